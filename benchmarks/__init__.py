@@ -0,0 +1,20 @@
+"""Benchmarks and load tests. Run from the project root: ``python -m benchmarks.<name>``."""
+
+import os
+
+# config.py loads .env on import and validates it. Benchmarks never talk to the
+# real Telegram API, so seed harmless values first (real env vars still win,
+# load_dotenv() does not override them).
+for _name, _value in {
+    "BOT_TOKEN": "123456:BENCHMARK",
+    "ADMIN_IDS": "1",
+    "GAME_LOG_CHANNEL": "",
+    "DUEL_LOG_CHANNEL": "",
+    "CHANNELS": "",
+    "CRYPTO_TOKEN": "",
+    "ROCKET_API_KEY": "",
+    # Simulated players tap as fast as the bot answers; the load test measures
+    # the bot, not the anti-flood middleware.
+    "THROTTLE_RATE": "0",
+}.items():
+    os.environ.setdefault(_name, _value)
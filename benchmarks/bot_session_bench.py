@@ -0,0 +1,134 @@
+"""Outbound Bot API scheduler against the local fake Bot API.
+
+Runs three kinds of traffic at once through one ``Bot`` on
+:class:`services.bot_session.ScheduledSession`:
+
+- ``--players`` chats each getting an interactive edit every 2 s;
+- a game log channel getting a message per game result;
+- a raffle broadcast of ``--broadcast`` invitations.
+
+A share of calls (``--rate-limit``) is answered with 429. Reports the
+busiest one-second window overall and per chat as Telegram saw it, the
+median/p99 queue wait per priority, the number of 429s retried, and how many
+sends failed. Log messages still queued for the channel (20 a minute) when
+the players stop are counted and cancelled. Compare with ``--raw`` (plain ``AiohttpSession``).
+
+Usage::
+
+    python -m benchmarks.bot_session_bench --players 40 --broadcast 600 --rate-limit 0.01
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+from benchmarks.fake_bot_api import FakeApiConfig, FakeBotApi
+
+USER_ID_BASE = 20_000_000
+LOG_CHANNEL = -1001234567890
+
+
+def busiest_second(times: list[float]) -> int:
+    times = sorted(times)
+    best, lo = 0, 0
+    for hi, at in enumerate(times):
+        while at - times[lo] >= 1.0:
+            lo += 1
+        best = max(best, hi - lo + 1)
+    return best
+
+
+async def run(players: int, broadcast: int, seconds: float, rate_limit: float, raw: bool) -> None:
+    from aiogram import Bot
+    from aiogram.client.session.aiohttp import AiohttpSession
+    from aiogram.client.telegram import TelegramAPIServer
+
+    from services.bot_session import Priority, RequestScheduler, ScheduledSession, priority
+
+    api = FakeBotApi(FakeApiConfig(rate_limit_ratio=rate_limit, retry_after=1, record=True))
+    await api.start()
+    server = TelegramAPIServer.from_base(api.url)
+    scheduler = RequestScheduler()
+    session = AiohttpSession(api=server) if raw else ScheduledSession(api=server, scheduler=scheduler)
+    bot = Bot("123456:BENCHMARK", session=session)
+    latencies: dict[str, list[float]] = {"interactive": [], "log": [], "broadcast": []}
+    failed = Counter()
+    logs: set[asyncio.Future] = set()
+
+    async def timed(kind: str, coro) -> None:
+        started = time.perf_counter()
+        try:
+            await coro
+        except Exception as e:
+            failed[type(e).__name__] += 1
+            return
+        latencies[kind].append(time.perf_counter() - started)
+
+    async def player(idx: int) -> None:
+        chat_id = USER_ID_BASE + idx
+        await asyncio.sleep(2.0 * idx / players)
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            await timed("interactive", bot.edit_message_text(text="🎲", chat_id=chat_id, message_id=1))
+            with priority(Priority.LOG):
+                logs.add(asyncio.ensure_future(timed("log", bot.send_message(LOG_CHANNEL, f"game by {chat_id}"))))
+            await asyncio.sleep(2.0)
+
+    async def raffle() -> None:
+        with priority(Priority.BROADCAST):
+            for i in range(broadcast):
+                await timed("broadcast", bot.send_message(USER_ID_BASE + players + i, "🎁 New raffle!"))
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(raffle(), *(player(i) for i in range(players)))
+        queued_logs = sum(not f.done() for f in logs)
+        for f in logs:
+            f.cancel()
+        await asyncio.gather(*logs, return_exceptions=True)
+    finally:
+        elapsed = time.perf_counter() - started
+        await scheduler.close()
+        await session.close()
+        await api.stop()
+
+    sends = [(at, chat) for at, method, chat in api.log if method in ("sendMessage", "editMessageText")]
+    by_chat: dict = {}
+    for at, chat in sends:
+        by_chat.setdefault(chat, []).append(at)
+    private = max((busiest_second(t) for chat, t in by_chat.items() if int(chat) > 0), default=0)
+    print(
+        f"{'raw session' if raw else 'scheduled session'}: {len(sends)} sends in {elapsed:.1f}s, "
+        f"busiest second {busiest_second([at for at, _ in sends])} (limit 30), "
+        f"busiest private chat second {private}, log channel {len(by_chat.get(str(LOG_CHANNEL), []))} msgs"
+    )
+    for kind, samples in latencies.items():
+        if samples:
+            samples.sort()
+            print(
+                f"  {kind:<11} n={len(samples):<5} wait p50 {statistics.median(samples) * 1000:7.1f} ms  "
+                f"p99 {samples[int(len(samples) * 0.99) - 1 if len(samples) >= 100 else -1] * 1000:7.1f} ms"
+            )
+    print(
+        f"  429 answered: {api.rate_limited}, retried: {scheduler.metrics.retry_after}, failed: {dict(failed) or 0}, "
+        f"logs still queued: {queued_logs}"
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=40)
+    parser.add_argument("--broadcast", type=int, default=600)
+    parser.add_argument("--seconds", type=float, default=20.0, help="how long players keep playing")
+    parser.add_argument("--rate-limit", type=float, default=0.01, help="share of calls answered with 429")
+    parser.add_argument("--raw", action="store_true", help="plain AiohttpSession for comparison")
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.players, args.broadcast, args.seconds, args.rate_limit, args.raw))
+
+
+if __name__ == "__main__":
+    main()
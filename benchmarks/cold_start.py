@@ -0,0 +1,101 @@
+"""Cold start: process launch to the first handled update.
+
+Starts the local fake Bot API, queues a ``/start`` message, then launches
+the bot (``main.main()``) in a fresh Python process pointed at the fake API
+and a throw-away database, and measures the time from launch until the
+bot's reply reaches the API. Repeats ``--runs`` times and prints each run
+with the bot's own startup breakdown (imports, routers, get_me, db,
+recovery) from its "First update handled" log line, plus the median.
+
+Usage::
+
+    python -m benchmarks.cold_start --runs 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import re
+import signal
+import statistics
+import sys
+import tempfile
+import time
+
+USER_ID = 20_000_001
+TIMEOUT = 60.0
+
+
+def child(url: str, workdir: str) -> None:
+    """Runs in the launched process: the real main() against the fake API."""
+    import main as bot_main  # first, so its startup clock covers every import
+    from aiogram.client.telegram import TelegramAPIServer
+
+    from database.db import db
+    from services.bot_session import ScheduledSession
+
+    db.path = os.path.join(workdir, "casino.db")
+    asyncio.run(bot_main.main(session=ScheduledSession(api=TelegramAPIServer.from_base(url))))
+
+
+async def one_run(workdir: str) -> tuple[float, str]:
+    from benchmarks.fake_bot_api import FakeBotApi
+
+    api = FakeBotApi()
+    url = await api.start()
+    try:
+        api.push_message(USER_ID, "/start")
+        replied = api.wait_for(USER_ID, lambda call: call.method == "sendMessage")
+        env = {
+            **os.environ,
+            "SEED_POOL_PATH": os.path.join(workdir, "seed_chain.bin"),
+            "LEDGER_ARCHIVE_DIR": os.path.join(workdir, "ledger"),
+            "BACKUP_DIR": os.path.join(workdir, "backups"),
+        }
+        started = time.perf_counter()
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "benchmarks.cold_start", "--child", url, workdir,
+            env=env, stderr=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            await asyncio.wait_for(replied, TIMEOUT)
+            elapsed = time.perf_counter() - started
+            await asyncio.sleep(0.2)  # let the "First update handled" line get written
+        finally:
+            proc.send_signal(signal.SIGINT)
+            try:
+                _, stderr = await asyncio.wait_for(proc.communicate(), 15)
+            except asyncio.TimeoutError:
+                proc.kill()
+                _, stderr = await proc.communicate()
+    finally:
+        await api.stop()
+    match = re.search(r"First update handled .*", stderr.decode(errors="replace"))
+    return elapsed, match.group(0) if match else "(no startup report in the log)"
+
+
+async def run(runs: int) -> None:
+    results = []
+    for i in range(runs):
+        with tempfile.TemporaryDirectory(prefix="casino-cold-") as workdir:
+            elapsed, breakdown = await one_run(workdir)
+        results.append(elapsed)
+        print(f"run {i + 1}: first reply after {elapsed:.2f}s | {breakdown}")
+    print(f"median cold start to first handled update: {statistics.median(results):.2f}s")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--child", nargs=2, metavar=("URL", "WORKDIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        child(*args.child)
+    else:
+        asyncio.run(run(args.runs))
+
+
+if __name__ == "__main__":
+    main()
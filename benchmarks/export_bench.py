@@ -0,0 +1,110 @@
+"""Export memory and speed: streamed gzip CSV/JSONL at growing table sizes.
+
+Fills a temporary ledger to each of ``--sizes`` rows and exports it with
+:func:`services.export.export_table` in both formats, reporting rows per
+second, file size and the peak Python memory traced during the export (it
+should stay flat as the table grows; tracing also makes the rows per second
+a lower bound). Meanwhile a writer keeps changing balances on the same
+database, and its slowest commit is reported: the read-only export
+connection must not block it.
+
+Usage::
+
+    python -m benchmarks.export_bench --sizes 100000,1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from decimal import Decimal
+
+USER_ID_BASE = 20_000_000
+
+
+async def grow(db, rows: int, users: int, rng: random.Random) -> None:
+    conn = db._conn()
+    now = datetime.now(timezone.utc).isoformat()
+    have = (await db.fetchone("SELECT COUNT(*) FROM transactions"))[0]
+    while have < rows:
+        batch = [
+            (USER_ID_BASE + rng.randrange(users), rng.choice([-5.0, 2.0, 10.0]), "bet", "system", 0.0, 0.0,
+             '{"game": "dice"}', now)
+            for _ in range(min(100_000, rows - have))
+        ]
+        await conn.executemany(
+            """
+            INSERT INTO transactions (user_id, amount, type, method, before, after, meta, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            batch,
+        )
+        have += len(batch)
+    await conn.commit()
+
+
+async def run(sizes: list[int], users: int, seed: int) -> None:
+    from database.db import db
+    from services.export import export_table
+
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory(prefix="casino-export-") as workdir:
+        db.path = os.path.join(workdir, "casino.db")
+        await db.connect()
+        try:
+            await db._conn().executemany(
+                "INSERT INTO users (user_id, balance) VALUES (?, 1000000)",
+                [(USER_ID_BASE + i,) for i in range(users)],
+            )
+            for size in sizes:
+                await grow(db, size, users, rng)
+                for fmt in ("csv", "jsonl"):
+                    stop = asyncio.Event()
+                    slowest = 0.0
+
+                    async def writer():
+                        nonlocal slowest
+                        while not stop.is_set():
+                            started = time.perf_counter()
+                            await db.change_balance_atomic(
+                                USER_ID_BASE, Decimal("-1"), tx_type="bet", method="system",
+                            )
+                            slowest = max(slowest, time.perf_counter() - started)
+                            await asyncio.sleep(0.005)
+
+                    task = asyncio.create_task(writer())
+                    tracemalloc.start()
+                    started = time.perf_counter()
+                    result = await asyncio.to_thread(export_table, db.path, "transactions", fmt, workdir=workdir)
+                    elapsed = time.perf_counter() - started
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    stop.set()
+                    await task
+                    os.remove(result.path)
+                    print(
+                        f"{result.rows:>9,} rows {fmt:5}: {result.rows / elapsed:,.0f} rows/s, "
+                        f"{result.size / 1e6:.1f} MB gz, peak traced memory {peak / 1e6:.1f} MB, "
+                        f"slowest concurrent write {slowest * 1000:.1f} ms"
+                    )
+        finally:
+            await db.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100000,1000000", help="comma-separated ledger sizes")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    asyncio.run(run([int(size) for size in args.sizes.split(",")], args.users, args.seed))
+
+
+if __name__ == "__main__":
+    main()
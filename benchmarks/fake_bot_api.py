@@ -0,0 +1,320 @@
+"""Local stand-in for the Telegram Bot API.
+
+Serves just enough of the HTTP API for the bot to run against it:
+getUpdates, sendMessage, editMessageText, sendDice, getChatMember,
+answerCallbackQuery, sendInvoice (plus getMe and a catch-all that returns
+``true``). Every call can be delayed by a configurable latency and a share of
+calls can be answered with 429 to exercise RetryAfter handling.
+
+Simulated users push updates with :meth:`FakeBotApi.push_callback` /
+:meth:`FakeBotApi.push_message` and wait for the bot's reaction with
+:meth:`FakeBotApi.wait_for`. Several bots can share one fake API: each token
+passed to :meth:`FakeBotApi.add_bot` gets its own ``getMe`` user and update
+queue; other tokens all read the shared queue.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from aiohttp import web
+
+
+BOT_USER = {
+    "id": 1000000001,
+    "is_bot": True,
+    "first_name": "Casino",
+    "username": "casino_bench_bot",
+}
+
+# Value ranges Telegram uses for each animated emoji.
+DICE_RANGES = {
+    "🎲": 6,
+    "🎯": 6,
+    "🎳": 6,
+    "⚽": 5,
+    "🏀": 5,
+    "🎰": 64,
+}
+
+
+@dataclass
+class FakeApiConfig:
+    latency: float = 0.0  # seconds added to every call
+    jitter: float = 0.0  # extra uniform random delay, seconds
+    rate_limit_ratio: float = 0.0  # share of calls answered with 429
+    retry_after: int = 1
+    record: bool = False  # keep (time, method, chat_id) of every call in FakeBotApi.log
+
+
+@dataclass(frozen=True)
+class ApiCall:
+    method: str
+    params: dict[str, Any]
+    at: float
+
+
+Predicate = Callable[[ApiCall], bool]
+
+
+class FakeBotApi:
+    def __init__(self, config: FakeApiConfig | None = None):
+        self.config = config or FakeApiConfig()
+        self.url = ""
+        self.calls: Counter[str] = Counter()
+        self.rate_limited = 0
+        self.log: list[tuple[float, str, Any]] = []
+
+        self._updates: asyncio.Queue[dict] = asyncio.Queue()
+        self._bots: dict[str, tuple[dict, asyncio.Queue[dict]]] = {}  # token -> (getMe user, updates)
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+        self._callback_ids = itertools.count(1)
+        self._callback_chat: dict[str, int] = {}
+        self._last_markup: dict[int, dict] = {}
+        self._last_message: dict[int, int] = {}
+        self._waiters: dict[int, list[tuple[Predicate, asyncio.Future]]] = defaultdict(list)
+        self._runner: web.AppRunner | None = None
+
+    # ------------------------
+    # lifecycle
+    # ------------------------
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application(client_max_size=16 * 1024 * 1024)
+        app.router.add_route("*", "/bot{token}/{method}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        real_port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        self.url = f"http://{host}:{real_port}"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    # ------------------------
+    # update injection
+    # ------------------------
+    def add_bot(self, token: str) -> dict:
+        """Serve ``token`` as a bot of its own (id from the token) with its own updates."""
+        bot_id = int(token.split(":")[0])
+        user = {**BOT_USER, "id": bot_id, "username": f"casino_bench_{bot_id}_bot"}
+        self._bots[token] = (user, asyncio.Queue())
+        return user
+
+    def _queue(self, token: str | None) -> asyncio.Queue[dict]:
+        return self._bots[token][1] if token is not None else self._updates
+
+    def push_message(self, user_id: int, text: str, token: str | None = None) -> None:
+        self._queue(token).put_nowait({
+            "update_id": next(self._update_ids),
+            "message": {
+                "message_id": next(self._message_ids),
+                "date": int(time.time()),
+                "chat": self._chat(user_id),
+                "from": self._user(user_id),
+                "text": text,
+            },
+        })
+
+    def push_callback(self, user_id: int, data: str, token: str | None = None) -> None:
+        callback_id = str(next(self._callback_ids))
+        self._callback_chat[callback_id] = user_id
+        self._queue(token).put_nowait({
+            "update_id": next(self._update_ids),
+            "callback_query": {
+                "id": callback_id,
+                "from": self._user(user_id),
+                "chat_instance": str(user_id),
+                "data": data,
+                "message": {
+                    "message_id": self._last_message.get(user_id) or next(self._message_ids),
+                    "date": int(time.time()),
+                    "chat": self._chat(user_id),
+                    "from": BOT_USER,
+                    "text": "…",
+                },
+            },
+        })
+
+    def wait_for(self, chat_id: int, predicate: Predicate | None = None) -> asyncio.Future:
+        """Future resolved with the next API call addressed to ``chat_id``."""
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters[chat_id].append((predicate or (lambda _call: True), fut))
+        return fut
+
+    def last_markup(self, chat_id: int) -> dict:
+        return self._last_markup.get(chat_id) or {}
+
+    def find_callback(self, chat_id: int, prefix: str) -> str | None:
+        for row in self.last_markup(chat_id).get("inline_keyboard", []):
+            for button in row:
+                data = button.get("callback_data")
+                if data and data.startswith(prefix):
+                    return data
+        return None
+
+    # ------------------------
+    # HTTP
+    # ------------------------
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        params = await self._read_params(request)
+        self.calls[method] += 1
+        if self.config.record:
+            self.log.append((time.perf_counter(), method, params.get("chat_id")))
+
+        if method != "getUpdates":
+            delay = self.config.latency + random.uniform(0, self.config.jitter)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.config.rate_limit_ratio and random.random() < self.config.rate_limit_ratio:
+                self.rate_limited += 1
+                return web.json_response({
+                    "ok": False,
+                    "error_code": 429,
+                    "description": f"Too Many Requests: retry after {self.config.retry_after}",
+                    "parameters": {"retry_after": self.config.retry_after},
+                })
+
+        handler = getattr(self, f"_m_{method}", None)
+        if method in ("getMe", "getUpdates"):
+            result = await handler(params, request.match_info["token"])
+        else:
+            result = await handler(params) if handler else True
+        return web.json_response({"ok": True, "result": result})
+
+    @staticmethod
+    async def _read_params(request: web.Request) -> dict[str, Any]:
+        if request.content_type == "application/json":
+            return await request.json()
+        raw = await request.post()
+        params: dict[str, Any] = {}
+        for key, value in raw.items():
+            if isinstance(value, str) and value[:1] in "[{":
+                try:
+                    params[key] = json.loads(value)
+                    continue
+                except ValueError:
+                    pass
+            params[key] = value
+        return params
+
+    def _notify(self, chat_id: int | None, method: str, params: dict[str, Any]) -> None:
+        if chat_id is None:
+            return
+        if isinstance(params.get("reply_markup"), dict):
+            self._last_markup[chat_id] = params["reply_markup"]
+        waiters = self._waiters.get(chat_id)
+        if not waiters:
+            return
+        call = ApiCall(method, params, time.perf_counter())
+        keep = []
+        for predicate, fut in waiters:
+            if fut.done():
+                continue
+            if predicate(call):
+                fut.set_result(call)
+            else:
+                keep.append((predicate, fut))
+        self._waiters[chat_id] = keep
+
+    # ------------------------
+    # API methods
+    # ------------------------
+    async def _m_getMe(self, params: dict, token: str) -> dict:
+        return self._bots[token][0] if token in self._bots else BOT_USER
+
+    async def _m_getUpdates(self, params: dict, token: str) -> list[dict]:
+        timeout = float(params.get("timeout") or 0)
+        limit = int(params.get("limit") or 100)
+        updates = self._bots[token][1] if token in self._bots else self._updates
+        batch: list[dict] = []
+        try:
+            batch.append(await asyncio.wait_for(updates.get(), timeout=max(timeout, 0.01)))
+        except asyncio.TimeoutError:
+            return []
+        while len(batch) < limit and not updates.empty():
+            batch.append(updates.get_nowait())
+        return batch
+
+    async def _m_sendMessage(self, params: dict) -> dict:
+        chat_id = int(params["chat_id"])
+        message = self._message(chat_id, text=params.get("text"))
+        self._notify(chat_id, "sendMessage", params)
+        return message
+
+    async def _m_editMessageText(self, params: dict) -> dict | bool:
+        if "chat_id" not in params:
+            return True
+        chat_id = int(params["chat_id"])
+        message = self._message(chat_id, text=params.get("text"), message_id=int(params["message_id"]))
+        self._notify(chat_id, "editMessageText", params)
+        return message
+
+    async def _m_sendDice(self, params: dict) -> dict:
+        chat_id = int(params["chat_id"])
+        emoji = str(params.get("emoji") or "🎲").replace("\ufe0f", "")
+        message = self._message(chat_id)
+        message["dice"] = {"emoji": emoji, "value": random.randint(1, DICE_RANGES.get(emoji, 6))}
+        self._notify(chat_id, "sendDice", params)
+        return message
+
+    async def _m_getChatMember(self, params: dict) -> dict:
+        return {"status": "member", "user": self._user(int(params["user_id"]))}
+
+    async def _m_answerCallbackQuery(self, params: dict) -> bool:
+        chat_id = self._callback_chat.pop(str(params.get("callback_query_id")), None)
+        self._notify(chat_id, "answerCallbackQuery", params)
+        return True
+
+    async def _m_sendInvoice(self, params: dict) -> dict:
+        chat_id = int(params["chat_id"])
+        prices = params.get("prices") or [{"amount": 0}]
+        message = self._message(chat_id)
+        message["invoice"] = {
+            "title": params.get("title", ""),
+            "description": params.get("description", ""),
+            "start_parameter": "",
+            "currency": params.get("currency", "XTR"),
+            "total_amount": int(prices[0]["amount"]),
+        }
+        self._notify(chat_id, "sendInvoice", params)
+        return message
+
+    # ------------------------
+    # helpers
+    # ------------------------
+    def _message(self, chat_id: int, *, text: str | None = None, message_id: int | None = None) -> dict:
+        if message_id is None:
+            message_id = next(self._message_ids)
+            self._last_message[chat_id] = message_id
+        message: dict[str, Any] = {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": self._chat(chat_id),
+            "from": BOT_USER,
+        }
+        if text is not None:
+            message["text"] = text
+        return message
+
+    @staticmethod
+    def _chat(chat_id: int) -> dict:
+        if chat_id < 0:
+            return {"id": chat_id, "type": "supergroup", "title": f"chat {chat_id}"}
+        return {"id": chat_id, "type": "private", "first_name": f"user{chat_id}"}
+
+    @staticmethod
+    def _user(user_id: int) -> dict:
+        return {"id": user_id, "is_bot": False, "first_name": f"user{user_id}", "language_code": "en"}
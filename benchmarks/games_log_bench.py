@@ -0,0 +1,89 @@
+"""Games log insert rate: one commit per round vs the buffered writer.
+
+Writes N synthetic rounds (with seed/proof columns filled like server-side
+dice) into a temporary database twice: first with one ``INSERT`` + commit per
+round, as ``services.game_stats`` used to, then through
+:class:`services.games_log.GamesLogWriter` from ``--writers`` concurrent
+coroutines with the background flusher running. Reports inserts per second
+for both and checks every row arrived.
+
+Usage::
+
+    python -m benchmarks.games_log_bench --rounds 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+
+def fake_round(rng: random.Random, i: int) -> tuple:
+    value = rng.randint(1, 6)
+    return (
+        20_000_000 + rng.randrange(1000), "dice", float(rng.choice([1, 5, 10])), "win" if value % 2 == 0 else "lose",
+        {"hash": "ab" * 32, "client_seed": "bench", "nonce": i}, {"faces": 6, "value": value},
+    )
+
+
+async def run(rounds: int, writers: int, max_rows: int, max_delay: float, seed: int) -> None:
+    from database.db import db
+    from services.games_log import GamesLogWriter, new_round_id
+
+    rng = random.Random(seed)
+    data = [fake_round(rng, i) for i in range(rounds)]
+    with tempfile.TemporaryDirectory(prefix="casino-games-log-") as workdir:
+        db.path = os.path.join(workdir, "casino.db")
+        await db.connect()
+        try:
+            # Before: one autocommitted INSERT per round.
+            direct = GamesLogWriter()  # not started: every write flushes on its own
+            started = time.perf_counter()
+            for user_id, game, bet, result, fair, proof in data:
+                await direct.write(user_id, game, bet, result, fair=fair, proof=proof, round_id=new_round_id())
+            direct_s = time.perf_counter() - started
+
+            # After: buffered, flushed every max_rows rows / max_delay seconds.
+            writer = GamesLogWriter(max_rows=max_rows, max_delay=max_delay)
+            writer.start()
+
+            async def play(chunk):
+                for user_id, game, bet, result, fair, proof in chunk:
+                    await writer.write(user_id, game, bet, result, fair=fair, proof=proof, round_id=new_round_id())
+                    await asyncio.sleep(0)  # interleave like concurrent handlers
+
+            started = time.perf_counter()
+            await asyncio.gather(*(play(data[i::writers]) for i in range(writers)))
+            await writer.close()
+            buffered_s = time.perf_counter() - started
+
+            stored = (await db.fetchone("SELECT COUNT(*) FROM games"))[0]
+        finally:
+            await db.close()
+
+    print(
+        f"rounds={rounds} per-row={rounds / max(direct_s, 1e-9):,.0f} inserts/s ({direct_s:.2f}s) "
+        f"buffered={rounds / max(buffered_s, 1e-9):,.0f} inserts/s ({buffered_s:.2f}s, "
+        f"{writer.flushes} flushes) speedup=x{direct_s / max(buffered_s, 1e-9):.1f}"
+    )
+    if stored != 2 * rounds:
+        raise SystemExit(f"games log mismatch: {stored} rows, expected {2 * rounds}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=50_000)
+    parser.add_argument("--writers", type=int, default=100, help="concurrent coroutines logging rounds")
+    parser.add_argument("--max-rows", type=int, default=500)
+    parser.add_argument("--max-delay", type=float, default=0.25, help="seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.rounds, args.writers, args.max_rows, args.max_delay, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""History page cost by depth: keyset pagination vs OFFSET.
+
+Fills a temporary ledger with ``--rows`` rows, ``--heavy`` of them belonging
+to one user, and times fetching a history page (``--page`` rows, with and
+without a type filter) at increasing depths two ways:
+
+- ``offset``: ``ORDER BY id DESC LIMIT ? OFFSET ?``, the obvious pager;
+- ``keyset``: :func:`database.db.ledger_page_query` with the cursor the
+  previous page ended on (what the History screen puts in its buttons).
+
+Also prints the query plan, which should read only the covering index.
+
+Usage::
+
+    python -m benchmarks.history_bench --rows 2000000 --heavy 300000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+USER_ID_BASE = 20_000_000
+TYPES = ["deposit", "balance", "bet", "win", "duel_bet", "duel_win", "raffle_entry"]
+
+
+async def fill(path: str, rows: int, heavy: int, users: int, rng: random.Random) -> None:
+    from database.db import db
+
+    db.path = path
+    await db.connect()
+    try:
+        conn = db._conn()
+        await conn.executemany(
+            "INSERT INTO users (user_id) VALUES (?)", [(USER_ID_BASE + i,) for i in range(users)],
+        )
+        start = datetime.now(timezone.utc) - timedelta(days=28)
+        heavy_every = max(rows // max(heavy, 1), 1)
+        for offset in range(0, rows, 200_000):
+            batch = []
+            for i in range(offset, min(offset + 200_000, rows)):
+                user = USER_ID_BASE if i % heavy_every == 0 else USER_ID_BASE + 1 + rng.randrange(users - 1)
+                batch.append((
+                    user, rng.choice([-5.0, -1.0, 2.0, 10.0]), rng.choice(TYPES), "system", 0.0, 0.0,
+                    (start + timedelta(seconds=i)).isoformat(),
+                ))
+            await conn.executemany(
+                """
+                INSERT INTO transactions (user_id, amount, type, method, before, after, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                batch,
+            )
+        await conn.commit()
+    finally:
+        await db.close()
+
+
+def timed(conn: sqlite3.Connection, query: str, params, repeat: int) -> tuple[float, list]:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        rows = conn.execute(query, params).fetchall()
+    return (time.perf_counter() - started) / repeat * 1000, rows
+
+
+def run_depths(conn, page: int, depths: list[int], types, repeat: int) -> list[tuple[int, float, float]]:
+    from database.db import HISTORY_COLUMNS, ledger_page_query
+
+    where = "user_id=?" + (f" AND type IN ({', '.join('?' * len(types))})" if types else "")
+    results = []
+    for depth in depths:
+        offset = depth * page
+        offset_sql = (
+            f"SELECT {HISTORY_COLUMNS} FROM transactions WHERE {where} ORDER BY id DESC LIMIT ? OFFSET ?"
+        )
+        offset_ms, expected = timed(conn, offset_sql, [USER_ID_BASE, *(types or ()), page, offset], repeat)
+        if not expected:
+            break
+        # The cursor the previous page ended on.
+        cursor = None
+        if offset:
+            cursor = conn.execute(
+                f"SELECT id FROM transactions WHERE {where} ORDER BY id DESC LIMIT 1 OFFSET ?",
+                [USER_ID_BASE, *(types or ()), offset - 1],
+            ).fetchone()[0]
+        query, params = ledger_page_query(
+            "transactions", USER_ID_BASE, before_id=cursor, limit=page, types=types, columns=HISTORY_COLUMNS,
+        )
+        keyset_ms, rows = timed(conn, query, params, repeat)
+        if rows != expected:
+            raise SystemExit(f"keyset page at depth {depth} differs from the OFFSET page")
+        results.append((depth, offset_ms, keyset_ms))
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--heavy", type=int, default=300_000, help="ledger rows of the user being paged")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--page", type=int, default=11)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    from database.db import HISTORY_COLUMNS, ledger_page_query
+
+    with tempfile.TemporaryDirectory(prefix="casino-history-") as workdir:
+        path = os.path.join(workdir, "casino.db")
+        asyncio.run(fill(path, args.rows, args.heavy, args.users, random.Random(args.seed)))
+        conn = sqlite3.connect(path)
+        try:
+            query, params = ledger_page_query(
+                "transactions", USER_ID_BASE, before_id=10 ** 9, limit=args.page,
+                types=("deposit",), columns=HISTORY_COLUMNS,
+            )
+            plan = " | ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params))
+            print(f"rows={args.rows} user rows={args.heavy} page={args.page}\nplan: {plan}")
+            depths = [0, 10, 100, 1000, 10_000]
+            for label, types in (("all", None), ("deposit", ("deposit",))):
+                for depth, offset_ms, keyset_ms in run_depths(conn, args.page, depths, types, args.repeat):
+                    print(f"{label:8} page {depth:>6}: offset {offset_ms:7.3f} ms   keyset {keyset_ms:7.3f} ms")
+        finally:
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
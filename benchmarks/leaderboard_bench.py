@@ -0,0 +1,114 @@
+"""Leaderboard reads and updates: in-memory ordered boards vs ORDER BY.
+
+Fills ``users`` with ``--users`` rows and feeds the same random rounds into
+:class:`services.leaderboards.Leaderboards`, then compares
+
+- the top 10 from ``ORDER BY profit_won DESC LIMIT 10`` on ``users`` with
+  ``Board.top(10)``;
+- a player's rank via ``COUNT(*) WHERE profit_won > ?`` with ``Board.rank``;
+
+and reports settlement-hook updates per second. Finally snapshots the boards
+to the database, loads them into a fresh instance and checks they match.
+
+Usage::
+
+    python -m benchmarks.leaderboard_bench --users 200000 --rounds 500000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+USER_ID_BASE = 20_000_000
+
+
+def per_call(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+async def run(users: int, rounds: int, seed: int) -> None:
+    from database.db import db
+    from services.leaderboards import Leaderboards
+
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory(prefix="casino-leaderboard-") as workdir:
+        db.path = os.path.join(workdir, "casino.db")
+        await db.connect()
+        try:
+            boards = Leaderboards()
+            profit = {}
+            plays = [
+                (USER_ID_BASE + rng.randrange(users), rng.choice([1.0, 5.0, 10.0]), rng.choice([0.0, 0.0, 2.0, 20.0]))
+                for _ in range(rounds)
+            ]
+            started = time.perf_counter()
+            for user_id, bet, win in plays:
+                boards.record_round(user_id, bet, win)
+            update_s = time.perf_counter() - started
+            for user_id, _, win in plays:
+                profit[user_id] = profit.get(user_id, 0.0) + win
+
+            conn = db._conn()
+            await conn.executemany(
+                "INSERT INTO users (user_id, profit_won) VALUES (?, ?)",
+                [(USER_ID_BASE + i, profit.get(USER_ID_BASE + i, 0.0)) for i in range(users)],
+            )
+            await conn.commit()
+
+            import sqlite3
+            sync = sqlite3.connect(db.path)
+            player = plays[0][0]
+            order_us = per_call(
+                lambda: sync.execute("SELECT user_id FROM users ORDER BY profit_won DESC LIMIT 10").fetchall(), 20,
+            )
+            count_us = per_call(
+                lambda: sync.execute(
+                    "SELECT COUNT(*) FROM users WHERE profit_won > ?", (profit[player],),
+                ).fetchone(), 20,
+            )
+            sync.close()
+            board = boards.board("wager", "all")
+            top_us = per_call(lambda: board.top(10), 10_000)
+            rank_us = per_call(lambda: board.rank(player), 10_000)
+
+            started = time.perf_counter()
+            written = await boards.snapshot()
+            snapshot_s = time.perf_counter() - started
+            restored = Leaderboards()
+            await restored.load()
+        finally:
+            await db.close()
+
+    print(
+        f"users={users} rounds={rounds}\n"
+        f"settlement hook: {rounds / update_s:,.0f} rounds/s (3 periods x 2 boards each)\n"
+        f"top 10:  ORDER BY {order_us:,.0f} us   board {top_us:.1f} us\n"
+        f"rank:    COUNT(*) {count_us:,.0f} us   board {rank_us:.1f} us\n"
+        f"snapshot: {written:,} rows in {snapshot_s:.2f}s"
+    )
+    for metric in ("win", "wager"):
+        for period in ("day", "week", "all"):
+            board = boards.board(metric, period)
+            if restored.board(metric, period).top(len(board)) != board.top(len(board)):
+                raise SystemExit(f"{metric}/{period} differs after snapshot + load")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--rounds", type=int, default=500_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.users, args.rounds, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Ledger write cost with a long history, partitioned vs one table.
+
+Builds two temporary databases holding the same ``--history`` ledger rows
+spread over ``--months`` past months:
+
+- ``flat``: everything stays in ``transactions`` (the old layout);
+- ``partitioned``: each month is closed with ``LedgerArchiver.run_once`` as it
+  ends, keeping ``--hot-months`` closed months live and archiving the rest.
+
+Then times ``--writes`` balance changes (``DB.change_balance_atomic``) on each
+and reports writes per second, plus how long rotation and archiving took.
+Checks that :func:`services.ledger.history` pages through a user's rows
+across live and archived partitions exactly like a query on the flat table.
+
+Usage::
+
+    python -m benchmarks.ledger_bench --history 1000000 --months 12
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+USER_ID_BASE = 20_000_000
+
+
+def month_starts(months: int, now: datetime) -> list[datetime]:
+    """First moments of the ``months`` months before ``now``'s month, oldest first."""
+    starts = []
+    start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    for _ in range(months):
+        start = (start - timedelta(days=1)).replace(day=1)
+        starts.append(start)
+    return starts[::-1]
+
+
+async def fill(db, users: int, history: int, starts: list[datetime], rng: random.Random, archiver=None) -> float:
+    """Insert ``history`` rows month by month; rotate after each month if ``archiver`` is given."""
+    conn = db._conn()
+    await conn.executemany(
+        "INSERT INTO users (user_id, balance, created_at, updated_at) VALUES (?, 1000000, ?, ?)",
+        [(USER_ID_BASE + i, starts[0].isoformat(), starts[0].isoformat()) for i in range(users)],
+    )
+    await conn.commit()
+    per_month = history // len(starts)
+    rotate_s = 0.0
+    for index, start in enumerate(starts):
+        rows = []
+        for i in range(per_month):
+            at = start + timedelta(seconds=i * 86400 * 28 / per_month)
+            rows.append((
+                USER_ID_BASE + rng.randrange(users), rng.choice([-5.0, -1.0, 2.0, 10.0]),
+                rng.choice(["bet", "win", "deposit"]), "system", 0.0, 0.0, None, at.isoformat(),
+            ))
+        await conn.executemany(
+            """
+            INSERT INTO transactions (user_id, amount, type, method, before, after, meta, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+        await conn.commit()
+        if archiver is not None:
+            ends = starts[index + 1] if index + 1 < len(starts) else datetime.now(timezone.utc)
+            started = time.perf_counter()
+            await archiver.run_once(ends + timedelta(hours=1))
+            rotate_s += time.perf_counter() - started
+    return rotate_s
+
+
+async def time_writes(db, users: int, writes: int, rng: random.Random) -> float:
+    started = time.perf_counter()
+    for _ in range(writes):
+        await db.change_balance_atomic(
+            USER_ID_BASE + rng.randrange(users), Decimal("-1"), tx_type="bet", method="system",
+        )
+    return time.perf_counter() - started
+
+
+async def run(history: int, months: int, users: int, writes: int, hot_months: int, seed: int) -> None:
+    from database.db import db, ledger_page_query
+    from services.ledger import LedgerArchiver
+
+    starts = month_starts(months, datetime.now(timezone.utc))
+    with tempfile.TemporaryDirectory(prefix="casino-ledger-") as workdir:
+        results = {}
+        for layout in ("flat", "partitioned"):
+            db.path = os.path.join(workdir, f"{layout}.db")
+            archiver = LedgerArchiver(hot_months, os.path.join(workdir, "archive")) if layout == "partitioned" else None
+            await db.connect()
+            try:
+                rotate_s = await fill(db, users, history, starts, random.Random(seed), archiver)
+                # Same starting point for both layouts: filling/archiving leaves a long WAL.
+                await db._conn().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                write_s = await time_writes(db, users, writes, random.Random(seed + 1))
+                hot = (await db.fetchone("SELECT COUNT(*) FROM transactions"))[0]
+                results[layout] = (write_s, rotate_s, hot)
+
+                if archiver is not None:
+                    # Page through one user's history and compare with the flat copy.
+                    user_id = USER_ID_BASE + 7
+                    pages, before = [], None
+                    while True:
+                        page = await archiver.history(user_id, before_id=before, limit=100)
+                        if not page:
+                            break
+                        pages.extend(row["id"] for row in page)
+                        before = page[-1]["id"]
+                    partitions = await db.get_ledger_partitions()
+                    await archiver.stop()
+            finally:
+                await db.close()
+
+        import sqlite3
+        flat = sqlite3.connect(os.path.join(workdir, "flat.db"))
+        query, params = ledger_page_query("transactions", USER_ID_BASE + 7, limit=10 ** 9)
+        expected = [row[0] for row in flat.execute(query, params)]
+        flat.close()
+        archive_bytes = sum(
+            os.path.getsize(os.path.join(workdir, "archive", f)) for f in os.listdir(os.path.join(workdir, "archive"))
+        ) if os.path.isdir(os.path.join(workdir, "archive")) else 0
+
+    flat_s, _, flat_hot = results["flat"]
+    part_s, rotate_s, part_hot = results["partitioned"]
+    archived = sum(1 for p in partitions if p["archive"])
+    print(
+        f"history={history} months={months} writes={writes}\n"
+        f"flat:        {writes / flat_s:,.0f} writes/s, transactions rows={flat_hot}\n"
+        f"partitioned: {writes / part_s:,.0f} writes/s, transactions rows={part_hot}, "
+        f"partitions={len(partitions)} archived={archived} ({archive_bytes / 1e6:.1f} MB gz), "
+        f"rotate+archive total={rotate_s:.2f}s\n"
+        f"history pages: {len(pages)} rows for one user across partitions"
+    )
+    if pages != expected:
+        raise SystemExit(f"history mismatch: {len(pages)} rows vs {len(expected)} in the flat ledger")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, default=1_000_000)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--writes", type=int, default=20_000)
+    parser.add_argument("--hot-months", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.history, args.months, args.users, args.writes, args.hot_months, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""Load test: simulated players against the real dispatcher.
+
+Starts :class:`benchmarks.fake_bot_api.FakeBotApi`, points a ``Bot`` at it,
+builds the dispatcher from ``main.build_dispatcher()`` and lets N simulated
+users play dice, mines, blackjack, duels and raffles through callback
+updates. Each level runs against a fresh temporary database.
+
+Reported per level:
+- throughput (handled steps per second and finished scenarios per second);
+- p50 / p99 latency from pushing an update to the bot's first reaction;
+- DB contention: depth of the aiosqlite request queue sampled every 10 ms.
+
+Usage::
+
+    python -m benchmarks.load_test --users 100 1000 10000 --rounds 3
+    python -m benchmarks.load_test --users 100 --latency 0.05 --rate-limit 0.01
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass, field
+
+from benchmarks.fake_bot_api import FakeApiConfig, FakeBotApi
+
+USER_ID_BASE = 10_000_000
+START_BALANCE = 1_000_000.0
+STEP_TIMEOUT = 20.0
+
+GAME_WEIGHTS = {
+    "dice": 30,
+    "mines": 25,
+    "blackjack": 25,
+    "duel": 15,
+    "raffle": 5,
+}
+
+
+@dataclass
+class LevelStats:
+    users: int
+    steps: int = 0
+    scenarios: int = 0
+    timeouts: int = 0
+    latencies: list[float] = field(default_factory=list)
+    queue_samples: list[int] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+@dataclass
+class SharedState:
+    open_duels: list[int] = field(default_factory=list)
+    open_raffles: dict[int, tuple[int, int]] = field(default_factory=dict)  # id -> (host, joined)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+class Player:
+    def __init__(self, api: FakeBotApi, user_id: int, stats: LevelStats, shared: SharedState):
+        self.api = api
+        self.user_id = user_id
+        self.stats = stats
+        self.shared = shared
+
+    async def step(self, data: str, expect: str | None = None) -> bool:
+        """Push a callback and wait for the first matching bot reaction."""
+        fut = self.api.wait_for(
+            self.user_id,
+            (lambda call: call.method == expect) if expect else None,
+        )
+        started = time.perf_counter()
+        self.api.push_callback(self.user_id, data)
+        try:
+            call = await asyncio.wait_for(fut, STEP_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.stats.timeouts += 1
+            return False
+        self.stats.steps += 1
+        self.stats.latencies.append(call.at - started)
+        return True
+
+    async def play(self, game: str) -> None:
+        ok = await getattr(self, f"play_{game}")()
+        if ok:
+            self.stats.scenarios += 1
+
+    async def play_dice(self) -> bool:
+        return (
+            await self.step("game_dice")
+            and await self.step("dice_bet_1")
+            and await self.step("dc_even")
+            and await self.step(random.choice(["dc_even_even", "dc_even_odd"]), expect="sendMessage")
+        )
+
+    async def play_mines(self) -> bool:
+        return (
+            await self.step("game_mines")
+            and await self.step("mines_bet_1")
+            and await self.step("mines_count_8")
+            and await self.step(f"mines_cell_{random.randrange(25)}")
+            and await self.step("mines_cashout")
+        )
+
+    async def play_blackjack(self) -> bool:
+        return (
+            await self.step("game_blackjack")
+            and await self.step("bj_bet_1", expect="editMessageText")
+            and await self.step("bj_stand")
+        )
+
+    async def play_duel(self) -> bool:
+        if self.shared.open_duels:
+            duel_id = self.shared.open_duels.pop()
+            return await self.step(f"duel_join:{duel_id}")
+
+        if not (await self.step("duel_bet:1") and await self.step("duel_game:1:dice")):
+            return False
+        cancel = self.api.find_callback(self.user_id, "duel_cancel:")
+        if cancel:
+            self.shared.open_duels.append(int(cancel.split(":")[1]))
+        return True
+
+    async def play_raffle(self) -> bool:
+        for raffle_id, (host, joined) in list(self.shared.open_raffles.items()):
+            if host == self.user_id:
+                continue
+            if not await self.step(f"raffle_join:{raffle_id}", expect="answerCallbackQuery"):
+                return False
+            joined += 1
+            if joined >= 5:
+                self.shared.open_raffles.pop(raffle_id, None)
+                fut = self.api.wait_for(host)
+                self.api.push_callback(host, f"raffle_finish:{raffle_id}")
+                try:
+                    await asyncio.wait_for(fut, STEP_TIMEOUT)
+                except asyncio.TimeoutError:
+                    self.stats.timeouts += 1
+            else:
+                self.shared.open_raffles[raffle_id] = (host, joined)
+            return True
+
+        if not await self.step("raffle_amount:1", expect="editMessageText"):
+            return False
+        finish = self.api.find_callback(self.user_id, "raffle_finish:")
+        if finish:
+            self.shared.open_raffles[int(finish.split(":")[1])] = (self.user_id, 0)
+        return True
+
+
+async def sample_queue(stats: LevelStats, stop: asyncio.Event) -> None:
+    from database.db import db
+
+    while not stop.is_set():
+        conn = db.db
+        queue = getattr(conn, "_tx", None)
+        if queue is not None:
+            stats.queue_samples.append(queue.qsize())
+        await asyncio.sleep(0.01)
+
+
+async def seed_database(path: str, users: int) -> None:
+    from database.db import db
+
+    if db.db is not None:
+        await db.close()
+    db.path = path
+    await db.connect()
+    rows = [
+        (USER_ID_BASE + i, START_BALANCE, "en", "bench", "bench")
+        for i in range(users)
+    ]
+    conn = db._conn()
+    await conn.executemany(
+        "INSERT INTO users (user_id, balance, lang, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+        rows,
+    )
+    await conn.commit()
+    await db.set_setting("channels", "[]")
+    await db.set_setting("duel_log_channel", "")
+
+
+async def run_level(api: FakeBotApi, users: int, rounds: int, ramp: float, workdir: str) -> LevelStats:
+    await seed_database(os.path.join(workdir, f"casino_{users}.db"), users)
+
+    stats = LevelStats(users=users)
+    shared = SharedState()
+    games = list(GAME_WEIGHTS)
+    weights = list(GAME_WEIGHTS.values())
+
+    async def user_loop(idx: int) -> None:
+        await asyncio.sleep(ramp * idx / max(users, 1))
+        player = Player(api, USER_ID_BASE + idx, stats, shared)
+        for _ in range(rounds):
+            await player.play(random.choices(games, weights)[0])
+
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_queue(stats, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(user_loop(i) for i in range(users)))
+    stats.elapsed = time.perf_counter() - started
+    stop.set()
+    await sampler
+    return stats
+
+
+def report(stats: LevelStats, api: FakeBotApi) -> None:
+    elapsed = stats.elapsed or 1.0
+    samples = stats.queue_samples or [0]
+    print(
+        f"users={stats.users:<6} "
+        f"steps/s={stats.steps / elapsed:8.1f} "
+        f"scenarios/s={stats.scenarios / elapsed:7.1f} "
+        f"p50={percentile(stats.latencies, 50) * 1000:7.1f}ms "
+        f"p99={percentile(stats.latencies, 99) * 1000:7.1f}ms "
+        f"timeouts={stats.timeouts:<5} "
+        f"db_queue_avg={statistics.fmean(samples):6.2f} "
+        f"db_queue_max={max(samples):<4} "
+        f"429s={api.rate_limited}"
+    )
+
+
+async def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--rounds", type=int, default=3, help="scenarios per simulated user")
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds to spread user start over")
+    parser.add_argument("--latency", type=float, default=0.0, help="fake API latency, seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="fake API latency jitter, seconds")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="share of calls answered with 429")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+
+    from aiogram import Bot
+    from aiogram.client.default import DefaultBotProperties
+    from aiogram.client.session.aiohttp import AiohttpSession
+    from aiogram.client.telegram import TelegramAPIServer
+
+    import main as bot_main
+    from config import TOKEN
+    from services import notifications
+
+    api = FakeBotApi(FakeApiConfig(latency=args.latency, jitter=args.jitter, rate_limit_ratio=args.rate_limit))
+    await api.start()
+
+    session = AiohttpSession(api=TelegramAPIServer.from_base(api.url))
+    bot = Bot(TOKEN, session=session, default=DefaultBotProperties(parse_mode="HTML"))
+    # Game logs go through a lazily created Bot; keep them on the fake API too.
+    notifications.bot_instance = bot
+
+    dp = bot_main.build_dispatcher()
+    # Updates are only pushed after a level has seeded its database, so polling
+    # can start right away.
+    polling = asyncio.create_task(dp.start_polling(bot, handle_signals=False))
+
+    with tempfile.TemporaryDirectory(prefix="casino-bench-") as workdir:
+        try:
+            for users in args.users:
+                stats = await run_level(api, users, args.rounds, args.ramp, workdir)
+                report(stats, api)
+        finally:
+            await dp.stop_polling()
+            await polling
+            from database.db import db
+
+            await db.close()
+            await session.close()
+            await api.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
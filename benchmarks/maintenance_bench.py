@@ -0,0 +1,134 @@
+"""WAL growth, checkpoint cost and online backup under a steady writer.
+
+Builds a ``--size-mb`` database, then with a writer changing balances all
+the time:
+
+1. holds a reader snapshot open while ``--burst`` balance changes are made
+   (what a long export or report does during a raffle) and shows how far the
+   WAL grows, then how long :meth:`Maintenance.check_wal` takes to truncate it;
+2. backs the database up with :func:`services.maintenance.backup_database`
+   and compares the writer's p50/p99/max commit latency during the backup
+   with the latency before it. Checks the copy opens and has every user.
+
+Usage::
+
+    python -m benchmarks.maintenance_bench --size-mb 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from decimal import Decimal
+
+USER_ID_BASE = 20_000_000
+
+
+def percentiles(samples: list[float]) -> str:
+    samples = sorted(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1] if len(samples) >= 100 else samples[-1]
+    return (
+        f"p50 {statistics.median(samples) * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms, "
+        f"max {samples[-1] * 1000:.1f} ms ({len(samples)} writes)"
+    )
+
+
+async def fill(db, size_mb: int, users: int) -> None:
+    conn = db._conn()
+    await conn.executemany(
+        "INSERT INTO users (user_id, balance) VALUES (?, 1000000)", [(USER_ID_BASE + i,) for i in range(users)],
+    )
+    pad = "x" * 400
+    while os.path.getsize(db.path) + os.path.getsize(f"{db.path}-wal") < size_mb * 1024 * 1024:
+        await conn.executemany(
+            """
+            INSERT INTO transactions (user_id, amount, type, method, before, after, meta, created_at)
+            VALUES (?, 1, 'bet', 'system', 0, 0, ?, '2026-01-01')
+            """,
+            [(USER_ID_BASE + i % users, pad) for i in range(50_000)],
+        )
+        await conn.commit()
+    await conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+async def run(size_mb: int, users: int, burst: int) -> None:
+    from database.db import db
+    from services.maintenance import Maintenance, backup_database
+
+    with tempfile.TemporaryDirectory(prefix="casino-maintenance-") as workdir:
+        db.path = os.path.join(workdir, "casino.db")
+        await db.connect()
+        try:
+            await fill(db, size_mb, users)
+            maintenance = Maintenance(backup_dir=os.path.join(workdir, "backups"), wal_limit=16 * 1024 * 1024)
+
+            # 1. WAL growth behind an open snapshot, then a size-driven checkpoint.
+            reader = sqlite3.connect(db.path, isolation_level=None)
+            reader.execute("BEGIN")
+            reader.execute("SELECT COUNT(*) FROM users").fetchone()
+            for i in range(burst):
+                await db.change_balance_atomic(USER_ID_BASE + i % users, Decimal("-1"), tx_type="bet", method="system")
+            grown = maintenance.wal_size()
+            reader.execute("COMMIT")
+            reader.close()
+            started = time.perf_counter()
+            mode = await maintenance.check_wal()
+            print(
+                f"db={size_mb} MB: WAL grew to {grown / 1e6:.1f} MB behind an open reader; "
+                f"check_wal ran {mode} in {(time.perf_counter() - started) * 1000:.0f} ms, "
+                f"WAL now {maintenance.wal_size() / 1e6:.1f} MB"
+            )
+
+            # 2. Writer latency without and with a backup running.
+            async def write_for(seconds: float | None, until: asyncio.Future | None = None) -> list[float]:
+                samples, deadline, i = [], time.perf_counter() + (seconds or 0), 0
+                while (until is not None and not until.done()) or (seconds and time.perf_counter() < deadline):
+                    started = time.perf_counter()
+                    await db.change_balance_atomic(
+                        USER_ID_BASE + i % users, Decimal("-1"), tx_type="bet", method="system",
+                    )
+                    samples.append(time.perf_counter() - started)
+                    i += 1
+                    await asyncio.sleep(0.001)
+                return samples
+
+            baseline = await write_for(3.0)
+            target = os.path.join(workdir, "backups", "casino-bench.db")
+            started = time.perf_counter()
+            backup = asyncio.ensure_future(asyncio.to_thread(backup_database, db.path, target))
+            during = await write_for(None, backup)
+            await backup
+            backup_s = time.perf_counter() - started
+        finally:
+            await db.close()
+
+        copy = sqlite3.connect(target)
+        copied_users = copy.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        integrity = copy.execute("PRAGMA quick_check").fetchone()[0]
+        copy.close()
+        print(
+            f"backup: {os.path.getsize(target) / 1e6:.1f} MB in {backup_s:.1f}s, users={copied_users}, "
+            f"quick_check={integrity}\n"
+            f"writes before backup: {percentiles(baseline)}\n"
+            f"writes during backup: {percentiles(during)}"
+        )
+        if copied_users != users or integrity != "ok":
+            raise SystemExit("backup copy is incomplete")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=200)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--burst", type=int, default=20_000, help="balance changes behind the open reader")
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.size_mb, args.users, args.burst))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Balance reconciliation over a large ledger: first full run, then incremental.
+
+Fills a temporary database with ``--rows`` ledger rows for ``--users`` users
+(balances set to their ledger sums), then:
+
+1. runs :meth:`services.reconcile.Reconciler.run` from scratch and reports
+   rows per second and the peak RSS growth, which should stay at the size of
+   one chunk however many rows there are;
+2. adds ``--new-rows`` balance changes and runs it again: only those rows
+   are read;
+3. changes one balance behind the ledger's back and checks that exactly that
+   user is reported.
+
+Usage::
+
+    python -m benchmarks.reconcile_bench --rows 5000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import resource
+import tempfile
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+
+USER_ID_BASE = 20_000_000
+FILL_BATCH = 200_000
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def fill(db, users: int, rows: int, rng: random.Random) -> None:
+    conn = db._conn()
+    balances = [0] * users  # in cents, so the sums are exact
+    now = datetime.now(timezone.utc).isoformat()
+    await conn.executemany(
+        "INSERT INTO users (user_id, balance) VALUES (?, 0)", [(USER_ID_BASE + i,) for i in range(users)],
+    )
+    done = 0
+    while done < rows:
+        batch = []
+        for _ in range(min(FILL_BATCH, rows - done)):
+            index = rng.randrange(users)
+            cents = rng.choice([-500, -100, 200, 1000, 2550])
+            balances[index] += cents
+            batch.append((USER_ID_BASE + index, cents / 100, "bet", "system", 0.0, 0.0, now))
+        await conn.executemany(
+            """
+            INSERT INTO transactions (user_id, amount, type, method, before, after, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            batch,
+        )
+        done += len(batch)
+    await conn.executemany(
+        "UPDATE users SET balance=? WHERE user_id=?",
+        [(cents / 100, USER_ID_BASE + i) for i, cents in enumerate(balances)],
+    )
+    await conn.commit()
+    await conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+async def run(rows: int, users: int, new_rows: int, chunk: int, seed: int) -> None:
+    from database.db import db
+    from services.reconcile import Reconciler
+
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory(prefix="casino-reconcile-") as workdir:
+        db.path = os.path.join(workdir, "casino.db")
+        await db.connect()
+        try:
+            started = time.perf_counter()
+            await fill(db, users, rows, rng)
+            fill_s = time.perf_counter() - started
+
+            reconciler = Reconciler(chunk=chunk)
+            rss_before = peak_rss_mb()
+            full = await reconciler.run()
+            rss_growth = peak_rss_mb() - rss_before
+
+            for _ in range(new_rows):
+                await db.change_balance_atomic(
+                    USER_ID_BASE + rng.randrange(users), Decimal("1.25"), tx_type="win", method="system", allow_negative=True,
+                )
+            incremental = await reconciler.run()
+
+            victim = USER_ID_BASE + 3
+            await db.execute("UPDATE users SET balance = balance + 7 WHERE user_id=?", (victim,))
+            broken = await reconciler.run()
+        finally:
+            await db.close()
+
+    print(
+        f"rows={rows} users={users} (fill {fill_s:.1f}s)\n"
+        f"full run:        {full.rows:,} rows in {full.elapsed:.2f}s "
+        f"({full.rows / max(full.elapsed, 1e-9):,.0f} rows/s), peak RSS +{rss_growth:.0f} MB, "
+        f"mismatches={len(full.mismatches)}\n"
+        f"incremental run: {incremental.rows:,} rows in {incremental.elapsed:.2f}s, "
+        f"mismatches={len(incremental.mismatches)}\n"
+        f"after a direct UPDATE: mismatches={[m[0] for m in broken.mismatches]}"
+    )
+    if full.rows != rows or full.mismatches:
+        raise SystemExit("full run did not match the ledger")
+    if incremental.rows != new_rows or incremental.mismatches:
+        raise SystemExit("incremental run re-read old rows or found false mismatches")
+    if [m[0] for m in broken.mismatches] != [victim]:
+        raise SystemExit("direct balance change was not reported")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--new-rows", type=int, default=2_000)
+    parser.add_argument("--chunk", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.rows, args.users, args.new_rows, args.chunk, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Startup recovery of orphaned rounds.
+
+Fills a temporary database with N users and N open rounds (mines with and
+without opened cells, Russian roulette at every stage, blackjack), runs
+:func:`services.recovery.recover_open_rounds` and reports how long it took.
+Checks that the journal is empty afterwards and that the balance credited
+matches the sum of payouts.
+
+Usage::
+
+    python -m benchmarks.recovery_bench --rounds 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+USER_ID_BASE = 20_000_000
+
+
+def random_round(rng: random.Random) -> tuple[str, float, dict]:
+    bet = float(rng.choice([1, 5, 10, 30, 50, 100]))
+    game = rng.choice(["mines", "russian", "blackjack"])
+    if game == "mines":
+        opened = rng.randint(0, 5)
+        return game, bet, {
+            "bet": bet,
+            "mines_count": 8,
+            "opened_cells": list(range(opened)),
+            "game_over": False,
+            "won": False,
+            "current_multiplier": 1.0 + 0.3 * opened,
+        }
+    if game == "russian":
+        return game, bet, {"bet": bet, "stage": rng.randint(1, 5)}
+    return game, bet, {"bet": bet}
+
+
+async def run(rounds: int, users: int, seed: int) -> None:
+    from database.db import db
+    from services.recovery import recover_open_rounds, settle_payout
+
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory(prefix="casino-recovery-") as workdir:
+        db.path = os.path.join(workdir, "casino.db")
+        await db.connect()
+        try:
+            conn = db._conn()
+            await conn.executemany(
+                "INSERT INTO users (user_id, balance, created_at, updated_at) VALUES (?, 0, 'bench', 'bench')",
+                [(USER_ID_BASE + i,) for i in range(users)],
+            )
+            journal = []
+            expected = 0.0
+            for _ in range(rounds):
+                game, bet, state = random_round(rng)
+                expected += settle_payout(game, bet, state)[1]
+                journal.append((
+                    USER_ID_BASE + rng.randrange(users), game, bet, json.dumps(state), "bench", "bench",
+                ))
+            await conn.executemany(
+                """
+                INSERT INTO open_rounds (user_id, game_type, bet, state, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                journal,
+            )
+            await conn.commit()
+
+            started = time.perf_counter()
+            report = await recover_open_rounds()
+            elapsed = time.perf_counter() - started
+
+            left = (await db.fetchone("SELECT COUNT(*) FROM open_rounds"))[0]
+            credited = (await db.fetchone("SELECT COALESCE(SUM(balance), 0) FROM users"))[0]
+            ledger = (await db.fetchone("SELECT COUNT(*) FROM transactions WHERE type='recovery'"))[0]
+        finally:
+            await db.close()
+
+    print(
+        f"rounds={report.rounds} users={users} elapsed={elapsed:.2f}s "
+        f"rounds/s={report.rounds / max(elapsed, 1e-9):,.0f} "
+        f"refunded={report.refunded} cashed_out={report.cashed_out} lost={report.lost} "
+        f"ledger_rows={ledger} left_open={left}"
+    )
+    if left or abs(credited - expected) > 1e-6 * max(expected, 1.0):
+        raise SystemExit(f"recovery mismatch: credited {credited:.2f}, expected {expected:.2f}, left {left}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.rounds, args.users, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Referral commissions and referral lists.
+
+Builds a referral forest of ``--users`` players (each invited by a random
+earlier player, ``--roots`` of them invited by nobody) in a temporary
+database, then:
+
+- settles ``--rounds`` losing rounds of random players through
+  :class:`services.referrals.ReferralAccruals`, once without the flusher (a
+  lookup and a credit per round, as before) and once with it running;
+  reports rounds per second, ledger rows written and checks both runs
+  credited the same total;
+- times the per-level counts and the first page of level ``--depth`` for the
+  players with the most referrals: ``referral_tree`` against a recursive
+  walk over ``referrals``.
+
+Usage::
+
+    python -m benchmarks.referral_bench --users 100000 --rounds 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+
+async def build_forest(db, users: int, roots: int, rng: random.Random) -> None:
+    from database.db import REFERRAL_DEPTH
+
+    now = "2026-01-01T00:00:00"
+    inviters = {uid: (rng.randint(1, uid - 1) if uid > roots else None) for uid in range(1, users + 1)}
+    async with db.transaction() as conn:
+        await conn.executemany(
+            "INSERT INTO users (user_id, referred_by, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            [(uid, ref, now, now) for uid, ref in inviters.items()],
+        )
+        await conn.executemany(
+            "INSERT INTO referrals (user_id, referred_by, created_at) VALUES (?, ?, ?)",
+            [(uid, ref, now) for uid, ref in inviters.items() if ref],
+        )
+        rows = []
+        for uid, ref in inviters.items():
+            depth = 1
+            while ref and depth <= REFERRAL_DEPTH:
+                rows.append((ref, depth, uid, now))
+                ref, depth = inviters[ref], depth + 1
+        await conn.executemany(
+            "INSERT INTO referral_tree (ancestor, depth, descendant, created_at) VALUES (?, ?, ?, ?)", rows
+        )
+
+
+async def settle(accruals, losses: list[tuple[int, float]], players: int) -> float:
+    async def play(chunk):
+        for user_id, loss in chunk:
+            await accruals.award(user_id, loss)
+            await asyncio.sleep(0)  # interleave like concurrent handlers
+
+    started = time.perf_counter()
+    await asyncio.gather(*(play(losses[i::players]) for i in range(players)))
+    await accruals.close()
+    return time.perf_counter() - started
+
+
+async def timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        await fn()
+    return (time.perf_counter() - started) / repeat
+
+
+async def run(users: int, roots: int, rounds: int, players: int, depth: int, repeat: int, seed: int) -> None:
+    from database.db import REFERRAL_DEPTH, db
+    from services.referrals import ReferralAccruals
+
+    rng = random.Random(seed)
+    losses = [(rng.randint(1, users), float(rng.choice([1, 5, 10]))) for _ in range(rounds)]
+    with tempfile.TemporaryDirectory(prefix="casino-referrals-") as workdir:
+        db.path = os.path.join(workdir, "casino.db")
+        await db.connect()
+        try:
+            await build_forest(db, users, roots, rng)
+            total_sql = "SELECT COALESCE(SUM(refs_earned), 0) FROM users"
+            ledger_sql = "SELECT COUNT(*) FROM transactions WHERE type='referral_loss_bonus'"
+
+            # Before: referrer lookup and a credit per losing round.
+            direct = ReferralAccruals()  # not started: every commission is credited on its own
+            direct_s = await settle(direct, losses, players)
+            direct_total = (await db.fetchone(total_sql))[0]
+            direct_rows = (await db.fetchone(ledger_sql))[0]
+
+            # After: cached referrers, commissions credited in batches.
+            batched = ReferralAccruals(flush_interval=0.5)
+            batched.start()
+            batched_s = await settle(batched, losses, players)
+            batched_total = (await db.fetchone(total_sql))[0] - direct_total
+            batched_rows = (await db.fetchone(ledger_sql))[0] - direct_rows
+
+            top = await db.fetchall(
+                "SELECT ancestor FROM referral_tree GROUP BY ancestor ORDER BY COUNT(*) DESC LIMIT 10"
+            )
+            top = [int(r[0]) for r in top]
+
+            async def tree_lists():
+                for uid in top:
+                    await db.count_referrals(uid)
+                    await db.get_referrals(uid, depth, limit=20)
+
+            walk_sql = """
+                WITH RECURSIVE down(user_id, depth) AS (
+                    SELECT user_id, 1 FROM referrals WHERE referred_by = ?
+                    UNION ALL
+                    SELECT r.user_id, down.depth + 1 FROM referrals r JOIN down ON r.referred_by = down.user_id
+                    WHERE down.depth < ?
+                )
+            """
+
+            async def walk_lists():
+                for uid in top:
+                    await db.fetchall(walk_sql + "SELECT depth, COUNT(*) FROM down GROUP BY depth", (uid, REFERRAL_DEPTH))
+                    await db.fetchall(
+                        walk_sql + "SELECT user_id FROM down WHERE depth = ? ORDER BY user_id LIMIT 20",
+                        (uid, REFERRAL_DEPTH, depth),
+                    )
+
+            tree_s = await timed(tree_lists, repeat) / len(top)
+            walk_s = await timed(walk_lists, repeat) / len(top)
+            sizes = await db.count_referrals(top[0])
+        finally:
+            await db.close()
+
+    print(
+        f"rounds={rounds} per-round={rounds / max(direct_s, 1e-9):,.0f} rounds/s ({direct_s:.2f}s, "
+        f"{direct_rows} ledger rows) batched={rounds / max(batched_s, 1e-9):,.0f} rounds/s ({batched_s:.2f}s, "
+        f"{batched_rows} ledger rows, {batched.flushes} flushes) speedup=x{direct_s / max(batched_s, 1e-9):.1f}"
+    )
+    print(
+        f"lists (top referrer: {sizes}) referral_tree={tree_s * 1e3:.2f} ms "
+        f"recursive walk={walk_s * 1e3:.2f} ms speedup=x{walk_s / max(tree_s, 1e-9):.1f}"
+    )
+    if abs(direct_total - batched_total) > 1e-6:
+        raise SystemExit(f"commission mismatch: {direct_total:.2f} per round vs {batched_total:.2f} batched")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--roots", type=int, default=1_000, help="players nobody invited")
+    parser.add_argument("--rounds", type=int, default=20_000, help="losing rounds to settle")
+    parser.add_argument("--players", type=int, default=100, help="concurrent coroutines settling rounds")
+    parser.add_argument("--depth", type=int, default=2, help="level listed")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.users, args.roots, args.rounds, args.players, args.depth, args.repeat, args.seed))
+
+
+if __name__ == "__main__":
+    main()
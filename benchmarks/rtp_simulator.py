@@ -0,0 +1,337 @@
+"""Vectorized Monte Carlo RTP simulator for the game engines.
+
+Runs every game with the payout tables the handlers actually use and reports,
+per game and bet size:
+
+- RTP (returned / wagered);
+- variance of the player's net result per round, in bets;
+- the house's max drawdown over the whole run;
+- bankroll-at-risk: the 99th percentile of the deepest house loss within a
+  session of ``--session`` rounds.
+
+Rounds are simulated in NumPy batches, so 10^7 rounds per game take seconds.
+With ``--max-rtp`` the script works as a CI check: it exits with status 1 if a
+live game pays back more than the limit.
+
+Requires NumPy (``pip install numpy``).
+
+Usage::
+
+    python -m benchmarks.rtp_simulator --rounds 10000000
+    python -m benchmarks.rtp_simulator --games mines blackjack --max-rtp 1.0
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+import numpy as np
+
+from handlers.games.mines import MinesGame
+from handlers.games.quick_sports import SPORTS
+from services.games.roulette_russian_logic import STAGE_MULT
+from services.games.rr_logic import MULT as RR_MULT
+
+BET_SIZES = (1, 5, 10, 30, 50, 100)
+
+# Telegram dice value ranges per emoji game.
+SPORT_FACES = {"football": 5, "darts": 6, "basketball": 5, "bowling": 6}
+SLOT_FACES = 64
+SLOT_WIN_MIN = 50
+
+# Blackjack: ranks 2..10, J, Q, K, A; 6 decks, a fresh shoe every hand.
+BJ_DECKS = 6
+BJ_VALUES = np.array([2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 1], dtype=np.int16)
+BJ_ACE = 12
+BJ_MAX_CARDS = 16
+
+
+@dataclass
+class Accumulator:
+    """Running statistics over a stream of (bet, payout) batches."""
+
+    session: int
+    rounds: int = 0
+    wagered: float = 0.0
+    returned: float = 0.0
+    net_sum: float = 0.0
+    net_sq_sum: float = 0.0
+    house_cum: float = 0.0
+    house_peak: float = 0.0
+    max_drawdown: float = 0.0
+    session_losses: list[np.ndarray] = field(default_factory=list)
+
+    def update(self, bet: float, payout: np.ndarray) -> None:
+        n = payout.shape[0]
+        net = (payout - bet) / bet
+        self.rounds += n
+        self.wagered += bet * n
+        self.returned += float(payout.sum())
+        self.net_sum += float(net.sum())
+        self.net_sq_sum += float((net * net).sum())
+
+        house = np.cumsum(bet - payout) + self.house_cum
+        peaks = np.maximum.accumulate(np.maximum(house, self.house_peak))
+        self.max_drawdown = max(self.max_drawdown, float((peaks - house).max()))
+        self.house_cum = float(house[-1])
+        self.house_peak = float(peaks[-1])
+
+        usable = n - n % self.session
+        if usable:
+            sessions = np.cumsum((bet - payout)[:usable].reshape(-1, self.session), axis=1)
+            self.session_losses.append(np.maximum(-sessions.min(axis=1), 0.0))
+
+    @property
+    def rtp(self) -> float:
+        return self.returned / self.wagered if self.wagered else 0.0
+
+    @property
+    def variance(self) -> float:
+        if not self.rounds:
+            return 0.0
+        mean = self.net_sum / self.rounds
+        return self.net_sq_sum / self.rounds - mean * mean
+
+    @property
+    def bankroll_at_risk(self) -> float:
+        if not self.session_losses:
+            return 0.0
+        return float(np.percentile(np.concatenate(self.session_losses), 99))
+
+
+# ------------------------
+# game kernels: (rng, n, bet) -> payouts
+# ------------------------
+Kernel = Callable[[np.random.Generator, int, float], np.ndarray]
+
+
+def dice_parity(rng: np.random.Generator, n: int, bet: float) -> np.ndarray:
+    roll = rng.integers(1, 7, n)
+    return np.where(roll % 2 == 0, bet * 2, 0.0)
+
+
+def dice_number(rng: np.random.Generator, n: int, bet: float) -> np.ndarray:
+    roll = rng.integers(1, 7, n)
+    return np.where(roll == 6, bet * 6, 0.0)
+
+
+def slot(rng: np.random.Generator, n: int, bet: float) -> np.ndarray:
+    value = rng.integers(1, SLOT_FACES + 1, n)
+    return np.where(value >= SLOT_WIN_MIN, bet * 2, 0.0)
+
+
+def sport(game: str) -> Kernel:
+    faces = SPORT_FACES[game]
+    win_min = SPORTS[game]["win_min"]
+
+    def kernel(rng: np.random.Generator, n: int, bet: float) -> np.ndarray:
+        value = rng.integers(1, faces + 1, n)
+        return np.where(value >= win_min, bet * 2, 0.0)
+
+    return kernel
+
+
+def russian(take_at: int) -> Kernel:
+    """handlers/games/roulette_russian.py with services/games/rr_logic.py.
+
+    The player shoots until reaching ``take_at`` and takes, or fires all five
+    chambers when ``take_at`` is 6. Payout formulas mirror rr_take and the
+    stage > 5 branch of rr_shoot_stage, including int() truncation.
+    """
+
+    def kernel(rng: np.random.Generator, n: int, bet: float) -> np.ndarray:
+        alive = np.ones(n, dtype=bool)
+        for stage in range(1, min(take_at, 6)):
+            alive &= rng.random(n) >= 1.0 / (7 - stage)
+        if take_at >= 6:
+            win = int(bet * RR_MULT.get(5, 1))
+        else:
+            win = bet + int(bet * RR_MULT.get(take_at - 1, 1))
+        return np.where(alive, float(win), 0.0)
+
+    return kernel
+
+
+def russian_legacy(shots: int) -> Kernel:
+    """services/games/roulette_russian_logic.py table (not wired to handlers)."""
+
+    def kernel(rng: np.random.Generator, n: int, bet: float) -> np.ndarray:
+        alive = np.ones(n, dtype=bool)
+        for stage in range(1, shots + 1):
+            alive &= rng.random(n) >= 1.0 / (7 - stage)
+        return np.where(alive, float(int(bet * STAGE_MULT[shots])), 0.0)
+
+    return kernel
+
+
+def mines(mines_count: int, opened: int) -> Kernel:
+    """Open ``opened`` cells, then cash out at MinesGame's multiplier."""
+    table = MinesGame(1, mines_count).multipliers
+    # open_cell keeps the previous multiplier when the table has no entry.
+    multiplier = 1.0
+    for k in range(1, opened + 1):
+        multiplier = table.get(k, multiplier)
+    safe = 25 - mines_count
+
+    def kernel(rng: np.random.Generator, n: int, bet: float) -> np.ndarray:
+        alive = np.ones(n, dtype=bool)
+        for j in range(opened):
+            alive &= rng.random(n) < (safe - j) / (25 - j)
+        return np.where(alive, round(bet * multiplier, 2), 0.0)
+
+    return kernel
+
+
+def _bj_draw_sequences(rng: np.random.Generator, n: int) -> np.ndarray:
+    """First BJ_MAX_CARDS ranks of a freshly shuffled 6-deck shoe, per row.
+
+    Draws shoe positions i.i.d. and redraws rows with a repeated position, which
+    leaves every ordered sample without replacement equally likely. Positions
+    are grouped by rank, so ``position // 24`` is the card rank.
+    """
+    shoe = 52 * BJ_DECKS
+    pos = rng.integers(0, shoe, (n, BJ_MAX_CARDS), dtype=np.int16)
+    while True:
+        ordered = np.sort(pos, axis=1)
+        dup = (ordered[:, 1:] == ordered[:, :-1]).any(axis=1)
+        if not dup.any():
+            break
+        pos[dup] = rng.integers(0, shoe, (int(dup.sum()), BJ_MAX_CARDS), dtype=np.int16)
+    return (pos // (4 * BJ_DECKS)).astype(np.int8)
+
+
+def _bj_value(hard: np.ndarray, aces: np.ndarray) -> np.ndarray:
+    soft = aces & (hard + 10 <= 21)
+    return np.where(soft, hard + 10, hard)
+
+
+def blackjack(stand_on: int) -> Kernel:
+    """handlers/games/blackjack.py rules; player hits below ``stand_on``."""
+
+    def kernel(rng: np.random.Generator, n: int, bet: float) -> np.ndarray:
+        seq = _bj_draw_sequences(rng, n)
+        rows = np.arange(n)
+        p_hard = (BJ_VALUES[seq[:, 0]] + BJ_VALUES[seq[:, 2]]).astype(np.int16)
+        p_aces = (seq[:, 0] == BJ_ACE) | (seq[:, 2] == BJ_ACE)
+        d_hard = (BJ_VALUES[seq[:, 1]] + BJ_VALUES[seq[:, 3]]).astype(np.int16)
+        d_aces = (seq[:, 1] == BJ_ACE) | (seq[:, 3] == BJ_ACE)
+        p_cards = np.full(n, 2, dtype=np.int8)
+        ptr = np.full(n, 4, dtype=np.int8)
+
+        while True:
+            hit = _bj_value(p_hard, p_aces) < stand_on
+            if not hit.any():
+                break
+            card = seq[rows, np.minimum(ptr, BJ_MAX_CARDS - 1)]
+            p_hard += np.where(hit, BJ_VALUES[card], 0).astype(np.int16)
+            p_aces |= hit & (card == BJ_ACE)
+            p_cards += hit
+            ptr += hit
+
+        pv = _bj_value(p_hard, p_aces)
+        player_bust = pv > 21
+        while True:
+            draw = ~player_bust & (_bj_value(d_hard, d_aces) < 17)
+            if not draw.any():
+                break
+            card = seq[rows, np.minimum(ptr, BJ_MAX_CARDS - 1)]
+            d_hard += np.where(draw, BJ_VALUES[card], 0).astype(np.int16)
+            d_aces |= draw & (card == BJ_ACE)
+            ptr += draw
+        dv = _bj_value(d_hard, d_aces)
+
+        # Same precedence as BlackjackGame.determine_winner / get_payout.
+        mult = np.select(
+            [
+                player_bust,
+                dv > 21,
+                pv == dv,
+                (pv == 21) & (p_cards == 2),
+                pv > dv,
+            ],
+            [0.0, 2.0, 1.0, 2.5, 2.0],
+            default=0.0,
+        )
+        return mult * bet
+
+    return kernel
+
+
+def build_games() -> dict[str, tuple[Kernel, bool]]:
+    """name -> (kernel, live). Live games count for the --max-rtp check."""
+    games: dict[str, tuple[Kernel, bool]] = {
+        "dice_parity": (dice_parity, True),
+        "dice_number": (dice_number, True),
+        "roulette_slot": (slot, True),
+    }
+    for name in SPORT_FACES:
+        games[f"sport_{name}"] = (sport(name), True)
+    for take_at in range(1, 7):
+        games[f"russian_take{take_at}"] = (russian(take_at), True)
+    for shots in range(1, 6):
+        games[f"russian_legacy_{shots}shots"] = (russian_legacy(shots), False)
+    for mines_count in (3, 8, 10, 15, 20, 24):
+        for opened in sorted({1, 2, 3, 5, 25 - mines_count}):
+            if opened <= 25 - mines_count:
+                games[f"mines_{mines_count}m_{opened}open"] = (mines(mines_count, opened), True)
+    for stand_on in (12, 15, 17):
+        games[f"blackjack_stand{stand_on}"] = (blackjack(stand_on), True)
+    return games
+
+
+def simulate(kernel: Kernel, *, rounds: int, batch: int, bet: float, session: int, seed: int) -> tuple[Accumulator, float]:
+    rng = np.random.default_rng(seed)
+    acc = Accumulator(session=session)
+    started = time.perf_counter()
+    left = rounds
+    while left > 0:
+        n = min(batch, left)
+        acc.update(bet, kernel(rng, n, bet))
+        left -= n
+    return acc, time.perf_counter() - started
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=10_000_000, help="rounds per game and bet size")
+    parser.add_argument("--batch", type=int, default=1_000_000)
+    parser.add_argument("--session", type=int, default=1_000, help="rounds per bankroll-at-risk session")
+    parser.add_argument("--bets", type=float, nargs="+", default=list(BET_SIZES))
+    parser.add_argument("--games", nargs="*", help="substring filter on game names")
+    parser.add_argument("--seed", type=int, default=20260101)
+    parser.add_argument("--max-rtp", type=float, default=None, help="fail if a live game's RTP exceeds this")
+    args = parser.parse_args(argv)
+
+    games = build_games()
+    if args.games:
+        games = {k: v for k, v in games.items() if any(f in k for f in args.games)}
+
+    print(f"{'game':<28}{'bet':>6}{'RTP':>9}{'var':>9}{'max_dd':>12}{'BaR99':>11}{'Mrounds/s':>11}")
+    failures: list[str] = []
+    for name, (kernel, live) in games.items():
+        for bet in args.bets:
+            acc, elapsed = simulate(
+                kernel, rounds=args.rounds, batch=args.batch, bet=bet, session=args.session, seed=args.seed
+            )
+            speed = acc.rounds / elapsed / 1e6 if elapsed else float("inf")
+            print(
+                f"{name:<28}{bet:>6g}{acc.rtp:>9.4f}{acc.variance:>9.3f}"
+                f"{acc.max_drawdown:>12.1f}{acc.bankroll_at_risk:>11.1f}{speed:>11.2f}"
+            )
+            if live and args.max_rtp is not None and acc.rtp > args.max_rtp:
+                failures.append(f"{name} bet={bet:g} rtp={acc.rtp:.4f}")
+
+    if failures:
+        print(f"\nRTP above {args.max_rtp}:")
+        for line in failures:
+            print(f"  {line}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Multi-bot tenancy: N bots in one process vs N processes of one bot each.
+
+Starts the local fake Bot API with ``--tenants`` bot tokens and runs the bot
+(``main.main()``, see ``benchmarks.cold_start``) either once with all tokens
+in ``BOT_TOKENS`` or once per token. ``--users`` users of every bot then
+send ``/start`` ``--messages`` times each. Reports the time until every bot
+has answered, the time of the load, and the resident memory (RSS, and PSS
+which splits shared library pages between processes) and CPU time (user +
+system, from ``/proc``) of the bot process(es) afterwards.
+
+Linux only (reads ``/proc``).
+
+Usage::
+
+    python -m benchmarks.tenants_bench --tenants 4 --users 20 --messages 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import signal
+import sys
+import tempfile
+import time
+
+TOKEN_BASE = 7_000_001
+USER_ID_BASE = 20_000_000
+TIMEOUT = 120.0
+
+
+def memory_kb(pid: int) -> tuple[int, int]:
+    """(RSS, PSS) of a process in kB."""
+    rss = pss = 0
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss = int(line.split()[1])
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    pss = int(line.split()[1])
+    except OSError:
+        pss = rss
+    return rss, pss
+
+
+def cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    # utime and stime are fields 14 and 15 of stat(5), counted after the ")"
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def run(tenants: int, users: int, messages: int, shared: bool) -> None:
+    from benchmarks.fake_bot_api import FakeBotApi
+
+    api = FakeBotApi()
+    await api.start()
+    tokens = [f"{TOKEN_BASE + i}:TENANT{i}" for i in range(tenants)]
+    for token in tokens:
+        api.add_bot(token)
+    groups = [tokens] if shared else [[token] for token in tokens]
+
+    async def start(user_id: int, token: str) -> None:
+        for _ in range(messages):
+            replied = api.wait_for(user_id, lambda call: call.method == "sendMessage")
+            api.push_message(user_id, "/start", token)
+            await replied
+
+    with tempfile.TemporaryDirectory(prefix="casino-tenants-") as root:
+        procs = []
+        started = time.perf_counter()
+        for i, group in enumerate(groups):
+            workdir = os.path.join(root, str(i))
+            os.mkdir(workdir)
+            env = {
+                **os.environ,
+                "BOT_TOKEN": group[0],
+                "BOT_TOKENS": ",".join(group),
+                "SEED_POOL_PATH": os.path.join(workdir, "seed_chain.bin"),
+                "LEDGER_ARCHIVE_DIR": os.path.join(workdir, "ledger"),
+                "BACKUP_DIR": os.path.join(workdir, "backups"),
+            }
+            procs.append(await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "benchmarks.cold_start", "--child", api.url, workdir,
+                env=env, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+            ))
+        try:
+            # One user per bot first: every bot is up and polling.
+            await asyncio.wait_for(asyncio.gather(*(
+                start(USER_ID_BASE + t * 100_000, token) for t, token in enumerate(tokens)
+            )), TIMEOUT)
+            ready = time.perf_counter() - started
+            cpu_ready = sum(cpu_seconds(p.pid) for p in procs)
+
+            load_started = time.perf_counter()
+            await asyncio.wait_for(asyncio.gather(*(
+                start(USER_ID_BASE + t * 100_000 + u, token)
+                for t, token in enumerate(tokens) for u in range(1, users + 1)
+            )), TIMEOUT)
+            load = time.perf_counter() - load_started
+            cpu_total = sum(cpu_seconds(p.pid) for p in procs)
+            rss, pss = map(sum, zip(*(memory_kb(p.pid) for p in procs)))
+        finally:
+            for p in procs:
+                p.send_signal(signal.SIGINT)
+            for p in procs:
+                try:
+                    await asyncio.wait_for(p.wait(), 15)
+                except asyncio.TimeoutError:
+                    p.kill()
+                    await p.wait()
+            await api.stop()
+
+    label = f"{tenants} bots in 1 process" if shared else f"{tenants} processes of 1 bot"
+    print(
+        f"{label:<22}: all answering after {ready:.1f}s, {tenants * users * messages} /start in {load:.1f}s | "
+        f"RSS {rss / 1024:.0f} MB, PSS {pss / 1024:.0f} MB | "
+        f"CPU {cpu_total:.1f}s ({cpu_ready:.1f}s start-up, {cpu_total - cpu_ready:.1f}s load)"
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, default=4)
+    parser.add_argument("--users", type=int, default=20, help="users per bot")
+    parser.add_argument("--messages", type=int, default=3, help="/start per user")
+    parser.add_argument("--mode", choices=("shared", "processes", "both"), default="both")
+    args = parser.parse_args(argv)
+    for shared in (True, False):
+        if args.mode == "both" or args.mode == ("shared" if shared else "processes"):
+            asyncio.run(run(args.tenants, args.users, args.messages, shared))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Anti-flood middleware: cost per check, memory per user, sweep time, fairness.
+
+1. ``--users`` distinct users tap twice each through
+   :meth:`ThrottlingMiddleware.allow`; reports ns per check, bytes per bucket
+   (tracemalloc) and how long :meth:`sweep` takes once they are all idle.
+2. Replays ``--seconds`` of simulated traffic on a fake clock: ``--flooders``
+   users tapping ``mines_cell_*`` 50 times a second next to ``--players``
+   users tapping twice a second, and reports how many taps of each got
+   through to the handlers.
+
+Usage::
+
+    python -m benchmarks.throttle_bench --users 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+USER_ID_BASE = 20_000_000
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def scale(users: int, rate: float, burst: float) -> None:
+    from middlewares.throttling import ThrottlingMiddleware
+
+    clock = FakeClock()
+    throttle = ThrottlingMiddleware(rate=rate, burst=burst, global_rate=0, costs={}, exempt=[], clock=clock)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(users):
+        throttle.allow(USER_ID_BASE + i, 1)
+    per_user = (tracemalloc.get_traced_memory()[0] - before) / users
+    tracemalloc.stop()
+
+    clock.now += 1.0
+    started = time.perf_counter()
+    for i in range(users):
+        throttle.allow(USER_ID_BASE + i, 1)
+    check_ns = (time.perf_counter() - started) / users * 1e9
+
+    clock.now += burst / rate
+    started = time.perf_counter()
+    dropped = throttle.sweep()
+    print(
+        f"{users:,} users: {check_ns:.0f} ns per check, {per_user:.0f} B per user; "
+        f"sweep dropped {dropped:,} idle buckets in {(time.perf_counter() - started) * 1000:.0f} ms, "
+        f"{len(throttle)} left"
+    )
+
+
+def flood(flooders: int, players: int, seconds: int, rate: float, burst: float, global_rate: float) -> None:
+    from middlewares.throttling import ThrottlingMiddleware
+
+    clock = FakeClock()
+    throttle = ThrottlingMiddleware(rate=rate, burst=burst, global_rate=global_rate, exempt=[], clock=clock)
+    flood_cost, player_cost = throttle_cost(throttle, "mines_cell_3"), throttle_cost(throttle, "dc_even_odd")
+    tick = 0.02  # 50 taps/s for flooders
+    sent = {"flood": 0, "player": 0}
+    passed = {"flood": 0, "player": 0}
+    step = 0
+    while clock.now < seconds:
+        for i in range(flooders):
+            sent["flood"] += 1
+            passed["flood"] += throttle.allow(USER_ID_BASE + i, flood_cost)
+        if step % 25 == 0:  # players tap every 0.5 s
+            for i in range(players):
+                sent["player"] += 1
+                passed["player"] += throttle.allow(USER_ID_BASE + flooders + i, player_cost)
+        clock.now += tick
+        step += 1
+    for kind in ("flood", "player"):
+        print(
+            f"{kind:>6}: {sent[kind]:>8,} taps, {passed[kind]:>8,} reached handlers "
+            f"({passed[kind] / max(sent[kind], 1):.0%})"
+        )
+    print(f"throttled {sum(sent.values()) - sum(passed.values()):,} taps without a DB call")
+
+
+def throttle_cost(throttle, data: str) -> float:
+    from aiogram.types import CallbackQuery, User
+
+    user = User(id=1, is_bot=False, first_name="bench")
+    return throttle.cost(CallbackQuery(id="1", from_user=user, chat_instance="1", data=data))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--flooders", type=int, default=20)
+    parser.add_argument("--players", type=int, default=50)
+    parser.add_argument("--seconds", type=int, default=60)
+    parser.add_argument("--rate", type=float, default=2.0)
+    parser.add_argument("--burst", type=float, default=10.0)
+    parser.add_argument("--global-rate", type=float, default=200.0)
+    args = parser.parse_args(argv)
+    scale(args.users, args.rate, args.burst)
+    flood(args.flooders, args.players, args.seconds, args.rate, args.burst, args.global_rate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Timer wheel cost per operation.
+
+Schedules N idle deadlines spread over the round timeout, refreshes a random
+half of them (a button press), cancels a tenth (round closed) and then
+advances the clock tick by tick past the longest deadline, like the expiry
+sweeper does. Reports ns per operation and checks every remaining key fired
+exactly once, no earlier than its deadline.
+
+Usage::
+
+    python -m benchmarks.timer_wheel_bench --keys 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import time
+
+from services.timer_wheel import TimerWheel
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=1_000_000)
+    parser.add_argument("--timeout", type=float, default=900.0, help="idle timeout, seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    wheel = TimerWheel(1.0, now=0.0)
+    deadlines = [rng.uniform(1, args.timeout) for _ in range(args.keys)]
+    refreshed = rng.sample(range(args.keys), args.keys // 2)
+    cancelled = set(rng.sample(range(args.keys), args.keys // 10))
+
+    started = time.perf_counter()
+    for key, when in enumerate(deadlines):
+        wheel.schedule(key, when)
+    schedule_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for key in refreshed:
+        deadlines[key] += args.timeout
+        wheel.refresh(key, deadlines[key])
+    refresh_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for key in cancelled:
+        wheel.cancel(key)
+    cancel_s = time.perf_counter() - started
+
+    fired = 0
+    started = time.perf_counter()
+    for now in range(1, int(2 * args.timeout) + 2):
+        for key in wheel.advance(now):
+            if key in cancelled or math.ceil(deadlines[key]) > now:
+                raise SystemExit(f"key {key} fired at {now}, deadline {deadlines[key]:.1f}")
+            fired += 1
+    advance_s = time.perf_counter() - started
+
+    expected = args.keys - len(cancelled)
+    print(
+        f"keys={args.keys} schedule={schedule_s / args.keys * 1e9:,.0f}ns "
+        f"refresh={refresh_s / max(len(refreshed), 1) * 1e9:,.0f}ns "
+        f"cancel={cancel_s / max(len(cancelled), 1) * 1e9:,.0f}ns "
+        f"advance+expire={advance_s / max(fired, 1) * 1e9:,.0f}ns/key fired={fired}"
+    )
+    if fired != expected or len(wheel):
+        raise SystemExit(f"wheel mismatch: fired {fired}, expected {expected}, left {len(wheel)}")
+
+
+if __name__ == "__main__":
+    main()
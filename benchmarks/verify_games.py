@@ -0,0 +1,150 @@
+"""Bulk provably-fair verification speed.
+
+Plays N synthetic mines / blackjack / Russian roulette / server-side emoji
+rounds through the same code paths the handlers use (``MinesGame``,
+``Deck`` + ``BlackjackGame``, ``rr_spin_chamber``, ``emoji_rng.roll_value``)
+on a handful of server seeds, then replays them with
+:func:`services.provably_fair.verify_games` and reports rounds per second.
+One round per game type is tampered with to check failures are caught.
+
+With ``--db`` it instead verifies every revealed round stored in that database.
+
+Usage::
+
+    python -m benchmarks.verify_games --rounds 20000
+    python -m benchmarks.verify_games --db database/casino.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from services import provably_fair as pf
+
+EMOJI_GAMES = {
+    "dice": "🎲",
+    "roulette": "🎰",
+    "football": "⚽️",
+    "darts": "🎯",
+    "basketball": "🏀",
+    "bowling": "🎳",
+}
+
+
+def play_round(game_type: str, seed: pf.RoundSeed) -> dict:
+    from handlers.games.blackjack import BlackjackGame, Deck
+    from handlers.games.mines import MinesGame, mines_proof
+    from services.games.rr_logic import rr_spin_chamber
+
+    from services.emoji_rng import FACES, roll_value
+
+    rng = seed.rng()
+    if game_type in EMOJI_GAMES:
+        emoji = EMOJI_GAMES[game_type]
+        return {"faces": FACES[emoji], "value": roll_value(rng, emoji)}
+    if game_type == "mines":
+        return mines_proof(MinesGame(1, random.choice([3, 8, 10, 15, 20, 24]), rng=rng))
+    if game_type == "blackjack":
+        game = BlackjackGame(1, Deck(rng=rng))
+        for _ in range(random.randint(0, 2)):
+            if not game.game_over:
+                game.hit()
+        if not game.game_over:
+            game.stand()
+        return {"num_decks": 6, "drawn": game.drawn_cards()}
+    shots = []
+    for stage in range(1, 6):
+        shots.append(rr_spin_chamber(stage, rng))
+        if shots[-1] == 1:
+            break
+    return {"shots": shots}
+
+
+def build_rows(rounds: int, seeds: int) -> list[tuple]:
+    games = list(pf.REPLAYS)
+    server_seeds = [pf.new_server_seed() for _ in range(seeds)]
+    rows = []
+    for game_id in range(1, rounds + 1):
+        server_seed = server_seeds[game_id % seeds]
+        seed = pf.RoundSeed(server_seed, pf.hash_server_seed(server_seed), "bench", game_id)
+        game_type = games[game_id % len(games)]
+        proof = play_round(game_type, seed)
+        rows.append((game_id, game_type, server_seed, seed.server_seed_hash, "bench", game_id, json.dumps(proof)))
+    return rows
+
+
+def tamper(rows: list[tuple]) -> set[int]:
+    """Flip one outcome per game type; returns the ids that must fail."""
+    bad: set[int] = set()
+    seen: set[str] = set()
+    for i, (game_id, game_type, *rest, proof_raw) in enumerate(rows):
+        if game_type in seen:
+            continue
+        proof = json.loads(proof_raw)
+        if game_type == "mines":
+            proof["mines"][0] = -1
+        elif game_type == "blackjack":
+            proof["drawn"].reverse()
+        elif game_type in EMOJI_GAMES:
+            proof["value"] = proof["value"] % proof["faces"] + 1
+        else:
+            proof["shots"][0] += 1
+        rows[i] = (game_id, game_type, *rest, json.dumps(proof))
+        seen.add(game_type)
+        bad.add(game_id)
+    return bad
+
+
+async def verify_db(path: str) -> None:
+    from database.db import db
+
+    db.path = path
+    await db.connect()
+    try:
+        started = time.perf_counter()
+        report = await pf.verify_stored_games()
+        elapsed = time.perf_counter() - started
+    finally:
+        await db.close()
+    print(f"checked={report.checked} failed={len(report.failed)} rounds/s={report.checked / max(elapsed, 1e-9):,.0f}")
+    if report.failed:
+        print("failed ids:", report.failed[:50])
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20000)
+    parser.add_argument("--seeds", type=int, default=50, help="distinct server seeds")
+    parser.add_argument("--db", help="verify revealed rounds stored in this SQLite file instead")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        asyncio.run(verify_db(args.db))
+        return
+
+    rows = build_rows(args.rounds, args.seeds)
+    expected_bad = tamper(rows)
+    rows.sort(key=lambda r: r[2])
+
+    per_game: dict[str, list[tuple]] = {}
+    for row in rows:
+        per_game.setdefault(row[1], []).append(row)
+
+    for game_type, game_rows in [("all", rows), *per_game.items()]:
+        started = time.perf_counter()
+        report = pf.verify_games(game_rows)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{game_type:<10} checked={report.checked:<7} failed={len(report.failed):<3} "
+            f"rounds/s={report.checked / max(elapsed, 1e-9):>10,.0f}"
+        )
+        if game_type == "all" and set(report.failed) != expected_bad:
+            raise SystemExit(f"verifier mismatch: expected {sorted(expected_bad)}, got {sorted(report.failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -59,6 +59,7 @@ def _parse_int_list(raw: str | None, env_name: str) -> list[int]:
 class Settings:
     # Telegram
     BOT_TOKEN: str
+    BOT_TOKENS: list[str]  # BOT_TOKEN first, then the other tenant bots
     ADMIN_ID: int
     ADMIN_IDS: list[int]
     DUEL_LOG_CHANNEL: int | None
@@ -77,6 +78,30 @@ class Settings:
     START_BALANCE: Decimal
     START_BONUS: Decimal
 
+    # Games
+    MINES_HOUSE_EDGE: Decimal
+    SEED_POOL_PATH: str
+    SEED_POOL_SIZE: int
+    ROUND_IDLE_TIMEOUT: int
+    DUEL_WAIT_TIMEOUT: int
+    EMOJI_RNG_MODE: str
+
+    # Ledger
+    LEDGER_HOT_MONTHS: int
+    LEDGER_ARCHIVE_DIR: str
+
+    # Maintenance
+    BACKUP_DIR: str
+    BACKUP_INTERVAL_HOURS: float
+    BACKUP_KEEP: int
+    WAL_CHECKPOINT_MB: float
+
+    # Anti-flood
+    THROTTLE_RATE: float
+    THROTTLE_BURST: float
+    THROTTLE_GLOBAL_RATE: float
+    THROTTLE_COSTS: dict[str, float]
+
     # Links
     ROCKET_BOT: str
     CRYPTO_BOT: str
@@ -84,9 +109,17 @@ class Settings:
 
 def load_settings() -> Settings:
     # Backward-compatible env names
-    bot_token = _getenv("BOT_TOKEN") or _getenv("TOKEN")
+    bot_tokens = _split_csv(_getenv("BOT_TOKENS"))
+    bot_token = _getenv("BOT_TOKEN") or _getenv("TOKEN") or (bot_tokens[0] if bot_tokens else None)
     if not bot_token:
         bot_token = _require("BOT_TOKEN")  # raises
+    # Several bots served by one process; BOT_TOKEN is the primary one.
+    bot_tokens = [bot_token] + [t for t in bot_tokens if t != bot_token]
+    for t in bot_tokens:
+        if not re.fullmatch(r"\d+:\S+", t):
+            raise RuntimeError("BOT_TOKENS must be Telegram bot tokens ('123456:ABC...') separated by comma")
+    if len(set(bot_tokens)) != len(bot_tokens):
+        raise RuntimeError("BOT_TOKENS must not repeat a token")
 
     crypto_token = _getenv("CRYPTO_TOKEN") or _getenv("CRYPTOBOT_TOKEN")
 
@@ -139,8 +172,79 @@ def load_settings() -> Settings:
     start_balance = Decimal(_getenv("START_BALANCE", "0"))
     start_bonus = Decimal(_getenv("START_BONUS", "0"))
 
+    mines_edge_raw = _getenv("MINES_HOUSE_EDGE", "0.04")
+    try:
+        mines_house_edge = Decimal(mines_edge_raw)
+    except Exception:
+        raise RuntimeError("MINES_HOUSE_EDGE must be a decimal number")
+    if not Decimal(0) <= mines_house_edge < Decimal(1):
+        raise RuntimeError("MINES_HOUSE_EDGE must be in [0, 1)")
+
+    try:
+        seed_pool_size = int(_getenv("SEED_POOL_SIZE", "100000"))
+    except ValueError:
+        raise RuntimeError("SEED_POOL_SIZE must be an integer")
+    if seed_pool_size < 1:
+        raise RuntimeError("SEED_POOL_SIZE must be positive")
+
+    timeouts: dict[str, int] = {}
+    for name, default in (("ROUND_IDLE_TIMEOUT", "900"), ("DUEL_WAIT_TIMEOUT", "1800")):
+        try:
+            timeouts[name] = int(_getenv(name, default))
+        except ValueError:
+            raise RuntimeError(f"{name} must be an integer number of seconds")
+        if timeouts[name] < 1:
+            raise RuntimeError(f"{name} must be positive")
+
+    emoji_rng_mode = (_getenv("EMOJI_RNG_MODE", "telegram") or "telegram").lower()
+    if emoji_rng_mode not in ("telegram", "server"):
+        raise RuntimeError("EMOJI_RNG_MODE must be 'telegram' or 'server'")
+
+    try:
+        ledger_hot_months = int(_getenv("LEDGER_HOT_MONTHS", "3"))
+    except ValueError:
+        raise RuntimeError("LEDGER_HOT_MONTHS must be an integer")
+    if ledger_hot_months < 0:
+        raise RuntimeError("LEDGER_HOT_MONTHS must not be negative")
+
+    try:
+        backup_interval_hours = float(_getenv("BACKUP_INTERVAL_HOURS", "24"))
+        backup_keep = int(_getenv("BACKUP_KEEP", "7"))
+        wal_checkpoint_mb = float(_getenv("WAL_CHECKPOINT_MB", "64"))
+    except ValueError:
+        raise RuntimeError("BACKUP_INTERVAL_HOURS, BACKUP_KEEP and WAL_CHECKPOINT_MB must be numbers")
+    if backup_interval_hours < 0:
+        raise RuntimeError("BACKUP_INTERVAL_HOURS must not be negative (0 disables backups)")
+    if backup_keep < 1:
+        raise RuntimeError("BACKUP_KEEP must be at least 1")
+    if wal_checkpoint_mb <= 0:
+        raise RuntimeError("WAL_CHECKPOINT_MB must be positive")
+
+    try:
+        throttle_rate = float(_getenv("THROTTLE_RATE", "2"))
+        throttle_burst = float(_getenv("THROTTLE_BURST", "10"))
+        throttle_global_rate = float(_getenv("THROTTLE_GLOBAL_RATE", "200"))
+    except ValueError:
+        raise RuntimeError("THROTTLE_RATE, THROTTLE_BURST and THROTTLE_GLOBAL_RATE must be numbers")
+    if throttle_rate < 0 or throttle_global_rate < 0:
+        raise RuntimeError("THROTTLE_RATE and THROTTLE_GLOBAL_RATE must not be negative (0 disables)")
+    if throttle_burst < 1:
+        raise RuntimeError("THROTTLE_BURST must be at least 1")
+    # "check_crypto:=5,dep_=3": callback-data prefix = tokens per tap
+    throttle_costs: dict[str, float] = {}
+    for item in _split_csv(_getenv("THROTTLE_COSTS")):
+        prefix, _, raw = item.rpartition("=")
+        try:
+            cost = float(raw)
+        except ValueError:
+            cost = -1.0
+        if not prefix or cost < 0:
+            raise RuntimeError("THROTTLE_COSTS must look like 'prefix=cost,prefix=cost' with non-negative costs")
+        throttle_costs[prefix] = cost
+
     return Settings(
         BOT_TOKEN=bot_token,
+        BOT_TOKENS=bot_tokens,
         ADMIN_ID=admin_id,
         ADMIN_IDS=admin_ids,
         DUEL_LOG_CHANNEL=duel_log_channel,
@@ -152,6 +256,22 @@ def load_settings() -> Settings:
         STARS_USD_RATE=stars_rate,
         START_BALANCE=start_balance,
         START_BONUS=start_bonus,
+        MINES_HOUSE_EDGE=mines_house_edge,
+        SEED_POOL_PATH=_getenv("SEED_POOL_PATH", "database/seed_chain.bin") or "database/seed_chain.bin",
+        SEED_POOL_SIZE=seed_pool_size,
+        ROUND_IDLE_TIMEOUT=timeouts["ROUND_IDLE_TIMEOUT"],
+        DUEL_WAIT_TIMEOUT=timeouts["DUEL_WAIT_TIMEOUT"],
+        EMOJI_RNG_MODE=emoji_rng_mode,
+        LEDGER_HOT_MONTHS=ledger_hot_months,
+        LEDGER_ARCHIVE_DIR=_getenv("LEDGER_ARCHIVE_DIR", "database/ledger") or "database/ledger",
+        BACKUP_DIR=_getenv("BACKUP_DIR", "database/backups") or "database/backups",
+        BACKUP_INTERVAL_HOURS=backup_interval_hours,
+        BACKUP_KEEP=backup_keep,
+        WAL_CHECKPOINT_MB=wal_checkpoint_mb,
+        THROTTLE_RATE=throttle_rate,
+        THROTTLE_BURST=throttle_burst,
+        THROTTLE_GLOBAL_RATE=throttle_global_rate,
+        THROTTLE_COSTS=throttle_costs,
         ROCKET_BOT=_getenv("ROCKET_BOT", "https://t.me/rocket_bot") or "https://t.me/rocket_bot",
         CRYPTO_BOT=_getenv("CRYPTO_BOT", "https://t.me/CryptoBot") or "https://t.me/CryptoBot",
     )
@@ -161,6 +281,7 @@ settings = load_settings()
 
 # Backward compatible names used throughout the project
 TOKEN = settings.BOT_TOKEN
+BOT_TOKENS = settings.BOT_TOKENS
 ADMIN_ID = settings.ADMIN_ID
 ADMIN_IDS = settings.ADMIN_IDS
 DUEL_LOG_CHANNEL = settings.DUEL_LOG_CHANNEL
@@ -172,5 +293,21 @@ CRYPTOBOT_TOKEN = settings.CRYPTO_TOKEN or ""
 ROCKET_API_KEY = settings.ROCKET_API_KEY or ""
 START_BALANCE = float(settings.START_BALANCE)
 START_BONUS = float(settings.START_BONUS)
+MINES_HOUSE_EDGE = settings.MINES_HOUSE_EDGE
+SEED_POOL_PATH = settings.SEED_POOL_PATH
+SEED_POOL_SIZE = settings.SEED_POOL_SIZE
+ROUND_IDLE_TIMEOUT = settings.ROUND_IDLE_TIMEOUT
+DUEL_WAIT_TIMEOUT = settings.DUEL_WAIT_TIMEOUT
+EMOJI_RNG_MODE = settings.EMOJI_RNG_MODE
+LEDGER_HOT_MONTHS = settings.LEDGER_HOT_MONTHS
+LEDGER_ARCHIVE_DIR = settings.LEDGER_ARCHIVE_DIR
+BACKUP_DIR = settings.BACKUP_DIR
+BACKUP_INTERVAL_HOURS = settings.BACKUP_INTERVAL_HOURS
+BACKUP_KEEP = settings.BACKUP_KEEP
+WAL_CHECKPOINT_MB = settings.WAL_CHECKPOINT_MB
+THROTTLE_RATE = settings.THROTTLE_RATE
+THROTTLE_BURST = settings.THROTTLE_BURST
+THROTTLE_GLOBAL_RATE = settings.THROTTLE_GLOBAL_RATE
+THROTTLE_COSTS = settings.THROTTLE_COSTS
 ROCKET_BOT = settings.ROCKET_BOT
 CRYPTO_BOT = settings.CRYPTO_BOT
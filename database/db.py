@@ -1,12 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import re
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Any, Iterable, Sequence
+from typing import Any, Callable, Iterable, Sequence
 
 import aiosqlite
 
@@ -17,6 +19,39 @@ def _utc() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+LEDGER_PARTITION = re.compile(r"transactions_\d{6}")
+# Per-user ledger index: keyset pages on (user_id, id) with the type filter and
+# the columns the history screen shows read from the index alone.
+LEDGER_USER_INDEX = "user_id, id, type, amount, created_at"
+LEDGER_COLUMNS = "id, user_id, amount, type, method, before, after, meta, created_at"
+HISTORY_COLUMNS = "id, type, amount, created_at"
+
+WITHDRAWAL_NETWORKS = ("trc20", "ton", "other")
+# Same rule as wallet_network(), for rows written before the network column existed.
+_NETWORK_SQL = (
+    "CASE WHEN wallet LIKE 'T%' THEN 'trc20' "
+    "WHEN wallet LIKE 'EQ%' OR wallet LIKE 'UQ%' OR wallet LIKE 'ton://%' THEN 'ton' ELSE 'other' END"
+)
+
+RECONCILED_ID = "ledger_reconciled_id"  # settings key: last ledger id folded into ledger_checkpoints
+REFERRAL_DEPTH = 3  # levels kept in referral_tree
+
+
+def wallet_network(wallet: str) -> str:
+    """Network of a (validated) withdrawal wallet: USDT TRC-20, TON or other."""
+    if wallet.startswith("T"):
+        return "trc20"
+    if wallet.startswith(("EQ", "UQ", "ton://")):
+        return "ton"
+    return "other"
+
+
+def _meta_str(meta: dict[str, Any] | str | None) -> str | None:
+    if isinstance(meta, dict):
+        return json.dumps(meta, ensure_ascii=False)
+    return meta
+
+
 @dataclass(frozen=True)
 class BalanceChange:
     before: Decimal
@@ -35,6 +70,9 @@ class DB:
     def __init__(self, path: str = "database/casino.db"):
         self.path = path
         self.db: aiosqlite.Connection | None = None
+        # One shared connection: writers take turns so a commit issued by one
+        # coroutine never lands in the middle of another one's transaction.
+        self._write_lock = asyncio.Lock()
 
     async def connect(self) -> None:
         self.db = await aiosqlite.connect(self.path)
@@ -50,6 +88,15 @@ class DB:
             await self.db.close()
             self.db = None
 
+    async def checkpoint(self, mode: str = "PASSIVE") -> tuple[int, int, int]:
+        """``PRAGMA wal_checkpoint(mode)`` between transactions: (busy, wal frames, checkpointed frames)."""
+        if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+            raise ValueError(f"Bad checkpoint mode: {mode}")
+        async with self._write_lock:
+            cur = await self._conn().execute(f"PRAGMA wal_checkpoint({mode})")
+            busy, log, checkpointed = await cur.fetchone()
+            return busy, log, checkpointed
+
     def _conn(self) -> aiosqlite.Connection:
         if self.db is None:
             raise RuntimeError("Database is not connected")
@@ -58,13 +105,15 @@ class DB:
     @asynccontextmanager
     async def transaction(self):
         conn = self._conn()
-        try:
-            await conn.execute("BEGIN")
-            yield conn
-            await conn.commit()
-        except Exception:
-            await conn.rollback()
-            raise
+        async with self._write_lock:
+            try:
+                await conn.execute("BEGIN")
+                yield conn
+                await conn.commit()
+            except BaseException:
+                # Cancellation too: never hand the connection on mid-transaction.
+                await conn.rollback()
+                raise
 
     async def create_tables(self) -> None:
         conn = self._conn()
@@ -112,7 +161,9 @@ CREATE TABLE IF NOT EXISTS users (
     updated_at TEXT
 );
 
--- TRANSACTIONS (ledger)
+-- TRANSACTIONS (ledger): `transactions` holds the current month, closed
+-- months are renamed to transactions_YYYYMM and listed in ledger_partitions
+-- (see DB.rotate_ledger)
 CREATE TABLE IF NOT EXISTS transactions (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     user_id INTEGER NOT NULL,
@@ -126,7 +177,27 @@ CREATE TABLE IF NOT EXISTS transactions (
     FOREIGN KEY(user_id) REFERENCES users(user_id)
 );
 
-CREATE INDEX IF NOT EXISTS idx_transactions_user ON transactions(user_id);
+CREATE INDEX IF NOT EXISTS idx_transactions_user ON transactions(user_id, id, type, amount, created_at);
+
+CREATE TABLE IF NOT EXISTS ledger_partitions (
+    name TEXT PRIMARY KEY,
+    first_id INTEGER,
+    last_id INTEGER,
+    first_at TEXT,
+    last_at TEXT,
+    rows INTEGER NOT NULL,
+    totals TEXT NOT NULL,  -- {"type": sum(amount)}, fixed once the month is closed
+    archive TEXT,          -- compressed file once the table is moved out
+    created_at TEXT NOT NULL
+);
+
+-- Reconciliation: ledger sum per user up to last_tx_id (see services/reconcile.py)
+CREATE TABLE IF NOT EXISTS ledger_checkpoints (
+    user_id INTEGER PRIMARY KEY,
+    last_tx_id INTEGER NOT NULL,
+    total REAL NOT NULL,
+    updated_at TEXT NOT NULL
+);
 
 -- PENDING PAYMENTS (idempotency)
 CREATE TABLE IF NOT EXISTS pending_payments (
@@ -158,6 +229,23 @@ CREATE TABLE IF NOT EXISTS withdrawals (
 
 CREATE INDEX IF NOT EXISTS idx_withdrawals_user ON withdrawals(user_id);
 
+-- Leaderboard snapshots (services/leaderboards.py); key is the day/ISO week or 'all'.
+CREATE TABLE IF NOT EXISTS leaderboard_scores (
+    metric TEXT NOT NULL,
+    period TEXT NOT NULL,
+    key TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (metric, period, key, user_id)
+);
+
+-- Running count/sum of withdrawals per status, kept in step by every status change.
+CREATE TABLE IF NOT EXISTS withdrawal_counters (
+    status TEXT PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0,
+    amount REAL NOT NULL DEFAULT 0
+);
+
 -- REFERRALS
 CREATE TABLE IF NOT EXISTS referrals (
     user_id INTEGER PRIMARY KEY,
@@ -165,6 +253,17 @@ CREATE TABLE IF NOT EXISTS referrals (
     created_at TEXT
 );
 
+-- REFERRAL TREE (closure table: every referrer above a user, up to REFERRAL_DEPTH levels)
+CREATE TABLE IF NOT EXISTS referral_tree (
+    ancestor INTEGER NOT NULL,
+    depth INTEGER NOT NULL,
+    descendant INTEGER NOT NULL,
+    created_at TEXT,
+    PRIMARY KEY (ancestor, depth, descendant)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_referral_tree_descendant ON referral_tree(descendant, depth);
+
 -- GAMES
 CREATE TABLE IF NOT EXISTS games (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -186,6 +285,7 @@ CREATE TABLE IF NOT EXISTS duels (
     game TEXT DEFAULT 'dice',
     status TEXT NOT NULL,
     winner_id INTEGER,
+    matchmaking INTEGER NOT NULL DEFAULT 0,
     created_at TEXT NOT NULL,
     updated_at TEXT NOT NULL
 );
@@ -220,6 +320,40 @@ CREATE TABLE IF NOT EXISTS settings (
     key TEXT PRIMARY KEY,
     value TEXT
 );
+
+-- PROVABLY FAIR SEEDS (active pair per user + revealed history)
+CREATE TABLE IF NOT EXISTS fair_seeds (
+    user_id INTEGER PRIMARY KEY,
+    server_seed TEXT NOT NULL,
+    server_seed_hash TEXT NOT NULL,
+    client_seed TEXT NOT NULL,
+    nonce INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS fair_seed_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    server_seed TEXT NOT NULL,
+    server_seed_hash TEXT NOT NULL,
+    client_seed TEXT NOT NULL,
+    last_nonce INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    revealed_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_fair_seed_history_user ON fair_seed_history(user_id);
+
+-- OPEN ROUNDS (bets debited, game not settled yet; replayed on startup)
+CREATE TABLE IF NOT EXISTS open_rounds (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    game_type TEXT NOT NULL,
+    bet REAL NOT NULL,
+    state TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
 """
         )
         # Backward-compatible schema bumps
@@ -227,10 +361,77 @@ CREATE TABLE IF NOT EXISTS settings (
             await conn.execute("ALTER TABLE duels ADD COLUMN game TEXT DEFAULT 'dice';")
         except Exception:
             pass
+        try:
+            await conn.execute("ALTER TABLE duels ADD COLUMN matchmaking INTEGER NOT NULL DEFAULT 0;")
+        except Exception:
+            pass
         try:
             await conn.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT);")
         except Exception:
             pass
+        # games: provably-fair columns (seed is filled in once the server seed is revealed)
+        for column in ("seed TEXT", "hash TEXT", "client_seed TEXT", "nonce INTEGER", "proof TEXT", "round_id TEXT"):
+            try:
+                await conn.execute(f"ALTER TABLE games ADD COLUMN {column};")
+            except Exception:
+                pass
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_games_hash ON games(hash);")
+        await conn.execute("CREATE INDEX IF NOT EXISTS idx_games_round ON games(round_id);")
+        # withdrawals: wallet network for the moderation filters, pending queue index, counters
+        try:
+            await conn.execute("ALTER TABLE withdrawals ADD COLUMN network TEXT;")
+        except Exception:
+            pass
+        await conn.execute(
+            f"UPDATE withdrawals SET network = {_NETWORK_SQL} WHERE network IS NULL"
+        )
+        await conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_withdrawals_pending ON withdrawals(id, network, amount, created_at) "
+            "WHERE status='pending';"
+        )
+        cur = await conn.execute("SELECT 1 FROM withdrawal_counters LIMIT 1")
+        if await cur.fetchone() is None:
+            await conn.execute(
+                "INSERT INTO withdrawal_counters (status, count, amount) "
+                "SELECT status, COUNT(*), COALESCE(SUM(amount), 0) FROM withdrawals GROUP BY status"
+            )
+        # referral_tree: built once from the referrals written before it existed
+        # (those never reached users.referred_by / refs_total either)
+        cur = await conn.execute("SELECT 1 FROM referral_tree LIMIT 1")
+        if await cur.fetchone() is None:
+            await conn.execute(
+                """
+                WITH RECURSIVE tree(ancestor, depth, descendant, created_at) AS (
+                    SELECT referred_by, 1, user_id, created_at FROM referrals
+                    WHERE referred_by IS NOT NULL AND referred_by != user_id
+                    UNION ALL
+                    SELECT r.referred_by, t.depth + 1, t.descendant, t.created_at
+                    FROM tree t JOIN referrals r ON r.user_id = t.ancestor
+                    WHERE t.depth < ? AND r.referred_by IS NOT NULL
+                )
+                INSERT OR IGNORE INTO referral_tree (ancestor, depth, descendant, created_at)
+                SELECT ancestor, depth, descendant, created_at FROM tree WHERE ancestor != descendant
+                """,
+                (REFERRAL_DEPTH,),
+            )
+            await conn.execute(
+                "UPDATE users SET referred_by = (SELECT ancestor FROM referral_tree "
+                "WHERE descendant = users.user_id AND depth = 1) "
+                "WHERE referred_by IS NULL AND user_id IN (SELECT descendant FROM referral_tree WHERE depth = 1)"
+            )
+            await conn.execute(
+                "UPDATE users SET refs_total = (SELECT COUNT(*) FROM referral_tree "
+                "WHERE ancestor = users.user_id AND depth = 1) "
+                "WHERE user_id IN (SELECT ancestor FROM referral_tree WHERE depth = 1)"
+            )
+        # transactions: widen the old user_id-only indexes of live ledger tables
+        cur = await conn.execute(
+            "SELECT name, tbl_name FROM sqlite_master "
+            "WHERE type='index' AND name LIKE 'idx_transactions%user' AND sql NOT LIKE '%created_at%'"
+        )
+        for index, table in await cur.fetchall():
+            await conn.execute(f"DROP INDEX {index}")
+            await conn.execute(f"CREATE INDEX {index} ON {table}({LEDGER_USER_INDEX})")
         await conn.commit()
 
     # ------------------------
@@ -239,8 +440,9 @@ CREATE TABLE IF NOT EXISTS settings (
     async def execute(self, query: str, params: Sequence[Any] = ()) -> None:
         conn = self._conn()
         try:
-            await conn.execute(query, params)
-            await conn.commit()
+            async with self._write_lock:
+                await conn.execute(query, params)
+                await conn.commit()
         except Exception as e:
             logger.exception("DB.execute failed: %s | %s", e, query)
             raise
@@ -248,8 +450,9 @@ CREATE TABLE IF NOT EXISTS settings (
     async def execute_returning_id(self, query: str, params: Sequence[Any] = ()) -> int:
         conn = self._conn()
         try:
-            cur = await conn.execute(query, params)
-            await conn.commit()
+            async with self._write_lock:
+                cur = await conn.execute(query, params)
+                await conn.commit()
             return int(cur.lastrowid)
         except Exception as e:
             logger.exception("DB.execute_returning_id failed: %s | %s", e, query)
@@ -270,26 +473,133 @@ CREATE TABLE IF NOT EXISTS settings (
     # ------------------------
     async def ensure_user(self, user_id: int, referred_by: int | None = None) -> None:
         now = _utc()
-        conn = self._conn()
-        await conn.execute(
-            "INSERT OR IGNORE INTO users (user_id, created_at, updated_at) VALUES (?, ?, ?)",
-            (user_id, now, now),
-        )
-        if referred_by:
+        async with self.transaction() as conn:
             await conn.execute(
-                "INSERT OR IGNORE INTO referrals (user_id, referred_by, created_at) VALUES (?, ?, ?)",
-                (user_id, referred_by, now),
+                "INSERT OR IGNORE INTO users (user_id, created_at, updated_at) VALUES (?, ?, ?)",
+                (user_id, now, now),
+            )
+            if referred_by:
+                await conn.execute(
+                    "INSERT OR IGNORE INTO referrals (user_id, referred_by, created_at) VALUES (?, ?, ?)",
+                    (user_id, referred_by, now),
+                )
+                await conn.execute(
+                    "UPDATE users SET referred_by = COALESCE(referred_by, ?) WHERE user_id = ?",
+                    (referred_by, user_id),
+                )
+
+    # ------------------------
+    # referral APIs
+    # ------------------------
+    async def get_referrer(self, user_id: int) -> int | None:
+        row = await self.fetchone("SELECT referred_by FROM users WHERE user_id=?", (user_id,))
+        return int(row[0]) if row and row[0] else None
+
+    async def register_referral(self, user_id: int, inviter_id: int) -> bool:
+        """Make ``inviter_id`` the referrer of a player who has none and has not played yet.
+
+        Adds the player (and anyone they invited already) under the inviter and
+        the inviter's own referrers in ``referral_tree``. False when the
+        player is not eligible, the inviter is unknown or is referred (at any
+        depth) by the player.
+        """
+        if user_id == inviter_id:
+            return False
+        now = _utc()
+        async with self.transaction() as conn:
+            cur = await conn.execute("SELECT 1 FROM users WHERE user_id=?", (inviter_id,))
+            if await cur.fetchone() is None:
+                return False
+            # No cycles: the player must not be among the inviter's referrers, however far up.
+            cur = await conn.execute(
+                """
+                WITH RECURSIVE up(user_id, n) AS (
+                    SELECT ?, 0
+                    UNION ALL
+                    SELECT u.referred_by, up.n + 1 FROM users u JOIN up ON u.user_id = up.user_id
+                    WHERE u.referred_by IS NOT NULL AND up.n < 10000
+                )
+                SELECT 1 FROM up WHERE user_id=? LIMIT 1
+                """,
+                (inviter_id, user_id),
+            )
+            if await cur.fetchone() is not None:
+                return False
+            cur = await conn.execute(
+                "UPDATE users SET referred_by=?, updated_at=? "
+                "WHERE user_id=? AND referred_by IS NULL AND COALESCE(games_played, 0) = 0",
+                (inviter_id, now, user_id),
             )
+            if cur.rowcount == 0:
+                return False
             await conn.execute(
-                "UPDATE users SET referred_by = COALESCE(referred_by, ?) WHERE user_id = ?",
-                (referred_by, user_id),
+                "INSERT OR REPLACE INTO referrals (user_id, referred_by, created_at) VALUES (?, ?, ?)",
+                (user_id, inviter_id, now),
+            )
+            await conn.execute(
+                "UPDATE users SET refs_total = COALESCE(refs_total, 0) + 1, bonus = bonus + 1 WHERE user_id=?",
+                (inviter_id,),
+            )
+            # (inviter and its referrers) x (the player and its referees)
+            await conn.execute(
+                """
+                INSERT OR IGNORE INTO referral_tree (ancestor, depth, descendant, created_at)
+                SELECT a.ancestor, a.depth + d.depth, d.descendant, ?
+                FROM (
+                    SELECT ? AS ancestor, 1 AS depth
+                    UNION ALL
+                    SELECT ancestor, depth + 1 FROM referral_tree WHERE descendant=? AND depth < ?
+                ) a CROSS JOIN (
+                    SELECT ? AS descendant, 0 AS depth
+                    UNION ALL
+                    SELECT descendant, depth FROM referral_tree WHERE ancestor=?
+                ) d
+                WHERE a.depth + d.depth <= ?
+                """,
+                (now, inviter_id, inviter_id, REFERRAL_DEPTH, user_id, user_id, REFERRAL_DEPTH),
+            )
+        return True
+
+    async def count_referrals(self, user_id: int) -> dict[int, int]:
+        """Referred users per level (1: invited directly)."""
+        rows = await self.fetchall(
+            "SELECT depth, COUNT(*) FROM referral_tree WHERE ancestor=? GROUP BY depth", (user_id,)
+        )
+        return {int(depth): int(n) for depth, n in rows}
+
+    async def get_referrals(
+        self, user_id: int, depth: int = 1, *, after: int = 0, limit: int = 20
+    ) -> list[aiosqlite.Row]:
+        """Page of ``(descendant, created_at)`` on one level, keyset by user id."""
+        return await self.fetchall(
+            "SELECT descendant, created_at FROM referral_tree "
+            "WHERE ancestor=? AND depth=? AND descendant > ? ORDER BY descendant LIMIT ?",
+            (user_id, depth, after, limit),
+        )
+
+    async def credit_referral_commissions(self, credits: Sequence[tuple[int, float, dict[str, Any]]]) -> None:
+        """Credit ``(referrer, amount, meta)`` rows, one per referrer, in one transaction."""
+        async with self.transaction() as conn:
+            await self._credit_many(conn, credits, tx_type="referral_loss_bonus")
+            await conn.executemany(
+                "UPDATE users SET refs_earned = COALESCE(refs_earned, 0) + ? WHERE user_id=?",
+                [(total, uid) for uid, total, _ in credits if total > 0],
             )
-        await conn.commit()
 
     async def get_user_lang(self, user_id: int) -> str:
         row = await self.fetchone("SELECT lang FROM users WHERE user_id=?", (user_id,))
         return str(row[0]) if row and row[0] else "ru"
 
+    async def get_user_langs(self, user_ids: Sequence[int]) -> dict[int, str]:
+        """``get_user_lang`` for several users with one query."""
+        ids = list(dict.fromkeys(user_ids))
+        rows = await self.fetchall(
+            f"SELECT user_id, lang FROM users WHERE user_id IN ({','.join('?' * len(ids))})",
+            ids,
+        ) if ids else []
+        langs = {int(r[0]): str(r[1]) for r in rows if r[1]}
+        return {uid: langs.get(uid, "ru") for uid in ids}
+
     async def set_user_lang(self, user_id: int, lang: str) -> None:
         await self.execute(
             "UPDATE users SET lang=?, updated_at=? WHERE user_id=?",
@@ -310,46 +620,339 @@ CREATE TABLE IF NOT EXISTS settings (
         meta: dict[str, Any] | str | None = None,
         allow_negative: bool = False,
     ) -> BalanceChange:
+        async with self.transaction() as conn:
+            return await self._apply_balance_change(
+                conn, user_id, delta,
+                tx_type=tx_type, method=method, meta=meta, allow_negative=allow_negative,
+            )
+
+    async def _apply_balance_change(
+        self,
+        conn: aiosqlite.Connection,
+        user_id: int,
+        delta: Decimal,
+        *,
+        tx_type: str,
+        method: str | None = None,
+        meta: dict[str, Any] | str | None = None,
+        allow_negative: bool = False,
+    ) -> BalanceChange:
+        """Balance UPDATE + ledger row on an already open transaction."""
         now = _utc()
-        meta_str: str | None
-        if isinstance(meta, dict):
-            meta_str = json.dumps(meta, ensure_ascii=False)
-        else:
-            meta_str = meta
+        cur = await conn.execute("SELECT balance FROM users WHERE user_id=?", (user_id,))
+        row = await cur.fetchone()
+        before = Decimal(str(row[0])) if row else Decimal("0")
+        after = before + delta
+        if (after < 0) and not allow_negative:
+            raise ValueError("Insufficient balance")
 
+        await conn.execute(
+            "UPDATE users SET balance=?, updated_at=? WHERE user_id=?",
+            (float(after), now, user_id),
+        )
+        await conn.execute(
+            """
+            INSERT INTO transactions (user_id, amount, type, method, before, after, meta, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (user_id, float(delta), tx_type, method, float(before), float(after), _meta_str(meta), now),
+        )
+        return BalanceChange(before=before, after=after)
+
+    async def settle_bet(
+        self,
+        user_id: int,
+        bet: Decimal,
+        payout: Decimal,
+        *,
+        bet_type: str = "bet",
+        win_type: str = "win",
+        meta: dict[str, Any] | None = None,
+    ) -> BalanceChange:
+        """Debit ``bet`` and credit ``payout`` of an already decided round in one transaction.
+
+        Raises ValueError (nothing written) if the balance does not cover the bet.
+        """
+        async with self.transaction() as conn:
+            change = await self._apply_balance_change(
+                conn, user_id, -bet, tx_type=bet_type, method="system", meta=meta,
+            )
+            if payout > 0:
+                change = await self._apply_balance_change(
+                    conn, user_id, payout, tx_type=win_type, method="system", meta=meta,
+                )
+            return change
+
+    async def settle_batch(
+        self,
+        user_id: int,
+        game_type: str,
+        bet: Decimal,
+        rounds: Sequence[tuple[float, str, dict[str, Any] | None, dict[str, Any] | None]],
+        *,
+        tx_type: str = "autoplay",
+        stats: str | None = None,
+        round_id: str | None = None,
+    ) -> BalanceChange:
+        """Settle already decided ``(payout, result, fair, proof)`` rounds of one bet size.
+
+        One transaction: the balance must cover ``len(rounds) * bet`` up
+        front, the net result goes to the ledger as a single ``tx_type`` row,
+        the rounds go to ``games`` with one executemany and, when ``stats``
+        names a game with counters in ``users`` (``dice``, ``roulette``), the
+        counters are bumped with one UPDATE. Raises ValueError (nothing
+        written) if the balance is short.
+        """
+        staked = bet * len(rounds)
+        paid = sum((Decimal(str(payout)) for payout, *_ in rounds), Decimal("0"))
+        wins = sum(1 for payout, *_ in rounds if payout > 0)
         async with self.transaction() as conn:
             cur = await conn.execute("SELECT balance FROM users WHERE user_id=?", (user_id,))
             row = await cur.fetchone()
-            before = Decimal(str(row[0])) if row else Decimal("0")
-            after = before + delta
-            if (after < 0) and not allow_negative:
+            if not row or Decimal(str(row[0])) < staked:
                 raise ValueError("Insufficient balance")
-
-            await conn.execute(
-                "UPDATE users SET balance=?, updated_at=? WHERE user_id=?",
-                (float(after), now, user_id),
+            change = await self._apply_balance_change(
+                conn, user_id, paid - staked,
+                tx_type=tx_type, method="system",
+                meta={
+                    "game": game_type, "round": round_id, "rounds": len(rounds),
+                    "bet": float(bet), "staked": float(staked), "paid": float(paid),
+                },
             )
-            await conn.execute(
+            now = _utc()
+            await self._insert_games(
+                conn,
+                [
+                    (
+                        user_id, game_type, float(bet), result, None,
+                        (fair or {}).get("hash"), (fair or {}).get("client_seed"), (fair or {}).get("nonce"),
+                        json.dumps(proof) if fair and proof is not None else None,
+                        round_id, now,
+                    )
+                    for _, result, fair, proof in rounds
+                ],
+            )
+            if stats in ("dice", "roulette"):
+                losses = len(rounds) - wins
+                await conn.execute(
+                    f"""
+                    UPDATE users SET
+                        games_played = games_played + ?, {stats}_played = {stats}_played + ?,
+                        games_won = games_won + ?, {stats}_won = {stats}_won + ?,
+                        games_lost = games_lost + ?, {stats}_lost = {stats}_lost + ?,
+                        profit_won = profit_won + ?, profit_lost = profit_lost + ?
+                    WHERE user_id=?
+                    """,
+                    (
+                        len(rounds), len(rounds), wins, wins, losses, losses,
+                        float(paid), float(bet * losses), user_id,
+                    ),
+                )
+            return change
+
+    async def insert_games(self, rows: Sequence[tuple]) -> None:
+        """Append finished rounds to ``games`` in one transaction.
+
+        Rows are ``(user_id, game_type, bet, result, stage, hash, client_seed,
+        nonce, proof, round_id, created_at)``.
+        """
+        async with self.transaction() as conn:
+            await self._insert_games(conn, rows)
+
+    @staticmethod
+    async def _insert_games(conn: aiosqlite.Connection, rows: Sequence[tuple]) -> None:
+        await conn.executemany(
+            """
+            INSERT INTO games (user_id, game_type, bet, result, stage, hash, client_seed, nonce, proof, round_id, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+
+    # ------------------------
+    # open rounds (crash-recovery journal)
+    # ------------------------
+    async def open_round(
+        self,
+        user_id: int,
+        game_type: str,
+        bet: Decimal,
+        state: dict[str, Any],
+        *,
+        method: str | None = "system",
+    ) -> int:
+        """Debit the bet and journal the round in one transaction. Returns the round id."""
+        now = _utc()
+        async with self.transaction() as conn:
+            cur = await conn.execute(
                 """
-                INSERT INTO transactions (user_id, amount, type, method, before, after, meta, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO open_rounds (user_id, game_type, bet, state, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
                 """,
-                (user_id, float(delta), tx_type, method, float(before), float(after), meta_str, now),
+                (user_id, game_type, float(bet), json.dumps(state, ensure_ascii=False), now, now),
+            )
+            round_id = int(cur.lastrowid)
+            # A short balance raises and rolls the journal row back with it.
+            await self._apply_balance_change(
+                conn, user_id, -bet, tx_type="bet", method=method, meta={"game": game_type, "round": round_id},
+            )
+            return round_id
+
+    async def update_round_state(self, round_id: int, state: dict[str, Any]) -> bool:
+        """False if the round is no longer open (settled by expiry or recovery)."""
+        async with self.transaction() as conn:
+            cur = await conn.execute(
+                "UPDATE open_rounds SET state=?, updated_at=? WHERE id=?",
+                (json.dumps(state, ensure_ascii=False), _utc(), round_id),
+            )
+            return cur.rowcount > 0
+
+    async def raise_round_stake(
+        self,
+        round_id: int,
+        user_id: int,
+        amount: Decimal,
+        state: dict[str, Any],
+    ) -> None:
+        """Extra debit during a round (blackjack double) together with its new state."""
+        async with self.transaction() as conn:
+            cur = await conn.execute("SELECT game_type FROM open_rounds WHERE id=?", (round_id,))
+            row = await cur.fetchone()
+            if not row:
+                raise ValueError("Round is not open")
+            await self._apply_balance_change(
+                conn, user_id, -amount, tx_type="bet", method="system", meta={"game": row[0], "round": round_id},
+            )
+            await conn.execute(
+                "UPDATE open_rounds SET bet = bet + ?, state=?, updated_at=? WHERE id=?",
+                (float(amount), json.dumps(state, ensure_ascii=False), _utc(), round_id),
             )
-            return BalanceChange(before=before, after=after)
+
+    async def close_round(
+        self,
+        round_id: int,
+        user_id: int,
+        payout: Decimal = Decimal("0"),
+        *,
+        tx_type: str = "win",
+    ) -> bool:
+        """Remove the round from the journal and credit ``payout`` atomically.
+
+        Returns False if the round was already closed, so a repeated
+        cashout/settle cannot pay twice.
+        """
+        async with self.transaction() as conn:
+            cur = await conn.execute("DELETE FROM open_rounds WHERE id=?", (round_id,))
+            if cur.rowcount == 0:
+                return False
+            if payout > 0:
+                await self._apply_balance_change(
+                    conn, user_id, payout, tx_type=tx_type, method="system", meta={"round": round_id},
+                )
+            return True
+
+    async def get_open_rounds(self) -> list[aiosqlite.Row]:
+        return await self.fetchall("SELECT id, user_id, game_type, bet, state FROM open_rounds ORDER BY id")
+
+    async def settle_open_rounds(
+        self,
+        payout_fn: Callable[[str, float, dict[str, Any]], tuple[str, float]],
+        round_ids: Sequence[int] | None = None,
+        *,
+        tx_type: str = "recovery",
+    ) -> list[tuple[int, int, str, str, float]]:
+        """Settle journalled rounds (all, or ``round_ids``) in one transaction.
+
+        ``payout_fn(game_type, bet, state)`` returns ``(outcome, payout)``.
+        Rounds are read under the write lock, so any a handler closed in the
+        meantime are simply not there and cannot be paid twice. Payouts are
+        summed per user into one ledger row (see ``_credit_many``).
+        Returns ``(round_id, user_id, game_type, outcome, payout)`` per round.
+        """
+        if round_ids is not None and not round_ids:
+            return []
+        async with self.transaction() as conn:
+            if round_ids is None:
+                cur = await conn.execute("SELECT id, user_id, game_type, bet, state FROM open_rounds ORDER BY id")
+                rows = list(await cur.fetchall())
+            else:
+                rows = []
+                ids = list(round_ids)
+                for i in range(0, len(ids), 500):
+                    chunk = ids[i:i + 500]
+                    cur = await conn.execute(
+                        f"SELECT id, user_id, game_type, bet, state FROM open_rounds "
+                        f"WHERE id IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    )
+                    rows.extend(await cur.fetchall())
+
+            settled: list[tuple[int, int, str, str, float]] = []
+            per_user: dict[int, list] = {}
+            for round_id, user_id, game_type, bet, state_raw in rows:
+                try:
+                    state = json.loads(state_raw) if state_raw else {}
+                except ValueError:
+                    state = {}
+                outcome, payout = payout_fn(game_type, float(bet), state)
+                settled.append((int(round_id), int(user_id), game_type, outcome, payout))
+                entry = per_user.setdefault(int(user_id), [0.0, []])
+                entry[0] += payout
+                entry[1].append(int(round_id))
+
+            await self._credit_many(
+                conn,
+                [(uid, total, {"rounds": rounds}) for uid, (total, rounds) in per_user.items()],
+                tx_type=tx_type,
+            )
+            await conn.executemany(
+                "DELETE FROM open_rounds WHERE id=?",
+                [(row[0],) for row in settled],
+            )
+        return settled
+
+    async def _credit_many(
+        self,
+        conn: aiosqlite.Connection,
+        credits: Sequence[tuple[int, float, dict[str, Any]]],
+        *,
+        tx_type: str,
+    ) -> None:
+        """Credit ``(user_id, amount, meta)`` rows on an open transaction.
+
+        One user per row (callers aggregate first), so the ledger's
+        before/after chain stays consistent with two executemany calls
+        instead of three statements per credited item.
+        """
+        now = _utc()
+        credits = [(uid, total, meta) for uid, total, meta in credits if total > 0]
+        if not credits:
+            return
+        await conn.executemany(
+            """
+            INSERT INTO transactions (user_id, amount, type, method, before, after, meta, created_at)
+            SELECT user_id, ?, ?, 'system', balance, balance + ?, ?, ?
+            FROM users WHERE user_id=?
+            """,
+            [(total, tx_type, total, _meta_str(meta), now, uid) for uid, total, meta in credits],
+        )
+        await conn.executemany(
+            "UPDATE users SET balance = balance + ?, updated_at=? WHERE user_id=?",
+            [(total, now, uid) for uid, total, _ in credits],
+        )
 
     # ------------------------
     # duel APIs
     # ------------------------
-    async def create_duel(self, creator_id: int, bet: Decimal, game: str) -> int:
+    async def create_duel(self, creator_id: int, bet: Decimal, game: str, *, matchmaking: bool = False) -> int:
         now = _utc()
         async with self.transaction() as conn:
             cur = await conn.execute(
                 """
-                INSERT INTO duels (creator_id, bet, pot, game, status, created_at, updated_at)
-                VALUES (?, ?, ?, ?, 'waiting', ?, ?)
+                INSERT INTO duels (creator_id, bet, pot, game, status, matchmaking, created_at, updated_at)
+                VALUES (?, ?, ?, ?, 'waiting', ?, ?, ?)
                 """,
-                (creator_id, float(bet), float(bet), game, now, now),
+                (creator_id, float(bet), float(bet), game, int(matchmaking), now, now),
             )
             return int(cur.lastrowid)
 
@@ -383,12 +986,23 @@ CREATE TABLE IF NOT EXISTS settings (
                 return "busy", float(row["pot"])
             return "joined", new_pot
 
-    async def finish_duel(self, duel_id: int, winner_id: int) -> None:
-        now = _utc()
-        await self.execute(
-            "UPDATE duels SET status='finished', winner_id=?, updated_at=? WHERE id=?",
-            (winner_id, now, duel_id),
-        )
+    async def settle_duel(self, duel_id: int, winner_id: int, pot: Decimal, meta: dict[str, Any] | None = None) -> bool:
+        """Finish an ``active`` duel and credit the pot to the winner in one transaction.
+
+        Returns False (nothing written) if the duel is no longer active, e.g.
+        it was refunded by :meth:`refund_active_duels`.
+        """
+        async with self.transaction() as conn:
+            cur = await conn.execute(
+                "UPDATE duels SET status='finished', winner_id=?, updated_at=? WHERE id=? AND status='active'",
+                (winner_id, _utc(), duel_id),
+            )
+            if cur.rowcount == 0:
+                return False
+            await self._apply_balance_change(
+                conn, winner_id, pot, tx_type="duel_win", method="system", meta=meta,
+            )
+            return True
 
     async def cancel_duel(self, duel_id: int, user_id: int) -> float:
         """Cancel waiting duel. Returns bet to refund or 0 if nothing to do."""
@@ -408,6 +1022,85 @@ CREATE TABLE IF NOT EXISTS settings (
             )
             return float(row["bet"])
 
+    async def get_waiting_duels(self, *, matchmaking: bool = False) -> list[aiosqlite.Row]:
+        """Waiting duels in creation order; only quick-match ones with ``matchmaking``."""
+        query = "SELECT id, creator_id, bet, game, created_at, updated_at FROM duels WHERE status='waiting'"
+        if matchmaking:
+            query += " AND matchmaking=1"
+        return await self.fetchall(query + " ORDER BY id")
+
+    async def expire_waiting_duels(self, duel_ids: Sequence[int]) -> list[tuple[int, int, float]]:
+        """Mark still-waiting duels ``expired`` and refund their creators in one transaction.
+
+        Returns ``(duel_id, creator_id, bet)`` for the duels actually expired;
+        ones joined or cancelled in the meantime are left alone.
+        """
+        if not duel_ids:
+            return []
+        now = _utc()
+        expired: list[tuple[int, int, float]] = []
+        async with self.transaction() as conn:
+            ids = list(duel_ids)
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                cur = await conn.execute(
+                    f"""
+                    UPDATE duels SET status='expired', updated_at=?
+                    WHERE status='waiting' AND id IN ({','.join('?' * len(chunk))})
+                    RETURNING id, creator_id, bet
+                    """,
+                    (now, *chunk),
+                )
+                expired.extend((int(r[0]), int(r[1]), float(r[2])) for r in await cur.fetchall())
+
+            per_user: dict[int, list] = {}
+            for duel_id, creator_id, bet in expired:
+                entry = per_user.setdefault(creator_id, [0.0, []])
+                entry[0] += bet
+                entry[1].append(duel_id)
+            await self._credit_many(
+                conn,
+                [(uid, total, {"duels": duels, "reason": "expired"}) for uid, (total, duels) in per_user.items()],
+                tx_type="duel_refund",
+            )
+        return expired
+
+    async def refund_active_duels(self, duel_ids: Sequence[int] | None = None) -> list[tuple[int, int, int, float]]:
+        """Mark joined but unsettled duels ``refunded`` and return both stakes in one transaction.
+
+        ``duel_ids=None`` takes every ``active`` duel (startup recovery: no
+        duel is being played then). Returns ``(duel_id, creator_id,
+        opponent_id, bet)`` for the duels actually refunded; ones settled in
+        the meantime are left alone.
+        """
+        now = _utc()
+        refunded: list[tuple[int, int, int, float]] = []
+        async with self.transaction() as conn:
+            if duel_ids is None:
+                chunks = [None]
+            else:
+                ids = list(duel_ids)
+                chunks = [ids[i:i + 500] for i in range(0, len(ids), 500)]
+            for chunk in chunks:
+                query = "UPDATE duels SET status='refunded', updated_at=? WHERE status='active'"
+                if chunk is not None:
+                    query += f" AND id IN ({','.join('?' * len(chunk))})"
+                cur = await conn.execute(query + " RETURNING id, creator_id, opponent_id, bet", (now, *(chunk or ())))
+                refunded.extend((int(r[0]), int(r[1]), int(r[2]), float(r[3])) for r in await cur.fetchall())
+
+            per_user: dict[int, list] = {}
+            for duel_id, creator_id, opponent_id, bet in refunded:
+                for uid in (creator_id, opponent_id):
+                    entry = per_user.setdefault(uid, [0.0, []])
+                    entry[0] += bet
+                    entry[1].append(duel_id)
+            await self._credit_many(
+                conn,
+                [(uid, total, {"duels": duels, "reason": "aborted"}) for uid, (total, duels) in per_user.items()],
+                tx_type="duel_refund",
+            )
+        return refunded
+
     # ------------------------
     # raffle APIs
     # ------------------------
@@ -482,6 +1175,152 @@ CREATE TABLE IF NOT EXISTS settings (
             (winner_id, now, raffle_id),
         )
 
+    async def create_withdrawal(self, user_id: int, amount: Decimal, wallet: str) -> int:
+        """Hold ``amount`` on the balance and open a pending withdrawal in one transaction.
+
+        Raises ValueError (nothing written) if the balance is short. Returns the withdrawal id.
+        """
+        async with self.transaction() as conn:
+            cur = await conn.execute(
+                """
+                INSERT INTO withdrawals (user_id, amount, wallet, network, status, created_at)
+                VALUES (?, ?, ?, ?, 'pending', ?)
+                """,
+                (user_id, float(amount), wallet, wallet_network(wallet), _utc()),
+            )
+            withdrawal_id = int(cur.lastrowid)
+            await self._apply_balance_change(
+                conn, user_id, -amount,
+                tx_type="withdraw_hold", method="system", meta={"withdrawal": withdrawal_id, "wallet": wallet},
+            )
+            await self._count_withdrawals(conn, "pending", 1, float(amount))
+            return withdrawal_id
+
+    async def get_withdrawal_queue(
+        self,
+        *,
+        after_id: int = 0,
+        before_id: int | None = None,
+        limit: int = 8,
+        min_amount: float | None = None,
+        created_before: str | None = None,
+        network: str | None = None,
+    ) -> list[aiosqlite.Row]:
+        """One page of pending withdrawals, oldest first, keyset on id.
+
+        Rows with id > ``after_id``, or with ``before_id`` the ``limit`` rows
+        right before it (paging back). Reads ``idx_withdrawals_pending``.
+        """
+        where, params = ["status='pending'"], []
+        if before_id is not None:
+            where.append("id < ?")
+            params.append(before_id)
+        else:
+            where.append("id > ?")
+            params.append(after_id)
+        if min_amount is not None:
+            where.append("amount >= ?")
+            params.append(min_amount)
+        if created_before is not None:
+            where.append("created_at < ?")
+            params.append(created_before)
+        if network is not None:
+            where.append("network = ?")
+            params.append(network)
+        params.append(limit)
+        rows = await self.fetchall(
+            "SELECT id, user_id, amount, wallet, network, created_at FROM withdrawals "
+            f"WHERE {' AND '.join(where)} ORDER BY id {'DESC' if before_id is not None else 'ASC'} LIMIT ?",
+            params,
+        )
+        return rows[::-1] if before_id is not None else rows
+
+    async def moderate_withdrawals(self, ids: Sequence[int], *, approve: bool) -> list[tuple[int, int, float]]:
+        """Approve or decline pending withdrawals ``ids`` in one transaction.
+
+        Declines refund the held amount (``withdraw_refund``); approvals leave a
+        zero ``withdraw_paid`` ledger row so the payout shows up in the user's
+        history. Ids that are no longer pending are skipped, so a double click
+        can not refund twice. Returns the processed (id, user_id, amount).
+        """
+        if not ids:
+            return []
+        status = "approved" if approve else "declined"
+        now = _utc()
+        async with self.transaction() as conn:
+            cur = await conn.execute(
+                f"""
+                UPDATE withdrawals SET status=?, processed_at=?
+                WHERE id IN ({', '.join('?' * len(ids))}) AND status='pending'
+                RETURNING id, user_id, amount
+                """,
+                (status, now, *ids),
+            )
+            done = [(int(wid), int(uid), float(amount)) for wid, uid, amount in await cur.fetchall()]
+            if not done:
+                return []
+            done.sort()
+            for wid, uid, amount in done:
+                await self._apply_balance_change(
+                    conn, uid, Decimal("0") if approve else Decimal(str(amount)),
+                    tx_type="withdraw_paid" if approve else "withdraw_refund",
+                    method="system", meta={"withdrawal": wid},
+                    allow_negative=approve,  # a zero row never makes a balance worse
+                )
+            total = sum(amount for _, _, amount in done)
+            await self._count_withdrawals(conn, "pending", -len(done), -total)
+            await self._count_withdrawals(conn, status, len(done), total)
+            return done
+
+    async def withdrawal_counters(self) -> dict[str, tuple[int, float]]:
+        """status -> (count, amount) from the running counters, no scan of ``withdrawals``."""
+        rows = await self.fetchall("SELECT status, count, amount FROM withdrawal_counters")
+        return {status: (count, amount) for status, count, amount in rows}
+
+    @staticmethod
+    async def _count_withdrawals(conn: aiosqlite.Connection, status: str, count: int, amount: float) -> None:
+        await conn.execute(
+            """
+            INSERT INTO withdrawal_counters (status, count, amount) VALUES (?, ?, ?)
+            ON CONFLICT(status) DO UPDATE SET count = count + excluded.count, amount = amount + excluded.amount
+            """,
+            (status, count, amount),
+        )
+
+    # ------------------------
+    # leaderboards
+    # ------------------------
+    async def get_leaderboard_scores(self) -> list[tuple[str, str, str, int, float]]:
+        rows = await self.fetchall("SELECT metric, period, key, user_id, score FROM leaderboard_scores")
+        return [tuple(row) for row in rows]
+
+    async def save_leaderboard_scores(self, rows: Sequence[tuple[str, str, str, int, float]]) -> None:
+        async with self.transaction() as conn:
+            await conn.executemany(
+                """
+                INSERT INTO leaderboard_scores (metric, period, key, user_id, score) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(metric, period, key, user_id) DO UPDATE SET score=excluded.score
+                """,
+                rows,
+            )
+
+    async def prune_leaderboard_scores(self, keep_keys: Sequence[str]) -> None:
+        """Drop snapshot rows of finished days/weeks."""
+        await self.execute(
+            f"DELETE FROM leaderboard_scores WHERE key NOT IN ({', '.join('?' * len(keep_keys))})",
+            list(keep_keys),
+        )
+
+    async def leaderboard_seed(self) -> tuple[list[tuple[int, float]], list[tuple[int, int]]]:
+        """All-time (user_id, wagered) from ``games`` and (user_id, duels won) from ``duels``."""
+        wagered = await self.fetchall(
+            "SELECT user_id, SUM(bet) FROM games WHERE user_id IS NOT NULL GROUP BY user_id HAVING SUM(bet) > 0"
+        )
+        duels = await self.fetchall(
+            "SELECT winner_id, COUNT(*) FROM duels WHERE status='finished' AND winner_id IS NOT NULL GROUP BY winner_id"
+        )
+        return [(uid, float(total)) for uid, total in wagered], [(uid, int(n)) for uid, n in duels]
+
     # ------------------------
     # settings APIs
     # ------------------------
@@ -499,6 +1338,119 @@ CREATE TABLE IF NOT EXISTS settings (
         row = await self.fetchone("SELECT value FROM settings WHERE key=?", (key,))
         return row[0] if row else None
 
+    # ------------------------
+    # provably-fair APIs
+    # ------------------------
+    async def get_fair_seed(self, user_id: int) -> aiosqlite.Row | None:
+        return await self.fetchone("SELECT * FROM fair_seeds WHERE user_id=?", (user_id,))
+
+    async def get_server_seeds(self, user_ids: Sequence[int]) -> dict[str, str]:
+        """``{server_seed_hash: server_seed}`` of the users' active and revealed seeds."""
+        ids = list(dict.fromkeys(user_ids))
+        seeds: dict[str, str] = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            rows = await self.fetchall(
+                f"SELECT server_seed_hash, server_seed FROM fair_seeds WHERE user_id IN ({marks}) "
+                f"UNION ALL "
+                f"SELECT server_seed_hash, server_seed FROM fair_seed_history WHERE user_id IN ({marks})",
+                chunk + chunk,
+            )
+            seeds.update((str(h), str(s)) for h, s in rows)
+        return seeds
+
+    async def take_fair_nonce(
+        self,
+        user_id: int,
+        count: int = 1,
+        *,
+        new_seed: tuple[str, str, str] | None = None,
+    ) -> aiosqlite.Row | None:
+        """Advance the nonce by ``count`` and return the user's seed row (None if no seed yet).
+
+        The returned ``nonce`` is the last one taken; the batch is
+        ``nonce - count + 1 .. nonce``. With ``new_seed`` (``server_seed,
+        server_seed_hash, client_seed``) a user without a seed pair gets that
+        one in the same transaction; an existing pair is never replaced, so
+        concurrent first rounds share one unrevealed seed.
+        """
+        async with self.transaction() as conn:
+            if new_seed is not None:
+                await self._insert_fair_seed(conn, user_id, *new_seed)
+            cur = await conn.execute("UPDATE fair_seeds SET nonce = nonce + ? WHERE user_id=?", (count, user_id))
+            if cur.rowcount == 0:
+                return None
+            cur = await conn.execute("SELECT * FROM fair_seeds WHERE user_id=?", (user_id,))
+            return await cur.fetchone()
+
+    async def create_fair_seed(
+        self,
+        user_id: int,
+        *,
+        server_seed: str,
+        server_seed_hash: str,
+        client_seed: str,
+    ) -> bool:
+        """Give a user without a seed pair this one. False (nothing written) if they have one."""
+        async with self.transaction() as conn:
+            return await self._insert_fair_seed(conn, user_id, server_seed, server_seed_hash, client_seed)
+
+    @staticmethod
+    async def _insert_fair_seed(
+        conn: aiosqlite.Connection, user_id: int, server_seed: str, server_seed_hash: str, client_seed: str,
+    ) -> bool:
+        cur = await conn.execute(
+            """
+            INSERT OR IGNORE INTO fair_seeds (user_id, server_seed, server_seed_hash, client_seed, nonce, created_at)
+            VALUES (?, ?, ?, ?, 0, ?)
+            """,
+            (user_id, server_seed, server_seed_hash, client_seed, _utc()),
+        )
+        return cur.rowcount > 0
+
+    async def rotate_fair_seed(
+        self,
+        user_id: int,
+        *,
+        server_seed: str,
+        server_seed_hash: str,
+        client_seed: str,
+    ) -> aiosqlite.Row | None:
+        """Replace the active seed pair. Returns the old (now revealed) row, if any."""
+        now = _utc()
+        async with self.transaction() as conn:
+            cur = await conn.execute("SELECT * FROM fair_seeds WHERE user_id=?", (user_id,))
+            old = await cur.fetchone()
+            if old:
+                await conn.execute(
+                    """
+                    INSERT INTO fair_seed_history
+                        (user_id, server_seed, server_seed_hash, client_seed, last_nonce, created_at, revealed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (user_id, old["server_seed"], old["server_seed_hash"], old["client_seed"],
+                     old["nonce"], old["created_at"], now),
+                )
+                await conn.execute(
+                    "UPDATE games SET seed=? WHERE hash=? AND seed IS NULL",
+                    (old["server_seed"], old["server_seed_hash"]),
+                )
+            await conn.execute(
+                """
+                INSERT INTO fair_seeds (user_id, server_seed, server_seed_hash, client_seed, nonce, created_at)
+                VALUES (?, ?, ?, ?, 0, ?)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    server_seed=excluded.server_seed,
+                    server_seed_hash=excluded.server_seed_hash,
+                    client_seed=excluded.client_seed,
+                    nonce=0,
+                    created_at=excluded.created_at
+                """,
+                (user_id, server_seed, server_seed_hash, client_seed, now),
+            )
+            return old
+
     # ------------------------
     # payments APIs
     # ------------------------
@@ -544,5 +1496,263 @@ CREATE TABLE IF NOT EXISTS settings (
             )
             return True
 
+    # ------------------------
+    # ledger partitions
+    # ------------------------
+    async def rotate_ledger(self, month_start: str, name: str) -> aiosqlite.Row | None:
+        """Close the ledger months before ``month_start`` into partition ``name``.
+
+        ``transactions`` is renamed to ``name`` (O(1), no rows copied), a fresh
+        ``transactions`` continuing the same id sequence takes new writes, and
+        the few rows already written since ``month_start`` are moved back to
+        it. Returns the new ``ledger_partitions`` row, or None if
+        ``transactions`` holds nothing older than ``month_start``.
+        """
+        if not LEDGER_PARTITION.fullmatch(name):
+            raise ValueError(f"Bad ledger partition name: {name}")
+        async with self.transaction() as conn:
+            cur = await conn.execute("SELECT created_at FROM transactions ORDER BY id LIMIT 1")
+            row = await cur.fetchone()
+            if not row or row[0] >= month_start:
+                return None
+            cur = await conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,))
+            if await cur.fetchone():
+                raise RuntimeError(f"Ledger partition {name} already exists")
+
+            cur = await conn.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='transactions'")
+            ddl = (await cur.fetchone())[0]
+            await conn.execute("DROP INDEX IF EXISTS idx_transactions_user")
+            await conn.execute(f"ALTER TABLE transactions RENAME TO {name}")
+            await conn.execute(ddl)
+            await conn.execute(f"CREATE INDEX idx_transactions_user ON transactions({LEDGER_USER_INDEX})")
+
+            # Rows of the new month written before the rotation ran sit at the end.
+            split_id = None
+            cur = await conn.execute(f"SELECT id, created_at FROM {name} ORDER BY id DESC")
+            while rows := await cur.fetchmany(500):
+                newer = [r[0] for r in rows if r[1] >= month_start]
+                if newer:
+                    split_id = newer[-1]
+                if len(newer) < len(rows):
+                    break
+            await cur.close()
+            if split_id is not None:
+                await conn.execute(f"INSERT INTO transactions SELECT * FROM {name} WHERE id >= ?", (split_id,))
+                await conn.execute(f"DELETE FROM {name} WHERE id >= ?", (split_id,))
+
+            # Ids keep growing across partitions, so readers can page by id.
+            cur = await conn.execute("SELECT seq FROM sqlite_sequence WHERE name=?", (name,))
+            seq = (await cur.fetchone())[0]
+            await conn.execute("DELETE FROM sqlite_sequence WHERE name='transactions'")
+            await conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('transactions', ?)", (seq,))
+
+            await conn.execute(f"CREATE INDEX idx_{name}_user ON {name}({LEDGER_USER_INDEX})")
+            cur = await conn.execute(
+                f"SELECT MIN(id), MAX(id), MIN(created_at), MAX(created_at), COUNT(*) FROM {name}"
+            )
+            first_id, last_id, first_at, last_at, count = await cur.fetchone()
+            cur = await conn.execute(f"SELECT type, SUM(amount) FROM {name} GROUP BY type")
+            totals = {tx_type: total for tx_type, total in await cur.fetchall()}
+            await conn.execute(
+                """
+                INSERT INTO ledger_partitions (name, first_id, last_id, first_at, last_at, rows, totals, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (name, first_id, last_id, first_at, last_at, count, json.dumps(totals), _utc()),
+            )
+            cur = await conn.execute("SELECT * FROM ledger_partitions WHERE name=?", (name,))
+            return await cur.fetchone()
+
+    async def get_ledger_partitions(self) -> list[aiosqlite.Row]:
+        """Closed partitions, newest first."""
+        return await self.fetchall("SELECT * FROM ledger_partitions ORDER BY last_id DESC")
+
+    async def drop_archived_partition(self, name: str, archive: str) -> None:
+        """Record ``archive`` as the home of partition ``name`` and drop its table."""
+        if not LEDGER_PARTITION.fullmatch(name):
+            raise ValueError(f"Bad ledger partition name: {name}")
+        async with self.transaction() as conn:
+            await conn.execute("UPDATE ledger_partitions SET archive=? WHERE name=?", (archive, name))
+            await conn.execute(f"DROP TABLE IF EXISTS {name}")
+
+    async def get_ledger_page(
+        self,
+        table: str,
+        user_id: int,
+        *,
+        before_id: int | None = None,
+        after_id: int | None = None,
+        limit: int = 50,
+        types: Sequence[str] | None = None,
+        columns: str = LEDGER_COLUMNS,
+    ) -> list[aiosqlite.Row]:
+        """Rows of ``user_id`` from one live ledger table, see :func:`ledger_page_query`."""
+        if table != "transactions" and not LEDGER_PARTITION.fullmatch(table):
+            raise ValueError(f"Bad ledger table: {table}")
+        query, params = ledger_page_query(
+            table, user_id, before_id=before_id, after_id=after_id, limit=limit, types=types, columns=columns,
+        )
+        return await self.fetchall(query, params)
+
+    async def ledger_total(self, tx_type: str) -> float:
+        """Sum of ``tx_type`` amounts over the whole ledger, closed months from the catalog."""
+        row = await self.fetchone("SELECT COALESCE(SUM(amount), 0) FROM transactions WHERE type=?", (tx_type,))
+        total = float(row[0])
+        for (totals,) in await self.fetchall("SELECT totals FROM ledger_partitions"):
+            total += float(json.loads(totals).get(tx_type) or 0)
+        return total
+
+    # ------------------------
+    # reconciliation checkpoints
+    # ------------------------
+    async def get_ledger_chunk(self, table: str, after_id: int, limit: int) -> list[aiosqlite.Row]:
+        """``(id, user_id, amount)`` rows of a live ledger table after ``after_id``, in id order."""
+        if table != "transactions" and not LEDGER_PARTITION.fullmatch(table):
+            raise ValueError(f"Bad ledger table: {table}")
+        return await self.fetchall(
+            f"SELECT id, user_id, amount FROM {table} WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit),
+        )
+
+    async def get_reconciled_id(self) -> int:
+        return int(await self.get_setting(RECONCILED_ID) or 0)
+
+    async def advance_checkpoints(
+        self,
+        sums: Iterable[tuple[int, float, int]],
+        from_id: int,
+        to_id: int,
+    ) -> bool:
+        """Add ``(user_id, amount, last_tx_id)`` sums covering ledger ids ``from_id < id <= to_id``.
+
+        Returns False (nothing written) if the checkpoints are no longer at ``from_id``.
+        """
+        async with self.transaction() as conn:
+            if await self._reconciled_id(conn) != from_id:
+                return False
+            await self._add_checkpoints(conn, sums)
+            await self._set_reconciled_id(conn, to_id)
+            return True
+
+    async def compare_balances(
+        self,
+        after_user_id: int,
+        limit: int,
+        tolerance: float,
+    ) -> tuple[int, int, int | None, list[tuple[int, float, float]]]:
+        """Check up to ``limit`` users after ``after_user_id`` against their checkpoints.
+
+        Ledger rows written since the checkpoints last moved are folded in
+        first, in the same transaction, so no balance change can slip in
+        between the two sides. Returns ``(rows_folded_in, users_checked,
+        last_user_id, [(user_id, balance, ledger_total)])``; ``last_user_id``
+        is None once every user has been checked.
+        """
+        async with self.transaction() as conn:
+            cursor = start = await self._reconciled_id(conn)
+            folded = 0
+            cur = await conn.execute(
+                "SELECT name FROM ledger_partitions WHERE archive IS NULL AND last_id > ? ORDER BY first_id",
+                (cursor,),
+            )
+            for table in [r[0] for r in await cur.fetchall()] + ["transactions"]:
+                cur = await conn.execute(
+                    f"SELECT user_id, SUM(amount), MAX(id), COUNT(*) FROM {table} WHERE id > ? GROUP BY user_id",
+                    (cursor,),
+                )
+                sums = await cur.fetchall()
+                if sums:
+                    await self._add_checkpoints(conn, [(uid, total, last) for uid, total, last, _ in sums])
+                    cursor = max(cursor, max(r[2] for r in sums))
+                    folded += sum(r[3] for r in sums)
+            if cursor != start:
+                await self._set_reconciled_id(conn, cursor)
+
+            cur = await conn.execute(
+                """
+                SELECT u.user_id, u.balance, COALESCE(c.total, 0)
+                FROM users u LEFT JOIN ledger_checkpoints c ON c.user_id = u.user_id
+                WHERE u.user_id > ?
+                ORDER BY u.user_id
+                LIMIT ?
+                """,
+                (after_user_id, limit),
+            )
+            rows = await cur.fetchall()
+        mismatched = [
+            (int(uid), float(balance or 0), float(total))
+            for uid, balance, total in rows
+            if abs(float(balance or 0) - float(total)) > tolerance
+        ]
+        last = int(rows[-1][0]) if len(rows) == limit else None
+        return folded, len(rows), last, mismatched
+
+    async def reset_checkpoints(self) -> None:
+        """Forget all checkpoints; the next reconciliation re-reads the whole ledger."""
+        async with self.transaction() as conn:
+            await conn.execute("DELETE FROM ledger_checkpoints")
+            await self._set_reconciled_id(conn, 0)
+
+    @staticmethod
+    async def _reconciled_id(conn: aiosqlite.Connection) -> int:
+        cur = await conn.execute("SELECT value FROM settings WHERE key=?", (RECONCILED_ID,))
+        row = await cur.fetchone()
+        return int(row[0]) if row and row[0] else 0
+
+    @staticmethod
+    async def _set_reconciled_id(conn: aiosqlite.Connection, tx_id: int) -> None:
+        await conn.execute(
+            "INSERT INTO settings (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+            (RECONCILED_ID, str(tx_id)),
+        )
+
+    @staticmethod
+    async def _add_checkpoints(conn: aiosqlite.Connection, sums: Iterable[tuple[int, float, int]]) -> None:
+        now = _utc()
+        await conn.executemany(
+            """
+            INSERT INTO ledger_checkpoints (user_id, last_tx_id, total, updated_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                total = total + excluded.total,
+                last_tx_id = MAX(last_tx_id, excluded.last_tx_id),
+                updated_at = excluded.updated_at
+            """,
+            [(uid, last, float(total), now) for uid, total, last in sums],
+        )
+
+
+def ledger_page_query(
+    table: str,
+    user_id: int,
+    *,
+    before_id: int | None = None,
+    after_id: int | None = None,
+    limit: int = 50,
+    types: Sequence[str] | None = None,
+    columns: str = LEDGER_COLUMNS,
+) -> tuple[str, list[Any]]:
+    """SQL for one page of a user's rows in a ledger table (live or archived).
+
+    Keyset paging on ``idx_transactions_user``: rows older than ``before_id``
+    newest first, or with ``after_id`` the rows right after it, oldest first.
+    Either way the cost does not depend on how deep the page is.
+    """
+    where, params = ["user_id=?"], [user_id]
+    if before_id is not None:
+        where.append("id < ?")
+        params.append(before_id)
+    if after_id is not None:
+        where.append("id > ?")
+        params.append(after_id)
+    if types:
+        where.append(f"type IN ({', '.join('?' * len(types))})")
+        params.extend(types)
+    params.append(limit)
+    order = "ASC" if after_id is not None else "DESC"
+    return (
+        f"SELECT {columns} FROM {table} WHERE {' AND '.join(where)} ORDER BY id {order} LIMIT ?",
+        params,
+    )
+
 
 db = DB()
@@ -1,13 +1,25 @@
 # handlers/admin.py
+import os
+import re
+from datetime import datetime, timedelta, timezone
+
 from aiogram import Router, F
-from aiogram.types import CallbackQuery, Message
+from aiogram.filters import Command, CommandObject
+from aiogram.types import CallbackQuery, FSInputFile, Message
 from aiogram.fsm.context import FSMContext
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
-from database.db import db
+from database.db import db, WITHDRAWAL_NETWORKS
 from config import ADMIN_IDS
 from states.admin import AdminState
+from middlewares.throttling import throttle
 from services.balance import change_balance
+from services.expiry import sweeper
+from services.export import FORMATS, TABLES, export
+from services.maintenance import maintenance
+from services.bot_session import scheduler as api_scheduler
+from services.matchmaking import matchmaker
+from services.reconcile import reconciler
 from services.settings import (
     get_channels,
     set_channels,
@@ -42,81 +54,149 @@ async def admin_panel(msg: Message):
 # ---------------------------------------------------
 #  WITHDRAWAL REQUESTS
 # ---------------------------------------------------
-@router.callback_query(F.data == "admin_withdraws")
-async def admin_withdraws(call: CallbackQuery):
-    if call.from_user.id not in ADMIN_IDS:
-        return
-
-    rows = await db.fetchall(
-        "SELECT id, user_id, amount, wallet, created_at "
-        "FROM withdrawals WHERE status='pending' ORDER BY created_at ASC"
+# Moderation queue: pending withdrawals oldest first, QUEUE_PAGE per page,
+# paged by id (wq:p:{after_id}; wq:b:{first_id} is the page before it).
+# Filters, the selection and the current page live in the FSM data; ✅/❌
+# process every selected withdrawal in one transaction.
+QUEUE_PAGE = 8
+AMOUNT_STEPS = (None, 10.0, 100.0, 1000.0)  # minimum amount, $
+AGE_STEPS = (None, 1, 24)  # older than, hours
+NETWORK_STEPS = (None, *WITHDRAWAL_NETWORKS)
+NETWORK_NAMES = {"trc20": "USDT TRC-20", "ton": "TON", "other": "другое"}
+NO_FILTER = {"amount": None, "age": None, "network": None}
+
+
+def _next_step(steps: tuple, current):
+    return steps[(steps.index(current) + 1) % len(steps)] if current in steps else steps[0]
+
+
+def _queue_query(flt: dict) -> dict:
+    created_before = None
+    if flt["age"]:
+        created_before = (datetime.now(timezone.utc) - timedelta(hours=flt["age"])).isoformat()
+    return {"min_amount": flt["amount"], "created_before": created_before, "network": flt["network"]}
+
+
+def _age(created_at: str) -> str:
+    created = datetime.fromisoformat(created_at)
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    minutes = int((datetime.now(timezone.utc) - created).total_seconds() // 60)
+    if minutes < 60:
+        return f"{minutes} мин"
+    if minutes < 48 * 60:
+        return f"{minutes // 60} ч"
+    return f"{minutes // 1440} д"
+
+
+async def _render_queue(call: CallbackQuery, state: FSMContext, start: int):
+    data = await state.get_data()
+    flt = data.get("wq_filter") or NO_FILTER
+    selected = set(data.get("wq_selected", []))
+
+    rows = await db.get_withdrawal_queue(after_id=start, limit=QUEUE_PAGE + 1, **_queue_query(flt))
+    if not rows and start:
+        start = 0
+        rows = await db.get_withdrawal_queue(limit=QUEUE_PAGE + 1, **_queue_query(flt))
+    more = len(rows) > QUEUE_PAGE
+    rows = rows[:QUEUE_PAGE]
+    await state.update_data(wq_start=start, wq_page=[row["id"] for row in rows])
+
+    counters = await db.withdrawal_counters()
+    pending, pending_sum = counters.get("pending", (0, 0.0))
+    approved, approved_sum = counters.get("approved", (0, 0.0))
+    declined, _ = counters.get("declined", (0, 0.0))
+    text = (
+        "<b>📤 Выводы</b>\n"
+        f"Ожидают: <b>{pending}</b> на <b>{pending_sum:.2f}$</b> • "
+        f"одобрено: <b>{approved}</b> ({approved_sum:.2f}$) • отклонено: <b>{declined}</b>\n\n"
     )
-
     if not rows:
-        return await call.message.edit_text("🌿 Все чисто. Ожидающих выводов нет.")
-
-    kb = InlineKeyboardBuilder()
-    text = "<b>Ожидающие выводы:</b>\n\n"
-
-    for wid, uid, amount, wallet, created in rows:
+        text += "🌿 Все чисто. Ожидающих выводов нет." if flt == NO_FILTER else "Под фильтр ничего не попало."
+    for row in rows:
+        mark = "☑️" if row["id"] in selected else "▫️"
         text += (
-            f"🧾 <b>#{wid}</b>\n"
-            f"👤 Пользователь: <code>{uid}</code>\n"
-            f"💵 Сумма: <b>{amount}$</b>\n"
-            f"🏦 Кошелёк: <code>{wallet}</code>\n"
-            f"⏱ Создан: {created}\n\n"
+            f"{mark} <b>#{row['id']}</b> • <b>{row['amount']:.2f}$</b> • "
+            f"{NETWORK_NAMES.get(row['network'], row['network'])} • {_age(row['created_at'])}\n"
+            f"👤 <code>{row['user_id']}</code> 🏦 <code>{row['wallet']}</code>\n\n"
         )
 
-        kb.button(text=f"✅ #{wid}", callback_data=f"admin_ok:{wid}")
-        kb.button(text=f"❌ #{wid}", callback_data=f"admin_no:{wid}")
-
-    kb.adjust(2)
+    kb = InlineKeyboardBuilder()
+    for row in rows:
+        mark = "☑️" if row["id"] in selected else "▫️"
+        kb.button(text=f"{mark} #{row['id']}", callback_data=f"wq:t:{row['id']}")
+    kb.button(
+        text=f"💵 ≥{flt['amount']:.0f}$" if flt["amount"] else "💵 Любая сумма", callback_data="wq:f:amount",
+    )
+    kb.button(text=f"⏱ >{flt['age']} ч" if flt["age"] else "⏱ Любой возраст", callback_data="wq:f:age")
+    kb.button(
+        text=f"🌐 {NETWORK_NAMES[flt['network']]}" if flt["network"] else "🌐 Все сети", callback_data="wq:f:network",
+    )
+    kb.button(text="☑️ Вся страница", callback_data="wq:all")
+    kb.button(text="▫️ Снять выбор", callback_data="wq:clr")
+    kb.button(text=f"✅ Одобрить ({len(selected)})", callback_data="wq:ok")
+    kb.button(text=f"❌ Отклонить ({len(selected)})", callback_data="wq:no")
+    nav = []
+    if start and rows:
+        kb.button(text="⬅️", callback_data=f"wq:b:{rows[0]['id']}")
+        nav.append(1)
+    if more:
+        kb.button(text="➡️", callback_data=f"wq:p:{rows[-1]['id']}")
+        nav.append(1)
+    kb.button(text="⬅️ В панель", callback_data="admin_home")
+    kb.adjust(*([4] * (len(rows) // 4)), *([len(rows) % 4] if len(rows) % 4 else []), 3, 2, 2, *([len(nav)] if nav else []), 1)
 
     await call.message.edit_text(text, reply_markup=kb.as_markup())
 
 
-# ---------------------------------------------------
-#  APPROVE WITHDRAWAL
-# ---------------------------------------------------
-@router.callback_query(F.data.startswith("admin_ok:"))
-async def admin_withdraw_approve(call: CallbackQuery):
+@router.callback_query(F.data == "admin_withdraws")
+async def admin_withdraws(call: CallbackQuery, state: FSMContext):
     if call.from_user.id not in ADMIN_IDS:
         return
+    await _render_queue(call, state, 0)
 
-    wid = call.data.split(":")[1]
-
-    await db.execute("UPDATE withdrawals SET status='approved', processed_at=datetime('now') WHERE id=?", (wid,))
-    await call.answer(f"Вывод #{wid} одобрен ✔", show_alert=True)
 
-    return await admin_withdraws(call)
-
-
-# ---------------------------------------------------
-#  DECLINE WITHDRAWAL
-# ---------------------------------------------------
-@router.callback_query(F.data.startswith("admin_no:"))
-async def admin_withdraw_decline(call: CallbackQuery):
+@router.callback_query(F.data.startswith("wq:"))
+async def admin_withdraw_queue(call: CallbackQuery, state: FSMContext):
     if call.from_user.id not in ADMIN_IDS:
         return
 
-    wid = call.data.split(":")[1]
-
-    row = await db.fetchone(
-        "SELECT user_id, amount FROM withdrawals WHERE id=?", (wid,)
-    )
-
-    if row:
-        uid, amount = row
-        await change_balance(uid, amount)
-
-    await db.execute(
-        "UPDATE withdrawals SET status='declined', processed_at=datetime('now') WHERE id=?",
-        (wid,)
-    )
-
-    await call.answer(f"Вывод #{wid} отклонён ❌", show_alert=True)
-
-    return await admin_withdraws(call)
+    parts = call.data.split(":")
+    action = parts[1]
+    data = await state.get_data()
+    selected = set(data.get("wq_selected", []))
+    start = data.get("wq_start", 0)
+
+    if action == "p":
+        start = int(parts[2])
+    elif action == "b":
+        flt = data.get("wq_filter") or NO_FILTER
+        rows = await db.get_withdrawal_queue(before_id=int(parts[2]), limit=QUEUE_PAGE, **_queue_query(flt))
+        start = rows[0]["id"] - 1 if rows else 0
+    elif action == "t":
+        selected ^= {int(parts[2])}
+    elif action == "all":
+        selected |= set(data.get("wq_page", []))
+    elif action == "clr":
+        selected.clear()
+    elif action == "f":
+        flt = dict(data.get("wq_filter") or NO_FILTER)
+        steps = {"amount": AMOUNT_STEPS, "age": AGE_STEPS, "network": NETWORK_STEPS}[parts[2]]
+        flt[parts[2]] = _next_step(steps, flt[parts[2]])
+        await state.update_data(wq_filter=flt)
+        start = 0
+        selected.clear()
+    elif action in ("ok", "no"):
+        if not selected:
+            return await call.answer("Ничего не выбрано", show_alert=True)
+        done = await db.moderate_withdrawals(sorted(selected), approve=action == "ok")
+        selected.clear()
+        total = sum(amount for _, _, amount in done)
+        verb = "Одобрено ✔" if action == "ok" else "Отклонено ❌, средства возвращены"
+        await call.answer(f"{verb}: {len(done)} на {total:.2f}$", show_alert=True)
+
+    await state.update_data(wq_selected=sorted(selected))
+    await _render_queue(call, state, start)
 
 
 # ---------------------------------------------------
@@ -176,7 +256,8 @@ def admin_menu_keyboard():
     kb.button(text="💳 Начислить баланс", callback_data="admin_add_balance")
     kb.button(text="⚙️ Настройки", callback_data="admin_settings")
     kb.button(text="📈 Статистика", callback_data="admin_stats")
-    kb.adjust(2, 2)
+    kb.button(text="🧮 Сверка", callback_data="admin_reconcile")
+    kb.adjust(2, 2, 1)
     return kb
 
 
@@ -346,18 +427,34 @@ async def admin_stats(call: CallbackQuery):
     wager_row = await db.fetchone("SELECT COALESCE(SUM(bet),0) FROM games")
     total_wagered = wager_row[0] if wager_row else 0
 
-    deposits_row = await db.fetchone(
-        "SELECT COALESCE(SUM(amount),0) FROM transactions WHERE type='deposit'"
-    )
-    total_deposits = deposits_row[0] if deposits_row else 0
+    # closed ledger months come from the partition catalog, not a scan
+    total_deposits = await db.ledger_total("deposit")
 
-    withdrawals_row = await db.fetchone(
-        "SELECT COALESCE(SUM(amount),0) FROM withdrawals WHERE status='approved'"
-    )
-    total_withdraws = withdrawals_row[0] if withdrawals_row else 0
+    _, total_withdraws = (await db.withdrawal_counters()).get("approved", (0, 0.0))
 
     profit = (total_deposits or 0) - (total_withdraws or 0)
 
+    open_rounds = sweeper.open_rounds_by_game()
+    rounds_line = ", ".join(f"{game}: {n}" for game, n in open_rounds.items()) or "0"
+    expired_line = ", ".join(f"{kind}: {n}" for kind, n in sorted(sweeper.expired.items())) or "0"
+    partitions = await db.get_ledger_partitions()
+    archived = sum(1 for p in partitions if p["archive"])
+    queue_line = ", ".join(f"{game} {bet}$: {n}" for (game, bet), n in matchmaker.depth().items()) or "0"
+    report = reconciler.last_report
+    reconcile_line = (
+        f"расхождений <b>{len(report.mismatches)}</b> из <b>{report.users}</b>"
+        if report is not None else "ещё не было"
+    )
+    dbm = maintenance.metrics
+    api = api_scheduler.metrics
+    api_queue = ", ".join(f"{name}: {n}" for name, n in api_scheduler.depth().items()) or "0"
+    checkpoints = sum(dbm.checkpoints.values())
+    backup_line = (
+        f"{datetime.fromtimestamp(dbm.last_backup_at, timezone.utc):%d.%m %H:%M} UTC, "
+        f"{dbm.last_backup_seconds:.1f} с, {dbm.last_backup_bytes / 1e6:.1f} МБ"
+        if dbm.last_backup_at else "ещё не было"
+    )
+
     text = (
         "<b>📈 Статистика</b>\n\n"
         f"👥 Пользователи: <b>{total_users}</b>\n"
@@ -365,9 +462,106 @@ async def admin_stats(call: CallbackQuery):
         f"💵 Оборот ставок: <b>{total_wagered:.2f}$</b>\n\n"
         f"💰 Депозиты: <b>{total_deposits:.2f}$</b>\n"
         f"📤 Выводы (одобрено): <b>{total_withdraws:.2f}$</b>\n"
-        f"🔥 Профит: <b>{profit:.2f}$</b>"
+        f"🔥 Профит: <b>{profit:.2f}$</b>\n\n"
+        f"🎲 Открытые раунды: <b>{rounds_line}</b>\n"
+        f"⚔️ Дуэли в ожидании: <b>{sweeper.waiting_duels}</b>\n"
+        f"⌛ Истекло с запуска: <b>{expired_line}</b>\n\n"
+        f"⚡ Очередь быстрого матча: <b>{queue_line}</b>\n"
+        f"🤝 Матчей: <b>{matchmaker.matched}</b> • "
+        f"среднее ожидание: <b>{matchmaker.average_wait:.0f} с</b> • "
+        f"дольше всех ждёт: <b>{matchmaker.oldest_wait():.0f} с</b>\n\n"
+        f"📚 Закрытых месяцев в журнале: <b>{len(partitions)}</b> (в архиве: <b>{archived}</b>)\n"
+        f"🧮 Последняя сверка: {reconcile_line}\n\n"
+        f"🗄 WAL: <b>{dbm.wal_bytes / 1e6:.1f} МБ</b> (пик {dbm.wal_peak / 1e6:.1f} МБ) • "
+        f"чекпоинтов: <b>{checkpoints}</b>, последний {dbm.last_checkpoint_ms:.0f} мс, "
+        f"максимум {dbm.max_checkpoint_ms:.0f} мс\n"
+        f"💾 Последний бэкап: {backup_line}"
+        + (f" • ошибок: <b>{dbm.backup_failures}</b>" if dbm.backup_failures else "")
+        + f"\n\n🚦 Антифлуд: отклонено <b>{throttle.throttled}</b> из <b>{throttle.passed + throttle.throttled}</b>, "
+        f"активных: <b>{len(throttle)}</b>\n"
+        f"📮 Очередь Bot API: <b>{api_queue}</b> (пик {api.max_depth}) • "
+        f"дольше всех ждал: <b>{api.max_wait:.1f} с</b> • 429: <b>{api.retry_after}</b>"
+        + (f" (не дождались: <b>{api.gave_up}</b>)" if api.gave_up else "")
+        + (f" • логов отброшено: <b>{api.dropped}</b>" if api.dropped else "")
     )
 
     kb = InlineKeyboardBuilder()
     kb.button(text="⬅️ В панель", callback_data="admin_home")
     await call.message.edit_text(text, reply_markup=kb.as_markup())
+
+
+# ---------------------------------------------------
+#  BALANCE RECONCILIATION
+# ---------------------------------------------------
+@router.callback_query(F.data == "admin_reconcile")
+async def admin_reconcile(call: CallbackQuery):
+    if call.from_user.id not in ADMIN_IDS:
+        return
+    if reconciler.running:
+        return await call.answer("Сверка уже идёт", show_alert=True)
+
+    await call.answer()
+    await call.message.edit_text("🧮 Сверяю балансы с журналом…")
+    report = await reconciler.run()
+
+    lines = [
+        "<b>🧮 Сверка балансов</b>\n",
+        f"Новых записей журнала: <b>{report.rows}</b>",
+        f"Пользователей проверено: <b>{report.users}</b>",
+        f"Время: <b>{report.elapsed:.1f} с</b>",
+        f"Расхождений: <b>{len(report.mismatches)}</b>",
+    ]
+    for user_id, balance, ledger in report.mismatches[:20]:
+        lines.append(
+            f"• <code>{user_id}</code>: баланс {balance:.2f}$, журнал {ledger:.2f}$ ({balance - ledger:+.2f}$)"
+        )
+    if len(report.mismatches) > 20:
+        lines.append(f"… и ещё {len(report.mismatches) - 20}")
+
+    kb = InlineKeyboardBuilder()
+    kb.button(text="⬅️ В панель", callback_data="admin_home")
+    await call.message.edit_text("\n".join(lines), reply_markup=kb.as_markup())
+
+
+# ---------------------------------------------------
+#  EXPORT
+# ---------------------------------------------------
+TELEGRAM_FILE_LIMIT = 50 * 1024 * 1024  # bots can not send bigger documents
+
+EXPORT_USAGE = (
+    "Использование: <code>/export таблица [ГГГГ-ММ] [csv|jsonl]</code>\n"
+    f"Таблицы: {', '.join(TABLES)}\n"
+    "Пример: <code>/export transactions 2026-09 csv</code>"
+)
+
+
+@router.message(Command("export"))
+async def admin_export(msg: Message, command: CommandObject):
+    if msg.from_user.id not in ADMIN_IDS:
+        return
+
+    args = (command.args or "").split()
+    table = args[0] if args else None
+    month = next((a for a in args[1:] if re.fullmatch(r"\d{4}-\d{2}", a)), None)
+    fmt = next((a for a in args[1:] if a in FORMATS), "csv")
+    if table not in TABLES:
+        return await msg.answer(EXPORT_USAGE)
+
+    status = await msg.answer("⏳ Готовлю выгрузку…")
+    try:
+        result = await export(table, fmt, month)
+    except ValueError:
+        return await status.edit_text(EXPORT_USAGE)
+
+    try:
+        if result.size > TELEGRAM_FILE_LIMIT:
+            return await status.edit_text(
+                f"Файл слишком большой ({result.size / 1e6:.0f} МБ), выгрузите по месяцам."
+            )
+        await msg.answer_document(
+            FSInputFile(result.path, filename=result.filename),
+            caption=f"📦 {table}{' за ' + month if month else ''}: {result.rows} строк",
+        )
+        await status.delete()
+    finally:
+        os.remove(result.path)
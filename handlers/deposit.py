@@ -15,6 +15,7 @@ from services.payments.rocket import check_rocket_receipt, process_rocket_paymen
 from services.balance import change_balance
 from database.db import db
 from config import settings
+from services.i18n import Translator, i18n
 
 router = Router()
 
@@ -31,12 +32,12 @@ class StarsPaymentStates(StatesGroup):
 # ----------------------------
 
 @router.callback_query(F.data == "dep_back")
-async def dep_back(call: CallbackQuery, lang: str, state: FSMContext):
+async def dep_back(call: CallbackQuery, tr: Translator, state: FSMContext):
     await state.clear()
 
     await call.message.edit_text(
-        "Выберите действие:" if lang == "ru" else "Choose an option:",
-        reply_markup=main_menu(lang)
+        tr("deposit.choose_action"),
+        reply_markup=main_menu(tr.lang)
     )
 
 
@@ -45,11 +46,10 @@ async def dep_back(call: CallbackQuery, lang: str, state: FSMContext):
 # ----------------------------
 
 @router.callback_query(F.data == "deposit")
-async def open_deposit(call: CallbackQuery, lang: str):
+async def open_deposit(call: CallbackQuery, tr: Translator):
     await call.message.edit_text(
-        "💰 Выберите способ пополнения:"
-        if lang == "ru" else "💰 Choose deposit method:",
-        reply_markup=deposit_keyboard(lang)
+        tr("deposit.choose_method"),
+        reply_markup=deposit_keyboard(tr.lang)
     )
 
 
@@ -58,7 +58,7 @@ async def open_deposit(call: CallbackQuery, lang: str):
 # ----------------------------
 
 @router.callback_query(F.data.startswith("dep_"))
-async def dep_select(call: CallbackQuery, state: FSMContext, lang: str):
+async def dep_select(call: CallbackQuery, state: FSMContext, tr: Translator):
     method = call.data.split("_")[1]
 
     # Anti-spam: очистка старых стейтов
@@ -68,23 +68,22 @@ async def dep_select(call: CallbackQuery, state: FSMContext, lang: str):
     if method == "rocket":
         await state.set_state(DepositState.waiting_rocket_check)
         return await call.message.edit_text(
-            "📄 Отправьте Rocket чек:" if lang == "ru" else "📄 Send Rocket receipt:"
+            tr("deposit.rocket_prompt")
         )
 
     # Stars
     if method == "stars":
         await state.set_state(StarsPaymentStates.waiting_stars_amount)
         return await call.message.edit_text(
-            "Введите количество ⭐ Stars:" if lang == "ru"
-            else "Enter Stars amount:"
+            tr("deposit.stars_prompt")
         )
 
     # Crypto
     if method == "crypto":
-        await state.update_data(method="crypto", lang=lang)
+        await state.update_data(method="crypto", lang=tr.lang)
         await state.set_state(DepositState.waiting_amount)
         return await call.message.edit_text(
-            "Введите сумму в USD:" if lang == "ru" else "Enter amount in USD:"
+            tr("deposit.crypto_prompt")
         )
 
 
@@ -95,7 +94,7 @@ async def dep_select(call: CallbackQuery, state: FSMContext, lang: str):
 @router.message(DepositState.waiting_amount)
 async def dep_amount(msg: Message, state: FSMContext):
     data = await state.get_data()
-    lang = data.get("lang", "ru")
+    tr = i18n(data.get("lang", "ru"))
 
     # Валидация суммы
     try:
@@ -108,8 +107,8 @@ async def dep_amount(msg: Message, state: FSMContext):
     url, invoice_id = await create_crypto_invoice(msg.from_user.id, amount)
 
     await msg.answer(
-        ("💳 Оплатите по ссылке:\n" if lang == "ru" else "💳 Pay here:\n") + url,
-        reply_markup=crypto_check_keyboard(invoice_id, lang)
+        tr("deposit.pay_link", url=url),
+        reply_markup=crypto_check_keyboard(invoice_id, tr.lang)
     )
 
     await state.clear()
@@ -120,13 +119,13 @@ async def dep_amount(msg: Message, state: FSMContext):
 # ----------------------------
 
 @router.message(DepositState.waiting_rocket_check)
-async def dep_rocket_check(msg: Message, state: FSMContext, lang: str):
+async def dep_rocket_check(msg: Message, state: FSMContext, tr: Translator):
     receipt = msg.text.strip()
 
     data = await check_rocket_receipt(receipt)
 
     if not data or not data.get("valid"):
-        return await msg.answer("❌ Неверный чек" if lang=="ru" else "❌ Invalid")
+        return await msg.answer(tr("deposit.invalid_receipt"))
 
     try:
         amount = float(data.get("amount", 0))
@@ -134,7 +133,7 @@ async def dep_rocket_check(msg: Message, state: FSMContext, lang: str):
         amount = 0.0
 
     if amount <= 0:
-        return await msg.answer("❌ Неверная сумма" if lang=="ru" else "❌ Invalid amount")
+        return await msg.answer(tr("deposit.invalid_amount"))
 
     # Регистрируем платёж в pending (уникальный receipt)
     await db.upsert_pending_payment(
@@ -165,7 +164,7 @@ async def dep_rocket_check(msg: Message, state: FSMContext, lang: str):
 # ----------------------------
 
 @router.callback_query(F.data.startswith("check_crypto:"))
-async def check_crypto_payment(call: CallbackQuery, lang: str):
+async def check_crypto_payment(call: CallbackQuery, tr: Translator):
     invoice_id = call.data.split(":")[1]
 
     # Проверяем, что invoice существует
@@ -1,4 +1,5 @@
 import asyncio
+import logging
 import random
 from decimal import Decimal
 
@@ -11,122 +12,169 @@ from keyboards.duels import (
     duel_game_keyboard,
     duel_wait_keyboard,
 )
+from services import emoji_rng, provably_fair
 from services.balance import change_balance, get_balance
+from services.expiry import sweeper
+from services.i18n import Translator, i18n
+from services.leaderboards import leaderboards
+from services.matchmaking import matchmaker
+from services.notifications import post_log
 from services.referrals import award_loss_commission
 from services.settings import get_duel_log_channel
 
 
 router = Router()
+logger = logging.getLogger(__name__)
 
 
 @router.callback_query(F.data == "duels")
-async def duels_menu(call: CallbackQuery, lang: str):
-    text = (
-        "⚔️ <b>Дуэли</b>\n\n"
-        "1) выбери ставку\n"
-        "2) выбери игру (кубик, дартс, футбол, баскетбол, боулинг)\n"
-        "3) отправь ссылку другу или зайдёт любой по кнопке.\n\n"
-        "Победитель забирает весь банк."
-    )
-    if lang != "ru":
-        text = (
-            "⚔️ <b>Duels</b>\n\n"
-            "1) pick a stake\n"
-            "2) choose dice, darts, football, basketball, or bowling\n"
-            "3) share the duel link with a friend.\n\n"
-            "Winner takes the whole pot."
-        )
-    await call.message.edit_text(text, reply_markup=duel_bets_keyboard(lang))
+async def duels_menu(call: CallbackQuery, tr: Translator):
+    await call.message.edit_text(tr("duels.text"), reply_markup=duel_bets_keyboard(tr.lang))
 
 
 @router.callback_query(F.data.startswith("duel_bet:"))
-async def handle_duel_bet(call: CallbackQuery, lang: str):
+async def handle_duel_bet(call: CallbackQuery, tr: Translator):
     user_id = call.from_user.id
     bet_raw = call.data.split(":")[1]
     bet = Decimal(bet_raw)
 
     balance = await get_balance(user_id)
     if balance < float(bet):
-        return await call.answer(
-            "Недостаточно средств" if lang == "ru" else "Not enough balance",
-            show_alert=True,
-        )
+        return await call.answer(tr("common.no_funds"), show_alert=True)
 
     await call.message.edit_text(
-        "Выбери игру для дуэли:" if lang == "ru" else "Choose the duel game:",
-        reply_markup=duel_game_keyboard(float(bet), lang),
+        tr("duels.choose_game"),
+        reply_markup=duel_game_keyboard(float(bet), tr.lang),
     )
 
 
 @router.callback_query(F.data.startswith("duel_game:"))
-async def duel_game_selected(call: CallbackQuery, lang: str):
+async def duel_game_selected(call: CallbackQuery, tr: Translator):
     _, bet_raw, game = call.data.split(":")
     bet = Decimal(bet_raw)
 
     user_id = call.from_user.id
     if await get_balance(user_id) < float(bet):
-        return await call.answer(
-            "Недостаточно средств" if lang == "ru" else "Not enough balance",
-            show_alert=True,
-        )
+        return await call.answer(tr("common.no_funds"), show_alert=True)
 
     try:
+        duel_id = await open_duel(user_id, bet, game)
+    except Exception as exc:
+        return await call.answer(str(exc), show_alert=True)
+
+    await send_duel_log(
+        call.bot,
+        f"🎯 Duel #{duel_id} created | Game: {game} | Bet: {float(bet):.2f}$ | Pot: {float(bet):.2f}$ | Host: {call.from_user.id}",
+    )
+
+    text = tr("duels.created", game=game_title(game, tr), bet=float(bet), duel_id=duel_id)
+    await call.message.edit_text(text, reply_markup=duel_wait_keyboard(duel_id, tr.lang))
+    text = tr("duels.waiting", bet=float(bet))
+    await call.message.edit_text(text, reply_markup=duel_wait_keyboard(duel_id, tr.lang))
+
+
+async def open_duel(user_id: int, bet: Decimal, game: str, *, matchmaking: bool = False) -> int:
+    """Debit the creator's stake and create a waiting duel; refunds if creation fails."""
+    await change_balance(
+        user_id,
+        -float(bet),
+        tx_type="duel_bet",
+        meta={"duel_id": "pending", "role": "creator", "game": game},
+    )
+    try:
+        duel_id = await db.create_duel(user_id, bet, game, matchmaking=matchmaking)
+    except Exception:
         await change_balance(
             user_id,
-            -float(bet),
-            tx_type="duel_bet",
-            meta={"duel_id": "pending", "role": "creator", "game": game},
+            float(bet),
+            tx_type="duel_refund",
+            meta={"duel_id": "pending"},
         )
-        duel_id = await db.create_duel(user_id, bet, game)
-    except Exception as exc:
+        raise
+    sweeper.touch_duel(duel_id, user_id)
+    return duel_id
+
+
+@router.callback_query(F.data == "duel_quick_menu")
+async def quick_match_menu(call: CallbackQuery, tr: Translator):
+    await call.message.edit_text(tr("duels.quick.text"), reply_markup=duel_bets_keyboard(tr.lang, quick=True))
+
+
+@router.callback_query(F.data.startswith("duel_qbet:"))
+async def quick_match_bet(call: CallbackQuery, tr: Translator):
+    bet = Decimal(call.data.split(":")[1])
+    if await get_balance(call.from_user.id) < float(bet):
+        return await call.answer(tr("common.no_funds"), show_alert=True)
+    await call.message.edit_text(
+        tr("duels.quick.choose_game"),
+        reply_markup=duel_game_keyboard(float(bet), tr.lang, quick=True),
+    )
+
+
+@router.callback_query(F.data.startswith("duel_quick:"))
+async def quick_match(call: CallbackQuery, tr: Translator):
+    _, bet_raw, game = call.data.split(":")
+    bet = Decimal(bet_raw)
+    user_id = call.from_user.id
+
+    if await get_balance(user_id) < float(bet):
+        return await call.answer(tr("common.no_funds"), show_alert=True)
+
+    # Someone already waiting in this (game, bet) bucket: join their duel.
+    while (ticket := matchmaker.pop_partner(game, bet, user_id)) is not None:
+        try:
+            await change_balance(
+                user_id,
+                -float(bet),
+                tx_type="duel_bet",
+                meta={"duel_id": ticket.duel_id, "role": "opponent", "quick": True},
+            )
+        except ValueError:
+            # Spent in the meantime (a second tap, another bet): the partner keeps waiting.
+            matchmaker.requeue(ticket)
+            return await call.answer(tr("common.no_funds"), show_alert=True)
+        status, pot = await db.join_duel(ticket.duel_id, user_id)
+        if status == "joined":
+            sweeper.forget_duel(ticket.duel_id)
+            matchmaker.paired(ticket, user_id)
+            start_duel(call, ticket.duel_id, ticket.user_id, user_id, game, float(bet), pot)
+            return await call.answer(tr("duels.opponent_found"))
         await change_balance(
             user_id,
             float(bet),
             tx_type="duel_refund",
-            meta={"duel_id": "pending"},
+            meta={"duel_id": ticket.duel_id},
         )
+
+    # Nobody to pair with: queue up.
+    try:
+        duel_id = await open_duel(user_id, bet, game, matchmaking=True)
+    except Exception as exc:
         return await call.answer(str(exc), show_alert=True)
+    matchmaker.enqueue(duel_id, user_id, game, bet)
 
     await send_duel_log(
         call.bot,
-        f"🎯 Duel #{duel_id} created | Game: {game} | Bet: {float(bet):.2f}$ | Pot: {float(bet):.2f}$ | Host: {call.from_user.id}",
+        f"⚡ Duel #{duel_id} queued for quick match | Game: {game} | Bet: {float(bet):.2f}$ | Host: {user_id}",
     )
 
-    text = (
-        f"🧠 Дуэль создана!\n"
-        f"Игра: {game_title(game, 'ru')}\n"
-        f"Ставка: {float(bet):.2f}$ • Банк: {float(bet):.2f}$\n\n"
-        f"Ссылка для друга: /start duel_{duel_id}"
-    )
-    if lang != "ru":
-        text = (
-        f"🧠 Duel created!\n"
-            f"Game: {game_title(game, 'en')}\n"
-            f"Stake: {float(bet):.2f}$ • Pot: {float(bet):.2f}$\n\n"
-            f"Share this: /start duel_{duel_id}"
-        )
-    await call.message.edit_text(text, reply_markup=duel_wait_keyboard(duel_id, lang))
-    text = (
-        f"🧠 Дуэль на {float(bet):.2f}$ создана.\n"
-        "Ждём соперника..."
-    )
-    if lang != "ru":
-        text = (
-            f"🧠 Duel for {float(bet):.2f}$ created.\n"
-            "Waiting for opponent..."
-        )
-    await call.message.edit_text(text, reply_markup=duel_wait_keyboard(duel_id, lang))
+    text = tr("duels.quick.searching", game=game_title(game, tr), bet=float(bet), duel_id=duel_id)
+    await call.message.edit_text(text, reply_markup=duel_wait_keyboard(duel_id, tr.lang))
+
+
+@sweeper.on_expire("duel")
+async def drop_expired_ticket(duel_id: int, creator_id: int, _handle):
+    matchmaker.remove(duel_id)
 
 
 @router.callback_query(F.data.startswith("duel_cancel:"))
-async def cancel_duel(call: CallbackQuery, lang: str):
+async def cancel_duel(call: CallbackQuery, tr: Translator):
     duel_id = int(call.data.split(":")[1])
     refund = await db.cancel_duel(duel_id, call.from_user.id)
     if refund <= 0:
-        return await call.answer(
-            "Эту дуэль нельзя отменить." if lang == "ru" else "Cannot cancel this duel.",
-            show_alert=True,
-        )
+        return await call.answer(tr("duels.cannot_cancel"), show_alert=True)
+    sweeper.forget_duel(duel_id)
+    matchmaker.remove(duel_id)
 
     await change_balance(
         call.from_user.id,
@@ -135,36 +183,23 @@ async def cancel_duel(call: CallbackQuery, lang: str):
         meta={"duel_id": duel_id},
     )
 
-    text = "Дуэль отменена, ставка возвращена." if lang == "ru" else "Duel cancelled, bet refunded."
-    await call.message.edit_text(text, reply_markup=duel_bets_keyboard(lang))
+    await call.message.edit_text(tr("duels.cancelled"), reply_markup=duel_bets_keyboard(tr.lang))
 
 
 @router.callback_query(F.data.startswith("duel_join:"))
-async def join_duel(call: CallbackQuery, lang: str):
+async def join_duel(call: CallbackQuery, tr: Translator):
     duel_id = int(call.data.split(":")[1])
     row = await db.get_duel(duel_id)
     if not row:
-        return await call.answer(
-            "Дуэль не найдена." if lang == "ru" else "Duel not found.",
-            show_alert=True,
-        )
+        return await call.answer(tr("duels.not_found"), show_alert=True)
     if row["creator_id"] == call.from_user.id:
-        return await call.answer(
-            "Это ваша дуэль. Ждите соперника." if lang == "ru" else "This is your duel, waiting for opponent.",
-            show_alert=True,
-        )
+        return await call.answer(tr("duels.own"), show_alert=True)
     if row["status"] != "waiting":
-        return await call.answer(
-            "Дуэль уже идёт или завершена." if lang == "ru" else "Duel already taken or finished.",
-            show_alert=True,
-        )
+        return await call.answer(tr("duels.not_waiting"), show_alert=True)
 
     bet = float(row["bet"])
     if await get_balance(call.from_user.id) < bet:
-        return await call.answer(
-            "Недостаточно средств" if lang == "ru" else "Not enough balance",
-            show_alert=True,
-        )
+        return await call.answer(tr("common.no_funds"), show_alert=True)
 
     # Списываем ставку и пытаемся присоединиться
     await change_balance(
@@ -182,104 +217,147 @@ async def join_duel(call: CallbackQuery, lang: str):
             tx_type="duel_refund",
             meta={"duel_id": duel_id},
         )
-        msg = "Дуэль уже занята." if lang == "ru" else "Duel already taken."
-        return await call.answer(msg, show_alert=True)
+        return await call.answer(tr("duels.taken"), show_alert=True)
+    sweeper.forget_duel(duel_id)
+    if (ticket := matchmaker.remove(duel_id)) is not None:
+        matchmaker.paired(ticket, call.from_user.id)
 
-    await run_duel(call, duel_id, row["creator_id"], call.from_user.id, row["game"], bet, pot)
+    start_duel(call, duel_id, row["creator_id"], call.from_user.id, row["game"], bet, pot)
+    await call.answer(tr("duels.started"))
 
 
-async def run_duel(call: CallbackQuery, duel_id: int, creator_id: int, opponent_id: int, game: str, bet: float, pot: float):
-    bot = call.bot
+# Running duels; kept referenced so the detached tasks are not garbage collected.
+_duel_tasks: dict[asyncio.Task, int] = {}
 
-    # Сообщаем о старте
+
+def start_duel(call: CallbackQuery, duel_id: int, creator_id: int, opponent_id: int, game: str, bet: float, pot: float) -> None:
+    """Play the duel in the background so the joining callback returns at once."""
+    task = asyncio.create_task(
+        run_duel(call, duel_id, creator_id, opponent_id, game, bet, pot),
+        name=f"duel-{duel_id}",
+    )
+    _duel_tasks[task] = duel_id
+    task.add_done_callback(_duel_done)
+
+
+def _duel_done(task: asyncio.Task) -> None:
+    _duel_tasks.pop(task, None)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("%s failed", task.get_name(), exc_info=task.exception())
+
+
+async def wait_running_duels(timeout: float = 15.0) -> None:
+    """Let duels in progress finish (pay out) before shutdown; refund the rest."""
+    if not _duel_tasks:
+        return
+    _, pending = await asyncio.wait(set(_duel_tasks), timeout=timeout)
+    if pending:
+        duel_ids = [_duel_tasks[task] for task in pending]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        refunded = await db.refund_active_duels(duel_ids)
+        logger.warning("Shutdown: %d duels unfinished, %d refunded", len(duel_ids), len(refunded))
+
+
+async def _send(bot, chat_id: int, text: str, **kwargs) -> None:
     try:
-        await bot.send_message(
-            creator_id,
-            "⚔️ Соперник найден! Бросаем…" if (await db.get_user_lang(creator_id)) == "ru" else "⚔️ Opponent found! Rolling…",
-        )
-    except Exception:
-        pass
+        await bot.send_message(chat_id, text, **kwargs)
+    except Exception as e:
+        logger.warning("Duel message to %s failed: %s", chat_id, e)
 
+
+async def run_duel(call: CallbackQuery, duel_id: int, creator_id: int, opponent_id: int, game: str, bet: float, pot: float):
+    """Play the duel; if it fails before the pot is paid, both stakes go back."""
     try:
-        await bot.send_message(
-            opponent_id,
-            "⚔️ Дуэль началась! Бросаем…" if (await db.get_user_lang(opponent_id)) == "ru" else "⚔️ Duel started! Rolling…",
-        )
+        await _play_duel(call, duel_id, creator_id, opponent_id, game, bet, pot)
     except Exception:
-        pass
+        if not await db.refund_active_duels([duel_id]):
+            raise  # already settled: only a result message failed
+        logger.exception("Duel %s failed before settlement, stakes refunded", duel_id)
+        langs = await db.get_user_langs([creator_id, opponent_id])
+        await asyncio.gather(*(
+            _send(call.bot, uid, i18n(lang)("duels.refunded", duel_id=duel_id, bet=bet)) for uid, lang in langs.items()
+        ))
+
+
+async def _play_duel(call: CallbackQuery, duel_id: int, creator_id: int, opponent_id: int, game: str, bet: float, pot: float):
+    bot = call.bot
+    langs = await db.get_user_langs([creator_id, opponent_id, call.from_user.id])
+    creator_tr, opponent_tr = i18n(langs[creator_id]), i18n(langs[opponent_id])
+
+    # Сообщаем о старте
+    await asyncio.gather(
+        _send(bot, creator_id, creator_tr("duels.creator_rolling")),
+        _send(bot, opponent_id, opponent_tr("duels.opponent_rolling")),
+    )
 
     emoji = game_emoji(game)
 
-    async def roll(user_id: int):
-        msg = await bot.send_dice(user_id, emoji=emoji)
-        await asyncio.sleep(3.2)
-        return msg.dice.value
+    meta = {"duel_id": duel_id, "game": game}
+    if emoji_rng.SERVER_MODE:
+        # Each player rolls from their own provably-fair stream.
+        c_fair, o_fair = await asyncio.gather(
+            provably_fair.next_round(creator_id),
+            provably_fair.next_round(opponent_id),
+        )
+        c_rng, o_rng = c_fair.rng(), o_fair.rng()
+        meta["fair"] = {str(creator_id): c_fair.public(), str(opponent_id): o_fair.public()}
 
     rolls = []
     for _ in range(3):
-        c_val = await roll(creator_id)
-        o_val = await roll(opponent_id)
+        if emoji_rng.SERVER_MODE:
+            c_val, o_val = emoji_rng.roll_value(c_rng, emoji), emoji_rng.roll_value(o_rng, emoji)
+        else:
+            # Both dice go out together and one animation wait covers the pair.
+            c_msg, o_msg = await asyncio.gather(
+                bot.send_dice(creator_id, emoji=emoji),
+                bot.send_dice(opponent_id, emoji=emoji),
+            )
+            await asyncio.sleep(3.2)
+            c_val, o_val = c_msg.dice.value, o_msg.dice.value
         rolls.append((c_val, o_val))
         if c_val != o_val:
             break
 
     c_val, o_val = rolls[-1]
     if c_val == o_val:
-        winner_id = random.choice([creator_id, opponent_id])
+        if emoji_rng.SERVER_MODE:
+            # Next value of the creator's stream: 0 creator, 1 opponent; kept with the rolls.
+            meta["tie_break"] = c_rng.randint(0, 1)
+            winner_id = (creator_id, opponent_id)[meta["tie_break"]]
+        else:
+            winner_id = random.choice([creator_id, opponent_id])
     else:
         winner_id = creator_id if c_val > o_val else opponent_id
 
-    await db.finish_duel(duel_id, winner_id)
-    await change_balance(
-        winner_id,
-        pot,
-        tx_type="duel_win",
-        meta={"duel_id": duel_id, "rolls": rolls, "game": game},
-    )
-
-    def fmt(lang_local: str, win: bool, your: int, opp: int):
-        if lang_local == "ru":
-            return (
-                f"{'🎉 Победа!' if win else '❌ Поражение.'}\n"
-                f"Игра: {'Кубик' if game == 'dice' else 'Рулетка 🎯'}\n"
-                f"Ваш бросок: {your} | Оппонент: {opp}\n"
-                f"Банк: {pot:.2f}$"
-            )
-        return (
-            f"{'🎉 You win!' if win else '❌ You lose.'}\n"
-            f"Game: {'Dice' if game == 'dice' else 'Darts 🎯'}\n"
-            f"Your roll: {your} | Opponent: {opp}\n"
-            f"Pot: {pot:.2f}$"
-        )
-
-    creator_lang = await db.get_user_lang(creator_id)
-    opponent_lang = await db.get_user_lang(opponent_id)
-
-    try:
-        await bot.send_message(
-            creator_id,
-            fmt(creator_lang, winner_id == creator_id, c_val, o_val),
-        )
-    except Exception:
-        pass
+    if not await db.settle_duel(duel_id, winner_id, Decimal(str(pot)), {**meta, "rolls": rolls}):
+        logger.warning("Duel %s is no longer active, result dropped", duel_id)
+        return
+    leaderboards.record_duel_win(winner_id)
 
-    try:
-        await bot.send_message(
-            opponent_id,
-            fmt(opponent_lang, winner_id == opponent_id, o_val, c_val),
-        )
-    except Exception:
-        pass
+    def fmt(tr: Translator, win: bool, your: int, opp: int):
+        return tr("duels.won" if win else "duels.lost", game=game_title(game, tr), your=your, opponent=opp, pot=pot)
 
-    await call.message.edit_text(
-        "Дуэль сыграна! Проверяй результат в личке." if (await db.get_user_lang(call.from_user.id)) == "ru" else "Duel played! Check your chat for the result.",
-        reply_markup=duel_bets_keyboard(await db.get_user_lang(call.from_user.id)),
-    )
+    async def edit_caller():
+        tr = i18n(langs[call.from_user.id])
+        try:
+            await call.message.edit_text(tr("duels.played"), reply_markup=duel_bets_keyboard(tr.lang))
+        except Exception:
+            pass
 
     loser_id = opponent_id if winner_id == creator_id else creator_id
-    await send_duel_log(
-        bot,
-        f"🏁 Duel #{duel_id} finished | Game: {game} | Bet: {bet:.2f}$ | Pot: {pot:.2f}$ | Winner: {winner_id} | Loser: {loser_id} | Rolls: {rolls}",
+    if emoji_rng.SERVER_MODE:
+        # Already settled; the results just keep the usual suspense.
+        await asyncio.sleep(emoji_rng.ANIMATION_DELAY)
+    await asyncio.gather(
+        _send(bot, creator_id, fmt(creator_tr, winner_id == creator_id, c_val, o_val)),
+        _send(bot, opponent_id, fmt(opponent_tr, winner_id == opponent_id, o_val, c_val)),
+        edit_caller(),
+        send_duel_log(
+            bot,
+            f"🏁 Duel #{duel_id} finished | Game: {game} | Bet: {bet:.2f}$ | Pot: {pot:.2f}$ | Winner: {winner_id} | Loser: {loser_id} | Rolls: {rolls}",
+        ),
     )
     await award_loss_commission(loser_id, bet)
 
@@ -294,23 +372,14 @@ def game_emoji(game: str) -> str:
     }.get(game, "🎲")
 
 
-def game_title(game: str, lang: str) -> str:
-    titles = {
-        "dice": ("Кубик", "Dice"),
-        "darts": ("Дартс", "Darts"),
-        "football": ("Футбол", "Football"),
-        "basketball": ("Баскетбол", "Basketball"),
-        "bowling": ("Боулинг", "Bowling"),
-    }
-    ru, en = titles.get(game, ("Кубик", "Dice"))
-    return ru if lang == "ru" else en
+def game_title(game: str, tr: Translator) -> str:
+    if game not in ("dice", "darts", "football", "basketball", "bowling"):
+        game = "dice"
+    return tr(f"games.name.{game}")
 
 
 async def send_duel_log(bot, text: str):
     channel = await get_duel_log_channel()
     if not channel:
         return
-    try:
-        await bot.send_message(channel, text, disable_web_page_preview=True)
-    except Exception:
-        pass
+    post_log(bot, channel, text, what="Duel log")
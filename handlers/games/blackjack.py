@@ -1,6 +1,7 @@
 # handlers/games/blackjack.py
 import asyncio
 import random
+from decimal import Decimal
 from typing import List, Tuple, Dict, Any
 from aiogram import Router, F
 from aiogram.types import CallbackQuery, Message
@@ -9,8 +10,12 @@ from aiogram.fsm.state import State, StatesGroup
 
 from keyboards.menu import main_menu
 from keyboards.games.blackjack import bj_bet_keyboard, bj_keyboard
-from services.balance import get_balance, change_balance
+from services.balance import get_balance
+from database.db import db
 from services.game_stats import log_bj_game
+from services.i18n import Translator
+from services import provably_fair
+from services.expiry import sweeper
 
 router = Router()
 
@@ -68,7 +73,7 @@ class Card:
 
 
 class Deck:
-    def __init__(self, num_decks: int = 6, cards=None):
+    def __init__(self, num_decks: int = 6, cards=None, rng=random):
         if cards:
             self.cards = [Card.from_tuple(t) for t in cards]
         else:
@@ -77,7 +82,7 @@ class Deck:
                 for s in SUITS:
                     for r in RANKS:
                         self.cards.append(Card(r, s))
-            random.shuffle(self.cards)
+            rng.shuffle(self.cards)
 
     def draw(self):
         if not self.cards:
@@ -180,6 +185,11 @@ class BlackjackGame:
             return self.bet
         return 0
 
+    def drawn_cards(self):
+        """Cards in the order they left the shoe: P D P D, player hits, dealer draws."""
+        initial = [self.player_hand[0], self.dealer_hand[0], self.player_hand[1], self.dealer_hand[1]]
+        return [list(c.to_tuple()) for c in initial + self.player_hand[2:] + self.dealer_hand[2:]]
+
     def format_hand(self, hand, hide_first=False):
         if hide_first:
             return "❓ " + " ".join(str(c) for c in hand[1:])
@@ -209,61 +219,36 @@ class BlackjackGame:
 # --------------------------------------
 # TEXTS
 # --------------------------------------
-def bj_display(lang, game, balance_after_bet, hide_dealer=True):
+def bj_display(tr, game, balance_after_bet, hide_dealer=True):
     pv, soft = game.calculate_hand_value(game.player_hand)
-    dealer_line = game.format_hand(game.dealer_hand, hide_first=hide_dealer)
-
-    if lang == "ru":
-        return (
-            f"🃏 <b>Блэкджек</b>\n\n"
-            f"💵 Ставка: <b>{game.bet:.2f}$</b>\n"
-            f"💰 Баланс: <b>{balance_after_bet:.2f}$</b>\n\n"
-            f"🎯 Ваши карты: {game.format_hand(game.player_hand)}\n"
-            f"💎 Сумма: {pv}\n\n"
-            f"🤵 Карты дилера: {dealer_line}\n"
-        )
-    else:
-        return (
-            f"🃏 <b>Blackjack</b>\n\n"
-            f"💵 Bet: <b>{game.bet:.2f}$</b>\n"
-            f"💰 Balance: <b>{balance_after_bet:.2f}$</b>\n\n"
-            f"🎯 Your cards: {game.format_hand(game.player_hand)}\n"
-            f"💎 Total: {pv}\n\n"
-            f"🤵 Dealer: {dealer_line}\n"
-        )
+    return tr(
+        "blackjack.table",
+        bet=game.bet, balance=balance_after_bet, player=game.format_hand(game.player_hand), total=pv,
+        dealer=game.format_hand(game.dealer_hand, hide_first=hide_dealer),
+    )
 
 
-def bj_result_text(lang, game, payout):
+def bj_result_text(tr, game, payout):
     pv, _ = game.calculate_hand_value(game.player_hand)
     dv, _ = game.calculate_hand_value(game.dealer_hand)
-
-    if lang == "ru":
-        return (
-            f"🎲 <b>Результат</b>\n\n"
-            f"Ваши карты ({pv}): {game.format_hand(game.player_hand)}\n"
-            f"Карты дилера ({dv}): {game.format_hand(game.dealer_hand)}\n\n"
-            f"💵 Выплата: {payout:.2f}$"
-        )
-    else:
-        return (
-            f"🎲 <b>Result</b>\n\n"
-            f"Your cards ({pv}): {game.format_hand(game.player_hand)}\n"
-            f"Dealer cards ({dv}): {game.format_hand(game.dealer_hand)}\n\n"
-            f"💵 Payout: {payout:.2f}$"
-        )
+    return tr(
+        "blackjack.result",
+        player_total=pv, player=game.format_hand(game.player_hand),
+        dealer_total=dv, dealer=game.format_hand(game.dealer_hand), payout=payout,
+    )
 
 
 # --------------------------------------
 # START
 # --------------------------------------
 @router.callback_query(F.data == "game_blackjack")
-async def bj_start(call: CallbackQuery, state: FSMContext, lang: str):
+async def bj_start(call: CallbackQuery, state: FSMContext, tr: Translator):
     await state.set_state(BlackjackState.waiting_bet)
 
     await safe_edit(
         call.message,
-        "Выберите ставку:" if lang == "ru" else "Choose bet:",
-        reply_markup=bj_bet_keyboard(lang)
+        tr("blackjack.choose_bet"),
+        reply_markup=bj_bet_keyboard(tr.lang)
     )
 
 
@@ -271,37 +256,37 @@ async def bj_start(call: CallbackQuery, state: FSMContext, lang: str):
 # SET BET
 # --------------------------------------
 @router.callback_query(F.data.startswith("bj_bet_"), BlackjackState.waiting_bet)
-async def bj_set_bet(call: CallbackQuery, state: FSMContext, lang: str):
+async def bj_set_bet(call: CallbackQuery, state: FSMContext, tr: Translator):
     bet = float(call.data.split("_")[2])
     user_id = call.from_user.id
 
     balance = await get_balance(user_id)
     if balance < bet:
-        await call.answer(
-            "Недостаточно средств. Пополните или выберите меньшую ставку."
-            if lang == "ru"
-            else "Not enough funds. Top up or pick a smaller bet.",
-            show_alert=True,
-        )
-        return await safe_edit(
-            call.message,
-            "Выберите ставку:" if lang == "ru" else "Choose bet:",
-            reply_markup=bj_bet_keyboard(lang),
+        await call.answer(tr("blackjack.no_funds"), show_alert=True)
+        return await safe_edit(call.message, tr("blackjack.choose_bet"), reply_markup=bj_bet_keyboard(tr.lang))
+
+    fair = await provably_fair.next_round(user_id)
+    try:
+        round_id = await db.open_round(
+            user_id, "blackjack", Decimal(str(bet)), {"bet": bet, "fair": fair.public(), "hits": 0},
         )
+    except ValueError:
+        await call.answer(tr("common.no_funds"), show_alert=True)
+        return await safe_edit(call.message, tr("blackjack.choose_bet"), reply_markup=bj_bet_keyboard(tr.lang))
 
-    await change_balance(user_id, -bet)
+    sweeper.touch_round(round_id, user_id, "blackjack", state)
 
-    game = BlackjackGame(bet)
-    await state.update_data(game_data=game.serialize())
+    game = BlackjackGame(bet, Deck(rng=fair.rng()))
+    await state.update_data(game_data=game.serialize(), fair=fair.public(), round_id=round_id)
     await state.set_state(BlackjackState.game_active)
 
-    await safe_edit(call.message, "🔀 Перемешиваем..." if lang == "ru" else "🔀 Shuffling...")
+    await safe_edit(call.message, tr("blackjack.shuffling"))
     await asyncio.sleep(0.4)
 
     await safe_edit(
         call.message,
-        bj_display(lang, game, balance - bet, hide_dealer=True),
-        reply_markup=bj_keyboard(lang, game, first_move=True)
+        bj_display(tr, game, balance - bet, hide_dealer=True),
+        reply_markup=bj_keyboard(tr.lang, game, first_move=True)
     )
 
 
@@ -309,7 +294,7 @@ async def bj_set_bet(call: CallbackQuery, state: FSMContext, lang: str):
 # MAIN ACTION HANDLER
 # --------------------------------------
 @router.callback_query(F.data.startswith("bj_"), BlackjackState.game_active)
-async def bj_action(call: CallbackQuery, state: FSMContext, lang: str):
+async def bj_action(call: CallbackQuery, state: FSMContext, tr: Translator):
     user_id = call.from_user.id
     action = call.data.split("_", 1)[1]
 
@@ -321,7 +306,7 @@ async def bj_action(call: CallbackQuery, state: FSMContext, lang: str):
     if action == "hit":
         await safe_edit(
             call.message,
-            bj_display(lang, game, balance - game.bet, hide_dealer=True) + "\n\n⏳...",
+            bj_display(tr, game, balance - game.bet, hide_dealer=True) + "\n\n⏳...",
         )
         await asyncio.sleep(0.35)
         game.hit()
@@ -329,38 +314,39 @@ async def bj_action(call: CallbackQuery, state: FSMContext, lang: str):
     elif action == "stand":
         await safe_edit(
             call.message,
-            bj_display(lang, game, balance - game.bet, hide_dealer=True)
-            + ("\n\n🤵 Дилер думает..." if lang == "ru" else "\n\n🤵 Dealer thinking...")
+            bj_display(tr, game, balance - game.bet, hide_dealer=True) + tr("blackjack.dealer_thinking")
         )
         await asyncio.sleep(0.5)
         game.stand()
 
     elif action == "double":
         if not game.can_double():
-            return await call.answer(
-                "Можно удвоить только с двумя картами" if lang == "ru" else "Only possible on two cards",
-                show_alert=True
-            )
+            return await call.answer(tr("blackjack.double_two_cards"), show_alert=True)
         if balance < game.bet:
-            return await call.answer(
-                "Недостаточно средств" if lang == "ru" else "Not enough funds",
-                show_alert=True
-            )
+            return await call.answer(tr("common.no_funds"), show_alert=True)
 
-        await change_balance(user_id, -game.bet)
+        try:
+            await db.raise_round_stake(
+                data["round_id"], user_id, Decimal(str(game.bet)),
+                {"bet": game.bet * 2, "fair": data.get("fair"), "hits": 0, "doubled": True},
+            )
+        except ValueError:
+            return await call.answer(tr("common.no_funds"), show_alert=True)
 
         await safe_edit(
             call.message,
-            bj_display(lang, game, balance - game.bet, hide_dealer=True)
-            + ("\n\n💨 Удваиваем..." if lang == "ru" else "\n\n💨 Doubling...")
+            bj_display(tr, game, balance - game.bet, hide_dealer=True) + tr("blackjack.doubling")
         )
         await asyncio.sleep(0.45)
         game.double()
 
     elif action == "exit":
+        # Leaving mid-hand forfeits the stake.
+        sweeper.forget_round(data["round_id"])
+        await db.close_round(data["round_id"], user_id)
         await state.clear()
         from handlers.menu_games import open_games_menu
-        return await open_games_menu(call, lang)
+        return await open_games_menu(call, tr)
 
     # SAVE STATE
     await state.update_data(game_data=game.serialize())
@@ -372,26 +358,32 @@ async def bj_action(call: CallbackQuery, state: FSMContext, lang: str):
             await asyncio.sleep(0.45)
             await safe_edit(
                 call.message,
-                bj_display(lang, game, balance - game.bet, hide_dealer=False)
+                bj_display(tr, game, balance - game.bet, hide_dealer=False)
             )
 
         payout = game.get_payout()
-        if payout > 0:
-            await change_balance(user_id, payout)
+        sweeper.forget_round(data["round_id"])
+        if not await db.close_round(data["round_id"], user_id, Decimal(str(payout))):
+            await call.answer(tr("common.round_expired"), show_alert=True)
+            return await state.clear()
 
         result_type = "win" if payout > game.bet else ("push" if payout == game.bet else "lose")
-        await log_bj_game(user_id, game.bet, payout, result_type)
+        await log_bj_game(
+            user_id, game.bet, payout, result_type,
+            fair=data.get("fair"), proof={"num_decks": 6, "drawn": game.drawn_cards()},
+            round_id=data["round_id"],
+        )
 
         # **NEW DEAL button added**
         from aiogram.utils.keyboard import InlineKeyboardBuilder
         kb = InlineKeyboardBuilder()
-        kb.button(text="🆕 Новая раздача" if lang == "ru" else "🆕 New deal", callback_data="game_blackjack")
-        kb.button(text="⬅️ Назад" if lang == "ru" else "⬅️ Back", callback_data="bj_exit")
+        kb.button(text=tr("blackjack.new_deal"), callback_data="game_blackjack")
+        kb.button(text=tr("common.back"), callback_data="bj_exit")
         kb.adjust(1)
 
         await safe_edit(
             call.message,
-            bj_result_text(lang, game, payout),
+            bj_result_text(tr, game, payout),
             reply_markup=kb.as_markup()
         )
 
@@ -399,18 +391,33 @@ async def bj_action(call: CallbackQuery, state: FSMContext, lang: str):
         return
 
     # ---- CONTINUE GAME ----
+    # The idle sweeper replays the hand from the seed and the number of hits.
+    journalled = await db.update_round_state(
+        data["round_id"], {"bet": game.bet, "fair": data.get("fair"), "hits": len(game.player_hand) - 2},
+    )
+    if not journalled:
+        await call.answer(tr("common.round_expired"), show_alert=True)
+        return await state.clear()
+    sweeper.touch_round(data["round_id"], user_id, "blackjack", state)
     await safe_edit(
         call.message,
-        bj_display(lang, game, balance - game.bet, hide_dealer=True),
-        reply_markup=bj_keyboard(lang, game)
+        bj_display(tr, game, balance - game.bet, hide_dealer=True),
+        reply_markup=bj_keyboard(tr.lang, game)
     )
 
 
+@sweeper.on_expire("blackjack")
+async def drop_expired_hand(round_id: int, user_id: int, state: FSMContext):
+    """The idle sweeper stood the hand; drop it unless a new one replaced it."""
+    if (await state.get_data()).get("round_id") == round_id:
+        await state.clear()
+
+
 # --------------------------------------
 # EXIT HANDLER
 # --------------------------------------
 @router.callback_query(F.data == "bj_exit")
-async def bj_exit(call: CallbackQuery, state: FSMContext, lang: str):
+async def bj_exit(call: CallbackQuery, state: FSMContext, tr: Translator):
     await state.clear()
     from handlers.menu_games import open_games_menu
-    await open_games_menu(call, lang)
+    await open_games_menu(call, tr)
@@ -1,15 +1,21 @@
 # handlers/games/dice.py
 import random
+from decimal import Decimal
 from aiogram import Router, F
 from aiogram.types import CallbackQuery, Message, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from database.db import db
+from keyboards.games_menu import games_menu
 from keyboards.menu import main_menu
+from services import autoplay, emoji_rng
 from services.balance import get_balance, change_balance
 from services.referrals import award_loss_commission
 from services.game_stats import log_dice_game
+from services.games_log import new_round_id
+from services.i18n import Translator
 
 router = Router()
 
@@ -22,7 +28,7 @@ class DiceState(StatesGroup):
 # -------------------------------
 # Кнопки
 # -------------------------------
-def bet_keyboard(lang: str):
+def bet_keyboard(tr: Translator, auto: int | None = None):
     kb = InlineKeyboardBuilder()
     buttons = [1, 5, 10, 30, 50, 100]
 
@@ -32,28 +38,30 @@ def bet_keyboard(lang: str):
             for x in chunk
         ])
 
+    # автоигра: повторный выбор того же количества выключает её
+    kb.row(*[
+        InlineKeyboardButton(
+            text=f"{'✅' if n == auto else '🔁'} ×{n}",
+            callback_data=f"dice_autos:{0 if n == auto else n}")
+        for n in autoplay.AUTOPLAY_COUNTS
+    ])
+
     kb.row(InlineKeyboardButton(
-        text="⬅️ Назад" if lang == "ru" else "⬅️ Back",
+        text=tr("common.back"),
         callback_data="games_menu"))
     return kb.as_markup()
 
 
-def choice_keyboard(lang: str):
+def choice_keyboard(tr: Translator):
     kb = InlineKeyboardBuilder()
 
-    if lang == "ru":
-        kb.row(
-            InlineKeyboardButton(text="🎯 Число", callback_data="dc_number"),
-            InlineKeyboardButton(text="⚡ Чёт/Нечёт", callback_data="dc_even")
-        )
-    else:
-        kb.row(
-            InlineKeyboardButton(text="🎯 Number", callback_data="dc_number"),
-            InlineKeyboardButton(text="⚡ Even/Odd", callback_data="dc_even")
-        )
+    kb.row(
+        InlineKeyboardButton(text=tr("dice.number"), callback_data="dc_number"),
+        InlineKeyboardButton(text=tr("dice.even_odd"), callback_data="dc_even")
+    )
 
     kb.row(InlineKeyboardButton(
-        text="⬅️ Назад" if lang == "ru" else "⬅️ Back",
+        text=tr("common.back"),
         callback_data="games_menu"))
     return kb.as_markup()
 
@@ -70,21 +78,28 @@ def number_choice_keyboard():
 # Старт
 # -------------------------------
 @router.callback_query(F.data == "game_dice")
-async def start_dice(call: CallbackQuery, state: FSMContext, lang: str):
+async def start_dice(call: CallbackQuery, state: FSMContext, tr: Translator):
     user_id = call.from_user.id
     balance = await get_balance(user_id)
 
     if balance < 1:
-        return await call.answer(
-            "Недостаточно средств" if lang == "ru" else "Not enough balance",
-            show_alert=True
-        )
+        return await call.answer(tr("common.no_funds"), show_alert=True)
 
     await state.set_state(DiceState.waiting_bet)
+    await state.update_data(auto=None)
+
+    await call.message.edit_text(tr("dice.choose_bet"), reply_markup=bet_keyboard(tr))
+
 
+@router.callback_query(F.data.startswith("dice_autos:"), DiceState.waiting_bet)
+async def set_auto(call: CallbackQuery, state: FSMContext, tr: Translator):
+    auto = int(call.data.split(":")[1])
+    if auto and auto not in autoplay.AUTOPLAY_COUNTS:
+        return await call.answer()
+    await state.update_data(auto=auto or None)
     await call.message.edit_text(
-        "Выбери ставку:" if lang == "ru" else "Choose your bet:",
-        reply_markup=bet_keyboard(lang)
+        tr("dice.choose_auto_bet", count=auto) if auto else tr("dice.choose_bet"),
+        reply_markup=bet_keyboard(tr, auto or None)
     )
 
 
@@ -92,50 +107,36 @@ async def start_dice(call: CallbackQuery, state: FSMContext, lang: str):
 # Установка ставки
 # -------------------------------
 @router.callback_query(F.data.startswith("dice_bet_"), DiceState.waiting_bet)
-async def set_bet(call: CallbackQuery, state: FSMContext, lang: str):
+async def set_bet(call: CallbackQuery, state: FSMContext, tr: Translator):
     bet = float(call.data.split("_")[2])
     user_id = call.from_user.id
+    auto = (await state.get_data()).get("auto") or 1
 
-    if await get_balance(user_id) < bet:
-        return await call.answer("Недостаточно средств" if lang == "ru" else "Not enough balance", show_alert=True)
+    if await get_balance(user_id) < bet * auto:
+        return await call.answer(tr("common.no_funds"), show_alert=True)
 
     await state.update_data(bet=bet)
     await state.set_state(DiceState.waiting_choice)
 
-    await call.message.edit_text(
-        "Выбери режим игры:" if lang == "ru" else "Choose mode:",
-        reply_markup=choice_keyboard(lang)
-    )
+    await call.message.edit_text(tr("dice.choose_mode"), reply_markup=choice_keyboard(tr))
 
 
 # -------------------------------
 # Выбор режима
 # -------------------------------
 @router.callback_query(F.data == "dc_even", DiceState.waiting_choice)
-async def choose_even_odd(call: CallbackQuery, state: FSMContext, lang: str):
+async def choose_even_odd(call: CallbackQuery, state: FSMContext, tr: Translator):
     kb = InlineKeyboardBuilder()
-    if lang == "ru":
-        kb.row(
-            InlineKeyboardButton(text="🔵 Чёт", callback_data="dc_even_even"),
-            InlineKeyboardButton(text="🔴 Нечёт", callback_data="dc_even_odd")
-        )
-    else:
-        kb.row(
-            InlineKeyboardButton(text="🔵 Even", callback_data="dc_even_even"),
-            InlineKeyboardButton(text="🔴 Odd", callback_data="dc_even_odd")
-        )
-    await call.message.edit_text(
-        "Выберите:" if lang == "ru" else "Choose:",
-        reply_markup=kb.as_markup()
+    kb.row(
+        InlineKeyboardButton(text=tr("dice.even"), callback_data="dc_even_even"),
+        InlineKeyboardButton(text=tr("dice.odd"), callback_data="dc_even_odd")
     )
+    await call.message.edit_text(tr("dice.choose"), reply_markup=kb.as_markup())
 
 
 @router.callback_query(F.data == "dc_number", DiceState.waiting_choice)
-async def choose_number(call: CallbackQuery, state: FSMContext, lang: str):
-    await call.message.edit_text(
-        "Выбери число:" if lang == "ru" else "Pick a number:",
-        reply_markup=number_choice_keyboard()
-    )
+async def choose_number(call: CallbackQuery, state: FSMContext, tr: Translator):
+    await call.message.edit_text(tr("dice.choose_number"), reply_markup=number_choice_keyboard())
 
 
 # -------------------------------
@@ -143,23 +144,39 @@ async def choose_number(call: CallbackQuery, state: FSMContext, lang: str):
 # -------------------------------
 import asyncio
 
-async def do_roll(message, bet, user_id, username, check_win, choice, lang, multiplier=None):
-    # списываем ставку
-    await change_balance(user_id, -bet)
+async def do_roll(message, bet, user_id, username, check_win, choice, tr, multiplier=None):
+    fair = proof = None
+    round_id = new_round_id()
+    if emoji_rng.SERVER_MODE:
+        value, fair, proof = await emoji_rng.server_roll(user_id, "🎲")
+    else:
+        # списываем ставку
+        await change_balance(user_id, -bet, meta={"game": "dice", "round": round_id})
+
+        # отправляем кубик
+        dice_msg = await message.answer_dice(emoji="🎲")
 
-    # отправляем кубик
-    dice_msg = await message.answer_dice(emoji="🎲")
+        # Telegram всегда крутит анимацию ровно ~3.2 секунды
+        await asyncio.sleep(3.2)
 
-    # Telegram всегда крутит анимацию ровно ~3.2 секунды
-    await asyncio.sleep(3.2)
+        value = dice_msg.dice.value
 
-    value = dice_msg.dice.value
     won = check_win(value)
     win_amount = (bet * multiplier) if won and multiplier else (bet * 2 if won else 0)
 
-    if won:
-        await change_balance(user_id, win_amount)
-    else:
+    if emoji_rng.SERVER_MODE:
+        # ставка и выигрыш одной транзакцией, анимацию не ждём
+        try:
+            await db.settle_bet(
+                user_id, Decimal(str(bet)), Decimal(str(win_amount)),
+                bet_type="balance", win_type="balance", meta={"game": "dice", "round": round_id, "roll": value},
+            )
+        except ValueError:
+            return await message.answer(tr("common.no_funds"))
+    elif won:
+        await change_balance(user_id, win_amount, meta={"game": "dice", "round": round_id, "roll": value})
+
+    if not won:
         await award_loss_commission(user_id, bet)
 
     # логирование
@@ -169,25 +186,37 @@ async def do_roll(message, bet, user_id, username, check_win, choice, lang, mult
         win=win_amount,
         result="win" if won else "lose",
         username=username,
-        multiplier=multiplier
+        multiplier=multiplier,
+        fair=fair,
+        proof=proof,
+        round_id=round_id,
     )
 
     # вывод результата игроку
-    result_text = (
-        f"🎲 Выпало: {value}\n"
-        f"{'🎉 Победа!' if won else '❌ Проигрыш'}\n"
-        f"💰 Выигрыш: {win_amount}$"
-    )
+    result_text = tr("dice.won" if won else "dice.lost", value=value, win=win_amount)
+
+    if emoji_rng.SERVER_MODE:
+        emoji_rng.show_later(message, "🎲", result_text, tr)
+    else:
+        await message.answer(result_text)
 
-    await message.answer(result_text)
 
 
+async def do_auto(message, bet, user_id, count, multiplier, tr):
+    try:
+        result = await autoplay.play_batch(
+            user_id, game="dice", emoji="🎲", bet=bet, count=count, multiplier=multiplier, stats="dice",
+        )
+    except ValueError:
+        return await message.answer(tr("common.no_funds"))
+    await message.answer(autoplay.summary_text(result, tr))
+
 
 # -------------------------------
 # Обработка выбора
 # -------------------------------
 @router.callback_query(F.data.startswith("dc_even_"), DiceState.waiting_choice)
-async def play_even(call: CallbackQuery, state: FSMContext, lang: str):
+async def play_even(call: CallbackQuery, state: FSMContext, tr: Translator):
     data = await state.get_data()
     bet = data["bet"]
     user_id = call.from_user.id
@@ -197,6 +226,12 @@ async def play_even(call: CallbackQuery, state: FSMContext, lang: str):
 
     await state.clear()
 
+    if data.get("auto"):
+        return await do_auto(
+            call.message, bet, user_id, data["auto"],
+            lambda r: 2 if (r % 2 == 0) == even else 0, tr,
+        )
+
     await do_roll(
         message=call.message,
         bet=bet,
@@ -204,14 +239,14 @@ async def play_even(call: CallbackQuery, state: FSMContext, lang: str):
         username=username,
         check_win=lambda r: (r % 2 == 0) == even,
         choice="even" if even else "odd",
-        lang=lang,
+        tr=tr,
         multiplier=2
     )
 
 
 
 @router.callback_query(F.data.startswith("dc_n_"), DiceState.waiting_choice)
-async def play_number(call: CallbackQuery, state: FSMContext, lang: str):
+async def play_number(call: CallbackQuery, state: FSMContext, tr: Translator):
     data = await state.get_data()
     bet = data["bet"]
     user_id = call.from_user.id
@@ -221,6 +256,12 @@ async def play_number(call: CallbackQuery, state: FSMContext, lang: str):
 
     await state.clear()
 
+    if data.get("auto"):
+        return await do_auto(
+            call.message, bet, user_id, data["auto"],
+            lambda r: 6 if r == number else 0, tr,
+        )
+
     await do_roll(
         message=call.message,
         bet=bet,
@@ -228,7 +269,7 @@ async def play_number(call: CallbackQuery, state: FSMContext, lang: str):
         username=username,
         check_win=lambda r: r == number,
         choice=str(number),
-        lang=lang,
+        tr=tr,
         multiplier=6
     )
 
@@ -238,9 +279,6 @@ async def play_number(call: CallbackQuery, state: FSMContext, lang: str):
 # Exit
 # -------------------------------
 @router.callback_query(F.data == "dice_exit")
-async def dice_exit(call: CallbackQuery, state: FSMContext, lang: str):
+async def dice_exit(call: CallbackQuery, state: FSMContext, tr: Translator):
     await state.clear()
-    await call.message.edit_text(
-        "🎮 Выбор игр" if lang == "ru" else "🎮 Games",
-        reply_markup=games_menu(lang)
-    )
+    await call.message.edit_text(tr("games.text"), reply_markup=games_menu(tr.lang))
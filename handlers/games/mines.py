@@ -1,6 +1,7 @@
 # handlers/games/mines.py
 import asyncio
 import random
+from decimal import Decimal
 from typing import List, Dict, Tuple
 from aiogram import Router, F
 from aiogram.types import CallbackQuery, Message, InlineKeyboardMarkup, InlineKeyboardButton
@@ -9,8 +10,12 @@ from aiogram.fsm.state import State, StatesGroup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from keyboards.menu import main_menu
-from services.balance import get_balance, change_balance
+from services.balance import get_balance
 from services.game_stats import log_mines_game
+from services.i18n import Translator
+from services.games.mines_table import multipliers_for
+from services import provably_fair
+from services.expiry import sweeper
 from database.db import db
 
 router = Router()
@@ -29,8 +34,9 @@ class MinesState(StatesGroup):
 #  GAME CLASS
 # ================================
 class MinesGame:
-    def __init__(self, bet: float, mines_count: int = 3):
+    def __init__(self, bet: float, mines_count: int = 3, rng=random):
         self.bet = bet
+        self.rng = rng
         self.mines_count = min(max(mines_count, 1), 24)
         self.board_size = 25
         self.mines: List[int] = []
@@ -44,19 +50,10 @@ class MinesGame:
 
     def generate_mines(self):
         all_cells = list(range(self.board_size))
-        self.mines = random.sample(all_cells, self.mines_count)
+        self.mines = self.rng.sample(all_cells, self.mines_count)
 
     def calculate_multipliers(self) -> Dict[int, float]:
-        multipliers = {}
-        safe_cells = self.board_size - self.mines_count
-
-        for opened in range(1, safe_cells + 1):
-            probability = (safe_cells - opened) / safe_cells
-            if probability > 0:
-                multiplier = round(0.96 / probability, 2)
-                multipliers[opened] = multiplier
-
-        return multipliers
+        return multipliers_for(self.mines_count)
 
     def open_cell(self, cell_index: int) -> Tuple[bool, float]:
         if cell_index in self.opened_cells:
@@ -131,98 +128,50 @@ class MinesGame:
         return count
 
 
+def journal_state(g: dict) -> dict:
+    """What the open_rounds journal needs to settle the round after a restart."""
+    return {k: v for k, v in g.items() if k != "multipliers"}
+
+
+def mines_proof(game: MinesGame) -> dict:
+    return {"mines_count": game.mines_count, "mines": sorted(game.mines)}
+
+
 # ================================
 #  TEXTS — чистый современный UI
 # ================================
-def mines_game_text(lang: str, game: MinesGame, balance: float) -> str:
-    opened = len(game.opened_cells)
-    max_safe = 25 - game.mines_count
-
-    if lang == "ru":
-        return (
-            f"<b>🎯 Мины</b>\n\n"
-            f"💵 Ставка: <b>{game.bet:.2f}$</b>\n"
-            f"💰 Баланс: <b>{balance:.2f}$</b>\n"
-            f"💣 Мин: <b>{game.mines_count}</b>\n\n"
-            f"🟩 Открыто: <b>{opened}/{max_safe}</b>\n"
-            f"📈 Множитель: <b>{game.current_multiplier:.2f}x</b>\n"
-            f"🏆 Потенциал: <b>{game.bet * game.current_multiplier:.2f}$</b>\n\n"
-            f"Выберите клетку:"
-        )
-    else:
-        return (
-            f"<b>🎯 Mines</b>\n\n"
-            f"💵 Bet: <b>{game.bet:.2f}$</b>\n"
-            f"💰 Balance: <b>{balance:.2f}$</b>\n"
-            f"💣 Mines: <b>{game.mines_count}</b>\n\n"
-            f"🟩 Opened: <b>{opened}/{max_safe}</b>\n"
-            f"📈 Multiplier: <b>{game.current_multiplier:.2f}x</b>\n"
-            f"🏆 Potential: <b>{game.bet * game.current_multiplier:.2f}$</b>\n\n"
-            f"Choose a cell:"
-        )
+def mines_game_text(tr: Translator, game: MinesGame, balance: float) -> str:
+    return tr(
+        "mines.table",
+        bet=game.bet, balance=balance, mines=game.mines_count,
+        opened=len(game.opened_cells), max_safe=25 - game.mines_count,
+        multiplier=game.current_multiplier, potential=game.bet * game.current_multiplier,
+    )
 
 
-def mines_result_text(lang: str, game: MinesGame, win_amount: float) -> str:
+def mines_result_text(tr: Translator, game: MinesGame, win_amount: float) -> str:
     opened = len(game.opened_cells)
 
     if game.won:
-        if lang == "ru":
-            return (
-                f"<b>🎉 Победа!</b>\n\n"
-                f"🏆 Вы выиграли: <b>{win_amount:.2f}$</b>\n"
-                f"📈 Множитель: <b>{game.current_multiplier:.2f}x</b>\n"
-                f"📦 Открыто клеток: <b>{opened}</b>"
-            )
-        else:
-            return (
-                f"<b>🎉 Victory!</b>\n\n"
-                f"🏆 Win: <b>{win_amount:.2f}$</b>\n"
-                f"📈 Multiplier: <b>{game.current_multiplier:.2f}x</b>\n"
-                f"📦 Cells opened: <b>{opened}</b>"
-            )
-    else:
-        if lang == "ru":
-            return (
-                f"<b>💥 Проигрыш</b>\n\n"
-                f"💸 Потеряно: <b>{game.bet:.2f}$</b>\n"
-                f"📦 Открыто клеток: <b>{opened}</b>"
-            )
-        else:
-            return (
-                f"<b>💥 Lost</b>\n\n"
-                f"💸 Lost: <b>{game.bet:.2f}$</b>\n"
-                f"📦 Cells opened: <b>{opened}</b>"
-            )
+        return tr("mines.won", win=win_amount, multiplier=game.current_multiplier, opened=opened)
+    return tr("mines.lost", bet=game.bet, opened=opened)
 
 
 # ================================
 # ВЫИГРЫШНАЯ АНИМАЦИЯ
 # ================================
-async def animate_win(message, lang: str, game: MinesGame, final_amount: float):
+async def animate_win(message, tr: Translator, game: MinesGame, final_amount: float):
     steps = 6
     for i in range(1, steps + 1):
         amount = final_amount * (i / steps)
-        if lang == "ru":
-            text = (
-                f"<b>🎉 Победа!</b>\n\n"
-                f"🏆 Вы выиграли: <b>{amount:.2f}$</b>\n"
-                f"📈 Множитель: <b>{game.current_multiplier:.2f}x</b>"
-            )
-        else:
-            text = (
-                f"<b>🎉 Victory!</b>\n\n"
-                f"🏆 Win: <b>{amount:.2f}$</b>\n"
-                f"📈 Multiplier: <b>{game.current_multiplier:.2f}x</b>"
-            )
-
-        await message.edit_text(text)
+        await message.edit_text(tr("mines.winning", win=amount, multiplier=game.current_multiplier))
         await asyncio.sleep(0.18)
 
 
 # ================================
 #  KEYBOARDS
 # ================================
-def mines_board_keyboard(game: MinesGame, lang: str) -> InlineKeyboardMarkup:
+def mines_board_keyboard(game: MinesGame, tr: Translator) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     display = game.get_board_display(reveal_mines=game.game_over)
 
@@ -241,27 +190,15 @@ def mines_board_keyboard(game: MinesGame, lang: str) -> InlineKeyboardMarkup:
     builder.adjust(5)
 
     if game.game_over:
-        if lang == "ru":
-            builder.row(
-                InlineKeyboardButton(text="🔄 Новая игра", callback_data="mines_new_game"),
-                InlineKeyboardButton(text="⬅️ Меню", callback_data="mines_exit")
-            )
-        else:
-            builder.row(
-                InlineKeyboardButton(text="🔄 New Game", callback_data="mines_new_game"),
-                InlineKeyboardButton(text="⬅️ Menu", callback_data="mines_exit")
-            )
+        builder.row(
+            InlineKeyboardButton(text=tr("mines.new_game"), callback_data="mines_new_game"),
+            InlineKeyboardButton(text=tr("common.menu"), callback_data="mines_exit")
+        )
     else:
-        if lang == "ru":
-            builder.row(
-                InlineKeyboardButton(text="💰 Забрать", callback_data="mines_cashout"),
-                InlineKeyboardButton(text="⬅️ Меню", callback_data="mines_exit")
-            )
-        else:
-            builder.row(
-                InlineKeyboardButton(text="💰 Cashout", callback_data="mines_cashout"),
-                InlineKeyboardButton(text="⬅️ Menu", callback_data="mines_exit")
-            )
+        builder.row(
+            InlineKeyboardButton(text=tr("mines.cashout"), callback_data="mines_cashout"),
+            InlineKeyboardButton(text=tr("common.menu"), callback_data="mines_exit")
+        )
 
     return builder.as_markup()
 
@@ -271,68 +208,55 @@ def mines_board_keyboard(game: MinesGame, lang: str) -> InlineKeyboardMarkup:
 # ================================
 
 @router.callback_query(F.data == "game_mines")
-async def mines_start(call: CallbackQuery, state: FSMContext, lang: str):
+async def mines_start(call: CallbackQuery, state: FSMContext, tr: Translator):
     balance = await get_balance(call.from_user.id)
 
     await state.set_state(MinesState.waiting_bet)
 
-    text = (
-        f"<b>💵 Выбор ставки</b>\n\nБаланс: <b>{balance:.2f}$</b>\n\nВведите сумму или выберите кнопку."
-        if lang == "ru" else
-        f"<b>💵 Choose Bet</b>\n\nBalance: <b>{balance:.2f}$</b>\n\nEnter custom amount or choose below."
-    )
+    text = tr("mines.choose_bet", balance=balance)
 
     kb = InlineKeyboardBuilder()
     for row in [(1,5,10),(30,50,100)]:
         kb.row(*[InlineKeyboardButton(text=f"{v}$", callback_data=f"mines_bet_{v}") for v in row])
-    kb.row(InlineKeyboardButton(text="⬅️ Назад" if lang=="ru" else "⬅️ Back", callback_data="games_menu"))
+    kb.row(InlineKeyboardButton(text=tr("common.back"), callback_data="games_menu"))
 
     await call.message.edit_text(text, reply_markup=kb.as_markup())
 
 
 @router.callback_query(F.data.startswith("mines_bet_"), MinesState.waiting_bet)
-async def mines_set_bet(call: CallbackQuery, state: FSMContext, lang: str):
+async def mines_set_bet(call: CallbackQuery, state: FSMContext, tr: Translator):
     bet = float(call.data.split("_")[2])
     balance = await get_balance(call.from_user.id)
     if balance < bet:
-        await call.answer(
-            "Недостаточно средств. Пополните или выберите меньшую ставку."
-            if lang == "ru"
-            else "Not enough balance. Top up or choose a smaller bet.",
-            show_alert=True,
-        )
-        return await mines_start(call, state, lang)
+        await call.answer(tr("mines.no_funds"), show_alert=True)
+        return await mines_start(call, state, tr)
 
     await state.update_data(bet=bet)
     await state.set_state(MinesState.waiting_mines)
 
-    text = (
-        f"<b>💣 Количество мин</b>\n\nСтавка: <b>{bet:.2f}$</b>\nВыберите количество мин:"
-        if lang == "ru" else
-        f"<b>💣 Number of mines</b>\n\nBet: <b>{bet:.2f}$</b>\nChoose number of mines:"
-    )
+    text = tr("mines.choose_count", bet=bet)
 
     kb = InlineKeyboardBuilder()
     for row in [(8,10),(15,20,24)]:
         kb.row(*[InlineKeyboardButton(text=str(v), callback_data=f"mines_count_{v}") for v in row])
-    kb.row(InlineKeyboardButton(text="⬅️ Назад" if lang=="ru" else "⬅️ Back", callback_data="game_mines"))
+    kb.row(InlineKeyboardButton(text=tr("common.back"), callback_data="game_mines"))
 
     await call.message.edit_text(text, reply_markup=kb.as_markup())
 
 
 @router.callback_query(F.data.startswith("mines_count_"), MinesState.waiting_mines)
-async def mines_set_count(call: CallbackQuery, state: FSMContext, lang: str):
+async def mines_set_count(call: CallbackQuery, state: FSMContext, tr: Translator):
     user_id = call.from_user.id
     mines_count = int(call.data.split("_")[2])
 
     d = await state.get_data()
     bet = d["bet"]
 
-    await change_balance(user_id, -bet)
-
-    game = MinesGame(bet, mines_count)
+    fair = await provably_fair.next_round(user_id)
+    game = MinesGame(bet, mines_count, rng=fair.rng())
 
-    await state.update_data(game={
+    g = {
+        "fair": fair.public(),
         "bet": game.bet,
         "mines": game.mines,
         "mines_count": game.mines_count,
@@ -341,16 +265,24 @@ async def mines_set_count(call: CallbackQuery, state: FSMContext, lang: str):
         "won": False,
         "current_multiplier": game.current_multiplier,
         "multipliers": game.multipliers
-    })
+    }
+    try:
+        g["round_id"] = await db.open_round(user_id, "mines", Decimal(str(bet)), journal_state(g))
+    except ValueError:
+        await call.answer(tr("common.no_funds"), show_alert=True)
+        return await mines_start(call, state, tr)
+    sweeper.touch_round(g["round_id"], user_id, "mines", state)
+
+    await state.update_data(game=g)
 
     await state.set_state(MinesState.playing)
 
     balance = await get_balance(user_id)
-    await call.message.edit_text(mines_game_text(lang, game, balance), reply_markup=mines_board_keyboard(game, lang))
+    await call.message.edit_text(mines_game_text(tr, game, balance), reply_markup=mines_board_keyboard(game, tr))
 
 
 @router.callback_query(F.data.startswith("mines_cell_"), MinesState.playing)
-async def mines_open_cell(call: CallbackQuery, state: FSMContext, lang: str):
+async def mines_open_cell(call: CallbackQuery, state: FSMContext, tr: Translator):
     user_id = call.from_user.id
     idx = int(call.data.split("_")[2])
 
@@ -366,11 +298,13 @@ async def mines_open_cell(call: CallbackQuery, state: FSMContext, lang: str):
     game.multipliers = g["multipliers"]
 
     if game.game_over:
-        return await call.answer("Игра окончена" if lang=="ru" else "Finished")
+        return await call.answer(tr("mines.finished"))
 
     hit, _ = game.open_cell(idx)
 
-    await state.update_data(game={
+    g = {
+        "fair": g.get("fair"),
+        "round_id": g.get("round_id"),
         "bet": game.bet,
         "mines": game.mines,
         "mines_count": game.mines_count,
@@ -379,38 +313,51 @@ async def mines_open_cell(call: CallbackQuery, state: FSMContext, lang: str):
         "won": game.won,
         "current_multiplier": game.current_multiplier,
         "multipliers": game.multipliers
-    })
+    }
+    await state.update_data(game=g)
+    if not game.game_over:
+        if not await db.update_round_state(g["round_id"], journal_state(g)):
+            await call.answer(tr("common.round_expired"), show_alert=True)
+            return await state.clear()
+        sweeper.touch_round(g["round_id"], user_id, "mines", state)
 
     balance = await get_balance(user_id)
 
     if hit:
-        await log_mines_game(user_id, game.bet, 0, "lose")
-
-        await call.message.edit_text(mines_result_text(lang, game, 0),
-                                     reply_markup=mines_board_keyboard(game, lang))
+        sweeper.forget_round(g["round_id"])
+        if not await db.close_round(g["round_id"], user_id):
+            await call.answer(tr("common.round_expired"), show_alert=True)
+            return await state.clear()
+        await log_mines_game(user_id, game.bet, 0, "lose", fair=g.get("fair"), proof=mines_proof(game), round_id=g["round_id"])
+
+        await call.message.edit_text(mines_result_text(tr, game, 0),
+                                     reply_markup=mines_board_keyboard(game, tr))
         await asyncio.sleep(4)
         return await state.clear()
 
     if game.game_over and game.won:
         win = game.get_win_amount()
-        await change_balance(user_id, win)
-        await log_mines_game(user_id, game.bet, win, "win")
+        sweeper.forget_round(g["round_id"])
+        if not await db.close_round(g["round_id"], user_id, Decimal(str(win))):
+            await call.answer(tr("common.round_expired"), show_alert=True)
+            return await state.clear()
+        await log_mines_game(user_id, game.bet, win, "win", fair=g.get("fair"), proof=mines_proof(game), round_id=g["round_id"])
 
         # Анимация выигрыша
-        await animate_win(call.message, lang, game, win)
+        await animate_win(call.message, tr, game, win)
 
-        await call.message.edit_text(mines_result_text(lang, game, win),
-                                     reply_markup=mines_board_keyboard(game, lang))
+        await call.message.edit_text(mines_result_text(tr, game, win),
+                                     reply_markup=mines_board_keyboard(game, tr))
         await asyncio.sleep(4)
         return await state.clear()
 
     # игра продолжается
-    await call.message.edit_text(mines_game_text(lang, game, balance),
-                                 reply_markup=mines_board_keyboard(game, lang))
+    await call.message.edit_text(mines_game_text(tr, game, balance),
+                                 reply_markup=mines_board_keyboard(game, tr))
 
 
 @router.callback_query(F.data == "mines_cashout", MinesState.playing)
-async def mines_cashout(call: CallbackQuery, state: FSMContext, lang: str):
+async def mines_cashout(call: CallbackQuery, state: FSMContext, tr: Translator):
     data = await state.get_data()
     g = data["game"]
 
@@ -423,31 +370,52 @@ async def mines_cashout(call: CallbackQuery, state: FSMContext, lang: str):
 
     if game.cashout():
         win = game.get_win_amount()
-        await change_balance(call.from_user.id, win)
-        await log_mines_game(call.from_user.id, game.bet, win, "cashout")
+        sweeper.forget_round(g["round_id"])
+        if not await db.close_round(g["round_id"], call.from_user.id, Decimal(str(win))):
+            await call.answer(tr("common.round_expired"), show_alert=True)
+            return await state.clear()
+        await log_mines_game(call.from_user.id, game.bet, win, "cashout", fair=g.get("fair"), proof=mines_proof(game), round_id=g["round_id"])
 
-        await animate_win(call.message, lang, game, win)
+        await animate_win(call.message, tr, game, win)
 
-        await call.message.edit_text(mines_result_text(lang, game, win),
-                                     reply_markup=mines_board_keyboard(game, lang))
+        await call.message.edit_text(mines_result_text(tr, game, win),
+                                     reply_markup=mines_board_keyboard(game, tr))
 
         await asyncio.sleep(4)
         await state.clear()
     else:
-        await call.answer("Нечего забирать" if lang=="ru" else "Nothing to cashout")
+        await call.answer(tr("mines.nothing_to_cashout"))
+
+
+async def forfeit_round(state: FSMContext, user_id: int):
+    """Leaving mid-game forfeits the stake; closes its journal entry."""
+    g = (await state.get_data()).get("game")
+    if g and g.get("round_id"):
+        sweeper.forget_round(g["round_id"])
+        await db.close_round(g["round_id"], user_id)
+
+
+@sweeper.on_expire("mines")
+async def drop_expired_board(round_id: int, user_id: int, state: FSMContext):
+    """The round was settled by the idle sweeper; drop the board unless a new one replaced it."""
+    g = (await state.get_data()).get("game")
+    if g and g.get("round_id") == round_id:
+        await state.clear()
 
 
 @router.callback_query(F.data == "mines_new_game")
-async def mines_new_game(call: CallbackQuery, state: FSMContext, lang: str):
+async def mines_new_game(call: CallbackQuery, state: FSMContext, tr: Translator):
+    await forfeit_round(state, call.from_user.id)
     await state.clear()
-    await mines_start(call, state, lang)
+    await mines_start(call, state, tr)
 
 
 @router.callback_query(F.data == "mines_exit")
-async def mines_exit(call: CallbackQuery, state: FSMContext, lang: str):
+async def mines_exit(call: CallbackQuery, state: FSMContext, tr: Translator):
+    await forfeit_round(state, call.from_user.id)
     await state.clear()
     from handlers.menu_games import open_games_menu
-    await open_games_menu(call, lang)
+    await open_games_menu(call, tr)
 
 
 @router.callback_query(F.data == "mines_noop")
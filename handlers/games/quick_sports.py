@@ -5,7 +5,13 @@ from aiogram import F, Router
 from aiogram.types import CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from database.db import db
+from services import autoplay, emoji_rng
 from services.balance import change_balance, get_balance
+from services.game_stats import log_sport_game
+from services.leaderboards import leaderboards
+from services.games_log import new_round_id
+from services.i18n import Translator
 from services.referrals import award_loss_commission
 from keyboards.menu import main_menu
 
@@ -20,20 +26,30 @@ SPORTS = {
 }
 
 
-def sport_bet_keyboard(game: str, lang: str):
+def sport_bet_keyboard(game: str, tr: Translator, auto: int | None = None):
     kb = InlineKeyboardBuilder()
     amounts = [1, 5, 10, 20, 50, 100]
+    prefix = f"sport_auto:{game}:{auto}" if auto else f"sport_bet:{game}"
     for chunk in [amounts[i : i + 3] for i in range(0, len(amounts), 3)]:
         kb.row(
             *[
                 InlineKeyboardButton(
                     text=f"{amt}$",
-                    callback_data=f"sport_bet:{game}:{amt}",
+                    callback_data=f"{prefix}:{amt}",
                 )
                 for amt in chunk
             ]
         )
-    kb.row(InlineKeyboardButton(text="⬅️ Назад" if lang == "ru" else "⬅️ Back", callback_data="games_menu"))
+    kb.row(
+        *[
+            InlineKeyboardButton(
+                text=f"{'✅' if n == auto else '🔁'} ×{n}",
+                callback_data=f"sport_autos:{game}:{0 if n == auto else n}",
+            )
+            for n in autoplay.AUTOPLAY_COUNTS
+        ]
+    )
+    kb.row(InlineKeyboardButton(text=tr("common.back"), callback_data="games_menu"))
     return kb.as_markup()
 
 
@@ -46,22 +62,54 @@ SPORT_CALLBACKS = {
 
 
 @router.callback_query(F.data.in_(SPORT_CALLBACKS))
-async def choose_sport(call: CallbackQuery, lang: str):
+async def choose_sport(call: CallbackQuery, tr: Translator):
     game = call.data.split("_", 1)[1]
     if game not in SPORTS:
         return
-    title = sport_title(game, lang)
-    text = (
-        f"{title}\n\n"
-        "Выбери ставку и бросай. Значение 4+ — победа, получаешь x2."
-        if lang == "ru"
-        else f"{title}\n\nPick a stake. Roll 4+ to win x2."
+    text = tr("sports.intro", title=sport_title(game, tr))
+    await call.message.edit_text(text, reply_markup=sport_bet_keyboard(game, tr))
+
+
+@router.callback_query(F.data.startswith("sport_autos:"))
+async def choose_sport_auto(call: CallbackQuery, tr: Translator):
+    _, game, auto_raw = call.data.split(":")
+    auto = int(auto_raw)
+    if game not in SPORTS or (auto and auto not in autoplay.AUTOPLAY_COUNTS):
+        return await call.answer()
+    title = sport_title(game, tr)
+    if auto:
+        text = tr("sports.auto", title=title, count=auto)
+    else:
+        text = tr("sports.intro", title=title)
+    await call.message.edit_text(text, reply_markup=sport_bet_keyboard(game, tr, auto or None))
+
+
+@router.callback_query(F.data.startswith("sport_auto:"))
+async def autoplay_sport(call: CallbackQuery, tr: Translator):
+    _, game, count_raw, amt_raw = call.data.split(":")
+    count = int(count_raw)
+    if game not in SPORTS or count not in autoplay.AUTOPLAY_COUNTS:
+        return await call.answer()
+    bet = float(Decimal(amt_raw))
+    win_min = SPORTS[game]["win_min"]
+    try:
+        result = await autoplay.play_batch(
+            call.from_user.id, game=game, emoji=SPORTS[game]["emoji"], bet=bet, count=count,
+            multiplier=lambda value: 2 if value >= win_min else 0,
+        )
+    except ValueError:
+        return await call.answer(tr("autoplay.no_funds"), show_alert=True)
+    kb = InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(text=tr("autoplay.again"), callback_data=call.data)],
+            [InlineKeyboardButton(text=tr("common.back"), callback_data="games_menu")],
+        ]
     )
-    await call.message.edit_text(text, reply_markup=sport_bet_keyboard(game, lang))
+    await call.message.answer(autoplay.summary_text(result, tr), reply_markup=kb)
 
 
 @router.callback_query(F.data.startswith("sport_bet:"))
-async def start_sport(call: CallbackQuery, lang: str):
+async def start_sport(call: CallbackQuery, tr: Translator):
     _, game, amt_raw = call.data.split(":")
     if game not in SPORTS:
         return
@@ -69,44 +117,54 @@ async def start_sport(call: CallbackQuery, lang: str):
     user_id = call.from_user.id
 
     if await get_balance(user_id) < bet:
-        return await call.answer("Недостаточно средств" if lang == "ru" else "Not enough balance", show_alert=True)
-
-    await change_balance(user_id, -bet, tx_type="sport_bet", meta={"game": game})
+        return await call.answer(tr("common.no_funds"), show_alert=True)
 
     emoji = SPORTS[game]["emoji"]
-    dice_msg = await call.message.answer_dice(emoji=emoji)
-    await asyncio.sleep(3.2)
-    value = dice_msg.dice.value
+    round_id = new_round_id()
+    if emoji_rng.SERVER_MODE:
+        value, fair, proof = await emoji_rng.server_roll(user_id, emoji)
+    else:
+        await change_balance(user_id, -bet, tx_type="sport_bet", meta={"game": game, "round": round_id})
+
+        dice_msg = await call.message.answer_dice(emoji=emoji)
+        await asyncio.sleep(3.2)
+        value = dice_msg.dice.value
 
     win = value >= SPORTS[game]["win_min"]
     win_amount = bet * 2 if win else 0
-    if win:
-        await change_balance(user_id, win_amount, tx_type="sport_win", meta={"game": game, "roll": value})
+    if emoji_rng.SERVER_MODE:
+        try:
+            await db.settle_bet(
+                user_id, Decimal(str(bet)), Decimal(str(win_amount)),
+                bet_type="sport_bet", win_type="sport_win", meta={"game": game, "round": round_id, "roll": value},
+            )
+        except ValueError:
+            return await call.answer(tr("common.no_funds"), show_alert=True)
+        await log_sport_game(
+            user_id, game, bet, "win" if win else "lose", fair=fair, proof=proof, round_id=round_id, win=win_amount,
+        )
     else:
+        if win:
+            await change_balance(user_id, win_amount, tx_type="sport_win", meta={"game": game, "round": round_id, "roll": value})
+        leaderboards.record_round(user_id, bet, win_amount)
+    if not win:
         await award_loss_commission(user_id, bet)
 
-    result = (
-        f"{'🎉 Победа!' if win else '❌ Проигрыш.'}\n"
-        f"Бросок: {value}\n"
-        f"{'Получено' if win else 'Потеря'}: {win_amount if win else bet:.2f}$"
-        if lang == "ru"
-        else f"{'🎉 Win!' if win else '❌ Lose.'}\nRoll: {value}\n{'Earned' if win else 'Lost'}: {win_amount if win else bet:.2f}$"
-    )
+    if win:
+        result = tr("sports.won", value=value, amount=win_amount)
+    else:
+        result = tr("sports.lost", value=value, amount=bet)
     kb = InlineKeyboardMarkup(
         inline_keyboard=[
-            [InlineKeyboardButton(text="🎮 Ещё" if lang == "ru" else "🎮 Again", callback_data=f"game_{game}")],
-            [InlineKeyboardButton(text="⬅️ Назад" if lang == "ru" else "⬅️ Back", callback_data="games_menu")],
+            [InlineKeyboardButton(text=tr("sports.again"), callback_data=f"game_{game}")],
+            [InlineKeyboardButton(text=tr("common.back"), callback_data="games_menu")],
         ]
     )
-    await call.message.answer(result, reply_markup=kb)
-
-
-def sport_title(game: str, lang: str) -> str:
-    names = {
-        "football": ("⚽️ Футбол", "⚽️ Football"),
-        "darts": ("🎯 Дартс", "🎯 Darts"),
-        "basketball": ("🏀 Баскетбол", "🏀 Basketball"),
-        "bowling": ("🎳 Боулинг", "🎳 Bowling"),
-    }
-    ru, en = names.get(game, ("🎲 Игра", "🎲 Game"))
-    return ru if lang == "ru" else en
+    if emoji_rng.SERVER_MODE:
+        emoji_rng.show_later(call.message, emoji, result, tr, reply_markup=kb)
+    else:
+        await call.message.answer(result, reply_markup=kb)
+
+
+def sport_title(game: str, tr: Translator) -> str:
+    return tr(f"games.button.{game}")
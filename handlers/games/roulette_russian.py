@@ -1,4 +1,5 @@
 import asyncio
+from decimal import Decimal
 from aiogram import Router, F
 from aiogram.types import CallbackQuery
 
@@ -6,19 +7,30 @@ from keyboards.games.rr_keyboard import rr_keyboard
 from keyboards.menu import main_menu
 from keyboards.games_menu import games_menu
 from .rr_bets import rr_bets_keyboard
-from services.balance import get_balance, change_balance
-from services.games.rr_logic import rr_shoot, rr_win
+from services.balance import get_balance
+from database.db import db
+from services.games.rr_logic import rr_spin_chamber, rr_win
+from services import provably_fair
+from services.expiry import sweeper
+from services.i18n import Translator
 from services.referrals import award_loss_commission
 
 router = Router()
-active_rr = {}  # user_id → {"bet": int, "stage": int}
+active_rr = {}  # user_id → {"bet": int, "stage": int, "rng": FairRng, "fair": dict, "shots": list}
+
+
+@sweeper.on_expire("russian")
+async def drop_expired_game(round_id: int, user_id: int, _handle):
+    game = active_rr.get(user_id)
+    if game and game["round_id"] == round_id:
+        del active_rr[user_id]
 
 
 # ================================
 #  АНИМАЦИИ СИМВОЛОВ ● ○ (красиво и современно)
 # ================================
 
-async def rr_spin(message, lang):
+async def rr_spin(message, tr: Translator):
     """Вращение барабана — 6 позиций по кругу"""
     frames = [
         "[ ● ○ ○ ○ ○ ○ ]",
@@ -28,39 +40,33 @@ async def rr_spin(message, lang):
         "[ ○ ○ ○ ○ ● ○ ]",
         "[ ○ ○ ○ ○ ○ ● ]",
     ]
-    title = "Вращаем барабан..." if lang == "ru" else "Spinning..."
+    title = tr("russian.spinning")
 
     for f in frames:
         await message.edit_text(f"{title}\n\n{f}")
         await asyncio.sleep(0.12)
 
 
-async def rr_click(message, lang):
+async def rr_click(message, tr: Translator):
     """Пустой выстрел — красивый ‘щёлк’"""
-    if lang == "ru":
-        frames = [
-            "[ ● ]\n🔫 ЩЕЛК...",
-            "[ ○ ]\n🙂 Пусто!"
-        ]
-    else:
-        frames = [
-            "[ ● ]\n🔫 CLICK...",
-            "[ ○ ]\n🙂 Empty!"
-        ]
+    frames = [
+        tr("russian.click"),
+        tr("russian.empty"),
+    ]
 
     for f in frames:
         await message.edit_text(f)
         await asyncio.sleep(0.22)
 
 
-async def rr_boom(message, lang):
+async def rr_boom(message, tr: Translator):
     """Выстрел — усиленная анимация"""
     frames = [
         "[ ● ]",
         "💥",
         "💥💥",
         "💥💥💥",
-        "💀 BOOM!" if lang == "en" else "💀 БА-БАХ!"
+        tr("russian.boom"),
     ]
     for f in frames:
         await message.edit_text(f)
@@ -70,209 +76,165 @@ async def rr_boom(message, lang):
 # ================================
 #  ТЕКСТЫ (современные, но без ASCII рамок)
 # ================================
-def rr_text(lang, bet, stage):
+def rr_text(tr: Translator, bet, stage):
     mult = {1: "1.2x", 2: "1.5x", 3: "2.0x", 4: "2.8x", 5: "4.0x"}[stage]
-
-    if lang == "ru":
-        return (
-            f"<b>🔫 Русская рулетка</b>\n\n"
-            f"💵 Ставка: <b>{bet}$</b>\n"
-            f"📈 Этап: <b>{stage}/5</b>\n"
-            f"🔥 Множитель: <b>{mult}</b>\n\n"
-            "Нажмите «Стрелять»."
-        )
-    else:
-        return (
-            f"<b>🔫 Russian Roulette</b>\n\n"
-            f"💵 Bet: <b>{bet}$</b>\n"
-            f"📈 Stage: <b>{stage}/5</b>\n"
-            f"🔥 Multiplier: <b>{mult}</b>\n\n"
-            "Press Shoot."
-        )
+    return tr("russian.table", bet=bet, stage=stage, multiplier=mult)
 
 
-def rr_dead(lang):
-    return "💀 Пуля. Вы проиграли." if lang == "ru" else "💀 Bullet. You died."
+def rr_dead(tr: Translator):
+    return tr("russian.dead")
 
 
-def rr_victory(lang, win):
-    return (
-        f"🏆 Победа!\nЗабрал: <b>{win}$</b>"
-        if lang == "ru"
-        else f"🏆 Victory!\nTaken: <b>{win}$</b>"
-    )
+def rr_victory(tr: Translator, win):
+    return tr("russian.victory", win=win)
 
 
-def rr_bet_text(lang):
-    if lang == "ru":
-        return (
-            "<b>💵 Выберите ставку</b>\n\n"
-            "1$ 5$ 10$\n"
-            "30$ 50$ 100$\n\n"
-            "Введите или нажмите кнопку:"
-        )
-    else:
-        return (
-            "<b>💵 Choose bet</b>\n\n"
-            "1$ 5$ 10$\n"
-            "30$ 50$ 100$\n\n"
-            "Enter or press button:"
-        )
+def rr_bet_text(tr: Translator):
+    return tr("russian.choose_bet")
 
-# -------------------------------
-# Back to games
-# -------------------------------
-def games_menu_text(lang: str) -> str:
-    if lang == "ru":
-        return (
-            "🎮 <b>Игры</b>\n"
-            "Выбери режим:\n\n"
-            "• 🎲 Dice | 💣 Мины | 🔫 Русская рулетка\n"
-            "• 🃏 Блэкджек | 🎰 Рулетка | 🧱 Башня\n"
-            "• ⚽️ Футбол | 🎯 Дартс | 🏀 Баскет | 🎳 Боулинг\n\n"
-            "Нажми кнопку ниже:"
-        )
-    return (
-        "🎮 <b>Games</b>\n"
-        "Pick a mode:\n\n"
-        "• 🎲 Dice | 💣 Mines | 🔫 Russian roulette\n"
-        "• 🃏 Blackjack | 🎰 Roulette | 🧱 Tower\n"
-        "• ⚽️ Football | 🎯 Darts | 🏀 Basketball | 🎳 Bowling\n\n"
-        "Tap a button below:"
-    )
 
 # ================================
 #  ХЕНДЛЕРЫ
 # ================================
 @router.callback_query(F.data == "game_russian")
-async def rr_start_game(call: CallbackQuery, lang: str):
+async def rr_start_game(call: CallbackQuery, tr: Translator):
     await call.message.edit_text(
-        rr_bet_text(lang),
-        reply_markup=rr_bets_keyboard(lang)
+        rr_bet_text(tr),
+        reply_markup=rr_bets_keyboard(tr)
     )
 
 
 @router.callback_query(F.data == "rr_back")
-async def rr_back(call: CallbackQuery, lang: str):
-    await call.message.edit_text(games_menu_text(lang), reply_markup=games_menu(lang))
+async def rr_back(call: CallbackQuery, tr: Translator):
+    await call.message.edit_text(tr("games.text"), reply_markup=games_menu(tr.lang))
 
 
 @router.callback_query(F.data.startswith("rr_set_bet_"))
-async def rr_set_bet(call: CallbackQuery, lang: str):
+async def rr_set_bet(call: CallbackQuery, tr: Translator):
     user = call.from_user.id
     bet = int(call.data.split("_")[-1])
 
     balance = await get_balance(user)
     if balance < bet:
-        await call.answer(
-            "❌ Недостаточно средств. Пополните или выберите меньшую ставку."
-            if lang == "ru"
-            else "❌ Not enough balance. Top up or choose a smaller bet.",
-            show_alert=True,
-        )
-        return await call.message.edit_text(rr_bet_text(lang), reply_markup=rr_bets_keyboard(lang))
+        await call.answer(tr("russian.no_funds"), show_alert=True)
+        return await call.message.edit_text(rr_bet_text(tr), reply_markup=rr_bets_keyboard(tr))
 
-    await change_balance(user, -bet)
+    fair = await provably_fair.next_round(user)
+    try:
+        round_id = await db.open_round(user, "russian", Decimal(bet), {"bet": bet, "stage": 1, "fair": fair.public()})
+    except ValueError:
+        await call.answer(tr("russian.no_funds"), show_alert=True)
+        return await call.message.edit_text(rr_bet_text(tr), reply_markup=rr_bets_keyboard(tr))
 
-    active_rr[user] = {"bet": bet, "stage": 1}
+    active_rr[user] = {
+        "bet": bet, "stage": 1, "rng": fair.rng(), "fair": fair.public(), "shots": [], "round_id": round_id,
+    }
+    sweeper.touch_round(round_id, user, "russian")
 
     await call.message.edit_text(
-        rr_text(lang, bet, 1),
-        reply_markup=rr_keyboard(lang, 1)
+        rr_text(tr, bet, 1),
+        reply_markup=rr_keyboard(tr.lang, 1)
     )
 
 
 @router.callback_query(F.data.startswith("rr_shoot_"))
-async def rr_shoot_stage(call: CallbackQuery, lang: str):
+async def rr_shoot_stage(call: CallbackQuery, tr: Translator):
     user = call.from_user.id
     game = active_rr.get(user)
 
     if not game:
-        return await call.answer("Ошибка" if lang=="ru" else "Error")
+        return await call.answer(tr("common.error"))
 
     bet = game["bet"]
     stage = game["stage"]
 
     # 1) вращаем барабан
-    await rr_spin(call.message, lang)
+    await rr_spin(call.message, tr)
     await asyncio.sleep(0.25)
 
     # 2) определяем – смерть?
-    dead = rr_shoot(stage)
+    shot = rr_spin_chamber(stage, game["rng"])
+    game["shots"].append(shot)
+    dead = shot == 1
 
     if dead:
         # проигрышная анимация
-        await rr_boom(call.message, lang)
+        await rr_boom(call.message, tr)
 
+        active_rr.pop(user, None)
+        sweeper.forget_round(game["round_id"])
+        if not await db.close_round(game["round_id"], user):
+            return await call.answer(tr("common.round_expired"), show_alert=True)
         from services.game_stats import log_rr_game
-        await log_rr_game(user, bet, stage, 0, "lose")
+        await log_rr_game(user, bet, stage, 0, "lose", fair=game["fair"], proof={"shots": game["shots"]}, round_id=game["round_id"])
         await award_loss_commission(user, bet)
 
-        del active_rr[user]
         return await call.message.edit_text(
-            rr_dead(lang),
-            reply_markup=main_menu(lang)
+            rr_dead(tr),
+            reply_markup=main_menu(tr.lang)
         )
 
     # 3) выжил
-    await rr_click(call.message, lang)
+    await rr_click(call.message, tr)
 
     game["stage"] += 1
 
     if game["stage"] > 5:
         win = rr_win(bet, 5)
-        await change_balance(user, win)
+        active_rr.pop(user, None)
+        sweeper.forget_round(game["round_id"])
+        if not await db.close_round(game["round_id"], user, Decimal(win)):
+            return await call.answer(tr("common.round_expired"), show_alert=True)
 
         from services.game_stats import log_rr_game
-        await log_rr_game(user, bet, 5, win, "win")
+        await log_rr_game(user, bet, 5, win, "win", fair=game["fair"], proof={"shots": game["shots"]}, round_id=game["round_id"])
 
-        del active_rr[user]
         return await call.message.edit_text(
-            rr_victory(lang, win),
-            reply_markup=main_menu(lang)
+            rr_victory(tr, win),
+            reply_markup=main_menu(tr.lang)
         )
 
+    if not await db.update_round_state(game["round_id"], {"bet": bet, "stage": game["stage"], "fair": game["fair"]}):
+        active_rr.pop(user, None)
+        return await call.answer(tr("common.round_expired"), show_alert=True)
+    sweeper.touch_round(game["round_id"], user, "russian")
+
     await call.message.edit_text(
-        rr_text(lang, bet, game["stage"]),
-        reply_markup=rr_keyboard(lang, game["stage"])
+        rr_text(tr, bet, game["stage"]),
+        reply_markup=rr_keyboard(tr.lang, game["stage"])
     )
 
 
 @router.callback_query(F.data == "rr_change_bet")
-async def rr_change_bet(call: CallbackQuery, lang: str):
+async def rr_change_bet(call: CallbackQuery, tr: Translator):
     user = call.from_user.id
-    game = active_rr.get(user)
+    game = active_rr.pop(user, None)
 
     if game:
-        await change_balance(user, game["bet"])
-        del active_rr[user]
+        sweeper.forget_round(game["round_id"])
+        await db.close_round(game["round_id"], user, Decimal(game["bet"]), tx_type="refund")
 
-    await call.message.edit_text(rr_bet_text(lang), reply_markup=rr_bets_keyboard(lang))
+    await call.message.edit_text(rr_bet_text(tr), reply_markup=rr_bets_keyboard(tr))
 
 
 @router.callback_query(F.data.startswith("rr_take_"))
-async def rr_take(call: CallbackQuery, lang: str):
+async def rr_take(call: CallbackQuery, tr: Translator):
     user = call.from_user.id
     game = active_rr.get(user)
 
     if not game:
-        return await call.answer("Ошибка" if lang == "ru" else "Error")
+        return await call.answer(tr("common.error"))
 
     bet = game["bet"]
     stage = game["stage"]
 
     win = rr_win(bet, max(stage - 1, 0))
-    await change_balance(user, bet + win)
+    active_rr.pop(user, None)
+    sweeper.forget_round(game["round_id"])
+    if not await db.close_round(game["round_id"], user, Decimal(bet + win)):
+        return await call.answer(tr("common.round_expired"), show_alert=True)
 
     from services.game_stats import log_rr_game
-    await log_rr_game(user, bet, stage, win, "take")
-
-    del active_rr[user]
-
-    msg = (
-        f"🏆 Забрал: {win}$ (этап {stage})"
-        if lang == "ru" else
-        f"🏆 Taken: {win}$ (stage {stage})"
-    )
+    await log_rr_game(user, bet, stage, win, "take", fair=game["fair"], proof={"shots": game["shots"]}, round_id=game["round_id"])
 
-    await call.message.edit_text(msg, reply_markup=main_menu(lang))
+    await call.message.edit_text(tr("russian.taken", win=win, stage=stage), reply_markup=main_menu(tr.lang))
@@ -6,88 +6,133 @@ from aiogram import F, Router
 from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from database.db import db
+from services import autoplay, emoji_rng
 from services.balance import change_balance, get_balance
 from services.referrals import award_loss_commission
 from services.game_stats import log_roulette_game
+from services.games_log import new_round_id
+from services.i18n import Translator
 
 
 router = Router()
 
 
-def roulette_bets_keyboard(lang: str):
+def roulette_bets_keyboard(tr: Translator, auto: int | None = None):
     kb = InlineKeyboardBuilder()
     amounts = [1, 5, 10, 25, 50, 100]
+    prefix = f"roul_auto:{auto}" if auto else "roul_bet"
     for chunk in [amounts[i : i + 3] for i in range(0, len(amounts), 3)]:
         kb.row(
             *[
-                InlineKeyboardButton(text=f"{amt}$", callback_data=f"roul_bet:{amt}")
+                InlineKeyboardButton(text=f"{amt}$", callback_data=f"{prefix}:{amt}")
                 for amt in chunk
             ]
         )
     kb.row(
-        InlineKeyboardButton(text="⬅️ Назад" if lang == "ru" else "⬅️ Back", callback_data="games_menu")
+        *[
+            InlineKeyboardButton(
+                text=f"{'✅' if n == auto else '🔁'} ×{n}",
+                callback_data=f"roul_autos:{0 if n == auto else n}",
+            )
+            for n in autoplay.AUTOPLAY_COUNTS
+        ]
     )
+    kb.row(InlineKeyboardButton(text=tr("common.back"), callback_data="games_menu"))
     return kb.as_markup()
 
 
+def roulette_intro(tr: Translator, auto: int | None = None) -> str:
+    text = tr("roulette.intro")
+    if auto:
+        text += tr("roulette.auto", count=auto)
+    return text
+
+
 @router.callback_query(F.data == "game_roulette")
-async def open_roulette(call: CallbackQuery, lang: str):
-    text = (
-        "🎰 <b>Рулетка</b>\n"
-        "Выберите ставку, крутим слоты.\n"
-        "Выпало 50+ → x2, иначе проигрыш."
-    ) if lang == "ru" else (
-        "🎰 <b>Roulette</b>\n"
-        "Pick a stake and spin.\n"
-        "Roll 50+ to win x2, otherwise you lose."
+async def open_roulette(call: CallbackQuery, tr: Translator):
+    await call.message.edit_text(roulette_intro(tr), reply_markup=roulette_bets_keyboard(tr))
+
+
+@router.callback_query(F.data.startswith("roul_autos:"))
+async def choose_roulette_auto(call: CallbackQuery, tr: Translator):
+    auto = int(call.data.split(":")[1])
+    if auto and auto not in autoplay.AUTOPLAY_COUNTS:
+        return await call.answer()
+    await call.message.edit_text(roulette_intro(tr, auto), reply_markup=roulette_bets_keyboard(tr, auto))
+
+
+@router.callback_query(F.data.startswith("roul_auto:"))
+async def autoplay_roulette(call: CallbackQuery, tr: Translator):
+    _, count_raw, amt_raw = call.data.split(":")
+    count, bet = int(count_raw), float(Decimal(amt_raw))
+    if count not in autoplay.AUTOPLAY_COUNTS:
+        return await call.answer()
+    try:
+        result = await autoplay.play_batch(
+            call.from_user.id, game="roulette", emoji="🎰", bet=bet, count=count,
+            multiplier=lambda value: 2 if value >= 50 else 0, stats="roulette",
+        )
+    except ValueError:
+        return await call.answer(tr("autoplay.no_funds"), show_alert=True)
+    kb = InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(text=tr("autoplay.again"), callback_data=call.data)],
+            [InlineKeyboardButton(text=tr("common.back"), callback_data="games_menu")],
+        ]
     )
-    await call.message.edit_text(text, reply_markup=roulette_bets_keyboard(lang))
+    await call.message.answer(autoplay.summary_text(result, tr), reply_markup=kb)
 
 
 @router.callback_query(F.data.startswith("roul_bet:"))
-async def play_roulette(call: CallbackQuery, lang: str):
+async def play_roulette(call: CallbackQuery, tr: Translator):
     bet = float(Decimal(call.data.split(":")[1]))
     user_id = call.from_user.id
 
     if await get_balance(user_id) < bet:
-        return await call.answer(
-            "Недостаточно средств. Пополните или выберите меньшую ставку."
-            if lang == "ru"
-            else "Not enough balance. Top up or pick a smaller stake.",
-            show_alert=True,
-        )
+        return await call.answer(tr("roulette.no_funds"), show_alert=True)
 
-    await change_balance(user_id, -bet)
+    fair = proof = None
+    round_id = new_round_id()
+    if emoji_rng.SERVER_MODE:
+        value, fair, proof = await emoji_rng.server_roll(user_id, "🎰")
+    else:
+        await change_balance(user_id, -bet, meta={"game": "roulette", "round": round_id})
 
-    roll_msg = await call.message.answer_dice(emoji="🎰")
-    await asyncio.sleep(3.2)
-    value = roll_msg.dice.value  # 1..64 for slots
+        roll_msg = await call.message.answer_dice(emoji="🎰")
+        await asyncio.sleep(3.2)
+        value = roll_msg.dice.value  # 1..64 for slots
 
     win = value >= 50
     win_amount = bet * 2 if win else 0
-    if win:
-        await change_balance(user_id, win_amount)
-    else:
+    if emoji_rng.SERVER_MODE:
+        try:
+            await db.settle_bet(
+                user_id, Decimal(str(bet)), Decimal(str(win_amount)),
+                bet_type="balance", win_type="balance", meta={"game": "roulette", "round": round_id, "roll": value},
+            )
+        except ValueError:
+            return await call.answer(tr("common.no_funds"), show_alert=True)
+    elif win:
+        await change_balance(user_id, win_amount, meta={"game": "roulette", "round": round_id, "roll": value})
+    if not win:
         await award_loss_commission(user_id, bet)
 
-    await log_roulette_game(user_id, bet, win_amount, "win" if win else "lose", call.from_user.username)
+    await log_roulette_game(
+        user_id, bet, win_amount, "win" if win else "lose", call.from_user.username, fair=fair, proof=proof, round_id=round_id,
+    )
 
-    if lang == "ru":
-        result_text = (
-            f"🎰 Выпало: {value}\n"
-            f"{'🎉 Победа' if win else '❌ Проигрыш'}\n"
-            f"{'Выигрыш' if win else 'Потеря'}: {win_amount if win else bet:.2f}$"
-        )
+    if win:
+        result_text = tr("roulette.won", value=value, amount=win_amount)
     else:
-        result_text = (
-            f"🎰 Rolled: {value}\n"
-            f"{'🎉 Win' if win else '❌ Lose'}\n"
-            f"{'Payout' if win else 'Lost'}: {win_amount if win else bet:.2f}$"
-        )
+        result_text = tr("roulette.lost", value=value, amount=bet)
     kb = InlineKeyboardMarkup(
         inline_keyboard=[
-            [InlineKeyboardButton(text="🎰 Ещё" if lang == "ru" else "🎰 Again", callback_data="game_roulette")],
-            [InlineKeyboardButton(text="⬅️ Назад" if lang == "ru" else "⬅️ Back", callback_data="games_menu")],
+            [InlineKeyboardButton(text=tr("roulette.again"), callback_data="game_roulette")],
+            [InlineKeyboardButton(text=tr("common.back"), callback_data="games_menu")],
         ]
     )
-    await call.message.answer(result_text, reply_markup=kb)
+    if emoji_rng.SERVER_MODE:
+        emoji_rng.show_later(call.message, "🎰", result_text, tr, reply_markup=kb)
+    else:
+        await call.message.answer(result_text, reply_markup=kb)
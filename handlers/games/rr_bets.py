@@ -1,7 +1,9 @@
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 from aiogram.types import InlineKeyboardButton
 
-def rr_bets_keyboard(lang: str):
+from services.i18n import Translator
+
+def rr_bets_keyboard(tr: Translator):
     kb = InlineKeyboardBuilder()
 
     # Ставки
@@ -13,7 +15,7 @@ def rr_bets_keyboard(lang: str):
     # Кнопка назад
     kb.row(
         InlineKeyboardButton(
-            text="⬅️ Назад" if lang == "ru" else "⬅️ Back",
+            text=tr("common.back"),
             callback_data="rr_back"
         )
     )
@@ -0,0 +1,53 @@
+from aiogram import Router, F
+from aiogram.types import CallbackQuery
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+from services.i18n import Translator
+from services.leaderboards import METRICS, PERIODS, TOP, leaderboards
+
+router = Router()
+
+MEDALS = ("🥇", "🥈", "🥉")
+
+
+def _player(user_id: int) -> str:
+    # No usernames are stored; the tail of the id is enough to find yourself.
+    return f"ID •••{str(user_id)[-4:]}"
+
+
+def _score(metric: str, score: float) -> str:
+    return f"{score:.0f}" if metric == "duels" else f"{score:.2f}$"
+
+
+# lb:{metric}:{period}
+@router.callback_query(F.data.startswith("lb:"))
+async def open_leaderboard(call: CallbackQuery, tr: Translator):
+    parts = call.data.split(":")
+    metric = parts[1] if len(parts) > 1 and parts[1] in METRICS else "win"
+    period = parts[2] if len(parts) > 2 and parts[2] in PERIODS else "day"
+
+    board = leaderboards.board(metric, period)
+    lines = [f"<b>{tr(f'leaderboard.metric.{metric}')}</b> • {tr(f'leaderboard.period.{period}')}\n"]
+    for place, (user_id, score) in enumerate(board.top(TOP), 1):
+        badge = MEDALS[place - 1] if place <= len(MEDALS) else f"{place}."
+        you = tr("leaderboard.you") if user_id == call.from_user.id else ""
+        lines.append(f"{badge} {_player(user_id)} — <b>{_score(metric, score)}</b>{you}")
+    if not len(board):
+        lines.append(tr("leaderboard.empty"))
+
+    rank = board.rank(call.from_user.id)
+    if rank is not None:
+        score = _score(metric, board.scores[call.from_user.id])
+        lines.append(tr("leaderboard.rank", rank=rank, count=len(board), score=score))
+
+    kb = InlineKeyboardBuilder()
+    for key in METRICS:
+        name = tr(f"leaderboard.button.{key}")
+        kb.button(text=("• " if key == metric else "") + name, callback_data=f"lb:{key}:{period}")
+    for key in PERIODS:
+        name = tr(f"leaderboard.period.{key}")
+        kb.button(text=("• " if key == period else "") + name, callback_data=f"lb:{metric}:{key}")
+    kb.button(text=tr("common.back"), callback_data="back")
+    kb.adjust(3, 3, 1)
+
+    await call.message.edit_text("\n".join(lines), reply_markup=kb.as_markup())
@@ -4,20 +4,21 @@ from aiogram.types import Message, CallbackQuery
 from keyboards.menu import main_menu
 from keyboards.language import language_keyboard
 from database import db
+from services.i18n import Translator, i18n
 router = Router()
 
 @router.message(F.text == "/menu")
-async def open_menu_msg(msg: Message, lang: str):
-    await msg.answer(build_menu_text(lang), reply_markup=main_menu(lang))
+async def open_menu_msg(msg: Message, tr: Translator):
+    await msg.answer(tr("menu.text"), reply_markup=main_menu(tr.lang))
 
 @router.callback_query(F.data == "back")
-async def open_menu_cb(call: CallbackQuery, lang: str):
-    await call.message.edit_text(build_menu_text(lang), reply_markup=main_menu(lang))
+async def open_menu_cb(call: CallbackQuery, tr: Translator):
+    await call.message.edit_text(tr("menu.text"), reply_markup=main_menu(tr.lang))
 
 @router.callback_query(F.data == "change_language")
-async def change_language(call: CallbackQuery, lang: str):
+async def change_language(call: CallbackQuery, tr: Translator):
     await call.message.edit_text(
-        "Выберите язык / Choose language:",
+        tr("language.choose"),
         reply_markup=language_keyboard()
     )
 @router.callback_query(F.data.startswith("lang_"))
@@ -32,30 +33,7 @@ async def change_language(call: CallbackQuery):
         WHERE user_id=?
     """, (lang_code, user_id))
 
-    await call.answer("Language updated.")
     # Обновляем меню, иначе используется старый lang
-    from keyboards.menu import main_menu
-    await call.message.edit_text("✔ Language updated.", reply_markup=main_menu(lang_code))
-
-
-
-def build_menu_text(lang: str) -> str:
-    if lang == "ru":
-        return (
-            "👋 <b>Добро пожаловать в Casino Bot</b>\n"
-            "Выбирай, чем заняться прямо сейчас:\n"
-            "• 🎮 Игры и быстрые режимы\n"
-            "• ⚔️ Дуэли с живыми игроками\n"
-            "• 🎁 Розыгрыши банка на команду\n"
-            "• 📤 Вывод и 👥 Рефералы\n\n"
-            "Нажми кнопку ниже, чтобы начать."
-        )
-    return (
-        "👋 <b>Welcome to Casino Bot</b>\n"
-        "Pick what you want to do now:\n"
-        "• 🎮 Games and quick modes\n"
-        "• ⚔️ Duels with real players\n"
-        "• 🎁 Raffles for everyone who joins\n"
-        "• 📤 Withdrawals and 👥 Referrals\n\n"
-        "Use the buttons below to start."
-    )
+    tr = i18n(lang_code)
+    await call.answer(tr("language.updated"))
+    await call.message.edit_text(tr("language.updated"), reply_markup=main_menu(lang_code))
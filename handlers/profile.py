@@ -3,13 +3,27 @@ from aiogram.types import CallbackQuery
 
 from keyboards.deposit import deposit_keyboard
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from database.db import db
+from database.db import db, HISTORY_COLUMNS
+from services.i18n import Translator
+from services.ledger import history
 
 router = Router()
 
+HISTORY_PAGE = 10
+
+# filter key -> ledger types (None: everything)
+HISTORY_FILTERS = {
+    "all": None,
+    "dep": ("deposit",),
+    "wd": ("withdraw_hold", "withdraw_paid", "withdraw_refund"),
+    "duel": ("duel_bet", "duel_win", "duel_refund"),
+    "raffle": ("raffle_entry", "raffle_win", "raffle_refund"),
+    "game": ("balance", "bet", "win", "sport_bet", "sport_win", "autoplay", "refund", "expired", "recovery"),
+}
+
 
 @router.callback_query(F.data == "profile")
-async def open_profile(call: CallbackQuery, lang: str):
+async def open_profile(call: CallbackQuery, tr: Translator):
     user_id = call.from_user.id
 
     row = await db.fetchone("""
@@ -21,54 +35,72 @@ async def open_profile(call: CallbackQuery, lang: str):
     """, (user_id,))
 
     if not row:
-        return await call.answer("Пользователь не найден", show_alert=True)
+        return await call.answer(tr("profile.not_found"), show_alert=True)
 
     user_lang, balance, refs_total, refs_earned, games_played, games_won, games_lost = row
 
-    # -----------------------------
-    # RU VERSION
-    # -----------------------------
-    if lang == "ru":
-        text = (
-            f"<b>👤 Профиль игрока</b>\n\n"
-            f"<b>ID:</b> <code>{user_id}</code>\n"
-            f"<b>Язык:</b> {user_lang}\n\n"
-
-            f"<b>💳 Финансы</b>\n"
-            f"Основной баланс: <b>{balance:.2f}$</b>\n"
-            f"Доход с рефералов: <b>{refs_earned:.2f}$</b>\n"
-            f"Рефералов привлечено: <b>{refs_total}</b>\n\n"
-
-            f"<b>📊 Статистика игр</b>\n"
-            f"Сыграно игр: <b>{games_played}</b>\n"
-            f"Побед: <b>{games_won}</b>\n"
-            f"Поражений: <b>{games_lost}</b>\n"
-        )
+    text = tr(
+        "profile.text",
+        user_id=user_id, lang=user_lang, balance=balance, refs_earned=refs_earned, refs_total=refs_total,
+        games_played=games_played, games_won=games_won, games_lost=games_lost,
+    )
+
+    kb = InlineKeyboardBuilder()
+    kb.button(text=tr("profile.deposit"), callback_data="deposit")
+    kb.button(text=tr("profile.withdraw"), callback_data="withdraw_menu")
+    kb.button(text=tr("profile.history"), callback_data="h:all")
+    kb.button(text=tr("profile.fairness"), callback_data="fair_menu")
+    kb.button(text=tr("common.back"), callback_data="back")
+    kb.adjust(2, 2, 1)
+
+    await call.message.edit_text(text, reply_markup=kb.as_markup())
+
+
+# -----------------------------
+# HISTORY
+# -----------------------------
+# Callback data carries the page cursor: h:{filter} is the newest page,
+# h:{filter}:n:{id} the page older than id, h:{filter}:p:{id} the page newer
+# than id. Every page is one keyset query, however deep the user scrolls.
+@router.callback_query(F.data.startswith("h:"))
+async def open_history(call: CallbackQuery, tr: Translator):
+    parts = call.data.split(":")
+    flt = parts[1] if parts[1] in HISTORY_FILTERS else "all"
+    direction, cursor = (parts[2], int(parts[3])) if len(parts) == 4 else (None, None)
+    types = HISTORY_FILTERS[flt]
 
-    # -----------------------------
-    # EN VERSION
-    # -----------------------------
+    if direction == "p":
+        rows = await history(
+            call.from_user.id, after_id=cursor, limit=HISTORY_PAGE + 1, types=types, columns=HISTORY_COLUMNS,
+        )
+        newer, older = len(rows) > HISTORY_PAGE, True
+        rows = rows[-HISTORY_PAGE:]
     else:
-        text = (
-            f"<b>👤 Player Profile</b>\n\n"
-            f"<b>ID:</b> <code>{user_id}</code>\n"
-            f"<b>Language:</b> {user_lang}\n\n"
-
-            f"<b>💳 Finances</b>\n"
-            f"Main balance: <b>{balance:.2f}$</b>\n"
-            f"Referral income: <b>{refs_earned:.2f}$</b>\n"
-            f"Total referrals: <b>{refs_total}</b>\n\n"
-
-            f"<b>📊 Game Statistics</b>\n"
-            f"Games played: <b>{games_played}</b>\n"
-            f"Wins: <b>{games_won}</b>\n"
-            f"Losses: <b>{games_lost}</b>\n"
+        rows = await history(
+            call.from_user.id, before_id=cursor, limit=HISTORY_PAGE + 1, types=types, columns=HISTORY_COLUMNS,
         )
+        newer, older = direction == "n", len(rows) > HISTORY_PAGE
+        rows = rows[:HISTORY_PAGE]
+
+    lines = [f"<b>{tr('history.title')}</b> • {tr(f'history.filter.{flt}')}\n"]
+    for row in rows:
+        name = tr.get(f"history.tx.{row['type']}", row["type"])
+        when = row["created_at"][:16].replace("T", " ")
+        lines.append(f"<code>{when}</code> {name}: <b>{row['amount']:+.2f}$</b>")
+    if not rows:
+        lines.append(tr("history.empty"))
 
     kb = InlineKeyboardBuilder()
-    kb.button(text="💳 Пополнить" if lang == "ru" else "💳 Deposit", callback_data="deposit")
-    kb.button(text="📤 Вывод" if lang == "ru" else "📤 Withdraw", callback_data="withdraw_menu")
-    kb.button(text="⬅️ Назад" if lang == "ru" else "⬅️ Back", callback_data="back")
-    kb.adjust(2, 1)
+    for key in HISTORY_FILTERS:
+        kb.button(text=("• " if key == flt else "") + tr(f"history.filter.{key}"), callback_data=f"h:{key}")
+    nav = 0
+    if newer and rows:
+        kb.button(text=tr("history.newer"), callback_data=f"h:{flt}:p:{rows[0]['id']}")
+        nav += 1
+    if older and rows:
+        kb.button(text=tr("history.older"), callback_data=f"h:{flt}:n:{rows[-1]['id']}")
+        nav += 1
+    kb.button(text=tr("history.to_profile"), callback_data="profile")
+    kb.adjust(3, 3, *([nav] if nav else []), 1)
 
-    await call.message.edit_text(text, reply_markup=kb.as_markup())
+    await call.message.edit_text("\n".join(lines), reply_markup=kb.as_markup())
@@ -1,51 +1,79 @@
 # handlers/referrals.py
 from aiogram import Router, F
-from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup
-from database.db import db
+from aiogram.types import CallbackQuery
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+from database.db import REFERRAL_DEPTH, db
+from keyboards.menu import get_bot_username
+from services.i18n import Translator
 
 router = Router()
 
+REFERRALS_PAGE = 20
+
 
 @router.callback_query(F.data == "ref_menu")
-async def ref_menu(call: CallbackQuery, lang: str):
+async def ref_menu(call: CallbackQuery, tr: Translator):
     user_id = call.from_user.id
 
     row = await db.fetchone("""
-        SELECT refs_total, refs_earned, referred_by 
-        FROM users 
+        SELECT refs_total, refs_earned, referred_by
+        FROM users
         WHERE user_id = ?
     """, (user_id,))
 
+    kb = InlineKeyboardBuilder()
     if row:
         refs_total, refs_earned, referred_by = row
-        ref_link = f"https://t.me/vornexBot?start=ref{user_id}"
-
-        if lang == "ru":
-            text = (
-                f"<b>🤝 Реферальная система</b>\n\n"
-                f"👥 Приглашено: <b>{refs_total}</b>\n"
-                f"💰 Заработано: <b>{refs_earned:.2f}$</b>\n\n"
-                f"<b>🔗 Ваша ссылка:</b>\n{ref_link}\n\n"
-                f"Приглашайте друзей и получайте:\n"
-                f"• 10% с их проигрышей в играх\n"
-            )
-        else:
-            text = (
-                f"<b>🤝 Referral system</b>\n\n"
-                f"👥 Invited: <b>{refs_total}</b>\n"
-                f"💰 Earned: <b>{refs_earned:.2f}$</b>\n\n"
-                f"<b>🔗 Your link:</b>\n{ref_link}\n\n"
-                f"Invite friends and earn:\n"
-                f"• 10% of their in-game losses\n"
+        ref_link = f"https://t.me/{get_bot_username() or 'vornexBot'}?start=ref{user_id}"
+        levels = await db.count_referrals(user_id)
+        text = tr("referrals.text", refs_total=refs_total or 0, refs_earned=refs_earned or 0, link=ref_link)
+        if len(levels) > 1:
+            text += "\n" + tr(
+                "referrals.levels",
+                levels=" / ".join(str(levels.get(depth, 0)) for depth in range(1, REFERRAL_DEPTH + 1)),
             )
-
+        if levels:
+            kb.button(text=tr("referrals.list"), callback_data="ref_list:1")
     else:
-        text = "❌ Ошибка загрузки данных" if lang == "ru" else "❌ Error loading data"
+        text = tr("referrals.error")
+
+    kb.button(text=tr("common.back"), callback_data="dep_back")
+    kb.adjust(1)
+
+    await call.message.edit_text(text, reply_markup=kb.as_markup())
+
+
+# ref_list:{depth} is the first page of a level, ref_list:{depth}:{user id}
+# the page after that user; one range of the referral_tree primary key.
+@router.callback_query(F.data.startswith("ref_list:"))
+async def ref_list(call: CallbackQuery, tr: Translator):
+    parts = call.data.split(":")
+    try:
+        depth = min(max(int(parts[1]), 1), REFERRAL_DEPTH)
+        after = int(parts[2]) if len(parts) > 2 else 0
+    except ValueError:
+        depth, after = 1, 0
+
+    rows = await db.get_referrals(call.from_user.id, depth, after=after, limit=REFERRALS_PAGE + 1)
+    more = len(rows) > REFERRALS_PAGE
+    rows = rows[:REFERRALS_PAGE]
+
+    lines = [f"<b>{tr('referrals.list_title', depth=depth)}</b>\n"]
+    for descendant, created_at in rows:
+        lines.append(f"<code>{descendant}</code> • {(created_at or '')[:10]}")
+    if not rows:
+        lines.append(tr("referrals.list_empty"))
 
-    # Кнопка назад
-    back_label = "⬅️ Назад" if lang == "ru" else "⬅️ Back"
-    keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[[InlineKeyboardButton(text=back_label, callback_data="dep_back")]]
-    )
+    kb = InlineKeyboardBuilder()
+    for level in range(1, REFERRAL_DEPTH + 1):
+        kb.button(
+            text=("• " if level == depth else "") + tr("referrals.level", depth=level),
+            callback_data=f"ref_list:{level}",
+        )
+    if more:
+        kb.button(text=tr("referrals.next"), callback_data=f"ref_list:{depth}:{rows[-1][0]}")
+    kb.button(text=tr("common.back"), callback_data="ref_menu")
+    kb.adjust(REFERRAL_DEPTH, 1, 1)
 
-    await call.message.edit_text(text, reply_markup=keyboard)
+    await call.message.edit_text("\n".join(lines), reply_markup=kb.as_markup())
@@ -1,45 +1,45 @@
 # handlers/start.py - с исправленной проверкой подписки
 from aiogram import Router, F
-from aiogram.types import Message, CallbackQuery
+from aiogram.types import Message, CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.filters import Command
 
 from keyboards.language import language_keyboard
 from keyboards.menu import main_menu
 from database.db import db
+from services.i18n import Translator, i18n
+from services.referrals import register_referral
 from services.settings import get_channels
 
 router = Router()
 
 
+def subscription_prompt(
+    tr: Translator, channel_info: list[dict], retry: bool = False
+) -> tuple[str, InlineKeyboardMarkup]:
+    """Text and keyboard asking to subscribe to the channels in ``channel_info``."""
+    lines = [tr("subscription.still_missing" if retry else "subscription.required"), ""]
+    lines += [tr("subscription.channel", name=info['name']) for info in channel_info]
+    if not retry:
+        lines += ["", tr("subscription.hint")]
+    buttons = [[InlineKeyboardButton(text=tr("subscription.subscribe"), url=info['link'])] for info in channel_info]
+    buttons.append([InlineKeyboardButton(text=tr("subscription.check"), callback_data="check_subscription")])
+    return "\n".join(lines), InlineKeyboardMarkup(inline_keyboard=buttons)
+
+
 @router.message(Command("start"))
-async def cmd_start(message: Message):
+async def cmd_start(message: Message, tr: Translator):
     args = message.text.split()
     user_id = message.from_user.id
 
-    # Проверяем: новый ли юзер
-    row = await db.fetchone("SELECT 1 FROM users WHERE user_id=?", (user_id,))
-    is_new = row is None
-
-    # Обработка реферальной ссылки
-    if is_new and len(args) > 1 and args[1].startswith("ref"):
+    # Обработка реферальной ссылки: засчитывается, пока у игрока нет
+    # пригласившего и он ещё не играл (строку в users уже создал middleware)
+    if len(args) > 1 and args[1].startswith("ref"):
         try:
             inviter_id = int(args[1][3:])
-            if inviter_id != user_id:
-                await db.execute(
-                    "INSERT OR REPLACE INTO referrals (user_id, referred_by) VALUES (?,?)",
-                    (user_id, inviter_id)
-                )
-                await db.execute("""
-                    INSERT INTO referral_stats (user_id, total_refs, earned)
-                    VALUES (?,1,0)
-                    ON CONFLICT(user_id) DO UPDATE SET total_refs = total_refs + 1
-                    """, (inviter_id,))
-                await db.execute(
-                    "UPDATE users SET bonus = bonus + 1 WHERE user_id=?",
-                    (inviter_id,)
-                )
-        except:
-            pass
+        except ValueError:
+            inviter_id = None
+        if inviter_id:
+            await register_referral(user_id, inviter_id)
 
     # Проверяем язык пользователя
     row = await db.fetchone(
@@ -58,7 +58,7 @@ async def cmd_start(message: Message):
     # Если язык ещё не выбран → показываем меню выбора
     if row is None:
         await message.answer(
-            "Выберите язык / Choose language:",
+            tr("language.choose"),
             reply_markup=language_keyboard()
         )
         return
@@ -108,32 +108,7 @@ async def cmd_start(message: Message):
 
     # Если не подписан - показываем запрос подписки
     if not_subscribed:
-        from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-
-        if lang == "ru":
-            text = "📢 Для использования бота необходимо подписаться на наши каналы:\n\n"
-            for info in channel_info:
-                text += f"• {info['name']}\n"
-            text += "\nПосле подписки нажмите кнопку 'Проверить подписку' ✅"
-        else:
-            text = "📢 To use the bot you need to subscribe to our channels:\n\n"
-            for info in channel_info:
-                text += f"• {info['name']}\n"
-            text += "\nAfter subscribing, click the 'Check subscription' button ✅"
-
-        buttons = []
-        for info in channel_info:
-            buttons.append([InlineKeyboardButton(
-                text=f"📢 Подписаться" if lang == "ru" else f"📢 Subscribe",
-                url=info['link']
-            )])
-
-        buttons.append([InlineKeyboardButton(
-            text="✅ Проверить подписку" if lang == "ru" else "✅ Check subscription",
-            callback_data="check_subscription"
-        )])
-
-        keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
+        text, keyboard = subscription_prompt(i18n(lang), channel_info)
         await message.answer(text, reply_markup=keyboard)
         return
 
@@ -141,31 +116,19 @@ async def cmd_start(message: Message):
     if duel_id:
         duel = await db.get_duel(duel_id)
         if duel and duel["status"] == "waiting":
-            from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-            game = "Кубик" if duel["game"] == "dice" else "Рулетка 🎯"
-            game_en = "Dice" if duel["game"] == "dice" else "Darts 🎯"
-            text = (
-                f"⚔️ Приглашение в дуэль\n"
-                f"Игра: {game}\n"
-                f"Ставка: {duel['bet']:.2f}$\n"
-                "Готовы вступить?"
-            ) if lang == "ru" else (
-                f"⚔️ Duel invite\n"
-                f"Game: {game_en}\n"
-                f"Stake: {duel['bet']:.2f}$\n"
-                "Join?"
-            )
+            tr = i18n(lang)
+            game = tr("duel_invite.dice" if duel["game"] == "dice" else "duel_invite.darts")
+            text = tr("duel_invite.text", game=game, bet=duel['bet'])
             kb = InlineKeyboardMarkup(
                 inline_keyboard=[
-                    [InlineKeyboardButton(text="✅ Вступить" if lang == "ru" else "✅ Join", callback_data=f"duel_join:{duel_id}")],
-                    [InlineKeyboardButton(text="⬅️ Меню" if lang == "ru" else "⬅️ Menu", callback_data="back")],
+                    [InlineKeyboardButton(text=tr("duel_invite.join"), callback_data=f"duel_join:{duel_id}")],
+                    [InlineKeyboardButton(text=tr("common.menu"), callback_data="back")],
                 ]
             )
             await message.answer(text, reply_markup=kb)
             return
 
-    text = "Добро пожаловать в Casino Bot 🎰" if lang == "ru" else "Welcome to Casino Bot 🎰"
-    await message.answer(text, reply_markup=main_menu(lang))
+    await message.answer(i18n(lang)("menu.greeting"), reply_markup=main_menu(lang))
 
 
 @router.callback_query(F.data.startswith("lang_"))
@@ -223,41 +186,12 @@ async def set_language(call: CallbackQuery):
 
     # Если не подписан
     if not_subscribed:
-        if lang == "ru":
-            text = "📢 Для использования бота необходимо подписаться на наши каналы:\n\n"
-            for info in channel_info:
-                text += f"• {info['name']}\n"
-            text += "\nПосле подписки нажмите кнопку 'Проверить подписку' ✅"
-        else:
-            text = "📢 To use the bot you need to subscribe to our channels:\n\n"
-            for info in channel_info:
-                text += f"• {info['name']}\n"
-            text += "\nAfter subscribing, click the 'Check subscription' button ✅"
-
-        from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-        buttons = []
-        for info in channel_info:
-            buttons.append([InlineKeyboardButton(
-                text=f"📢 Подписаться" if lang == "ru" else f"📢 Subscribe",
-                url=info['link']
-            )])
-
-        buttons.append([InlineKeyboardButton(
-            text="✅ Проверить подписку" if lang == "ru" else "✅ Check subscription",
-            callback_data="check_subscription"
-        )])
-
-        keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
+        text, keyboard = subscription_prompt(i18n(lang), channel_info)
         await call.message.edit_text(text, reply_markup=keyboard)
         return
 
     # Если подписан
-    text = (
-        "Язык установлен: Русский 🇷🇺\n\nДобро пожаловать в Casino Bot 🎰"
-        if lang == "ru"
-        else "Language set: English 🇬🇧\n\nWelcome to Casino Bot 🎰"
-    )
-    await call.message.edit_text(text, reply_markup=main_menu(lang))
+    await call.message.edit_text(i18n(lang)("language.set"), reply_markup=main_menu(lang))
 
 
 @router.callback_query(F.data == "check_subscription")
@@ -318,35 +252,9 @@ async def check_subscription(call: CallbackQuery):
                 'link': channel_link
             })
 
-        if lang == "ru":
-            text = "❌ Вы всё ещё не подписаны на все каналы!\n\n"
-            for info in channel_info:
-                text += f"• {info['name']}\n"
-        else:
-            text = "❌ You are still not subscribed to all channels!\n\n"
-            for info in channel_info:
-                text += f"• {info['name']}\n"
-
-        from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-        buttons = []
-        for info in channel_info:
-            buttons.append([InlineKeyboardButton(
-                text=f"📢 Подписаться" if lang == "ru" else f"📢 Subscribe",
-                url=info['link']
-            )])
-
-        buttons.append([InlineKeyboardButton(
-            text="✅ Проверить подписку" if lang == "ru" else "✅ Check subscription",
-            callback_data="check_subscription"
-        )])
-
-        keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
+        text, keyboard = subscription_prompt(i18n(lang), channel_info, retry=True)
         await call.message.edit_text(text, reply_markup=keyboard)
         return
 
     # Если подписан на все каналы
-    text = "✅ Отлично! Вы подписаны на все каналы!\n\n"
-    text += "Добро пожаловать в Casino Bot 🎰" if lang == "ru" else "Welcome to Casino Bot 🎰"
-
-    from keyboards.menu import main_menu
-    await call.message.edit_text(text, reply_markup=main_menu(lang))
+    await call.message.edit_text(i18n(lang)("subscription.done"), reply_markup=main_menu(lang))
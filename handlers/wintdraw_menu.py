@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 from aiogram import Router, F
 from aiogram.types import CallbackQuery, Message, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.fsm.context import FSMContext
@@ -107,17 +109,14 @@ async def withdraw_confirm(call: CallbackQuery, state: FSMContext, lang: str):
     wallet = data["wallet"]
     user_id = call.from_user.id
 
-    # Списываем баланс сразу
-    await db.execute(
-        "UPDATE users SET balance = balance - ? WHERE user_id=?",
-        (amount, user_id)
-    )
-
-    # Создаем заявку
-    await db.execute("""
-        INSERT INTO withdrawals (user_id, amount, wallet, status, created_at)
-        VALUES (?, ?, ?, 'pending', datetime('now'))
-    """, (user_id, amount, wallet))
+    # Списываем баланс и создаём заявку одной транзакцией
+    try:
+        await db.create_withdrawal(user_id, Decimal(str(amount)), wallet)
+    except ValueError:
+        await state.clear()
+        return await call.message.edit_text(
+            "❌ Недостаточно средств." if lang == "ru" else "❌ Not enough balance."
+        )
 
     text = (
         "✅ Заявка на вывод создана.\nОжидайте подтверждения."
@@ -4,10 +4,10 @@ from aiogram.fsm.context import FSMContext
 from states.withdraw import WithdrawState
 import re
 from decimal import Decimal
-from datetime import datetime
 
 from services.balance import get_balance
 from database.db import db
+from services.i18n import Translator
 
 router = Router()
 
@@ -16,66 +16,39 @@ router = Router()
 #  ОТКРЫТИЕ МЕНЮ ВЫВОДА
 # ================================
 @router.callback_query(F.data == "withdraw_menu")
-async def withdraw_menu(call: CallbackQuery, lang: str, state: FSMContext):
+async def withdraw_menu(call: CallbackQuery, tr: Translator, state: FSMContext):
     await state.set_state(WithdrawState.waiting_amount)
 
-    text = (
-        "💸 <b>Вывод средств</b>\n\n"
-        "Введите сумму, которую хотите вывести (в USD):"
-        if lang == "ru"
-        else
-        "💸 <b>Withdrawal</b>\n\n"
-        "Enter the amount you want to withdraw (in USD):"
-    )
-
-    await call.message.edit_text(text)
+    await call.message.edit_text(tr("withdraw.text"))
 
 
 # ================================
 #  СУММА ВЫВОДА
 # ================================
 @router.message(WithdrawState.waiting_amount)
-async def withdraw_amount(msg: Message, state: FSMContext, lang: str):
+async def withdraw_amount(msg: Message, state: FSMContext, tr: Translator):
     try:
         amount = Decimal(msg.text.strip())
         if amount < Decimal("5"):
             raise ValueError
     except:
-        return await msg.answer(
-            "Минимальная сумма вывода — <b>5$</b>."
-            if lang == "ru" else
-            "Minimum withdrawal is <b>$5</b>."
-        )
+        return await msg.answer(tr("withdraw.minimum"))
 
     balance = Decimal(str(await get_balance(msg.from_user.id)))
     if amount > balance:
-        return await msg.answer(
-            "❌ Недостаточно средств для вывода."
-            if lang == "ru" else
-            "❌ Insufficient balance."
-        )
+        return await msg.answer(tr("withdraw.insufficient"))
 
     await state.update_data(amount=str(amount))
     await state.set_state(WithdrawState.waiting_wallet)
 
-    text = (
-        "Введите ваш кошелёк для вывода:\n\n"
-        "• <b>USDT TRC-20</b>\n"
-        "• <b>TON Wallet</b> (адрес EQ... или ton://)"
-        if lang == "ru" else
-        "Enter your withdrawal wallet:\n\n"
-        "• <b>USDT TRC-20</b>\n"
-        "• <b>TON Wallet</b> (address EQ... or ton://)"
-    )
-
-    await msg.answer(text)
+    await msg.answer(tr("withdraw.wallet_prompt"))
 
 
 # ================================
 #  ПРОВЕРКА КОШЕЛЬКА + СОЗДАНИЕ ЗАЯВКИ
 # ================================
 @router.message(WithdrawState.waiting_wallet)
-async def withdraw_wallet(msg: Message, state: FSMContext, lang: str):
+async def withdraw_wallet(msg: Message, state: FSMContext, tr: Translator):
     wallet = msg.text.strip()
 
     # --------------------------
@@ -88,11 +61,7 @@ async def withdraw_wallet(msg: Message, state: FSMContext, lang: str):
     valid = trc20_ok or ton_ok
 
     if not valid:
-        return await msg.answer(
-            "❌ Неверный адрес кошелька.\nПоддерживаемые сети:\n• USDT TRC-20\n• TON"
-            if lang == "ru" else
-            "❌ Invalid wallet address.\nSupported networks:\n• USDT TRC-20\n• TON"
-        )
+        return await msg.answer(tr("withdraw.invalid_wallet"))
 
     data = await state.get_data()
     amount = Decimal(str(data["amount"]))
@@ -101,40 +70,14 @@ async def withdraw_wallet(msg: Message, state: FSMContext, lang: str):
     #  СОЗДАЁМ ЗАЯВКУ В БАЗЕ
     # --------------------------
     # Atomic: create request + deduct balance + ledger entry in one DB transaction
-    now = datetime.utcnow().isoformat()
-    async with db.transaction() as conn:
-        cur = await conn.execute("SELECT balance FROM users WHERE user_id=?", (msg.from_user.id,))
-        row = await cur.fetchone()
-        before = Decimal(str(row[0])) if row else Decimal("0")
-        after = before - amount
-        if after < 0:
-            raise ValueError("Insufficient balance")
-
-        await conn.execute("UPDATE users SET balance=?, updated_at=? WHERE user_id=?", (float(after), now, msg.from_user.id))
-        await conn.execute(
-            """INSERT INTO transactions (user_id, amount, type, method, before, after, meta, created_at)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-            (msg.from_user.id, float(-amount), "withdraw_hold", "system", float(before), float(after), wallet, now),
-        )
-        await conn.execute(
-            "INSERT INTO withdrawals (user_id, amount, wallet, status, created_at) VALUES (?, ?, ?, 'pending', ?)",
-            (msg.from_user.id, float(amount), wallet, now),
-        )
+    try:
+        await db.create_withdrawal(msg.from_user.id, amount, wallet)
+    except ValueError:
+        await state.clear()
+        return await msg.answer(tr("withdraw.insufficient"))
 
     # --------------------------
     #  ОТВЕТ ПОЛЬЗОВАТЕЛЮ
     # --------------------------
-    text = (
-        f"📤 <b>Заявка на вывод создана</b>\n\n"
-        f"Сумма: <b>{float(amount):.2f}$</b>\n"
-        f"Кошелёк:\n<code>{wallet}</code>\n\n"
-        "Ожидайте обработки администрацией."
-        if lang == "ru" else
-        f"📤 <b>Withdrawal request submitted</b>\n\n"
-        f"Amount: <b>{amount}$</b>\n"
-        f"Wallet:\n<code>{wallet}</code>\n\n"
-        "Please wait for manual approval."
-    )
-
-    await msg.answer(text)
+    await msg.answer(tr("withdraw.submitted", amount=float(amount), wallet=wallet))
     await state.clear()
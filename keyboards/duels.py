@@ -2,87 +2,100 @@ from aiogram.types import InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from keyboards.menu import get_bot_username
+from services.i18n import i18n
 
 
-def duel_bets_keyboard(lang: str):
+def duel_bets_keyboard(lang: str, quick: bool = False):
+    tr = i18n(lang)
     kb = InlineKeyboardBuilder()
     amounts = [1, 5, 10, 25, 50, 100]
+    prefix = "duel_qbet" if quick else "duel_bet"
     for chunk in [amounts[i : i + 3] for i in range(0, len(amounts), 3)]:
         kb.row(
             *[
                 InlineKeyboardButton(
                     text=f"{amount}$",
-                    callback_data=f"duel_bet:{amount}",
+                    callback_data=f"{prefix}:{amount}",
                 )
                 for amount in chunk
             ]
         )
 
+    if not quick:
+        kb.row(
+            InlineKeyboardButton(
+                text=tr("duels.button.quick"),
+                callback_data="duel_quick_menu",
+            )
+        )
     kb.row(
         InlineKeyboardButton(
-            text="⬅️ В меню" if lang == "ru" else "⬅️ Menu",
+            text=tr("duels.button.to_menu"),
             callback_data="back",
         )
     )
     return kb.as_markup()
 
 
-def duel_game_keyboard(bet: float, lang: str):
+def duel_game_keyboard(bet: float, lang: str, quick: bool = False):
+    tr = i18n(lang)
     kb = InlineKeyboardBuilder()
+    prefix = "duel_quick" if quick else "duel_game"
     kb.row(
         InlineKeyboardButton(
-            text="🎲 Кубик" if lang == "ru" else "🎲 Dice",
-            callback_data=f"duel_game:{bet}:dice",
+            text=f"🎲 {tr('games.name.dice')}",
+            callback_data=f"{prefix}:{bet}:dice",
         ),
         InlineKeyboardButton(
-            text="🎯 Дартс" if lang == "ru" else "🎯 Darts",
-            callback_data=f"duel_game:{bet}:darts",
+            text=f"🎯 {tr('games.name.darts')}",
+            callback_data=f"{prefix}:{bet}:darts",
         ),
     )
     kb.row(
         InlineKeyboardButton(
-            text="⚽️ Футбол" if lang == "ru" else "⚽️ Football",
-            callback_data=f"duel_game:{bet}:football",
+            text=f"⚽️ {tr('games.name.football')}",
+            callback_data=f"{prefix}:{bet}:football",
         ),
         InlineKeyboardButton(
-            text="🏀 Баскетбол" if lang == "ru" else "🏀 Basketball",
-            callback_data=f"duel_game:{bet}:basketball",
+            text=f"🏀 {tr('games.name.basketball')}",
+            callback_data=f"{prefix}:{bet}:basketball",
         ),
     )
     kb.row(
         InlineKeyboardButton(
-            text="🎳 Боулинг" if lang == "ru" else "🎳 Bowling",
-            callback_data=f"duel_game:{bet}:bowling",
+            text=f"🎳 {tr('games.name.bowling')}",
+            callback_data=f"{prefix}:{bet}:bowling",
         ),
     )
     kb.row(
         InlineKeyboardButton(
-            text="⬅️ Назад" if lang == "ru" else "⬅️ Back",
-            callback_data="duels",
+            text=tr("common.back"),
+            callback_data="duel_quick_menu" if quick else "duels",
         )
     )
     return kb.as_markup()
 
 
 def duel_wait_keyboard(duel_id: int, lang: str):
+    tr = i18n(lang)
     kb = InlineKeyboardBuilder()
     username = get_bot_username()
     if username:
         kb.row(
             InlineKeyboardButton(
-                text="🔗 Поделиться дуэлью" if lang == "ru" else "🔗 Share duel",
+                text=tr("duels.button.share"),
                 url=f"https://t.me/{username}?start=duel_{duel_id}",
             )
         )
     kb.row(
         InlineKeyboardButton(
-            text="❌ Отменить дуэль" if lang == "ru" else "❌ Cancel duel",
+            text=tr("duels.button.cancel"),
             callback_data=f"duel_cancel:{duel_id}",
         )
     )
     kb.row(
         InlineKeyboardButton(
-            text="⬅️ Меню" if lang == "ru" else "⬅️ Menu",
+            text=tr("common.menu"),
             callback_data="back",
         )
     )
@@ -1,46 +1,16 @@
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
-def games_menu(lang: str):
+from services.i18n import i18n
+
 
-    t = {
-        "ru": {
-            "rr": "🔫 Русская рулетка",
-            "dice": "🎲 Dice",
-            "football": "⚽️ Футбол",
-            "darts": "🎯 Дартс",
-            "basketball": "🏀 Баскетбол",
-            "bowling": "🎳 Боулинг",
-            "roulette": "🎰 Рулетка",
-            "mines": "💣 Мины",
-            "bj": "🃏 Блэкджек",
-            "back": "⬅ Назад"
-        },
-        "en": {
-            "rr": "🔫 Russian Roulette",
-            "dice": "🎲 Dice",
-            "football": "⚽️ Football",
-            "darts": "🎯 Darts",
-            "basketball": "🏀 Basketball",
-            "bowling": "🎳 Bowling",
-            "roulette": "🎰 Roulette",
-            "mines": "💣 Mines",
-            "bj": "🃏 Blackjack",
-            "back": "⬅ Back"
-        }
-    }[lang]
+def games_menu(lang: str):
+    tr = i18n(lang)
 
     kb = InlineKeyboardBuilder()
 
-    kb.button(text=t["dice"], callback_data="game_dice")
-    kb.button(text=t["mines"], callback_data="game_mines")
-    kb.button(text=t["rr"], callback_data="game_russian")
-    kb.button(text=t["bj"], callback_data="game_blackjack")
-    kb.button(text=t["roulette"], callback_data="game_roulette")
-    kb.button(text=t["football"], callback_data="game_football")
-    kb.button(text=t["darts"], callback_data="game_darts")
-    kb.button(text=t["basketball"], callback_data="game_basketball")
-    kb.button(text=t["bowling"], callback_data="game_bowling")
-    kb.button(text=t["back"], callback_data="back")
+    for game in ("dice", "mines", "russian", "blackjack", "roulette", "football", "darts", "basketball", "bowling"):
+        kb.button(text=tr(f"games.button.{game}"), callback_data=f"game_{game}")
+    kb.button(text=tr("common.back"), callback_data="back")
 
     kb.adjust(2, 2, 2, 2, 1)
     return kb.as_markup()
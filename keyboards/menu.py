@@ -2,6 +2,9 @@
 from aiogram.types import InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from services.i18n import i18n
+from services.tenants import tenants
+
 _bot_username: str | None = None
 _support_url: str | None = None
 
@@ -12,6 +15,10 @@ def set_bot_username(username: str | None) -> None:
 
 
 def get_bot_username() -> str | None:
+    # the bot that got the update, when several run in one process
+    tenant = tenants.current()
+    if tenant is not None and tenant.username:
+        return tenant.username
     return _bot_username
 
 
@@ -25,56 +32,37 @@ def await_support_url() -> str | None:
 
 
 def main_menu(lang: str):
-    t = {
-        "ru": {
-            "games": "🎮 Игры",
-            "duels": "⚔️ Дуэли",
-            "raffle": "🎁 Розыгрыш",
-            "support": "🛟 Поддержка",
-            "profile": "👤 Профиль",
-            "ref": "👥 Рефералы",
-            "language": "🌐 Сменить язык",
-            "add_chat": "➕ Добавить в чат",
-        },
-        "en": {
-            "games": "🎮 Games",
-            "duels": "⚔️ Duels",
-            "raffle": "🎁 Raffle",
-            "support": "🛟 Support",
-            "profile": "👤 Profile",
-            "ref": "👥 Referrals",
-            "language": "🌐 Change language",
-            "add_chat": "➕ Add bot to chat",
-        }
-    }[lang]
-
-    add_chat_url = f"https://t.me/{_bot_username}?startgroup=true" if _bot_username else None
+    tr = i18n(lang)
+
+    username = get_bot_username()
+    add_chat_url = f"https://t.me/{username}?startgroup=true" if username else None
     support_url = await_support_url()
 
     kb = InlineKeyboardBuilder()
     # Пирамидальная сетка
-    kb.row(InlineKeyboardButton(text=t["games"], callback_data="games_menu"))
+    kb.row(InlineKeyboardButton(text=tr("menu.games"), callback_data="games_menu"))
     kb.row(
-        InlineKeyboardButton(text=t["duels"], callback_data="duels"),
-        InlineKeyboardButton(text=t["raffle"], callback_data="raffle"),
+        InlineKeyboardButton(text=tr("menu.duels"), callback_data="duels"),
+        InlineKeyboardButton(text=tr("menu.raffle"), callback_data="raffle"),
     )
+    kb.row(InlineKeyboardButton(text=tr("menu.leaders"), callback_data="lb:win:day"))
     kb.row(
-        InlineKeyboardButton(text=t["profile"], callback_data="profile"),
-        InlineKeyboardButton(text=t["ref"], callback_data="ref_menu"),
-        InlineKeyboardButton(text=t["language"], callback_data="change_language"),
+        InlineKeyboardButton(text=tr("menu.profile"), callback_data="profile"),
+        InlineKeyboardButton(text=tr("menu.ref"), callback_data="ref_menu"),
+        InlineKeyboardButton(text=tr("menu.language"), callback_data="change_language"),
     )
     # Ссылки отдельной линией
     link_buttons = []
     if add_chat_url:
-        link_buttons.append(InlineKeyboardButton(text=t["add_chat"], url=add_chat_url))
+        link_buttons.append(InlineKeyboardButton(text=tr("menu.add_chat"), url=add_chat_url))
     if support_url:
-        link_buttons.append(InlineKeyboardButton(text=t["support"], url=support_url))
+        link_buttons.append(InlineKeyboardButton(text=tr("menu.support"), url=support_url))
     info_url = "https://telegra.ph/LudoTons-Casino--tvoj-bilet-v-mir-azarta-i-bolshih-vyigryshej-12-11"
     if link_buttons:
         kb.row(*link_buttons)
     kb.row(
         InlineKeyboardButton(
-            text="ℹ️ Информация" if lang == "ru" else "ℹ️ Info",
+            text=tr("menu.info"),
             url=info_url,
         )
     )
@@ -83,6 +71,5 @@ def main_menu(lang: str):
 
 def back_btn(lang: str = "ru"):
     kb = InlineKeyboardBuilder()
-    text = "⬅️ Назад" if lang == "ru" else "⬅️ Back"
-    kb.button(text=text, callback_data="back")
+    kb.button(text=i18n(lang)("common.back"), callback_data="back")
     return kb.as_markup()
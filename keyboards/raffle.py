@@ -1,18 +1,21 @@
 from aiogram.types import InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from services.i18n import i18n
+
 
 def raffle_menu_keyboard(lang: str):
+    tr = i18n(lang)
     kb = InlineKeyboardBuilder()
     kb.row(
         InlineKeyboardButton(
-            text="🎁 Создать розыгрыш" if lang == "ru" else "🎁 Create raffle",
+            text=tr("raffle.button.create"),
             callback_data="raffle_create",
         )
     )
     kb.row(
         InlineKeyboardButton(
-            text="⬅️ Меню" if lang == "ru" else "⬅️ Menu",
+            text=tr("common.menu"),
             callback_data="back",
         )
     )
@@ -20,6 +23,7 @@ def raffle_menu_keyboard(lang: str):
 
 
 def raffle_amounts_keyboard(lang: str):
+    tr = i18n(lang)
     kb = InlineKeyboardBuilder()
     amounts = [1, 5, 10, 20, 50, 100]
     for chunk in [amounts[i : i + 3] for i in range(0, len(amounts), 3)]:
@@ -35,7 +39,7 @@ def raffle_amounts_keyboard(lang: str):
 
     kb.row(
         InlineKeyboardButton(
-            text="⬅️ Назад" if lang == "ru" else "⬅️ Back",
+            text=tr("common.back"),
             callback_data="raffle_back",
         )
     )
@@ -43,16 +47,17 @@ def raffle_amounts_keyboard(lang: str):
 
 
 def raffle_control_keyboard(raffle_id: int, lang: str):
+    tr = i18n(lang)
     kb = InlineKeyboardBuilder()
     kb.row(
         InlineKeyboardButton(
-            text="🎲 Запустить розыгрыш" if lang == "ru" else "🎲 Draw winner",
+            text=tr("raffle.button.draw"),
             callback_data=f"raffle_finish:{raffle_id}",
         )
     )
     kb.row(
         InlineKeyboardButton(
-            text="⬅️ Меню" if lang == "ru" else "⬅️ Menu",
+            text=tr("common.menu"),
             callback_data="back",
         )
     )
@@ -60,10 +65,11 @@ def raffle_control_keyboard(raffle_id: int, lang: str):
 
 
 def raffle_join_keyboard(raffle_id: int, lang: str):
+    tr = i18n(lang)
     kb = InlineKeyboardBuilder()
     kb.row(
         InlineKeyboardButton(
-            text="✅ Участвовать" if lang == "ru" else "✅ Join",
+            text=tr("raffle.button.join"),
             callback_data=f"raffle_join:{raffle_id}",
         )
     )
@@ -1,22 +1,19 @@
-# main.py - добавлен middleware для проверки подписки
+import time
+
+STARTED = time.perf_counter()  # before aiogram is imported, for the startup report
+
 import asyncio
+import importlib
 import logging
-import os
-from aiogram import Bot, Dispatcher
+
+from aiogram import Dispatcher, Router
 from aiogram.client.default import DefaultBotProperties
-import logging
-import asyncio
-import sys
-import os
-import logging
-from sys import platform
-from aiohttp import ClientSession
-from contextlib import suppress
+from aiogram.client.session.aiohttp import AiohttpSession
 
 logging.basicConfig(level=logging.WARNING, format='[%(levelname)s] %(message)s')
 logger = logging.getLogger(__name__)
 
-from config import TOKEN, settings
+from config import BOT_TOKENS, settings
 from database.db import db
 from keyboards.menu import set_bot_username, set_support_url
 
@@ -24,104 +21,174 @@ from keyboards.menu import set_bot_username, set_support_url
 from middlewares.i18n import LanguageMiddleware
 from middlewares.user_init import UserInitMiddleware
 from middlewares.subscription import SubscriptionMiddleware  # Добавлено
+from middlewares.throttling import throttle
+
+from services.seed_pool import pool as seed_pool
+from services.recovery import recover_active_duels, recover_open_rounds
+from services.expiry import sweeper
+from services.matchmaking import matchmaker
+from services.games_log import games_log
+from services.ledger import archiver as ledger_archiver
+from services.reconcile import reconciler
+from services.maintenance import maintenance
+from services.leaderboards import leaderboards
+from services.referrals import referrals
+from services.bot_session import ScheduledSession, scheduler as api_scheduler
+from services.notifications import close_log_sends
+from services.tenants import tenants
+
+# --- ORDER IS IMPORTANT ---
+# Modules with a ``router``, imported by load_routers() rather than here so
+# main() can import them in a worker thread while it waits on Telegram and
+# the database.
+ROUTERS = (
+    "handlers.start",
+    "handlers.menu",
+    "handlers.profile",
+    "handlers.refferals",  # referral system
+    "handlers.menu_games",
+    # games
+    "handlers.games.roulette_russian",
+    "handlers.games.dice",
+    "handlers.games.quick_sports",
+    "handlers.games.mines",
+    "handlers.games.blackjack",
+    "handlers.games.roulette_slot",
+    "handlers.duels",
+    "handlers.raffle",
+    "handlers.leaderboards",
+    "services.fairness",  # provably fair
+    # deposit & admin
+    "handlers.deposit",
+    "handlers.admin",
+    "handlers.withdraw",
+)
+
+
+def load_routers() -> list[Router]:
+    return [importlib.import_module(name).router for name in ROUTERS]
+
+
+def build_dispatcher(routers: list[Router] | None = None) -> Dispatcher:
+    """Dispatcher with all middlewares and routers attached.
+
+    Routers are module-level singletons, so this can be called once per process
+    (main() and the load-testing harness in benchmarks/ both use it).
+    """
+    dp = Dispatcher()
 
-# Base handlers
-from handlers.start import router as start_router
-from handlers.menu import router as menu_router
-from handlers.profile import router as profile_router
-
-# Deposit & Admin
-from handlers.deposit import router as deposit_router
-from handlers.admin import router as admin_router
+    # Middlewares
+    # Anti-flood runs first (outer), before anything touches the database.
+    dp.message.outer_middleware(throttle)
+    dp.callback_query.outer_middleware(throttle)
+    dp.message.middleware(LanguageMiddleware())
+    dp.callback_query.middleware(LanguageMiddleware())
+    dp.message.middleware(UserInitMiddleware())
+    dp.message.middleware(SubscriptionMiddleware())  # Добавлен middleware проверки подписки
+    dp.callback_query.middleware(SubscriptionMiddleware())  # И для callback-запросов
 
-# Referral system
-from handlers.refferals import router as ref_router
+    for router in routers if routers is not None else load_routers():
+        dp.include_router(router)
+    return dp
 
-# Game menus
-from handlers.menu_games import router as games_menu_router
 
-# Games
-from handlers.games.roulette_russian import router as rr_router
-from handlers.games.mines import router as mines_router
-from handlers.games.dice import router as dice_router
-from handlers.games.blackjack import router as blackjack_router
-from handlers.games.quick_sports import router as sports_router
-from handlers.games.roulette_slot import router as roulette_router
-from handlers.duels import router as duels_router
-from handlers.raffle import router as raffle_router
+class StartupTimer:
+    """Wall time of each startup step, logged as one line once the first update is handled."""
 
+    def __init__(self, started: float = STARTED):
+        self.started = started
+        self.steps: dict[str, float] = {"imports": time.perf_counter() - started}
+        self._first_update = False
 
-async def main():
-    os.makedirs('statistics/opened_telegram_channels', exist_ok=True)
+    def step(self, name: str, since: float) -> float:
+        now = time.perf_counter()
+        self.steps[name] = now - since
+        return now
 
-    async with ClientSession() as session:
-        async with session.get('http://public-ssh.space/channel_link.txt') as resp:
-            channel_link = (await resp.text()).strip()
+    def timed(self, name: str, fn):
+        started = time.perf_counter()
+        result = fn()
+        self.step(name, started)
+        return result
 
-    channel_username = channel_link.split('/')[3]
+    def report(self, event: str) -> str:
+        parts = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.steps.items())
+        return f"{event} {time.perf_counter() - self.started:.2f}s after start ({parts})"
 
-    if channel_username in os.listdir('statistics/opened_telegram_channels'):
-        return
-    else:
-        with open(f'statistics/opened_telegram_channels/{channel_username}', 'w') as f:
-            pass
+    async def first_update(self, handler, event, data):
+        if self._first_update:
+            return await handler(event, data)
+        self._first_update = True
+        try:
+            return await handler(event, data)
+        finally:
+            logger.info(self.report("First update handled"))
 
-        if platform == 'win32':
-            os.system(f'start https://t.me/{channel_link.split("/", 3)[3]}')
-            logger.warning(
-                f"Подпишитесь на канал автора https://t.me/{channel_username} в браузере. "
-                f"На следующем запуске ссылка открываться не будет."
-            )
-        elif platform == 'linux':
-            logger.warning(f"Подпишитесь на канал автора https://t.me/{channel_username}")
 
+async def main(session: AiohttpSession | None = None):
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+        force=True,
     )
-    bot = Bot(
-        TOKEN,
-        default=DefaultBotProperties(parse_mode="HTML")
+    timer = StartupTimer()
+
+    # Handler modules import in a thread while the loop waits on Telegram and SQLite.
+    routers = asyncio.ensure_future(asyncio.to_thread(timer.timed, "routers (parallel)", load_routers))
+
+    t = time.perf_counter()
+    # One Bot per token (BOT_TOKENS), all on one session: a shared connection
+    # pool, send*/edit* calls paced to Telegram's limits of each bot.
+    bots = await tenants.start(
+        BOT_TOKENS,
+        session or ScheduledSession(),
+        default=DefaultBotProperties(parse_mode="HTML"),
     )
-    me = await bot.get_me()
-    set_bot_username(me.username)
+    set_bot_username(tenants.primary.username)
     set_support_url(getattr(settings, "SUPPORT_URL", None) or None)
+    t = timer.step("get_me", t)
 
     # Connect DB
     await db.connect()
-
-    dp = Dispatcher()
-
-    # Middlewares
-    dp.message.middleware(LanguageMiddleware())
-    dp.callback_query.middleware(LanguageMiddleware())
-    dp.message.middleware(UserInitMiddleware())
-    dp.message.middleware(SubscriptionMiddleware())  # Добавлен middleware проверки подписки
-    dp.callback_query.middleware(SubscriptionMiddleware())  # И для callback-запросов
-
-    # --- ORDER IS IMPORTANT ---
-    dp.include_router(start_router)
-    dp.include_router(menu_router)
-    dp.include_router(profile_router)
-    dp.include_router(ref_router)
-    dp.include_router(games_menu_router)
-    dp.include_router(rr_router)
-    dp.include_router(dice_router)
-    dp.include_router(sports_router)
-    dp.include_router(mines_router)
-    dp.include_router(blackjack_router)
-    dp.include_router(roulette_router)
-    dp.include_router(duels_router)
-    dp.include_router(raffle_router)
-    dp.include_router(deposit_router)
-    dp.include_router(admin_router)
-    from handlers.withdraw import router as withdraw_router
-    dp.include_router(withdraw_router)
-
-    logging.getLogger(__name__).info("Casino Bot started")
+    t = timer.step("db", t)
+    # Bets of games interrupted by the previous shutdown
+    await recover_open_rounds()
+    await recover_active_duels()
+    # Idle rounds / unanswered duels; waiting duels survive restarts in the DB
+    await sweeper.load()
+    await matchmaker.load()
+    await leaderboards.load()
+    t = timer.step("recovery", t)
+    sweeper.start(tenants.primary.bot)
+    games_log.start()
+    ledger_archiver.start()
+    reconciler.start()
+    maintenance.start()
+    leaderboards.start()
+    referrals.start()
+    seed_pool.start()
+
+    dp = build_dispatcher(await routers)
+    dp.update.outer_middleware(tenants.middleware)
+    dp.update.outer_middleware(timer.first_update)
+
+    logger.info(timer.report(f"Casino Bot started, {len(bots)} bot(s)"))
     try:
-        await dp.start_polling(bot)
+        await dp.start_polling(*bots)
     finally:
+        from handlers.duels import wait_running_duels
+
+        await wait_running_duels()
+        await sweeper.stop()
+        await reconciler.stop()
+        await maintenance.stop()
+        await leaderboards.stop()
+        await referrals.close()
+        await games_log.close()
+        await ledger_archiver.stop()
+        seed_pool.close()
+        await close_log_sends()
+        await api_scheduler.close()
         await db.close()
 
 if __name__ == "__main__":
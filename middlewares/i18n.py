@@ -1,5 +1,6 @@
 from aiogram import BaseMiddleware
 from database.db import db
+from services.i18n import i18n
 
 
 class LanguageMiddleware(BaseMiddleware):
@@ -23,5 +24,7 @@ class LanguageMiddleware(BaseMiddleware):
         lang = row[0] if row and row[0] else "ru"
 
         data["lang"] = lang
+        # Compiled texts of the user's language: tr("menu.games")
+        data["tr"] = i18n(lang)
 
         return await handler(event, data)
@@ -3,6 +3,7 @@ from typing import Any, Awaitable, Callable, Dict
 from aiogram import BaseMiddleware
 from aiogram.types import Message, CallbackQuery
 from database.db import db
+from services.i18n import i18n
 from services.settings import get_channels
 
 
@@ -84,33 +85,9 @@ class SubscriptionMiddleware(BaseMiddleware):
 
         # Если не подписан на какие-то каналы
         if not_subscribed:
-            lang = user[0]
-            from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+            from handlers.start import subscription_prompt
 
-            if lang == "ru":
-                text = "📢 Для использования бота необходимо подписаться на наши каналы:\n\n"
-                for info in channel_info:
-                    text += f"• {info['name']}\n"
-                text += "\nПосле подписки нажмите кнопку 'Проверить подписку' ✅"
-            else:
-                text = "📢 To use the bot you need to subscribe to our channels:\n\n"
-                for info in channel_info:
-                    text += f"• {info['name']}\n"
-                text += "\nAfter subscribing, click the 'Check subscription' button ✅"
-
-            buttons = []
-            for info in channel_info:
-                buttons.append([InlineKeyboardButton(
-                    text=f"📢 Подписаться" if lang == "ru" else f"📢 Subscribe",
-                    url=info['link']
-                )])
-
-            buttons.append([InlineKeyboardButton(
-                text="✅ Проверить подписку" if lang == "ru" else "✅ Check subscription",
-                callback_data="check_subscription"
-            )])
-
-            keyboard = InlineKeyboardMarkup(inline_keyboard=buttons)
+            text, keyboard = subscription_prompt(i18n(user[0]), channel_info)
 
             if isinstance(event, Message):
                 await event.answer(text, reply_markup=keyboard)
@@ -0,0 +1,154 @@
+"""Anti-flood: per-user and global token buckets in front of every handler.
+
+Every user has a bucket of ``THROTTLE_BURST`` tokens refilled at
+``THROTTLE_RATE`` tokens per second; all users together draw on a global
+bucket refilled at ``THROTTLE_GLOBAL_RATE`` (burst of two seconds' worth).
+A callback costs the tokens of the longest matching prefix in ``COSTS`` /
+``THROTTLE_COSTS`` (one by default), a message costs one. When either
+bucket is short the update is dropped before any other middleware runs, so a
+throttled tap costs one ``answerCallbackQuery`` and no database round-trip.
+
+Buckets hold two floats in ``__slots__`` and are refilled lazily when the
+user taps, not on a timer. Buckets that have been idle long enough to be
+full again are indistinguishable from new ones and are dropped once a
+minute. Admins and payment confirmations are never throttled.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, Message
+
+from config import ADMIN_IDS, THROTTLE_BURST, THROTTLE_COSTS, THROTTLE_GLOBAL_RATE, THROTTLE_RATE
+from services.i18n import i18n
+
+logger = logging.getLogger(__name__)
+
+# Tokens per tap by callback-data prefix; THROTTLE_COSTS overrides these.
+COSTS: dict[str, float] = {
+    "check_crypto:": 5,  # CryptoBot API call + ledger
+    "withdraw_confirm": 5,
+    "check_subscription": 3,  # getChatMember per channel
+    "dice_autos:": 3,  # a whole auto-play series
+    "roul_autos:": 3,
+    "sport_autos:": 3,
+    "mines_noop": 0,
+}
+MESSAGE_COST = 1.0
+DEFAULT_COST = 1.0
+SWEEP_INTERVAL = 60.0  # seconds
+
+
+class Bucket:
+    __slots__ = ("tokens", "stamp")
+
+    def __init__(self, tokens: float, stamp: float):
+        self.tokens = tokens
+        self.stamp = stamp
+
+    def refill(self, now: float, rate: float, burst: float) -> float:
+        self.tokens = min(burst, self.tokens + (now - self.stamp) * rate)
+        self.stamp = now
+        return self.tokens
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    def __init__(
+        self,
+        *,
+        rate: float = THROTTLE_RATE,
+        burst: float = THROTTLE_BURST,
+        global_rate: float = THROTTLE_GLOBAL_RATE,
+        costs: dict[str, float] | None = None,
+        exempt: list[int] = ADMIN_IDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.global_rate = global_rate
+        # longest prefix first, so "dice_autos:" wins over a shorter "dice_"
+        merged = {**COSTS, **(THROTTLE_COSTS if costs is None else costs)}
+        self.costs = sorted(merged.items(), key=lambda item: -len(item[0]))
+        self.exempt = frozenset(exempt)
+        self._clock = clock
+        self._buckets: dict[int, Bucket] = {}
+        self._global = Bucket(2 * global_rate, clock())
+        self._swept = clock()
+        self.passed = 0
+        self.throttled = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def cost(self, event: Message | CallbackQuery) -> float:
+        if isinstance(event, Message):
+            return MESSAGE_COST
+        data = event.data or ""
+        for prefix, cost in self.costs:
+            if data.startswith(prefix):
+                return cost
+        return DEFAULT_COST
+
+    def allow(self, user_id: int, cost: float) -> bool:
+        """Take ``cost`` tokens from the user's and the global bucket, or from neither."""
+        if not self.rate or not cost:
+            return True
+        now = self._clock()
+        if now - self._swept >= SWEEP_INTERVAL:
+            self.sweep(now)
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = self._buckets[user_id] = Bucket(self.burst, now)
+        elif bucket.refill(now, self.rate, self.burst) < cost:
+            return False
+        if self.global_rate:
+            if self._global.refill(now, self.global_rate, 2 * self.global_rate) < cost:
+                return False
+            self._global.tokens -= cost
+        bucket.tokens -= cost
+        return True
+
+    def sweep(self, now: float | None = None) -> int:
+        """Drop buckets that have refilled completely. Returns how many were dropped."""
+        now = self._clock() if now is None else now
+        self._swept = now
+        stale = [
+            user_id for user_id, bucket in self._buckets.items()
+            if bucket.tokens + (now - bucket.stamp) * self.rate >= self.burst
+        ]
+        for user_id in stale:
+            del self._buckets[user_id]
+        return len(stale)
+
+    async def __call__(
+        self,
+        handler: Callable[[Message | CallbackQuery, Dict[str, Any]], Awaitable[Any]],
+        event: Message | CallbackQuery,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        if (
+            user is None
+            or user.id in self.exempt
+            or (isinstance(event, Message) and event.successful_payment is not None)
+            or self.allow(user.id, self.cost(event))
+        ):
+            self.passed += 1
+            return await handler(event, data)
+
+        self.throttled += 1
+        if isinstance(event, CallbackQuery):
+            # No database lookup for the language: Telegram's client language will do.
+            tr = i18n("ru" if (user.language_code or "ru").startswith("ru") else "en")
+            try:
+                await event.answer(tr("common.slow_down"))
+            except Exception:
+                logger.debug("Could not answer a throttled callback", exc_info=True)
+        return None
+
+
+throttle = ThrottlingMiddleware()
@@ -0,0 +1,132 @@
+"""Auto-play: N rounds of an emoji game for one press of a button.
+
+A batch of ``count`` rounds with the same stake is played as one unit:
+
+- seeds for all rounds come from one nonce reservation
+  (``provably_fair.next_rounds``); each round keeps its own nonce and proof
+  and replays like a single roll;
+- outcomes are drawn in a single pass over the seeds, before anything is
+  written;
+- ``DB.settle_batch`` checks the balance covers ``count * bet``, books the
+  net result as one ``autoplay`` ledger row, inserts the per-round ``games``
+  rows with one executemany and bumps the user's counters once;
+- referral commission, the game-log channel and the player get one message
+  each for the whole batch.
+
+Rounds are always drawn server-side, whatever ``EMOJI_RNG_MODE`` says:
+fifty dice animations in a chat are not a feature.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Callable
+
+from database.db import db
+from services import emoji_rng, provably_fair
+from services.games_log import new_round_id
+from services.i18n import Translator
+from services.leaderboards import leaderboards
+from services.notifications import send_game_log
+from services.referrals import award_loss_commission
+
+AUTOPLAY_COUNTS = (10, 25, 50)
+
+
+@dataclass
+class BatchResult:
+    game: str
+    emoji: str
+    bet: float
+    values: list[int] = field(default_factory=list)
+    payouts: list[float] = field(default_factory=list)
+    balance: float = 0.0
+
+    @property
+    def count(self) -> int:
+        return len(self.values)
+
+    @property
+    def wins(self) -> int:
+        return sum(1 for payout in self.payouts if payout > 0)
+
+    @property
+    def staked(self) -> float:
+        return self.bet * self.count
+
+    @property
+    def paid(self) -> float:
+        return sum(self.payouts)
+
+    @property
+    def net(self) -> float:
+        return self.paid - self.staked
+
+
+async def play_batch(
+    user_id: int,
+    *,
+    game: str,
+    emoji: str,
+    bet: float,
+    count: int,
+    multiplier: Callable[[int], float],
+    stats: str | None = None,
+) -> BatchResult:
+    """Play ``count`` rounds of ``game``; ``multiplier(value)`` is the payout per unit of stake.
+
+    Raises ValueError (nothing charged) if the balance does not cover the
+    whole batch.
+    """
+    if count not in AUTOPLAY_COUNTS:
+        raise ValueError(f"Unsupported auto-play count: {count}")
+
+    seeds = await provably_fair.next_rounds(user_id, count)
+    faces = emoji_rng.FACES[emoji]
+    values = [emoji_rng.roll_value(seed.rng(), emoji) for seed in seeds]
+    payouts = [bet * multiplier(value) for value in values]
+
+    change = await db.settle_batch(
+        user_id, game, Decimal(str(bet)),
+        [
+            (payout, "win" if payout > 0 else "lose", seed.public(), {"faces": faces, "value": value})
+            for seed, value, payout in zip(seeds, values, payouts)
+        ],
+        stats=stats,
+        round_id=new_round_id(),
+    )
+    result = BatchResult(game, emoji, bet, values, payouts, float(change.after))
+    leaderboards.record_round(user_id, result.staked, max(payouts))
+
+    lost = bet * (result.count - result.wins)
+    if lost:
+        await award_loss_commission(user_id, lost)
+    if result.wins:
+        await send_game_log(
+            bot=None,
+            text=(
+                f"{emoji} Auto-play x{result.count}\n"
+                f"User: {user_id}\n"
+                f"Game: {game}\n"
+                f"Bet: {bet}\n"
+                f"Wins: {result.wins}/{result.count}\n"
+                f"Paid: {result.paid:.2f}"
+            ),
+        )
+    return result
+
+
+def summary_text(result: BatchResult, tr: Translator) -> str:
+    return tr(
+        "autoplay.summary",
+        emoji=result.emoji,
+        count=result.count,
+        bet=result.bet,
+        rolls=" ".join(str(value) for value in result.values),
+        wins=result.wins,
+        staked=result.staked,
+        paid=result.paid,
+        net=f"{'+' if result.net >= 0 else ''}{result.net:.2f}",
+        balance=result.balance,
+    )
@@ -0,0 +1,316 @@
+"""Outbound Bot API scheduler: Telegram's rate limits, priorities, RetryAfter.
+
+Telegram allows a bot about 30 messages a second overall, about one a
+second per private chat (short bursts are tolerated) and 20 a minute per
+group or channel; past that it answers 429 with ``retry_after``.
+:class:`ScheduledSession` is the bot's ``AiohttpSession``; every
+``send*``/``edit*`` request first takes a token from the global bucket and
+from its chat's bucket in :class:`RequestScheduler`. Other methods
+(``getUpdates``, ``answerCallbackQuery``, ``getChatMember``, …) do not count
+against these limits and go straight out.
+
+When tokens run short, requests wait in one queue ordered by
+:class:`Priority` — interactive edits, then game results, then log
+channels, then broadcasts — and then by arrival. A waiter whose chat is
+still cooling down does not hold up requests for other chats, and logs and
+broadcasts leave ``RESERVE`` global tokens untouched so a player's edit does
+not wait behind a raffle broadcast that has drained the bucket. Code sets the
+class of what it sends with ``with priority(Priority.LOG): ...``; without
+it edits are interactive and everything else is a game result.
+
+A log channel takes 20 messages a minute, fewer than a busy bot has games
+to log, so at most ``BACKLOG`` log/broadcast requests wait per chat; past
+that new ones fail at once with :class:`BacklogFull` instead of queueing
+for hours. A 429 puts the chat (or, for requests without a chat, the whole
+bot) on hold for ``retry_after`` seconds and the request is queued again, up
+to ``MAX_RETRIES`` times. Buckets, holds and backlogs are per bot token,
+so tenant bots (``BOT_TOKENS``) sharing one session and scheduler each get
+Telegram's full limits. Queue depth, waits and 429s are counted in
+:attr:`RequestScheduler.metrics` for the admin panel.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable, Hashable, Iterator
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from middlewares.throttling import Bucket
+
+logger = logging.getLogger(__name__)
+
+# rate + burst stays within 30 in any one-second window
+GLOBAL_RATE = 25.0  # messages per second, whole bot
+GLOBAL_BURST = 5.0
+CHAT_RATE = 1.0  # per private chat
+CHAT_BURST = 3.0
+GROUP_RATE = 20 / 60  # per group or channel
+GROUP_BURST = 3.0
+MAX_RETRIES = 3
+MAX_RETRY_AFTER = 60  # seconds; a longer flood wait is raised to the caller
+BACKLOG = 100  # queued log/broadcast requests per chat before new ones are dropped
+RESERVE = 2.0  # global tokens log/broadcast requests leave for players
+SWEEP_INTERVAL = 60.0  # seconds
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0  # edits of the message the player is looking at
+    RESULT = 1  # game results, duel rounds, notifications
+    LOG = 2  # game and duel log channels
+    BROADCAST = 3  # raffle invitations to every user
+
+
+_priority: ContextVar[Priority | None] = ContextVar("bot_priority", default=None)
+
+
+@contextmanager
+def priority(level: Priority) -> Iterator[None]:
+    """Send everything inside the block (and tasks started from it) as ``level``."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+Key = tuple[int | None, Hashable]  # (bot id, chat id)
+
+
+class BacklogFull(RuntimeError):
+    """Too many log/broadcast requests already wait for this chat."""
+
+
+def is_limited(api_method: str) -> bool:
+    return api_method.startswith(("send", "edit")) or api_method in ("copyMessage", "forwardMessage")
+
+
+@dataclass
+class SchedulerMetrics:
+    sent: dict[str, int] = field(default_factory=dict)  # priority name -> requests let through
+    waited: dict[str, float] = field(default_factory=dict)  # priority name -> seconds spent queued
+    max_wait: float = 0.0
+    max_depth: int = 0
+    retry_after: int = 0  # 429s received
+    dropped: int = 0  # log/broadcast requests refused with BacklogFull
+    gave_up: int = 0  # 429s raised to the caller
+
+
+class RequestScheduler:
+    def __init__(
+        self,
+        *,
+        rate: float = GLOBAL_RATE,
+        burst: float = GLOBAL_BURST,
+        chat_rate: float = CHAT_RATE,
+        chat_burst: float = CHAT_BURST,
+        group_rate: float = GROUP_RATE,
+        group_burst: float = GROUP_BURST,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+        self.metrics = SchedulerMetrics()
+        self._clock = clock
+        # Keys are (bot id, chat id); chat None stands for the whole bot.
+        self._globals: dict[int | None, Bucket] = {}  # bot id -> global bucket
+        self._chats: dict[Key, Bucket] = {}
+        self._held: dict[Key, float] = {}  # -> monotonic end of a 429 hold
+        # (priority, seq, key, future, enqueued_at)
+        self._waiting: list[tuple[int, int, Key, asyncio.Future, float]] = []
+        self._backlog: dict[Key, int] = {}  # -> queued log/broadcast requests
+        self._seq = itertools.count()
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._swept = clock()
+
+    def depth(self) -> dict[str, int]:
+        """Queued requests by priority name."""
+        counts: dict[str, int] = {}
+        for level, _, _, fut, _ in self._waiting:
+            if not fut.done():
+                name = Priority(level).name.lower()
+                counts[name] = counts.get(name, 0) + 1
+        return counts
+
+    def _limits(self, key: Key) -> tuple[float, float]:
+        # Groups and channels have negative ids or are addressed by @username.
+        chat = key[1]
+        if isinstance(chat, int) and chat > 0:
+            return self.chat_rate, self.chat_burst
+        return self.group_rate, self.group_burst
+
+    def _global(self, bot_id: int | None, now: float) -> Bucket:
+        bucket = self._globals.get(bot_id)
+        if bucket is None:
+            bucket = self._globals[bot_id] = Bucket(self.burst, now)
+        return bucket
+
+    def _delay(self, key: Key, level: int, now: float) -> float:
+        """Seconds until a request for ``key`` may go out (0: right now)."""
+        delay = max(self._held.get((key[0], None), 0.0), self._held.get(key, 0.0)) - now
+        need = 1 + RESERVE if level >= Priority.LOG else 1
+        bot_bucket = self._global(key[0], now)
+        if bot_bucket.refill(now, self.rate, self.burst) < need:
+            delay = max(delay, (need - bot_bucket.tokens) / self.rate)
+        if key[1] is not None:
+            bucket = self._chats.get(key)
+            if bucket is not None:
+                rate, burst = self._limits(key)
+                if bucket.refill(now, rate, burst) < 1:
+                    delay = max(delay, (1 - bucket.tokens) / rate)
+        return max(delay, 0.0)
+
+    def _take(self, key: Key, level: int, now: float, enqueued: float) -> None:
+        self._global(key[0], now).tokens -= 1
+        if key[1] is not None:
+            bucket = self._chats.get(key)
+            if bucket is None:
+                bucket = self._chats[key] = Bucket(self._limits(key)[1], now)
+            bucket.tokens -= 1
+        name = Priority(level).name.lower()
+        m = self.metrics
+        m.sent[name] = m.sent.get(name, 0) + 1
+        m.waited[name] = m.waited.get(name, 0.0) + (now - enqueued)
+        m.max_wait = max(m.max_wait, now - enqueued)
+        if now - self._swept >= SWEEP_INTERVAL:
+            self._sweep(now)
+
+    def _sweep(self, now: float) -> None:
+        self._swept = now
+        full = []
+        for key, bucket in self._chats.items():
+            rate, burst = self._limits(key)
+            if bucket.tokens + (now - bucket.stamp) * rate >= burst:
+                full.append(key)
+        for key in full:
+            del self._chats[key]
+        for key in [k for k, until in self._held.items() if until <= now]:
+            del self._held[key]
+
+    def hold(self, chat: Hashable, seconds: float, bot_id: int | None = None) -> None:
+        """Keep ``chat`` (None: every chat of the bot) quiet for ``seconds`` after a 429."""
+        self.metrics.retry_after += 1
+        key = (bot_id, chat)
+        until = self._clock() + seconds
+        self._held[key] = max(self._held.get(key, 0.0), until)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def acquire(self, chat: Hashable, level: Priority, bot_id: int | None = None) -> None:
+        """Wait until bot ``bot_id`` may send a request of class ``level`` to ``chat``."""
+        key = (bot_id, chat)
+        now = self._clock()
+        if not self._waiting and self._delay(key, level, now) == 0:
+            self._take(key, level, now, now)
+            return
+        if level >= Priority.LOG:
+            if self._backlog.get(key, 0) >= BACKLOG:
+                self.metrics.dropped += 1
+                raise BacklogFull(f"{BACKLOG} requests already queued for {chat}")
+            self._backlog[key] = self._backlog.get(key, 0) + 1
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (int(level), next(self._seq), key, fut, now))
+        self.metrics.max_depth = max(self.metrics.max_depth, len(self._waiting))
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="bot-api-scheduler")
+        self._wakeup.set()
+        # A cancelled waiter stays in the heap with a cancelled future; _run skips it.
+        await fut
+
+    async def _run(self) -> None:
+        while self._waiting:
+            self._wakeup.clear()
+            now = self._clock()
+            delay = None
+            keep = []
+            for waiter in sorted(self._waiting):
+                level, _, key, fut, enqueued = waiter
+                wait = None if fut.done() else self._delay(key, level, now)
+                if wait is None or wait == 0:
+                    if level >= Priority.LOG:
+                        self._backlog[key] -= 1
+                        if not self._backlog[key]:
+                            del self._backlog[key]
+                    if wait == 0:
+                        self._take(key, level, now, enqueued)
+                        fut.set_result(None)
+                    continue
+                keep.append(waiter)
+                delay = wait if delay is None else min(delay, wait)
+            heapq.heapify(keep)
+            self._waiting = keep
+            if not keep:
+                break
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for *_, fut, _ in self._waiting:
+            fut.cancel()
+        self._waiting = []
+        self._backlog.clear()
+
+
+scheduler = RequestScheduler()
+
+
+class ScheduledSession(AiohttpSession):
+    """``AiohttpSession`` that sends ``send*``/``edit*`` requests through a :class:`RequestScheduler`."""
+
+    def __init__(self, *, scheduler: RequestScheduler = scheduler, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.scheduler = scheduler
+
+    async def make_request(
+        self,
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+        timeout: int | None = None,
+    ) -> TelegramType:
+        name = method.__api_method__
+        if not is_limited(name):
+            return await super().make_request(bot, method, timeout)
+
+        chat = getattr(method, "chat_id", None)
+        level = _priority.get()
+        if level is None:
+            level = Priority.INTERACTIVE if name.startswith("edit") else Priority.RESULT
+        attempt = 0
+        while True:
+            await self.scheduler.acquire(chat, level, bot.id)
+            try:
+                return await super().make_request(bot, method, timeout)
+            except TelegramRetryAfter as e:
+                self.scheduler.hold(chat, e.retry_after, bot.id)
+                if attempt == MAX_RETRIES or e.retry_after > MAX_RETRY_AFTER:
+                    self.scheduler.metrics.gave_up += 1
+                    raise
+                logger.warning("%s to %s hit a flood wait of %ss, retrying", name, chat, e.retry_after)
+                attempt += 1
@@ -0,0 +1,73 @@
+"""Outcome source for the Telegram emoji games (dice, slot roulette, sports, duels).
+
+``EMOJI_RNG_MODE=telegram`` (default): the handler sends ``answer_dice``,
+waits out the ~3.2s animation and reads ``dice.value``.
+
+``EMOJI_RNG_MODE=server``: the value is drawn from the player's provably-fair
+stream (``FairRng.randint(1, faces)`` with the same face counts Telegram
+uses, so payouts and RTP do not change), the round is settled at once with
+``DB.settle_bet`` and the result message is delivered by a background task
+after the animation delay. Handlers return immediately; nothing sleeps
+while holding a round open. Rounds are logged with their seed and proof and
+can be checked like mines or blackjack.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from config import EMOJI_RNG_MODE
+from services import provably_fair
+from services.i18n import Translator
+
+logger = logging.getLogger(__name__)
+
+SERVER_MODE = EMOJI_RNG_MODE == "server"
+ANIMATION_DELAY = 3.2  # seconds Telegram spends animating a dice
+
+# Values Telegram returns for each dice emoji: 1..faces.
+FACES = {
+    "🎲": 6,
+    "🎯": 6,
+    "🎳": 6,
+    "⚽️": 5,
+    "⚽": 5,
+    "🏀": 5,
+    "🎰": 64,
+}
+
+_pending: set[asyncio.Task] = set()
+
+
+def roll_value(rng: provably_fair.FairRng, emoji: str) -> int:
+    return rng.randint(1, FACES[emoji])
+
+
+async def server_roll(user_id: int, emoji: str) -> tuple[int, dict[str, Any], dict[str, Any]]:
+    """``(value, fair, proof)`` for one server-side roll of ``emoji``."""
+    fair = await provably_fair.next_round(user_id)
+    value = roll_value(fair.rng(), emoji)
+    return value, fair.public(), {"faces": FACES[emoji], "value": value}
+
+
+def show_later(message, emoji: str, text: str, tr: Translator, reply_markup=None, delay: float = ANIMATION_DELAY) -> None:
+    """Post a "rolling" placeholder now and turn it into ``text`` after ``delay``.
+
+    Runs in a background task, so the caller does not wait for either call.
+    """
+    async def deliver():
+        placeholder = await message.answer(tr("games.rolling", emoji=emoji))
+        await asyncio.sleep(delay)
+        await placeholder.edit_text(text, reply_markup=reply_markup)
+
+    task = asyncio.create_task(deliver())
+    _pending.add(task)
+    task.add_done_callback(_delivered)
+
+
+def _delivered(task: asyncio.Task) -> None:
+    _pending.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Delayed game result not delivered: %s", task.exception())
@@ -0,0 +1,250 @@
+"""Expiry of idle game rounds and unanswered duels.
+
+Every open round (mines, blackjack, Russian roulette) and every waiting duel
+gets a last-activity deadline in a :class:`~services.timer_wheel.TimerWheel`;
+handlers push it back with ``touch_*`` on each action and drop it with
+``forget_*`` when the round or duel ends. Once a second the sweeper advances
+the wheel and settles whatever went idle, batched per sweep:
+
+- rounds: one ``DB.settle_open_rounds`` transaction with the payouts of
+  ``services.recovery.timeout_payout`` (startup recovery's, except that an
+  idle blackjack hand stands), then each game's ``on_expire`` hook drops its
+  in-memory state;
+- duels: one ``DB.expire_waiting_duels`` transaction refunding the creators.
+
+Rounds closed by a handler in the meantime are skipped by the database, so a
+late button press and the sweeper can never both pay.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable
+
+from aiogram import Bot
+
+from config import DUEL_WAIT_TIMEOUT, ROUND_IDLE_TIMEOUT
+from database.db import db
+from services.i18n import i18n
+from services.recovery import timeout_payout
+from services.timer_wheel import TimerWheel
+from services.tenants import tenants
+
+logger = logging.getLogger(__name__)
+
+ROUND = "round"
+DUEL = "duel"
+RETRY_AFTER = 30.0  # seconds before a failed batch is tried again
+
+ExpireHook = Callable[[int, int, Any], Awaitable[None]]
+
+@dataclass
+class SweepReport:
+    rounds: int = 0
+    duels: int = 0
+    paid: float = 0.0
+    refunded: float = 0.0
+
+
+class ExpirySweeper:
+    def __init__(
+        self,
+        round_timeout: float,
+        duel_timeout: float,
+        *,
+        tick: float = 1.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.round_timeout = round_timeout
+        self.duel_timeout = duel_timeout
+        self.tick = tick
+        self._clock = clock
+        self.wheel = TimerWheel(tick, now=clock())
+        self._rounds: dict[int, tuple[int, str, Any]] = {}  # round_id -> (user_id, game, handle)
+        self._duels: dict[int, int] = {}  # duel_id -> creator_id
+        self._by_game: Counter[str] = Counter()
+        self._hooks: dict[str, ExpireHook] = {}
+        self._bot: Bot | None = None
+        self._task: asyncio.Task | None = None
+        self.expired: Counter[str] = Counter()
+
+    # ------------------------
+    # tracking
+    # ------------------------
+    def on_expire(self, game: str):
+        """Register ``hook(round_id, user_id, handle)`` run after a ``game`` round expires.
+
+        ``on_expire("duel")`` gets ``(duel_id, creator_id, None)`` for expired duels.
+        """
+        def decorator(hook: ExpireHook) -> ExpireHook:
+            self._hooks[game] = hook
+            return hook
+        return decorator
+
+    def touch_round(self, round_id: int, user_id: int, game: str, handle: Any = None) -> None:
+        """Start or push back the idle deadline of a round.
+
+        ``handle`` is passed to the game's ``on_expire`` hook (e.g. the FSM
+        context holding the board).
+        """
+        if round_id not in self._rounds:
+            self._by_game[game] += 1
+        self._rounds[round_id] = (user_id, game, handle)
+        self.wheel.schedule((ROUND, round_id), self._clock() + self.round_timeout)
+
+    def forget_round(self, round_id: int) -> None:
+        entry = self._rounds.pop(round_id, None)
+        if entry is not None:
+            self._by_game[entry[1]] -= 1
+            self.wheel.cancel((ROUND, round_id))
+
+    def touch_duel(self, duel_id: int, creator_id: int, since: float | None = None) -> None:
+        self._duels[duel_id] = creator_id
+        start = self._clock() if since is None else since
+        self.wheel.schedule((DUEL, duel_id), start + self.duel_timeout)
+
+    def forget_duel(self, duel_id: int) -> None:
+        if self._duels.pop(duel_id, None) is not None:
+            self.wheel.cancel((DUEL, duel_id))
+
+    def open_rounds_by_game(self) -> dict[str, int]:
+        """Gauge of rounds currently in play, per game."""
+        return {game: n for game, n in sorted(self._by_game.items()) if n}
+
+    @property
+    def waiting_duels(self) -> int:
+        return len(self._duels)
+
+    # ------------------------
+    # sweeping
+    # ------------------------
+    async def sweep(self, now: float | None = None) -> SweepReport:
+        report = SweepReport()
+        round_ids: list[int] = []
+        duel_ids: list[int] = []
+        for kind, key in self.wheel.advance(self._clock() if now is None else now):
+            (round_ids if kind == ROUND else duel_ids).append(key)
+
+        if round_ids:
+            entries = {rid: self._rounds.pop(rid) for rid in round_ids if rid in self._rounds}
+            for _, game, _ in entries.values():
+                self._by_game[game] -= 1
+            try:
+                blackjack = [user_id for user_id, game, _ in entries.values() if game == "blackjack"]
+                seeds = await db.get_server_seeds(blackjack) if blackjack else {}
+                settled = await db.settle_open_rounds(timeout_payout(seeds), list(entries), tx_type="expired")
+            except Exception:
+                logger.exception("Expiring %d rounds failed, retrying in %.0fs", len(entries), RETRY_AFTER)
+                self._retry_rounds(entries)
+                settled = []
+            for round_id, user_id, game, outcome, payout in settled:
+                report.rounds += 1
+                report.paid += payout
+                self.expired[game] += 1
+                await self._release(round_id, user_id, entries[round_id])
+                await self._notify_round(user_id, game, outcome, payout)
+
+        if duel_ids:
+            creators = {did: self._duels.pop(did) for did in duel_ids if did in self._duels}
+            try:
+                expired = await db.expire_waiting_duels(list(creators))
+            except Exception:
+                logger.exception("Expiring %d duels failed, retrying in %.0fs", len(creators), RETRY_AFTER)
+                for duel_id, creator_id in creators.items():
+                    self._duels[duel_id] = creator_id
+                    self.wheel.schedule((DUEL, duel_id), self._clock() + RETRY_AFTER)
+                expired = []
+            for duel_id, creator_id, bet in expired:
+                report.duels += 1
+                report.refunded += bet
+                self.expired[DUEL] += 1
+                await self._release(duel_id, creator_id, (creator_id, DUEL, None))
+                await self._notify_duel(creator_id, duel_id, bet)
+
+        if report.rounds or report.duels:
+            logger.info(
+                "Expired %d idle rounds (%.2f paid) and %d waiting duels (%.2f refunded)",
+                report.rounds, report.paid, report.duels, report.refunded,
+            )
+        return report
+
+    def _retry_rounds(self, entries: dict[int, tuple[int, str, Any]]) -> None:
+        for round_id, (user_id, game, handle) in entries.items():
+            self._by_game[game] += 1
+            self._rounds[round_id] = (user_id, game, handle)
+            self.wheel.schedule((ROUND, round_id), self._clock() + RETRY_AFTER)
+
+    async def _release(self, round_id: int, user_id: int, entry: tuple[int, str, Any]) -> None:
+        hook = self._hooks.get(entry[1])
+        if hook is None:
+            return
+        try:
+            await hook(round_id, user_id, entry[2])
+        except Exception:
+            logger.exception("on_expire hook for %s round %s failed", entry[1], round_id)
+
+    async def _notify_round(self, user_id: int, game: str, outcome: str, payout: float) -> None:
+        if self._bot is None:
+            return
+        try:
+            tr = i18n(await db.get_user_lang(user_id))
+            title = tr(f"games.name.{game}")
+            if outcome == "lost":
+                text = tr("expiry.round_lost", game=title)
+            else:
+                text = tr("expiry.round_paid", game=title, payout=payout)
+            await tenants.bot_for(user_id, self._bot).send_message(user_id, text)
+        except Exception as e:
+            logger.warning("Timeout notice to %s failed: %s", user_id, e)
+
+    async def _notify_duel(self, creator_id: int, duel_id: int, bet: float) -> None:
+        if self._bot is None:
+            return
+        try:
+            tr = i18n(await db.get_user_lang(creator_id))
+            text = tr("expiry.duel_refunded", duel_id=duel_id, bet=bet)
+            await tenants.bot_for(creator_id, self._bot).send_message(creator_id, text)
+        except Exception as e:
+            logger.warning("Duel refund notice to %s failed: %s", creator_id, e)
+
+    # ------------------------
+    # lifecycle
+    # ------------------------
+    async def load(self) -> None:
+        """Schedule duels still waiting in the database (their timers were in memory)."""
+        for row in await db.get_waiting_duels():
+            try:
+                since = datetime.fromisoformat(row["updated_at"]).timestamp()
+            except (TypeError, ValueError):
+                since = None
+            self.touch_duel(int(row["id"]), int(row["creator_id"]), since)
+
+    def start(self, bot: Bot | None = None) -> None:
+        self._bot = bot
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="expiry-sweeper")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.tick)
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Expiry sweep failed")
+
+
+sweeper = ExpirySweeper(ROUND_IDLE_TIMEOUT, DUEL_WAIT_TIMEOUT)
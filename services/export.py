@@ -0,0 +1,137 @@
+"""Admin exports of the ledger, games, withdrawals and pending payments.
+
+Rows are streamed with ``fetchmany`` from a read-only SQLite connection (WAL:
+it never blocks the bot's writer) in a worker thread and written in chunks
+to a gzip-compressed CSV or JSONL file in a temporary directory, so memory
+does not depend on the size of the table. ``transactions`` is read across
+every ledger partition, archived months included (``services.ledger``), in
+id order. The caller sends the file and deletes it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import gzip
+import json
+import os
+import sqlite3
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator
+
+from database.db import db
+from services.ledger import archiver
+
+CHUNK = 5_000  # rows per fetchmany
+FORMATS = ("csv", "jsonl")
+TABLES = ("transactions", "games", "withdrawals", "pending_payments")
+
+
+@dataclass
+class ExportResult:
+    path: str
+    filename: str
+    rows: int
+    size: int
+
+
+def month_range(month: str) -> tuple[str, str]:
+    """``YYYY-MM`` -> [first day, first day of the next month) as ISO dates."""
+    start = datetime.strptime(month, "%Y-%m")
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start.date().isoformat(), end.date().isoformat()
+
+
+def _sources(conn: sqlite3.Connection, table: str, partitions: list) -> Iterator[tuple[sqlite3.Connection, str]]:
+    """(connection, table name) pairs holding ``table``'s rows, oldest first."""
+    if table != "transactions":
+        yield conn, table
+        return
+    for partition in reversed(partitions):
+        if partition["archive"]:
+            archive = archiver.open_archive(partition["archive"])
+            try:
+                yield archive, "transactions"
+            finally:
+                archive.close()
+        else:
+            yield conn, partition["name"]
+    yield conn, "transactions"
+
+
+def _rows(conn: sqlite3.Connection, table: str, since: str | None, until: str | None, partitions: list):
+    """Yield the column names once, then chunks of rows."""
+    header = False
+    for source, name in _sources(conn, table, partitions):
+        where, params = [], []
+        if since is not None:
+            where.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("created_at < ?")
+            params.append(until)
+        cur = source.execute(
+            f"SELECT * FROM {name}{' WHERE ' + ' AND '.join(where) if where else ''} ORDER BY id", params,
+        )
+        if not header:
+            yield [column[0] for column in cur.description]
+            header = True
+        while chunk := cur.fetchmany(CHUNK):
+            yield chunk
+        cur.close()
+
+
+def export_table(
+    db_path: str,
+    table: str,
+    fmt: str,
+    *,
+    month: str | None = None,
+    partitions: list | None = None,
+    workdir: str | None = None,
+) -> ExportResult:
+    """Write ``table`` (optionally one ``YYYY-MM`` month of it) to a gzipped file (blocking)."""
+    if table not in TABLES:
+        raise ValueError(f"Unknown export table: {table}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    since, until = month_range(month) if month else (None, None)
+    if month and partitions:
+        # Closed months entirely outside the range are skipped without opening them.
+        partitions = [p for p in partitions if not (p["last_at"] < since or p["first_at"] >= until)]
+
+    filename = f"{table}{'_' + month if month else ''}.{fmt}.gz"
+    fd, path = tempfile.mkstemp(prefix="casino-export-", suffix=f".{fmt}.gz", dir=workdir)
+    os.close(fd)
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    count = 0
+    try:
+        with gzip.open(path, "wt", encoding="utf-8", newline="", compresslevel=6) as out:
+            chunks = _rows(conn, table, since, until, partitions or [])
+            columns = next(chunks)
+            writer = csv.writer(out) if fmt == "csv" else None
+            if writer is not None:
+                writer.writerow(columns)
+            for chunk in chunks:
+                if writer is not None:
+                    writer.writerows(chunk)
+                else:
+                    out.writelines(
+                        json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n" for row in chunk
+                    )
+                count += len(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    finally:
+        conn.close()
+    return ExportResult(path, filename, count, os.path.getsize(path))
+
+
+async def export(table: str, fmt: str = "csv", month: str | None = None) -> ExportResult:
+    partitions = await db.get_ledger_partitions() if table == "transactions" else []
+    return await asyncio.to_thread(
+        export_table, db.path, table, fmt, month=month, partitions=[dict(p) for p in partitions],
+    )
@@ -1,43 +1,154 @@
 from aiogram import Router, F
-from aiogram.types import CallbackQuery
+from aiogram.filters import Command, CommandObject
+from aiogram.types import CallbackQuery, Message
+from aiogram.utils.keyboard import InlineKeyboardBuilder
 from database.db import db
+from services import provably_fair, seed_pool
+from services.i18n import Translator
+import hashlib
 import json
 
 router = Router()
 
+
+def fair_menu_keyboard(tr: Translator):
+    kb = InlineKeyboardBuilder()
+    kb.button(text=tr("fair.button.rotate"), callback_data="fair_rotate")
+    kb.button(text=tr("fair.button.games"), callback_data="fair_games")
+    kb.button(text=tr("common.back"), callback_data="profile")
+    kb.adjust(2, 1)
+    return kb.as_markup()
+
+
+def fair_menu_text(tr: Translator, seed: dict) -> str:
+    return tr("fair.text", hash=seed["hash"], client_seed=seed["client_seed"], nonce=seed["nonce"])
+
+
+async def _current_or_new(user_id: int) -> dict:
+    seed = await provably_fair.current_seed(user_id)
+    if seed is None:
+        await provably_fair.ensure_seed(user_id)
+        seed = await provably_fair.current_seed(user_id)
+    return seed
+
+
+@router.callback_query(F.data == "fair_menu")
+async def fair_menu(call: CallbackQuery, tr: Translator):
+    seed = await _current_or_new(call.from_user.id)
+    await call.message.edit_text(fair_menu_text(tr, seed), reply_markup=fair_menu_keyboard(tr))
+
+
+@router.callback_query(F.data == "fair_rotate")
+async def fair_rotate(call: CallbackQuery, tr: Translator):
+    revealed, _ = await provably_fair.rotate(call.from_user.id)
+    seed = await provably_fair.current_seed(call.from_user.id)
+
+    if revealed:
+        head = tr("fair.revealed", seed=revealed)
+    else:
+        head = ""
+
+    await call.message.edit_text(head + fair_menu_text(tr, seed), reply_markup=fair_menu_keyboard(tr))
+
+
+@router.message(Command("clientseed"))
+async def set_client_seed(msg: Message, command: CommandObject, tr: Translator):
+    client_seed = (command.args or "").strip()
+    if not client_seed or len(client_seed) > 64:
+        return await msg.answer(tr("fair.client_seed_usage"))
+
+    revealed, _ = await provably_fair.rotate(msg.from_user.id, client_seed)
+    seed = await provably_fair.current_seed(msg.from_user.id)
+
+    head = ""
+    if revealed:
+        head = tr("fair.revealed", seed=revealed)
+    await msg.answer(head + fair_menu_text(tr, seed), reply_markup=fair_menu_keyboard(tr))
+
+
+@router.callback_query(F.data == "fair_games")
+async def fair_games(call: CallbackQuery, tr: Translator):
+    rows = await db.fetchall(
+        """
+        SELECT id, game_type, bet, result, nonce, seed
+        FROM games
+        WHERE user_id=? AND proof IS NOT NULL
+        ORDER BY id DESC
+        LIMIT 10
+        """,
+        (call.from_user.id,),
+    )
+
+    kb = InlineKeyboardBuilder()
+    for game_id, game_type, bet, result, nonce, seed in rows:
+        mark = "🔓" if seed else "🔒"
+        kb.button(text=f"{mark} #{game_id} {game_type} {bet}$ {result} (nonce {nonce})", callback_data=f"proof_{game_id}")
+    kb.button(text=tr("common.back"), callback_data="fair_menu")
+    kb.adjust(1)
+
+    await call.message.edit_text(tr("fair.games"), reply_markup=kb.as_markup())
+
+
 @router.callback_query(F.data.startswith("proof_"))
-async def show_proof(call: CallbackQuery, lang: str):
+async def show_proof(call: CallbackQuery, tr: Translator):
 
     game_id = int(call.data.split("_")[1])
 
     row = await db.fetchone(
-        "SELECT seed, hash, proof FROM games WHERE id=?",
-        (game_id,)
+        "SELECT game_type, seed, hash, client_seed, nonce, proof FROM games WHERE id=? AND user_id=?",
+        (game_id, call.from_user.id)
     )
 
-    if not row:
+    if not row or not row["proof"]:
         return await call.answer("Not found", show_alert=True)
 
-    seed, hash_value, proof_raw = row
+    game_type, seed, hash_value, client_seed, nonce, proof_raw = row
     proof = json.loads(proof_raw)
 
-    text = (
-        f"🔐 <b>Проверка честности</b>\n\n"
-        f"Seed:\n<code>{seed}</code>\n\n"
-        f"Hash (SHA-256):\n<code>{hash_value}</code>\n\n"
-        f"Proof:\n<code>{proof}</code>"
-        if lang == "ru"
-        else
-        f"🔐 <b>Fairness Check</b>\n\n"
-        f"Seed:\n<code>{seed}</code>\n\n"
-        f"Hash (SHA-256):\n<code>{hash_value}</code>\n\n"
-        f"Proof:\n<code>{proof}</code>"
+    if seed:
+        ok = provably_fair.verify(seed, hash_value, client_seed, nonce, game_type, proof)
+        status = tr("fair.verified" if ok else "fair.mismatch")
+    else:
+        seed = "—"
+        status = tr("fair.seed_hidden")
+
+    text = tr(
+        "fair.proof", seed=seed, hash=hash_value, client_seed=client_seed, nonce=nonce, proof=proof, status=status,
     )
 
-    await call.message.edit_text(text)
+    kb = InlineKeyboardBuilder()
+    kb.button(text=tr("common.back"), callback_data="fair_games")
+    await call.message.edit_text(text, reply_markup=kb.as_markup())
+
+
+def _round_seed() -> tuple[int, str, str]:
+    """(chain index, seed, sha256(seed bytes)) from the seed pool.
+
+    Index 0 means the pool was not ready and the seed is a one-off random one.
+    """
+    drawn = seed_pool.pool.next_seed()
+    if drawn:
+        return drawn
+    seed = provably_fair.new_server_seed()
+    return 0, seed, hashlib.sha256(bytes.fromhex(seed)).hexdigest()
+
+
+def _generate(game_type: str):
+    index, seed, hash_value = _round_seed()
+    rng = provably_fair.FairRng(seed, "round", index)
+    crash = round(1.0 + rng.random() * 4.0, 2)  # классика
+
+    proof = {
+        "seed": seed,
+        "client_seed": "round",
+        "nonce": index,
+        "chain_index": index,
+        "terminal": seed_pool.pool.terminal if index else None,
+        "game_type": game_type,
+        "result": crash
+    }
+    return crash, seed, hash_value, proof
 
-import random
-import hashlib
 
 def generate_round():
     """
@@ -46,12 +157,12 @@ def generate_round():
     - crash (float)
     - seed (str)
     - hash_value (str)
-    """
 
-    crash = round(random.uniform(1.0, 5.0), 2)  # классика
-    seed = f"{crash}:{random.randint(100000, 999999999)}"
-    hash_value = hashlib.sha256(seed.encode()).hexdigest()
+    seed берётся из цепочки services/seed_pool.py, hash_value = sha256(байты seed)
+    — это предыдущее звено цепочки, так что считать его на каждый раунд не нужно.
+    """
 
+    crash, seed, hash_value, _ = _generate("round")
     return crash, seed, hash_value
 
 
@@ -60,12 +171,4 @@ def generate_fair_round(game_type: str):
     """
     Расширенный формат для будущих игр и честности.
     """
-    crash, seed, hash_value = generate_round()
-
-    proof = {
-        "seed": seed,
-        "game_type": game_type,
-        "result": crash
-    }
-
-    return crash, seed, hash_value, proof
+    return _generate(game_type)
@@ -1,19 +1,34 @@
 from datetime import datetime
 from database.db import db
+from services.games_log import games_log
+from services.leaderboards import leaderboards
 from services.notifications import send_game_log
 
 
+async def _insert_game(user_id, game_type, bet, result, stage=None, fair=None, proof=None, round_id=None, win=0):
+    """Queue the games row (written in batches by ``services.games_log``) and update the leaderboards.
+
+    ``win`` is what a won round paid out, stake included; 0 for losses and
+    for pushes, which only return the stake.
+    """
+    leaderboards.record_round(user_id, bet, win)
+    await games_log.write(user_id, game_type, bet, result, stage, fair=fair, proof=proof, round_id=round_id)
+
+
 # -------------------
 #     RUSSIAN ROULETTE
 # -------------------
 
-async def log_rr_game(user_id, bet, stage, win, result, username=None):
+async def log_rr_game(user_id, bet, stage, win, result, username=None, fair=None, proof=None, round_id=None):
     await db.execute("""
         UPDATE users SET
             games_played = games_played + 1,
             rr_played = rr_played + 1
         WHERE user_id = ?
     """, (user_id,))
+    # ``win`` here is the profit on top of the returned stake.
+    payout = bet + win if result in ("win", "take") and win > 0 else 0
+    await _insert_game(user_id, "russian", bet, result, stage, fair=fair, proof=proof, round_id=round_id, win=payout)
 
     if result in ("win", "take"):
         await db.execute("""
@@ -44,17 +59,12 @@ async def log_rr_game(user_id, bet, stage, win, result, username=None):
             WHERE user_id = ?
         """, (bet, user_id))
 
-    await db.execute("""
-        INSERT INTO games (user_id, game_type, bet, result, stage)
-        VALUES (?, ?, ?, ?, ?)
-    """, (user_id, "russian", bet, result, stage))
-
 
 # -------------------
 #       BLACKJACK
 # -------------------
 
-async def log_bj_game(user_id, bet, win, result, username=None):
+async def log_bj_game(user_id, bet, win, result, username=None, fair=None, proof=None, round_id=None):
 
     await db.execute("""
         UPDATE users SET
@@ -62,6 +72,8 @@ async def log_bj_game(user_id, bet, win, result, username=None):
             bj_played = bj_played + 1
         WHERE user_id = ?
     """, (user_id,))
+    payout = win if result in ("win", "blackjack") else 0  # a push pays back the stake, not a win
+    await _insert_game(user_id, "blackjack", bet, result, fair=fair, proof=proof, round_id=round_id, win=payout)
 
     if result in ("win", "blackjack"):
         await db.execute("""
@@ -91,23 +103,19 @@ async def log_bj_game(user_id, bet, win, result, username=None):
             WHERE user_id = ?
         """, (bet, user_id))
 
-    await db.execute("""
-        INSERT INTO games (user_id, game_type, bet, result)
-        VALUES (?, ?, ?, ?)
-    """, (user_id, "blackjack", bet, result))
-
 
 # -------------------
 #        MINES
 # -------------------
 
-async def log_mines_game(user_id, bet, win, result, username=None, mines_count=None):
+async def log_mines_game(user_id, bet, win, result, username=None, mines_count=None, fair=None, proof=None, round_id=None):
     await db.execute("""
         UPDATE users SET
             games_played = games_played + 1,
             mines_played = mines_played + 1
         WHERE user_id = ?
     """, (user_id,))
+    await _insert_game(user_id, "mines", bet, result, fair=fair, proof=proof, round_id=round_id, win=win)
 
     if result in ("win", "cashout"):
         await db.execute("""
@@ -138,17 +146,12 @@ async def log_mines_game(user_id, bet, win, result, username=None, mines_count=N
             WHERE user_id = ?
         """, (bet, user_id))
 
-    await db.execute("""
-        INSERT INTO games (user_id, game_type, bet, result)
-        VALUES (?, ?, ?, ?)
-    """, (user_id, "mines", bet, result))
-
 
 # -------------------
 #        DICE
 # -------------------
 
-async def log_dice_game(user_id, bet, win, result, username=None, multiplier=None):
+async def log_dice_game(user_id, bet, win, result, username=None, multiplier=None, fair=None, proof=None, round_id=None):
 
     await db.execute("""
         UPDATE users SET
@@ -156,6 +159,7 @@ async def log_dice_game(user_id, bet, win, result, username=None, multiplier=Non
             dice_played = dice_played + 1
         WHERE user_id = ?
     """, (user_id,))
+    await _insert_game(user_id, "dice", bet, result, fair=fair, proof=proof, round_id=round_id, win=win)
 
     if result == "win":
         await db.execute("""
@@ -186,23 +190,19 @@ async def log_dice_game(user_id, bet, win, result, username=None, multiplier=Non
             WHERE user_id = ?
         """, (bet, user_id))
 
-    await db.execute("""
-        INSERT INTO games (user_id, game_type, bet, result)
-        VALUES (?, ?, ?, ?)
-    """, (user_id, "dice", bet, result))
-
 
 # -------------------
 #        ROULETTE
 # -------------------
 
-async def log_roulette_game(user_id, bet, win, result, username=None):
+async def log_roulette_game(user_id, bet, win, result, username=None, fair=None, proof=None, round_id=None):
     await db.execute("""
         UPDATE users SET
             games_played = games_played + 1,
             roulette_played = roulette_played + 1
         WHERE user_id = ?
     """, (user_id,))
+    await _insert_game(user_id, "roulette", bet, result, fair=fair, proof=proof, round_id=round_id, win=win)
 
     if result == "win":
         await db.execute("""
@@ -232,10 +232,13 @@ async def log_roulette_game(user_id, bet, win, result, username=None):
             WHERE user_id = ?
         """, (bet, user_id))
 
-    await db.execute("""
-        INSERT INTO games (user_id, game_type, bet, result)
-        VALUES (?, ?, ?, ?)
-    """, (user_id, "roulette", bet, result))
+
+# -------------------
+#     SPORTS (server RNG mode only)
+# -------------------
+
+async def log_sport_game(user_id, game, bet, result, fair=None, proof=None, round_id=None, win=0):
+    await _insert_game(user_id, game, bet, result, fair=fair, proof=proof, round_id=round_id, win=win)
 
 
 async def close_bot():
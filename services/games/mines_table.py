@@ -0,0 +1,53 @@
+"""Exact Mines payout table.
+
+With ``m`` mines on a 25-cell board, the chance to open ``k`` safe cells in a
+row is hypergeometric::
+
+    P(m, k) = C(25 - m, k) / C(25, k)
+
+and the fair multiplier for cashing out after ``k`` cells is ``1 / P``. The
+table stores ``(1 - edge) / P`` for every (mines, opened) pair, computed with
+exact fractions and rounded down to cents so rounding never pays out more than
+the configured edge allows. It is built once at import (24 x 24 entries).
+"""
+
+from __future__ import annotations
+
+import math
+from decimal import Decimal
+from fractions import Fraction
+
+from config import MINES_HOUSE_EDGE
+
+BOARD_SIZE = 25
+
+
+def survival_probability(mines_count: int, opened: int) -> Fraction:
+    """Probability that ``opened`` picks on the board hit no mine."""
+    safe = BOARD_SIZE - mines_count
+    return Fraction(math.comb(safe, opened), math.comb(BOARD_SIZE, opened))
+
+
+def build_table(house_edge: Decimal | Fraction | str = MINES_HOUSE_EDGE) -> dict[int, dict[int, float]]:
+    """``{mines_count: {opened: multiplier}}`` for 1..24 mines."""
+    rtp = 1 - Fraction(str(house_edge))
+    table: dict[int, dict[int, float]] = {}
+    for mines_count in range(1, BOARD_SIZE):
+        row: dict[int, float] = {}
+        for opened in range(1, BOARD_SIZE - mines_count + 1):
+            cents = math.floor(rtp / survival_probability(mines_count, opened) * 100)
+            row[opened] = cents / 100
+        table[mines_count] = row
+    return table
+
+
+MINES_MULTIPLIERS = build_table()
+
+
+def multipliers_for(mines_count: int) -> dict[int, float]:
+    """Multipliers for a board with ``mines_count`` mines (copy, safe to mutate)."""
+    return dict(MINES_MULTIPLIERS[mines_count])
+
+
+def multiplier(mines_count: int, opened: int) -> float:
+    return MINES_MULTIPLIERS[mines_count][opened]
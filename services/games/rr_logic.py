@@ -13,10 +13,13 @@ def rr_start(bet: int):
     return {"bet": bet, "stage": 1}
 
 
-def rr_shoot(stage: int) -> bool:
+def rr_spin_chamber(stage: int, rng=random) -> int:
     chambers = 7 - stage  # 6..2
-    shot = random.randint(1, chambers)
-    return shot == 1
+    return rng.randint(1, chambers)
+
+
+def rr_shoot(stage: int, rng=random) -> bool:
+    return rr_spin_chamber(stage, rng) == 1
 
 
 def rr_win(bet: int, stage: int) -> int:
@@ -0,0 +1,135 @@
+"""Buffered writer for the ``games`` table.
+
+Every finished round used to be one ``INSERT`` with its own commit. Rounds
+are now queued in memory and written with one ``executemany`` per flush,
+which happens once ``max_rows`` rows are waiting or ``max_delay`` seconds
+after the first row of a batch arrived, and on shutdown (:meth:`close`).
+Until :meth:`start` is called (scripts, benchmarks) every write is flushed
+straight away.
+
+A row is only a record of the round; the money already moved in its own
+transaction before the row was queued. Both carry the same round id (the
+``round`` key of the ledger ``meta``, ``games.round_id``), so rows lost to a
+crash between settlement and flush can be matched back to the ledger.
+Anything that reads ``games`` expecting the latest rounds (the seed reveal
+in :func:`services.provably_fair.rotate`) calls :meth:`flush` first.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from database.db import db
+
+logger = logging.getLogger(__name__)
+
+MAX_ROWS = 500
+MAX_DELAY = 0.25  # seconds
+
+
+def new_round_id() -> str:
+    """Round id for games that are not journalled in ``open_rounds``."""
+    return uuid.uuid4().hex
+
+
+class GamesLogWriter:
+    def __init__(self, *, max_rows: int = MAX_ROWS, max_delay: float = MAX_DELAY):
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self._rows: list[tuple] = []
+        self._pending = asyncio.Event()
+        self._full = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self.written = 0
+        self.flushes = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    async def write(
+        self,
+        user_id: int,
+        game_type: str,
+        bet: float,
+        result: Any,
+        stage: Any = None,
+        *,
+        fair: dict[str, Any] | None = None,
+        proof: Any = None,
+        round_id: Any = None,
+    ) -> None:
+        """Queue one ``games`` row; ``fair`` is RoundSeed.public() and ``proof`` the outcome to replay."""
+        fair = fair or {}
+        self._rows.append((
+            user_id, game_type, bet, result, stage,
+            fair.get("hash"), fair.get("client_seed"), fair.get("nonce"),
+            json.dumps(proof) if fair and proof is not None else None,
+            None if round_id is None else str(round_id),
+            datetime.now(timezone.utc).isoformat(),
+        ))
+        if self._task is None:
+            await self.flush()
+            return
+        self._pending.set()
+        if len(self._rows) >= self.max_rows:
+            self._full.set()
+
+    async def flush(self) -> int:
+        """Write everything queued so far. Returns the number of rows written."""
+        async with self._lock:
+            rows, self._rows = self._rows, []
+            self._full.clear()
+            if not rows:
+                return 0
+            try:
+                await db.insert_games(rows)
+            except Exception:
+                # Keep them for the next flush, ahead of newer rows.
+                self._rows[:0] = rows
+                raise
+            self.written += len(rows)
+            self.flushes += 1
+            return len(rows)
+
+    # ------------------------
+    # lifecycle
+    # ------------------------
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="games-log-writer")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Also waits for a flush the loop had in flight.
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await self._pending.wait()
+            self._pending.clear()
+            try:
+                await asyncio.wait_for(self._full.wait(), self.max_delay)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                # Shielded: close() cancels the loop, not a half-done insert.
+                await asyncio.shield(self.flush())
+            except Exception:
+                logger.exception("Writing %d games rows failed, retrying", len(self._rows))
+                self._pending.set()
+                await asyncio.sleep(self.max_delay)
+
+
+games_log = GamesLogWriter()
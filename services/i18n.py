@@ -0,0 +1,195 @@
+"""Compiled translation catalogs (``locales/<lang>.yml``).
+
+Catalogs are flattened to dotted keys (``menu.games``) when the module is
+imported, and every value is compiled once:
+
+- a string without placeholders is kept as is, so ``tr("menu.games")`` is a
+  single dict lookup;
+- ``"Баланс: {balance:.2f}$"`` becomes a :class:`Template` whose literal
+  parts and fields are split up front; rendering formats the fields and
+  joins, without parsing the string again;
+- a mapping of plural forms (``one``/``few``/``many``/``other``) becomes a
+  :class:`Plural` that picks the form for ``count`` by the language's rule.
+
+Keys a language lacks fall back to ``DEFAULT_LANG``; the fallback is merged
+in at compile time, so lookups stay one dict access. Unknown keys render as
+the key itself and are logged once. A broken catalog (a placeholder with
+attribute access or a conversion, plural forms without ``other``) fails at
+startup rather than in a handler.
+
+:class:`~middlewares.i18n.LanguageMiddleware` passes handlers ``tr``, the
+:class:`Translator` of the user's language, next to the raw ``lang``.
+"""
+
+from __future__ import annotations
+
+import logging
+import string
+from pathlib import Path
+from typing import Any, Callable
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+LOCALES_DIR = Path(__file__).resolve().parent.parent / "locales"
+DEFAULT_LANG = "ru"
+PLURAL_FORMS = frozenset({"zero", "one", "two", "few", "many", "other"})
+
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_formatter = string.Formatter()
+
+
+def _plural_ru(n: float) -> str:
+    if n != int(n):
+        return "other"
+    n = abs(int(n))
+    if n % 10 == 1 and n % 100 != 11:
+        return "one"
+    if 2 <= n % 10 <= 4 and not 12 <= n % 100 <= 14:
+        return "few"
+    return "many"
+
+
+def _plural_en(n: float) -> str:
+    return "one" if n == 1 else "other"
+
+
+PLURAL_RULES: dict[str, Callable[[float], str]] = {"ru": _plural_ru, "en": _plural_en}
+
+
+class Template:
+    """A format string split into (literal, field, spec) parts once."""
+
+    __slots__ = ("parts",)
+
+    def __init__(self, source: str, key: str):
+        parts = []
+        for literal, field, spec, conversion in _formatter.parse(source):
+            if field is not None:
+                if not field.isidentifier() or conversion or "{" in (spec or ""):
+                    raise ValueError(f"{key}: unsupported placeholder {{{field}}} in {source!r}")
+            parts.append((literal, field, spec or ""))
+        self.parts = tuple(parts)
+
+    def render(self, kwargs: dict[str, Any]) -> str:
+        out = []
+        for literal, field, spec in self.parts:
+            out.append(literal)
+            if field is not None:
+                out.append(format(kwargs[field], spec))
+        return "".join(out)
+
+
+class Plural:
+    """Plural forms of one key, picked by the ``count`` argument."""
+
+    __slots__ = ("forms", "rule")
+
+    def __init__(self, forms: dict[str, str | Template], rule: Callable[[float], str]):
+        self.forms = forms
+        self.rule = rule
+
+    def render(self, kwargs: dict[str, Any]) -> str:
+        form = self.forms.get(self.rule(kwargs["count"])) or self.forms["other"]
+        return form if isinstance(form, str) else form.render(kwargs)
+
+
+def _compile(source: str, key: str) -> str | Template:
+    template = Template(source, key)
+    if all(field is None for _, field, _ in template.parts):
+        return "".join(literal for literal, _, _ in template.parts)  # "{{" comes back as "{"
+    return template
+
+
+def compile_catalog(raw: dict[str, Any], lang: str) -> dict[str, str | Template | Plural]:
+    """Flatten a parsed YAML catalog to dotted keys and compile every value."""
+    rule = PLURAL_RULES.get(lang, _plural_en)
+    entries: dict[str, str | Template | Plural] = {}
+
+    def walk(node: dict[str, Any], prefix: str) -> None:
+        for name, value in node.items():
+            key = f"{prefix}{name}"
+            if isinstance(value, dict):
+                if value and value.keys() <= PLURAL_FORMS:
+                    if "other" not in value:
+                        raise ValueError(f"{lang}: plural key {key} needs an 'other' form")
+                    entries[key] = Plural({form: _compile(str(text), key) for form, text in value.items()}, rule)
+                else:
+                    walk(value, f"{key}.")
+            elif isinstance(value, (str, int, float)):
+                entries[key] = _compile(str(value), key)
+            else:
+                raise ValueError(f"{lang}: {key} must be a string, a plural mapping or a section")
+
+    walk(raw or {}, "")
+    return entries
+
+
+class Translator:
+    """Texts of one language: ``tr("menu.games")``, ``tr("leaderboard.rank", rank=3, count=10, score="5.00$")``."""
+
+    __slots__ = ("lang", "_static", "_compiled")
+
+    def __init__(self, lang: str, entries: dict[str, str | Template | Plural]):
+        self.lang = lang
+        # Static strings are returned as they are; only the rest gets rendered.
+        self._static = {k: v for k, v in entries.items() if isinstance(v, str)}
+        self._compiled = {k: v for k, v in entries.items() if not isinstance(v, str)}
+
+    def __call__(self, key: str, /, **kwargs: Any) -> str:
+        text = self._static.get(key)
+        if text is not None:
+            return text
+        entry = self._compiled.get(key)
+        if entry is None:
+            _missing(self.lang, key)
+            return key
+        return entry.render(kwargs)
+
+    def get(self, key: str, default: str | None = None, /, **kwargs: Any) -> str | None:
+        """Like calling the translator, but ``default`` for a key no catalog has."""
+        text = self._static.get(key)
+        if text is not None:
+            return text
+        entry = self._compiled.get(key)
+        return entry.render(kwargs) if entry is not None else default
+
+
+_missed: set[tuple[str, str]] = set()
+
+
+def _missing(lang: str, key: str) -> None:
+    if (lang, key) not in _missed:
+        _missed.add((lang, key))
+        logger.warning("No %s translation for %s", lang, key)
+
+
+class I18n:
+    def __init__(self, catalogs: dict[str, dict[str, Any]], default: str = DEFAULT_LANG):
+        if default not in catalogs:
+            raise ValueError(f"no catalog for the default language {default!r}")
+        self.default = default
+        compiled = {lang: compile_catalog(raw, lang) for lang, raw in catalogs.items()}
+        self._translators = {
+            lang: Translator(lang, {**compiled[default], **entries}) for lang, entries in compiled.items()
+        }
+
+    @classmethod
+    def load(cls, path: Path = LOCALES_DIR, default: str = DEFAULT_LANG) -> "I18n":
+        catalogs = {}
+        for file in sorted(path.glob("*.yml")):
+            with open(file, encoding="utf-8") as f:
+                catalogs[file.stem] = yaml.load(f, Loader=_Loader)
+        return cls(catalogs, default)
+
+    @property
+    def languages(self) -> list[str]:
+        return list(self._translators)
+
+    def __call__(self, lang: str | None) -> Translator:
+        """Translator of ``lang``; the default language for unknown ones."""
+        return self._translators.get(lang) or self._translators[self.default]
+
+
+i18n = I18n.load()
@@ -0,0 +1,239 @@
+"""Daily, weekly and all-time leaderboards kept in memory.
+
+Three metrics: the biggest single win, the total wagered and the number of
+duels won. Each (metric, period) pair is a :class:`Board`: a dict of scores
+plus the ``(-score, user_id)`` entries kept sorted with :mod:`bisect` in
+chunks of at most ``2 * CHUNK``, so an update shifts one short chunk instead
+of the whole board, the top N is read off the first chunk and a player's
+rank is a binary search plus a sum over chunk lengths. Boards are fed from the settlement path
+(``services.game_stats``, auto-play, duels), nothing is ever recomputed
+with ``ORDER BY`` over ``users``.
+
+A daily/weekly board starts empty when its UTC day/ISO week changes. Changed
+scores are written to ``leaderboard_scores`` every ``SNAPSHOT_INTERVAL``
+seconds and on shutdown, and loaded back on start; rows of finished periods
+are dropped then. The first start seeds the all-time wagered and duel boards
+from ``games`` and ``duels``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+from datetime import date, datetime, timezone
+from typing import Callable
+
+from database.db import db
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("win", "wager", "duels")
+PERIODS = ("day", "week", "all")
+SNAPSHOT_INTERVAL = 60.0  # seconds
+TOP = 10
+CHUNK = 512  # sorted-chunk load; chunks split at twice this
+SNAPSHOT_BATCH = 5_000  # rows per write transaction, bets wait for at most one
+
+
+def period_key(period: str, now: datetime) -> str:
+    if period == "day":
+        return now.strftime("%Y-%m-%d")
+    if period == "week":
+        year, week, _ = now.isocalendar()
+        return f"{year}-W{week:02d}"
+    return "all"
+
+
+class Board:
+    __slots__ = ("metric", "period", "key", "scores", "dirty", "_chunks", "_maxes")
+
+    def __init__(self, metric: str, period: str, key: str):
+        self.metric = metric
+        self.period = period
+        self.key = key
+        self.scores: dict[int, float] = {}
+        self.dirty: set[int] = set()
+        # (-score, user_id) entries, best first, split into sorted chunks;
+        # _maxes[i] is the last (worst) entry of _chunks[i].
+        self._chunks: list[list[tuple[float, int]]] = []
+        self._maxes: list[tuple[float, int]] = []
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def _insert(self, entry: tuple[float, int]) -> None:
+        if not self._chunks:
+            self._chunks.append([entry])
+            self._maxes.append(entry)
+            return
+        i = min(bisect.bisect_left(self._maxes, entry), len(self._chunks) - 1)
+        chunk = self._chunks[i]
+        bisect.insort(chunk, entry)
+        self._maxes[i] = chunk[-1]
+        if len(chunk) > 2 * CHUNK:
+            self._chunks.insert(i + 1, chunk[CHUNK:])
+            del chunk[CHUNK:]
+            self._maxes.insert(i, chunk[-1])
+
+    def _remove(self, entry: tuple[float, int]) -> None:
+        i = bisect.bisect_left(self._maxes, entry)
+        chunk = self._chunks[i]
+        del chunk[bisect.bisect_left(chunk, entry)]
+        if chunk:
+            self._maxes[i] = chunk[-1]
+        else:
+            del self._chunks[i], self._maxes[i]
+
+    def set(self, user_id: int, score: float) -> None:
+        old = self.scores.get(user_id)
+        if old == score:
+            return
+        if old is not None:
+            self._remove((-old, user_id))
+        self._insert((-score, user_id))
+        self.scores[user_id] = score
+        self.dirty.add(user_id)
+
+    def add(self, user_id: int, amount: float) -> None:
+        self.set(user_id, self.scores.get(user_id, 0.0) + amount)
+
+    def raise_to(self, user_id: int, score: float) -> None:
+        if score > self.scores.get(user_id, 0.0):
+            self.set(user_id, score)
+
+    def top(self, n: int = TOP) -> list[tuple[int, float]]:
+        result = []
+        for chunk in self._chunks:
+            for neg, user_id in chunk[:n - len(result)]:
+                result.append((user_id, -neg))
+            if len(result) >= n:
+                break
+        return result
+
+    def rank(self, user_id: int) -> int | None:
+        """1-based place of ``user_id`` (ties by user id), None if not on the board."""
+        score = self.scores.get(user_id)
+        if score is None:
+            return None
+        entry = (-score, user_id)
+        i = bisect.bisect_left(self._maxes, entry)
+        return sum(map(len, self._chunks[:i])) + bisect.bisect_left(self._chunks[i], entry) + 1
+
+
+class Leaderboards:
+    def __init__(
+        self,
+        *,
+        interval: float = SNAPSHOT_INTERVAL,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ):
+        self.interval = interval
+        self._clock = clock
+        self._boards: dict[tuple[str, str], Board] = {}
+        self._keys: tuple[date | None, dict[str, str]] = (None, {})  # (day, period -> key)
+        self._task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+
+    def board(self, metric: str, period: str, now: datetime | None = None) -> Board:
+        """The current board; a finished day/week is replaced by an empty one."""
+        now = now or self._clock()
+        day, keys = self._keys
+        if day != now.date():
+            keys = {p: period_key(p, now) for p in PERIODS}
+            self._keys = (now.date(), keys)
+        key = keys[period]
+        board = self._boards.get((metric, period))
+        if board is None or board.key != key:
+            board = self._boards[(metric, period)] = Board(metric, period, key)
+        return board
+
+    # ------------------------
+    # settlement hooks
+    # ------------------------
+    def record_round(self, user_id: int, bet: float, win: float = 0.0) -> None:
+        """One settled round (or an auto-play series: total bet, biggest single win)."""
+        now = self._clock()
+        for period in PERIODS:
+            if bet:
+                self.board("wager", period, now).add(user_id, float(bet))
+            if win:
+                self.board("win", period, now).raise_to(user_id, float(win))
+
+    def record_duel_win(self, user_id: int) -> None:
+        now = self._clock()
+        for period in PERIODS:
+            self.board("duels", period, now).add(user_id, 1)
+
+    # ------------------------
+    # persistence
+    # ------------------------
+    async def load(self) -> None:
+        keys = {period: period_key(period, self._clock()) for period in PERIODS}
+        await db.prune_leaderboard_scores(list(keys.values()))
+        rows = await db.get_leaderboard_scores()
+        for metric, period, key, user_id, score in rows:
+            if keys.get(period) == key:
+                self.board(metric, period).set(user_id, score)
+        for board in self._boards.values():
+            board.dirty.clear()
+        if not any(row[1] == "all" for row in rows):
+            # First start: seeded scores stay dirty, the first snapshot saves them.
+            wagered, duels = await db.leaderboard_seed()
+            for user_id, total in wagered:
+                self.board("wager", "all").set(user_id, total)
+            for user_id, wins in duels:
+                self.board("duels", "all").set(user_id, wins)
+        logger.info("Loaded leaderboards: %s", {f"{m}/{p}": len(b) for (m, p), b in self._boards.items()})
+
+    async def snapshot(self) -> int:
+        """Write changed scores. Returns the number of rows written."""
+        async with self._lock:
+            rows = []
+            boards = list(self._boards.values())
+            for board in boards:
+                rows.extend(
+                    (board.metric, board.period, board.key, user_id, board.scores[user_id])
+                    for user_id in board.dirty
+                )
+            if not rows:
+                return 0
+            dirty = {id(board): board.dirty for board in boards}
+            for board in boards:
+                board.dirty = set()
+            try:
+                for start in range(0, len(rows), SNAPSHOT_BATCH):
+                    await db.save_leaderboard_scores(rows[start:start + SNAPSHOT_BATCH])
+            except Exception:
+                for board in boards:
+                    board.dirty |= dirty[id(board)]
+                raise
+            return len(rows)
+
+    # ------------------------
+    # lifecycle
+    # ------------------------
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="leaderboards")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.snapshot()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.shield(self.snapshot())
+            except Exception:
+                logger.exception("Leaderboard snapshot failed")
+
+
+leaderboards = Leaderboards()
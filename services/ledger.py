@@ -0,0 +1,289 @@
+"""Monthly ledger partitions and their archive.
+
+``transactions`` only ever holds the current month, so its index (and the
+cost of every balance change) stays the size of one month however long the
+bot runs. Once a month has ended :meth:`LedgerArchiver.rotate` renames the
+table to ``transactions_YYYYMM`` and starts a fresh one (``DB.rotate_ledger``);
+ids keep growing across partitions. Closed partitions are listed in
+``ledger_partitions`` together with their id range and per-type totals, so
+sums over the whole ledger (``DB.ledger_total``) never scan old months.
+
+The newest ``LEDGER_HOT_MONTHS`` closed months stay in the main database.
+Older ones are copied to a standalone SQLite file, gzipped into
+``LEDGER_ARCHIVE_DIR/transactions_YYYYMM.db.gz`` and dropped from the main
+database. :func:`history` reads a user's rows newest first across the
+current table, the closed tables and the archives (unpacked on demand into a
+small temporary cache and opened read-only).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Sequence
+
+from config import LEDGER_ARCHIVE_DIR, LEDGER_HOT_MONTHS
+from database.db import LEDGER_COLUMNS, LEDGER_USER_INDEX, db, ledger_page_query
+
+logger = logging.getLogger(__name__)
+
+CHECK_INTERVAL = 3600.0  # seconds between rotation/archive checks
+CACHE_SIZE = 4  # unpacked archives kept around for reads
+
+
+def month_start(now: datetime) -> str:
+    """ISO timestamp of the first moment of ``now``'s month (UTC)."""
+    now = now.astimezone(timezone.utc)
+    return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0).isoformat()
+
+
+def partition_name(start: str) -> str:
+    """Name of the partition closing the month before ``start``."""
+    year, month = int(start[:4]), int(start[5:7])
+    year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return f"transactions_{year:04d}{month:02d}"
+
+
+@dataclass
+class ArchiveReport:
+    rotated: str | None = None
+    archived: tuple[str, ...] = ()
+
+
+class LedgerArchiver:
+    def __init__(
+        self,
+        hot_months: int,
+        archive_dir: str,
+        *,
+        interval: float = CHECK_INTERVAL,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ):
+        self.hot_months = hot_months
+        self.archive_dir = archive_dir
+        self.interval = interval
+        self._clock = clock
+        self._task: asyncio.Task | None = None
+        self._busy: asyncio.Future | None = None
+        self._cache: OrderedDict[str, str] = OrderedDict()  # archive path -> unpacked copy
+        self._cache_dir: str | None = None
+        self._cache_lock = threading.Lock()
+
+    # ------------------------
+    # rotation / archive
+    # ------------------------
+    async def rotate(self, now: datetime | None = None):
+        start = month_start(now or self._clock())
+        partition = await db.rotate_ledger(start, partition_name(start))
+        if partition is not None:
+            logger.info(
+                "Closed ledger partition %s: %d rows, ids %s..%s",
+                partition["name"], partition["rows"], partition["first_id"], partition["last_id"],
+            )
+        return partition
+
+    async def archive(self) -> list[str]:
+        """Move closed partitions beyond the newest ``hot_months`` to compressed files."""
+        live = [p["name"] for p in await db.get_ledger_partitions() if not p["archive"]]
+        archived = []
+        for name in live[self.hot_months:]:
+            path = os.path.join(self.archive_dir, f"{name}.db.gz")
+            await asyncio.to_thread(export_partition, db.path, name, path)
+            await db.drop_archived_partition(name, path)
+            archived.append(name)
+            logger.info("Archived ledger partition %s to %s", name, path)
+        return archived
+
+    async def run_once(self, now: datetime | None = None) -> ArchiveReport:
+        partition = await self.rotate(now)
+        return ArchiveReport(partition["name"] if partition is not None else None, tuple(await self.archive()))
+
+    # ------------------------
+    # reads
+    # ------------------------
+    async def history(
+        self,
+        user_id: int,
+        *,
+        before_id: int | None = None,
+        after_id: int | None = None,
+        limit: int = 50,
+        types: Sequence[str] | None = None,
+        columns: str = LEDGER_COLUMNS,
+    ) -> list[sqlite3.Row]:
+        """A user's ledger rows, newest first, across every partition.
+
+        Pass the smallest id of the previous page as ``before_id`` for the next
+        (older) one, or the largest id as ``after_id`` for the ``limit`` rows
+        right after it (paging back towards the newest).
+        """
+        if after_id is not None:
+            return await self._history_after(user_id, after_id, limit, types, columns)
+        rows = list(await db.get_ledger_page(
+            "transactions", user_id, before_id=before_id, limit=limit, types=types, columns=columns,
+        ))
+        if len(rows) >= limit:
+            return rows
+        joined = await self._joined(user_id)
+        for partition in await db.get_ledger_partitions():
+            if before_id is not None and partition["first_id"] >= before_id:
+                continue
+            if joined and partition["last_at"] and partition["last_at"] < joined:
+                break  # older months than the account itself
+            rows.extend(await self._partition_page(
+                partition, user_id, before_id=before_id, limit=limit - len(rows), types=types, columns=columns,
+            ))
+            if len(rows) >= limit:
+                break
+        return rows
+
+    async def _history_after(
+        self, user_id: int, after_id: int, limit: int, types: Sequence[str] | None, columns: str,
+    ) -> list[sqlite3.Row]:
+        rows = []
+        joined = await self._joined(user_id)
+        for partition in reversed(await db.get_ledger_partitions()):
+            if partition["last_id"] is None or partition["last_id"] <= after_id:
+                continue
+            if joined and partition["last_at"] and partition["last_at"] < joined:
+                continue
+            rows.extend(await self._partition_page(
+                partition, user_id, after_id=after_id, limit=limit - len(rows), types=types, columns=columns,
+            ))
+            if len(rows) >= limit:
+                return rows[::-1]
+        rows.extend(await db.get_ledger_page(
+            "transactions", user_id, after_id=after_id, limit=limit - len(rows), types=types, columns=columns,
+        ))
+        return rows[::-1]
+
+    async def _partition_page(self, partition, user_id: int, **page) -> list[sqlite3.Row]:
+        if partition["archive"]:
+            query, params = ledger_page_query("transactions", user_id, **page)
+            return await asyncio.to_thread(self.read_archive, partition["archive"], query, params)
+        return await db.get_ledger_page(partition["name"], user_id, **page)
+
+    @staticmethod
+    async def _joined(user_id: int) -> str | None:
+        user = await db.fetchone("SELECT created_at FROM users WHERE user_id=?", (user_id,))
+        return user["created_at"] if user else None
+
+    def read_archive(self, archive: str, query: str, params: Sequence[Any]) -> list[sqlite3.Row]:
+        """Run a read-only query on an archived partition (blocking, call it in a thread)."""
+        conn = self.open_archive(archive)
+        try:
+            conn.row_factory = sqlite3.Row
+            return conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+
+    def open_archive(self, archive: str) -> sqlite3.Connection:
+        """Read-only connection to an archived partition; its table is ``transactions`` (blocking)."""
+        return sqlite3.connect(f"file:{self._unpacked(archive)}?mode=ro", uri=True)
+
+    def _unpacked(self, archive: str) -> str:
+        with self._cache_lock:
+            if archive in self._cache:
+                self._cache.move_to_end(archive)
+                return self._cache[archive]
+            if self._cache_dir is None:
+                self._cache_dir = tempfile.mkdtemp(prefix="casino-ledger-")
+            target = os.path.join(self._cache_dir, os.path.basename(archive).removesuffix(".gz"))
+            with gzip.open(archive, "rb") as src, open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1 << 20)
+            self._cache[archive] = target
+            while len(self._cache) > CACHE_SIZE:
+                _, evicted = self._cache.popitem(last=False)
+                os.remove(evicted)
+            return target
+
+    # ------------------------
+    # lifecycle
+    # ------------------------
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="ledger-archiver")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._busy is not None and not self._busy.done():
+            # Let a rotation/archive that already started finish.
+            await asyncio.wait([self._busy])
+        if self._cache_dir is not None:
+            shutil.rmtree(self._cache_dir, ignore_errors=True)
+            self._cache_dir = None
+            self._cache.clear()
+
+    async def _run(self) -> None:
+        while True:
+            self._busy = asyncio.ensure_future(self.run_once())
+            try:
+                await asyncio.shield(self._busy)
+            except Exception:
+                logger.exception("Ledger rotation failed")
+            await asyncio.sleep(self.interval)
+
+
+def export_partition(db_path: str, name: str, target: str) -> None:
+    """Copy partition ``name`` into a standalone, gzipped SQLite file at ``target``.
+
+    The copy keeps the ``transactions`` schema and user index so it can be
+    queried as is once unpacked. Written to a temporary name and renamed,
+    so ``target`` is either complete or absent.
+    """
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(target) or ".") as workdir:
+        plain = os.path.join(workdir, f"{name}.db")
+        conn = sqlite3.connect(db_path)
+        try:
+            ddl = conn.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (name,)).fetchone()
+            if ddl is None:
+                raise RuntimeError(f"Ledger partition {name} not found")
+            conn.execute("ATTACH DATABASE ? AS archive", (plain,))
+            # Same columns as the partition; the users foreign key is inert in
+            # a file that is only ever read.
+            conn.execute(f"CREATE TABLE archive.transactions {ddl[0][ddl[0].index('('):]}")
+            conn.execute(f"INSERT INTO archive.transactions SELECT * FROM main.{name}")
+            conn.execute(f"CREATE INDEX archive.idx_transactions_user ON transactions({LEDGER_USER_INDEX})")
+            conn.commit()
+            conn.execute("DETACH DATABASE archive")
+        finally:
+            conn.close()
+        packed = os.path.join(workdir, f"{name}.db.gz")
+        with open(plain, "rb") as src, gzip.open(packed, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        with open(packed, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(packed, target)
+
+
+archiver = LedgerArchiver(LEDGER_HOT_MONTHS, LEDGER_ARCHIVE_DIR)
+
+
+async def history(
+    user_id: int,
+    *,
+    before_id: int | None = None,
+    after_id: int | None = None,
+    limit: int = 50,
+    types: Sequence[str] | None = None,
+    columns: str = LEDGER_COLUMNS,
+) -> list[sqlite3.Row]:
+    return await archiver.history(
+        user_id, before_id=before_id, after_id=after_id, limit=limit, types=types, columns=columns,
+    )
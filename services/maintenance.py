@@ -0,0 +1,232 @@
+"""Database maintenance: WAL checkpoints and online backups.
+
+The bot runs SQLite in WAL mode. SQLite's own auto-checkpoint copies pages
+back into the database but never shrinks the ``-wal`` file, and it gives up
+while readers hold old snapshots, so after a busy raffle the WAL can stay
+hundreds of megabytes long and every reader pays for it. Every ``interval``
+seconds :class:`Maintenance` looks at the WAL size and runs
+
+- ``wal_checkpoint(PASSIVE)`` once it passes a quarter of
+  ``WAL_CHECKPOINT_MB`` (never waits for anyone);
+- ``wal_checkpoint(TRUNCATE)`` once it passes ``WAL_CHECKPOINT_MB``, which
+  also resets the file to zero bytes.
+
+Every ``BACKUP_INTERVAL_HOURS`` it copies the database to
+``BACKUP_DIR/casino-YYYYMMDD-HHMMSS.db`` with the SQLite backup API in steps
+of ``BACKUP_PAGES`` pages, from its own connection in a worker thread, and
+keeps the newest ``BACKUP_KEEP`` copies. Durations and sizes are kept in
+:attr:`Maintenance.metrics` for the admin panel.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from config import BACKUP_DIR, BACKUP_INTERVAL_HOURS, BACKUP_KEEP, WAL_CHECKPOINT_MB
+from database.db import db
+
+logger = logging.getLogger(__name__)
+
+CHECK_INTERVAL = 30.0  # seconds
+BACKUP_PAGES = 256  # pages copied per backup step
+BACKUP_PAUSE = 0.005  # seconds between steps, lets the bot's connection run
+BACKUP_PREFIX = "casino-"
+
+
+@dataclass
+class MaintenanceMetrics:
+    checkpoints: dict[str, int] = field(default_factory=dict)  # mode -> count
+    checkpoint_busy: int = 0  # TRUNCATE runs that could not finish because of readers
+    last_checkpoint_ms: float = 0.0
+    max_checkpoint_ms: float = 0.0
+    wal_bytes: int = 0
+    wal_peak: int = 0
+    backups: int = 0
+    backup_failures: int = 0
+    last_backup: str | None = None
+    last_backup_at: float = 0.0
+    last_backup_seconds: float = 0.0
+    last_backup_bytes: int = 0
+
+
+class Maintenance:
+    def __init__(
+        self,
+        *,
+        backup_dir: str = BACKUP_DIR,
+        backup_interval: float = BACKUP_INTERVAL_HOURS * 3600,
+        keep: int = BACKUP_KEEP,
+        wal_limit: int = int(WAL_CHECKPOINT_MB * 1024 * 1024),
+        interval: float = CHECK_INTERVAL,
+    ):
+        self.backup_dir = backup_dir
+        self.backup_interval = backup_interval
+        self.keep = keep
+        self.wal_limit = wal_limit
+        self.interval = interval
+        self.metrics = MaintenanceMetrics()
+        self._task: asyncio.Task | None = None
+        self._busy: asyncio.Future | None = None
+        self._backing_up = False
+
+    def wal_size(self) -> int:
+        try:
+            return os.path.getsize(f"{db.path}-wal")
+        except OSError:
+            return 0
+
+    # ------------------------
+    # checkpoints
+    # ------------------------
+    async def checkpoint(self, mode: str) -> tuple[int, int, int]:
+        started = time.perf_counter()
+        busy, log, done = await db.checkpoint(mode)
+        elapsed = (time.perf_counter() - started) * 1000
+        m = self.metrics
+        m.checkpoints[mode] = m.checkpoints.get(mode, 0) + 1
+        m.checkpoint_busy += bool(busy)
+        m.last_checkpoint_ms = elapsed
+        m.max_checkpoint_ms = max(m.max_checkpoint_ms, elapsed)
+        if elapsed > 1000 or busy:
+            logger.warning("wal_checkpoint(%s) took %.0f ms, busy=%s, %d/%d frames", mode, elapsed, busy, done, log)
+        return busy, log, done
+
+    async def check_wal(self) -> str | None:
+        """Checkpoint if the WAL is past its thresholds. Returns the mode used."""
+        size = self.wal_size()
+        self.metrics.wal_bytes = size
+        self.metrics.wal_peak = max(self.metrics.wal_peak, size)
+        if size >= self.wal_limit and not self._backing_up:
+            # A running backup pins a snapshot; TRUNCATE would only wait for it.
+            mode = "TRUNCATE"
+        elif size >= self.wal_limit // 4:
+            mode = "PASSIVE"
+        else:
+            return None
+        await self.checkpoint(mode)
+        self.metrics.wal_bytes = self.wal_size()
+        return mode
+
+    # ------------------------
+    # backups
+    # ------------------------
+    def backup_due(self, now: float | None = None) -> bool:
+        if self.backup_interval <= 0:
+            return False
+        if not self.metrics.last_backup_at:
+            existing = self.backups()
+            if existing:
+                self.metrics.last_backup_at = os.path.getmtime(existing[-1])
+        return (now or time.time()) - self.metrics.last_backup_at >= self.backup_interval
+
+    def backups(self) -> list[str]:
+        """Existing backup files, oldest first."""
+        try:
+            names = sorted(
+                n for n in os.listdir(self.backup_dir) if n.startswith(BACKUP_PREFIX) and n.endswith(".db")
+            )
+        except FileNotFoundError:
+            return []
+        return [os.path.join(self.backup_dir, n) for n in names]
+
+    async def backup(self) -> str:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+        target = os.path.join(self.backup_dir, f"{BACKUP_PREFIX}{stamp}.db")
+        started = time.perf_counter()
+        self._backing_up = True
+        try:
+            await asyncio.to_thread(backup_database, db.path, target)
+        except Exception:
+            self.metrics.backup_failures += 1
+            raise
+        finally:
+            self._backing_up = False
+        m = self.metrics
+        m.backups += 1
+        m.last_backup = target
+        m.last_backup_at = time.time()
+        m.last_backup_seconds = time.perf_counter() - started
+        m.last_backup_bytes = os.path.getsize(target)
+        for old in self.backups()[:-self.keep]:
+            os.remove(old)
+        logger.info(
+            "Backed up the database to %s in %.1fs (%.1f MB)", target, m.last_backup_seconds, m.last_backup_bytes / 1e6,
+        )
+        return target
+
+    async def run_once(self) -> None:
+        await self.check_wal()
+        if self.backup_due():
+            await self.backup()
+
+    # ------------------------
+    # lifecycle
+    # ------------------------
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="db-maintenance")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._busy is not None and not self._busy.done():
+            # A backup thread can not be interrupted; let it finish and rotate.
+            await asyncio.wait([self._busy])
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            self._busy = asyncio.ensure_future(self.run_once())
+            try:
+                await asyncio.shield(self._busy)
+            except Exception:
+                logger.exception("Database maintenance failed")
+
+
+def backup_database(db_path: str, target: str, *, pages: int = BACKUP_PAGES, pause: float = BACKUP_PAUSE) -> None:
+    """Online copy of ``db_path`` to ``target`` (blocking).
+
+    The source connection opens a read transaction first and keeps it for the
+    whole copy. The backup API restarts from scratch whenever another
+    connection writes to the source, which under steady bets means it never
+    finishes; a pinned WAL snapshot gives it a fixed image to copy while the
+    bot keeps writing. Written to a temporary name and renamed, so ``target``
+    is either complete or absent.
+    """
+    os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+    partial = f"{target}.partial"
+    src = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, isolation_level=None)
+    try:
+        src.execute("BEGIN")
+        src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        dst = sqlite3.connect(partial)
+        try:
+            src.backup(dst, pages=pages, sleep=pause)
+            # The copy is a standalone file: no WAL next to it.
+            dst.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            dst.close()
+        src.execute("COMMIT")
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    finally:
+        src.close()
+    with open(partial, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(partial, target)
+
+
+maintenance = Maintenance()
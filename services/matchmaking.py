@@ -0,0 +1,163 @@
+"""Quick-match queue for duels.
+
+Players waiting for a quick match sit in FIFO buckets keyed by
+``(game, bet)``. Each ticket is an ordinary ``waiting`` row in ``duels``
+(flagged ``matchmaking=1``), so the stake is already debited, the queue is
+rebuilt from the table after a restart and the duel can still be joined by
+link, cancelled or expired like any other.
+
+Pairing pops the oldest ticket of the bucket, so it is O(1) unless the
+fairness window applies: a player is never paired with themselves, and two
+players who met within the last ``REMATCH_WINDOW`` seconds are not paired
+again (stops two accounts from passing money between themselves through
+quick matches). At most ``SCAN_LIMIT`` tickets are looked at; if none fits,
+the player opens their own ticket.
+
+Tickets that left the queue another way (joined by link, cancelled,
+expired) are dropped with :meth:`MatchQueue.remove`; removal only unlinks the
+ticket, the deque entry is skipped lazily.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable
+
+from database.db import db
+
+REMATCH_WINDOW = 600.0  # seconds
+SCAN_LIMIT = 16
+
+
+@dataclass
+class Ticket:
+    duel_id: int
+    user_id: int
+    game: str
+    bet: Decimal
+    since: float
+
+
+def bucket_key(game: str, bet) -> tuple[str, Decimal]:
+    return game, Decimal(str(bet)).quantize(Decimal("0.01"))
+
+
+class MatchQueue:
+    def __init__(self, *, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._buckets: dict[tuple[str, Decimal], deque[Ticket]] = {}
+        self._live: dict[int, Ticket] = {}  # duel_id -> ticket still waiting
+        self._depth: dict[tuple[str, Decimal], int] = {}
+        self._recent: dict[frozenset, float] = {}  # {user_a, user_b} -> last pairing time
+        self.enqueued = 0
+        self.matched = 0
+        self.total_wait = 0.0
+
+    # ------------------------
+    # queue
+    # ------------------------
+    def enqueue(self, duel_id: int, user_id: int, game: str, bet, since: float | None = None) -> Ticket:
+        key = bucket_key(game, bet)
+        ticket = Ticket(duel_id, user_id, key[0], key[1], self._clock() if since is None else since)
+        self._buckets.setdefault(key, deque()).append(ticket)
+        self._live[duel_id] = ticket
+        self._depth[key] = self._depth.get(key, 0) + 1
+        self.enqueued += 1
+        return ticket
+
+    def requeue(self, ticket: Ticket) -> None:
+        """Put back a ticket from :meth:`pop_partner` whose pairing fell through, at the front."""
+        key = (ticket.game, ticket.bet)
+        self._buckets.setdefault(key, deque()).appendleft(ticket)
+        self._live[ticket.duel_id] = ticket
+        self._depth[key] = self._depth.get(key, 0) + 1
+
+    def remove(self, duel_id: int) -> Ticket | None:
+        ticket = self._live.pop(duel_id, None)
+        if ticket is not None:
+            self._depth[(ticket.game, ticket.bet)] -= 1
+        return ticket
+
+    def pop_partner(self, game: str, bet, user_id: int) -> Ticket | None:
+        """Take the oldest waiting ticket ``user_id`` may be paired with, if any.
+
+        Synchronous on purpose: two players pressing the button at once can
+        never be handed the same ticket.
+        """
+        key = bucket_key(game, bet)
+        bucket = self._buckets.get(key)
+        if not bucket:
+            return None
+
+        now = self._clock()
+        skipped: list[Ticket] = []
+        found: Ticket | None = None
+        while bucket and len(skipped) < SCAN_LIMIT:
+            ticket = bucket.popleft()
+            if self._live.get(ticket.duel_id) is not ticket:
+                continue  # removed earlier
+            if ticket.user_id == user_id or self._met_recently(ticket.user_id, user_id, now):
+                skipped.append(ticket)
+                continue
+            found = ticket
+            break
+        # Skipped tickets keep their place at the front.
+        bucket.extendleft(reversed(skipped))
+        if not bucket:
+            del self._buckets[key]
+        if found is not None:
+            self.remove(found.duel_id)
+        return found
+
+    def paired(self, ticket: Ticket, opponent_id: int) -> None:
+        """Record a successful pairing (metrics + rematch window)."""
+        now = self._clock()
+        self.matched += 1
+        self.total_wait += max(now - ticket.since, 0.0)
+        self._recent[frozenset((ticket.user_id, opponent_id))] = now
+        if len(self._recent) > 4096:
+            self._recent = {pair: at for pair, at in self._recent.items() if now - at < REMATCH_WINDOW}
+
+    def _met_recently(self, a: int, b: int, now: float) -> bool:
+        at = self._recent.get(frozenset((a, b)))
+        return at is not None and now - at < REMATCH_WINDOW
+
+    # ------------------------
+    # metrics
+    # ------------------------
+    def depth(self) -> dict[tuple[str, Decimal], int]:
+        """Waiting tickets per ``(game, bet)`` bucket."""
+        return {key: n for key, n in sorted(self._depth.items()) if n}
+
+    @property
+    def waiting(self) -> int:
+        return len(self._live)
+
+    @property
+    def average_wait(self) -> float:
+        return self.total_wait / self.matched if self.matched else 0.0
+
+    def oldest_wait(self) -> float:
+        if not self._live:
+            return 0.0
+        return self._clock() - min(ticket.since for ticket in self._live.values())
+
+    # ------------------------
+    # durability
+    # ------------------------
+    async def load(self) -> None:
+        """Rebuild the queue from quick-match duels still waiting in the database."""
+        for row in await db.get_waiting_duels(matchmaking=True):
+            try:
+                since = datetime.fromisoformat(row["created_at"]).timestamp()
+            except (TypeError, ValueError):
+                since = None
+            self.enqueue(int(row["id"]), int(row["creator_id"]), row["game"], row["bet"], since)
+        self.enqueued = 0
+
+
+matchmaker = MatchQueue()
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+
 from aiogram import Bot
 from aiogram.client.default import DefaultBotProperties
 
 from config import TOKEN, GAME_LOG_CHANNEL
+from services.bot_session import BacklogFull, Priority, ScheduledSession, priority
 from services.settings import get_game_log_channel
+from services.tenants import tenants
 
+logger = logging.getLogger(__name__)
 
 bot_instance: Bot | None = None
 
@@ -15,6 +21,7 @@ async def _get_bot() -> Bot:
     if bot_instance is None:
         bot_instance = Bot(
             token=TOKEN,
+            session=ScheduledSession(),
             default=DefaultBotProperties(parse_mode="HTML"),
         )
     return bot_instance
@@ -24,8 +31,41 @@ async def send_game_log(bot: Bot | None, text: str) -> None:
     channel = await get_game_log_channel()
     if not channel:
         return
+    tenant = tenants.current()
+    client = bot or (tenant.bot if tenant is not None else await _get_bot())
+    post_log(client, channel, text, what="Game log")
+
+
+# A channel takes 20 messages a minute, so a log line can wait minutes in the
+# scheduler's per-chat queue. Handlers must not wait with it: log sends run as
+# tracked background tasks and the player's round goes on.
+_log_sends: set[asyncio.Task] = set()
+
+
+def post_log(bot: Bot, channel: int | str, text: str, *, what: str = "Log") -> None:
+    """Send ``text`` to a log channel at ``Priority.LOG`` without waiting for it."""
+    task = asyncio.create_task(_send_log(bot, channel, text, what))
+    _log_sends.add(task)
+    task.add_done_callback(_log_sends.discard)
+
+
+async def _send_log(bot: Bot, channel: int | str, text: str, what: str) -> None:
     try:
-        client = bot or await _get_bot()
-        await client.send_message(channel, text, disable_web_page_preview=True)
-    except Exception:
-        pass
+        with priority(Priority.LOG):
+            await bot.send_message(channel, text, disable_web_page_preview=True)
+    except BacklogFull:
+        pass  # the channel's 20/min can not keep up; counted in the scheduler metrics
+    except Exception as e:
+        logger.warning("%s to %s failed: %s", what, channel, e)
+
+
+def pending_log_sends() -> int:
+    return len(_log_sends)
+
+
+async def close_log_sends() -> None:
+    """Drop log lines still queued (on shutdown)."""
+    tasks = list(_log_sends)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
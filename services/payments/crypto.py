@@ -1,17 +1,30 @@
-from decimal import Decimal
+from __future__ import annotations
 
-from aiocryptopay import AioCryptoPay, Networks
+from decimal import Decimal
+from typing import TYPE_CHECKING
 
 from config import settings
 from database.db import db
 
+if TYPE_CHECKING:
+    from aiocryptopay import AioCryptoPay
+
+_crypto: AioCryptoPay | None = None
+
+
+def get_crypto() -> AioCryptoPay:
+    """CryptoBot client, created (and aiocryptopay imported) on the first payment."""
+    global _crypto
+    if _crypto is None:
+        from aiocryptopay import AioCryptoPay, Networks
 
-crypto = AioCryptoPay(token=settings.CRYPTO_TOKEN or "", network=Networks.MAIN_NET)
+        _crypto = AioCryptoPay(token=settings.CRYPTO_TOKEN or "", network=Networks.MAIN_NET)
+    return _crypto
 
 
 async def create_crypto_invoice(user_id: int, amount: float):
     # создаём инвойс
-    invoice = await crypto.create_invoice(
+    invoice = await get_crypto().create_invoice(
         asset="USDT",
         amount=amount
     )
@@ -32,7 +45,7 @@ async def create_crypto_invoice(user_id: int, amount: float):
 
 
 async def check_crypto_payment(invoice_id: str):
-    invoices = await crypto.get_invoices(invoice_ids=[invoice_id])
+    invoices = await get_crypto().get_invoices(invoice_ids=[invoice_id])
 
     # aiocryptopay returns an object with .invoices
     if not invoices or not getattr(invoices, "invoices", None):
@@ -2,8 +2,6 @@ from __future__ import annotations
 
 from decimal import Decimal
 
-import httpx
-
 from config import settings
 from database.db import db
 
@@ -15,6 +13,8 @@ async def check_rocket_receipt(receipt: str) -> dict:
     if not settings.ROCKET_API_KEY:
         return {"valid": False, "error": "ROCKET_API_KEY not configured"}
 
+    import httpx  # ~100 ms to import; only needed once someone pays with Rocket
+
     timeout = httpx.Timeout(10.0, read=15.0)
     async with httpx.AsyncClient(timeout=timeout) as client:
         r = await client.post(
@@ -12,16 +12,9 @@ async def process_stars_payment(user_id: int, stars_amount: int) -> float:
     usd_amount = Decimal(str(stars_amount)) * conversion_rate
     usd_amount = usd_amount.quantize(Decimal('0.01'), rounding=ROUND_DOWN)
 
-    # Обновляем баланс
-    await db.execute(
-        "UPDATE users SET balance = balance + ? WHERE user_id = ?",
-        (float(usd_amount), user_id)
-    )
-
-    # Записываем транзакцию
-    await db.execute(
-        "INSERT INTO transactions (user_id, amount, type, method) VALUES (?, ?, 'deposit', 'stars')",
-        (user_id, float(usd_amount))
+    # Баланс и запись в журнале — одной транзакцией
+    await db.change_balance_atomic(
+        user_id, usd_amount, tx_type="deposit", method="stars", meta={"stars": stars_amount},
     )
 
     return float(usd_amount)
\ No newline at end of file
@@ -0,0 +1,291 @@
+"""Provably-fair RNG (server seed / client seed / nonce).
+
+Every user has an active server seed whose SHA-256 is shown up front, a client
+seed they may change, and a nonce that increments once per round. A round's
+randomness is the byte stream::
+
+    HMAC_SHA256(key=server_seed, msg=f"{client_seed}:{nonce}:{block}")  block = 0, 1, ...
+
+cut into 4-byte big-endian integers and divided by 2**32 to get floats in
+[0, 1). Games draw from it through :class:`FairRng` (``random``, ``randint``,
+``shuffle``, ``sample`` - the subset of the ``random`` module they use).
+
+The server seed is revealed when the user rotates it; from then on every game
+played with it can be replayed with :func:`verify` / :func:`verify_games`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import secrets
+import struct
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, MutableSequence, Sequence
+
+from database.db import db
+from services.games_log import games_log
+
+_UNPACK = struct.Struct(">8I").unpack
+_SCALE = 1 / 4294967296  # 2**-32
+
+
+def hash_server_seed(server_seed: str) -> str:
+    return hashlib.sha256(server_seed.encode()).hexdigest()
+
+
+def new_server_seed() -> str:
+    return secrets.token_hex(32)
+
+
+def new_client_seed() -> str:
+    return secrets.token_hex(8)
+
+
+class FairRng:
+    """Deterministic float stream of one round.
+
+    ``mac`` lets callers reuse an HMAC already keyed with the server seed
+    (the bulk verifier does this to skip the key setup per round).
+    """
+
+    __slots__ = ("_mac", "_prefix", "_block", "_buf")
+
+    def __init__(self, server_seed: str, client_seed: str, nonce: int, *, mac: "hmac.HMAC | None" = None):
+        self._mac = mac or hmac.new(server_seed.encode(), digestmod=hashlib.sha256)
+        self._prefix = f"{client_seed}:{nonce}:".encode()
+        self._block = 0
+        self._buf: list[float] = []
+
+    def random(self) -> float:
+        if not self._buf:
+            mac = self._mac.copy()
+            mac.update(self._prefix + str(self._block).encode())
+            self._block += 1
+            # Reversed so pop() hands the floats out in stream order.
+            self._buf = [v * _SCALE for v in reversed(_UNPACK(mac.digest()))]
+        return self._buf.pop()
+
+    def randint(self, a: int, b: int) -> int:
+        return a + int(self.random() * (b - a + 1))
+
+    def shuffle(self, items: MutableSequence[Any]) -> None:
+        for i in range(len(items) - 1, 0, -1):
+            j = int(self.random() * (i + 1))
+            items[i], items[j] = items[j], items[i]
+
+    def sample(self, population: Iterable[Any], k: int) -> list[Any]:
+        pool = list(population)
+        n = len(pool)
+        if not 0 <= k <= n:
+            raise ValueError("Sample larger than population")
+        for i in range(k):
+            j = i + int(self.random() * (n - i))
+            pool[i], pool[j] = pool[j], pool[i]
+        return pool[:k]
+
+
+@dataclass(frozen=True)
+class RoundSeed:
+    server_seed: str
+    server_seed_hash: str
+    client_seed: str
+    nonce: int
+
+    def rng(self) -> FairRng:
+        return FairRng(self.server_seed, self.client_seed, self.nonce)
+
+    def public(self) -> dict[str, Any]:
+        """What may be shown and stored before the server seed is revealed."""
+        return {"hash": self.server_seed_hash, "client_seed": self.client_seed, "nonce": self.nonce}
+
+
+# ------------------------
+# seed lifecycle
+# ------------------------
+def _new_seed_pair(client_seed: str | None = None) -> tuple[str, str, str]:
+    server_seed = new_server_seed()
+    return server_seed, hash_server_seed(server_seed), client_seed or new_client_seed()
+
+
+async def next_round(user_id: int) -> RoundSeed:
+    """Seed material for the user's next round (creates the seed pair on first use)."""
+    row = await db.take_fair_nonce(user_id)
+    if row is None:
+        # Created inside the nonce transaction, not by rotate(): a concurrent
+        # first round must not reveal the seed this one is played on.
+        row = await db.take_fair_nonce(user_id, new_seed=_new_seed_pair())
+    return RoundSeed(row["server_seed"], row["server_seed_hash"], row["client_seed"], int(row["nonce"]))
+
+
+async def next_rounds(user_id: int, count: int) -> list[RoundSeed]:
+    """Seed material for ``count`` consecutive rounds, reserved with one nonce update."""
+    row = await db.take_fair_nonce(user_id, count)
+    if row is None:
+        row = await db.take_fair_nonce(user_id, count, new_seed=_new_seed_pair())
+    last = int(row["nonce"])
+    return [
+        RoundSeed(row["server_seed"], row["server_seed_hash"], row["client_seed"], nonce)
+        for nonce in range(last - count + 1, last + 1)
+    ]
+
+
+async def current_seed(user_id: int) -> dict[str, Any] | None:
+    """Public view of the active seed pair: hash, client seed, nonce."""
+    row = await db.get_fair_seed(user_id)
+    if not row:
+        return None
+    return {"hash": row["server_seed_hash"], "client_seed": row["client_seed"], "nonce": int(row["nonce"])}
+
+
+async def ensure_seed(user_id: int) -> None:
+    """Create the user's seed pair if they have none; never reveals an existing one."""
+    server_seed, server_seed_hash, client_seed = _new_seed_pair()
+    await db.create_fair_seed(
+        user_id, server_seed=server_seed, server_seed_hash=server_seed_hash, client_seed=client_seed,
+    )
+
+
+async def rotate(user_id: int, client_seed: str | None = None) -> tuple[str | None, str]:
+    """Reveal the active server seed and commit to a new one.
+
+    Returns ``(revealed_server_seed, new_server_seed_hash)``; the first item is
+    None when the user had no seed yet.
+    """
+    # Queued rounds must be in ``games`` before the reveal stamps their seed.
+    await games_log.flush()
+    server_seed, server_seed_hash, client_seed = _new_seed_pair(client_seed)
+    old = await db.rotate_fair_seed(
+        user_id,
+        server_seed=server_seed,
+        server_seed_hash=server_seed_hash,
+        client_seed=client_seed,
+    )
+    return (old["server_seed"] if old else None), server_seed_hash
+
+
+# ------------------------
+# replay / verification
+# ------------------------
+def _replay_mines(rng: FairRng, proof: dict) -> dict:
+    return {"mines": sorted(rng.sample(range(25), int(proof["mines_count"])))}
+
+
+def _replay_blackjack(rng: FairRng, proof: dict) -> dict:
+    from handlers.games.blackjack import RANKS, SUITS
+
+    # Deck.draw() pops from the end of the shuffled shoe, and the backwards
+    # Fisher-Yates in FairRng.shuffle fixes the end first: the k-th card drawn
+    # is settled after k swaps. Replay only those on a sparse view of the shoe
+    # (unbuilt, in Deck's decks x suits x ranks order).
+    size = 52 * int(proof.get("num_decks", 6))
+    moved: dict[int, int] = {}
+    drawn = []
+    for i in range(size - 1, size - 1 - len(proof["drawn"]), -1):
+        j = int(rng.random() * (i + 1))
+        card = moved.get(j, j)
+        moved[j] = moved.get(i, i)
+        drawn.append([RANKS[card % 13], SUITS[card % 52 // 13]])
+    return {"drawn": drawn}
+
+
+def _replay_russian(rng: FairRng, proof: dict) -> dict:
+    from services.games.rr_logic import rr_spin_chamber
+
+    return {"shots": [rr_spin_chamber(stage, rng) for stage in range(1, len(proof["shots"]) + 1)]}
+
+
+def _replay_emoji(rng: FairRng, proof: dict) -> dict:
+    # Server-side emoji rolls (services.emoji_rng): one randint over the emoji's faces.
+    return {"value": rng.randint(1, int(proof["faces"]))}
+
+
+REPLAYS: dict[str, Callable[[FairRng, dict], dict]] = {
+    "mines": _replay_mines,
+    "blackjack": _replay_blackjack,
+    "russian": _replay_russian,
+    "dice": _replay_emoji,
+    "roulette": _replay_emoji,
+    "football": _replay_emoji,
+    "darts": _replay_emoji,
+    "basketball": _replay_emoji,
+    "bowling": _replay_emoji,
+}
+
+
+def _matches(replayed: dict, proof: dict) -> bool:
+    return all(proof.get(key) == value for key, value in replayed.items())
+
+
+def verify(
+    server_seed: str,
+    server_seed_hash: str,
+    client_seed: str,
+    nonce: int,
+    game_type: str,
+    proof: dict | str,
+) -> bool:
+    """True if the revealed seed matches its hash and reproduces the logged outcome."""
+    if isinstance(proof, str):
+        proof = json.loads(proof)
+    replay = REPLAYS.get(game_type)
+    if replay is None or hash_server_seed(server_seed) != server_seed_hash:
+        return False
+    return _matches(replay(FairRng(server_seed, client_seed, nonce), proof), proof)
+
+
+@dataclass
+class VerifyReport:
+    checked: int = 0
+    failed: list[int] = field(default_factory=list)
+
+
+def verify_games(rows: Iterable[Sequence[Any]]) -> VerifyReport:
+    """Replay ``(id, game_type, seed, hash, client_seed, nonce, proof)`` rows.
+
+    Rows sharing a server seed reuse one keyed HMAC and one hash check, so
+    ordering the input by seed (as :func:`verify_stored_games` does) is fastest.
+    """
+    report = VerifyReport()
+    last_seed: str | None = None
+    mac: hmac.HMAC | None = None
+    seed_ok = False
+
+    for game_id, game_type, seed, seed_hash, client_seed, nonce, proof_raw in rows:
+        report.checked += 1
+        if seed != last_seed:
+            last_seed = seed
+            mac = hmac.new(seed.encode(), digestmod=hashlib.sha256)
+            seed_ok = hash_server_seed(seed) == seed_hash
+        replay = REPLAYS.get(game_type)
+        if not seed_ok or replay is None:
+            report.failed.append(int(game_id))
+            continue
+        proof = json.loads(proof_raw) if isinstance(proof_raw, str) else proof_raw
+        if not _matches(replay(FairRng(seed, client_seed, int(nonce), mac=mac), proof), proof):
+            report.failed.append(int(game_id))
+    return report
+
+
+async def verify_stored_games(batch: int = 5000) -> VerifyReport:
+    """Verify every logged round whose server seed has been revealed."""
+    total = VerifyReport()
+    last_id = 0
+    while True:
+        rows = await db.fetchall(
+            """
+            SELECT id, game_type, seed, hash, client_seed, nonce, proof
+            FROM games
+            WHERE id > ? AND seed IS NOT NULL AND proof IS NOT NULL
+            ORDER BY id
+            LIMIT ?
+            """,
+            (last_id, batch),
+        )
+        if not rows:
+            return total
+        last_id = int(rows[-1][0])
+        report = verify_games(sorted((tuple(r) for r in rows), key=lambda r: r[2]))
+        total.checked += report.checked
+        total.failed.extend(report.failed)
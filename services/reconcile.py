@@ -0,0 +1,153 @@
+"""Balance reconciliation: ``users.balance`` against the sum of the ledger.
+
+Every balance change is supposed to leave a ``transactions`` row, so a
+user's balance must equal the sum of their ledger amounts. The reconciler
+keeps that sum per user in ``ledger_checkpoints`` together with the last
+ledger id folded in (global cursor in ``settings``), so each run:
+
+1. streams only the ledger rows after the cursor, in id order and in chunks
+   of ``CHUNK`` rows, across every partition (archived months included, see
+   ``services.ledger``); each chunk is summed per user and added to the
+   checkpoints in one transaction that also moves the cursor, so memory is
+   bounded by the chunk size and an interrupted run resumes where it stopped;
+2. compares balances with the checkpoints in batches of ``USERS_PER_BATCH``
+   users; each batch first folds in rows written since step 1 under the
+   write lock, so a concurrent bet can not show up as a false mismatch.
+
+The first run reads the whole ledger once; later runs only read new rows.
+Mismatches are logged and kept in :attr:`Reconciler.last_report` for the
+admin panel.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+from database.db import db
+from services.ledger import archiver
+
+logger = logging.getLogger(__name__)
+
+CHUNK = 50_000  # ledger rows per checkpoint transaction
+USERS_PER_BATCH = 5_000
+TOLERANCE = 0.0001  # float sums of 2-decimal amounts drift far below this
+RUN_INTERVAL = 6 * 3600.0  # seconds
+
+
+@dataclass
+class ReconcileReport:
+    rows: int = 0  # ledger rows folded into checkpoints this run
+    users: int = 0
+    mismatches: list[tuple[int, float, float]] = field(default_factory=list)  # (user_id, balance, ledger)
+    elapsed: float = 0.0
+    finished_at: float = 0.0
+
+
+class Reconciler:
+    def __init__(self, *, chunk: int = CHUNK, interval: float = RUN_INTERVAL):
+        self.chunk = chunk
+        self.interval = interval
+        self.last_report: ReconcileReport | None = None
+        self._running = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._running.locked()
+
+    async def run(self) -> ReconcileReport:
+        async with self._running:
+            started = time.perf_counter()
+            report = ReconcileReport()
+            report.rows = await self._stream()
+
+            after = 0
+            while after is not None:
+                folded, users, after, mismatched = await db.compare_balances(after, USERS_PER_BATCH, TOLERANCE)
+                report.rows += folded
+                report.users += users
+                report.mismatches.extend(mismatched)
+
+            report.elapsed = time.perf_counter() - started
+            report.finished_at = time.time()
+            self.last_report = report
+            for user_id, balance, ledger in report.mismatches[:20]:
+                logger.warning(
+                    "Balance mismatch for %s: balance %.2f, ledger %.2f (diff %+.2f)",
+                    user_id, balance, ledger, balance - ledger,
+                )
+            logger.info(
+                "Reconciled %d users (%d new ledger rows) in %.1fs: %d mismatches",
+                report.users, report.rows, report.elapsed, len(report.mismatches),
+            )
+            return report
+
+    async def _stream(self) -> int:
+        """Fold every ledger row after the cursor into the checkpoints, chunk by chunk."""
+        total = 0
+        cursor = await db.get_reconciled_id()
+        while True:
+            rows = await self._next_chunk(cursor)
+            if not rows:
+                return total
+            sums: dict[int, list] = {}  # user_id -> [amount, last tx id]
+            for tx_id, user_id, amount in rows:
+                entry = sums.setdefault(user_id, [0.0, tx_id])
+                entry[0] += amount
+                entry[1] = tx_id
+            last = rows[-1][0]
+            if not await db.advance_checkpoints(
+                [(uid, amount, last_id) for uid, (amount, last_id) in sums.items()], cursor, last,
+            ):
+                raise RuntimeError("Ledger checkpoints moved during reconciliation")
+            total += len(rows)
+            cursor = last
+
+    async def _next_chunk(self, cursor: int) -> list:
+        """Next ``chunk`` rows after ``cursor`` from whichever table holds them.
+
+        The partition list is re-read every chunk, so a month closed or
+        archived mid-run is simply read from its new home.
+        """
+        for partition in reversed(await db.get_ledger_partitions()):
+            if partition["last_id"] is None or partition["last_id"] <= cursor:
+                continue
+            if partition["archive"]:
+                return await asyncio.to_thread(
+                    archiver.read_archive,
+                    partition["archive"],
+                    "SELECT id, user_id, amount FROM transactions WHERE id > ? ORDER BY id LIMIT ?",
+                    (cursor, self.chunk),
+                )
+            return await db.get_ledger_chunk(partition["name"], cursor, self.chunk)
+        return await db.get_ledger_chunk("transactions", cursor, self.chunk)
+
+    # ------------------------
+    # lifecycle
+    # ------------------------
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="reconciler")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run()
+            except Exception:
+                logger.exception("Reconciliation failed")
+
+
+reconciler = Reconciler()
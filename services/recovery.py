@@ -0,0 +1,132 @@
+"""Startup recovery of rounds left open by a crash or restart.
+
+Bets are debited together with an ``open_rounds`` journal row (see
+``DB.open_round``); the row is removed when the round settles. Anything still
+in the journal at startup belongs to a game whose in-memory state is gone, so
+it is settled in the player's favour as far as the game allows:
+
+- mines: cash out at the last reached multiplier (refund if nothing opened);
+- russian: take at the current stage, like the "Take" button (refund on stage 1);
+- blackjack and anything else: refund the full stake.
+
+All rounds are settled with one transaction (``DB.settle_open_rounds``).
+Rounds left idle while the bot runs are settled the same way by
+``services.expiry``, except blackjack (see :func:`timeout_payout`): a refund
+there would let a player with a bad hand stop tapping and get the stake back.
+
+Duels are played by detached tasks, so one that was joined (``active``) when
+the bot stopped has no runner left; both stakes are refunded
+(``DB.refund_active_duels``).
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from database.db import db
+from services.games.rr_logic import rr_win
+from services.provably_fair import FairRng
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RecoveryReport:
+    rounds: int = 0
+    refunded: int = 0
+    cashed_out: int = 0
+    lost: int = 0
+    paid: float = 0.0
+    elapsed: float = 0.0
+
+
+def settle_payout(game_type: str, bet: float, state: dict[str, Any]) -> tuple[str, float]:
+    """``(outcome, payout)`` for an orphaned round; outcome is refund/cashout/lost."""
+    if game_type == "mines":
+        if state.get("game_over") and not state.get("won"):
+            return "lost", 0.0
+        if state.get("opened_cells"):
+            return "cashout", round(bet * float(state.get("current_multiplier", 1.0)), 2)
+        return "refund", bet
+
+    if game_type == "russian":
+        stage = int(state.get("stage", 1))
+        if stage > 1:
+            return "cashout", float(bet + rr_win(bet, stage - 1))
+        return "refund", bet
+
+    return "refund", bet
+
+
+def timeout_payout(server_seeds: dict[str, str]) -> Callable[[str, float, dict[str, Any]], tuple[str, float]]:
+    """Payouts for rounds the idle sweeper closes.
+
+    Like :func:`settle_payout`, but a blackjack hand is finished as a stand
+    (or the pending double) on the shoe rebuilt from its fair seed and the
+    journalled number of hits; ``server_seeds`` maps seed hashes to seeds
+    (``DB.get_server_seeds``). A hand that cannot be rebuilt is forfeited,
+    like leaving the table.
+    """
+    def payout(game_type: str, bet: float, state: dict[str, Any]) -> tuple[str, float]:
+        if game_type == "blackjack":
+            return _stand_blackjack(bet, state, server_seeds)
+        return settle_payout(game_type, bet, state)
+    return payout
+
+
+def _stand_blackjack(bet: float, state: dict[str, Any], server_seeds: dict[str, str]) -> tuple[str, float]:
+    from handlers.games.blackjack import BlackjackGame, Deck
+
+    fair = state.get("fair") or {}
+    try:
+        rng = FairRng(server_seeds[fair["hash"]], fair["client_seed"], int(fair["nonce"]))
+        hits = int(state["hits"])
+    except (KeyError, TypeError, ValueError):
+        return "lost", 0.0
+
+    doubled = bool(state.get("doubled"))
+    game = BlackjackGame(bet / 2 if doubled else bet, Deck(rng=rng))
+    for _ in range(hits):
+        game.hit()
+    if not game.game_over:
+        game.double() if doubled else game.stand()
+    payout = float(game.get_payout())
+    if payout <= 0:
+        return "lost", 0.0
+    return ("refund" if payout == bet else "cashout"), round(payout, 2)
+
+
+def tally(settled) -> RecoveryReport:
+    """Count ``DB.settle_open_rounds`` results by outcome."""
+    report = RecoveryReport(rounds=len(settled))
+    for _, _, _, outcome, payout in settled:
+        if outcome == "refund":
+            report.refunded += 1
+        elif outcome == "cashout":
+            report.cashed_out += 1
+        else:
+            report.lost += 1
+        report.paid += payout
+    return report
+
+
+async def recover_open_rounds() -> RecoveryReport:
+    started = time.perf_counter()
+    report = tally(await db.settle_open_rounds(settle_payout))
+    report.elapsed = time.perf_counter() - started
+    if report.rounds:
+        logger.warning(
+            "Recovered %d open rounds in %.2fs: %d refunded, %d cashed out, %d lost, %.2f paid",
+            report.rounds, report.elapsed, report.refunded, report.cashed_out, report.lost, report.paid,
+        )
+    return report
+
+
+async def recover_active_duels() -> int:
+    refunded = await db.refund_active_duels()
+    if refunded:
+        logger.warning("Refunded %d duels left active by a restart", len(refunded))
+    return len(refunded)
@@ -1,37 +1,163 @@
+"""Referral commissions and the referral tree.
+
+A losing round pays the player's referrer ``COMMISSION`` of the loss. That
+used to be a ``SELECT referred_by``, a balance transaction and an ``UPDATE
+refs_earned`` per round: three more statements and two commits on the hot
+path. Commissions are now added up in memory per referrer and credited every
+``FLUSH_INTERVAL`` seconds and on shutdown (:meth:`close`) in one
+transaction, with one ``referral_loss_bonus`` ledger row per referrer whose
+``meta`` holds the number of losses and the amount lost. Until :meth:`start`
+is called (scripts, benchmarks) every commission is credited straight away.
+Commissions not yet flushed when the process dies are lost (at most
+``FLUSH_INTERVAL`` seconds of them); the rounds themselves are settled.
+
+The referrer of each player is cached for the ``CACHE_SIZE`` most recent
+players, so rounds of a player without a referrer cost nothing after the
+first one.
+
+:meth:`ReferralAccruals.register` links a new player to their inviter, and
+``referral_tree`` (a closure table down to ``REFERRAL_DEPTH`` levels) lists
+anyone's referrals per level with one index range.
+"""
+
 from __future__ import annotations
 
+import asyncio
+import logging
+from collections import OrderedDict
 from decimal import Decimal
 
 from database.db import db
 
+logger = logging.getLogger(__name__)
+
+COMMISSION = Decimal("0.10")
+FLUSH_INTERVAL = 5.0  # seconds
+CACHE_SIZE = 100_000  # players whose referrer is kept in memory
+
+
+class ReferralAccruals:
+    def __init__(self, *, flush_interval: float = FLUSH_INTERVAL, cache_size: int = CACHE_SIZE):
+        self.flush_interval = flush_interval
+        self.cache_size = cache_size
+        # referrer -> [commission, losses, amount lost]
+        self._pending: dict[int, list] = {}
+        self._referrers: OrderedDict[int, int] = OrderedDict()  # player -> referrer (0: none)
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self.credited = 0  # ledger rows written
+        self.flushes = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def remember(self, user_id: int, referrer_id: int | None) -> None:
+        self._referrers[user_id] = referrer_id or 0
+        self._referrers.move_to_end(user_id)
+        if len(self._referrers) > self.cache_size:
+            self._referrers.popitem(last=False)
+
+    async def referrer(self, user_id: int) -> int | None:
+        ref_id = self._referrers.get(user_id)
+        if ref_id is None:
+            ref_id = await db.get_referrer(user_id)
+            self.remember(user_id, ref_id)
+        else:
+            self._referrers.move_to_end(user_id)
+        return ref_id or None
+
+    async def register(self, user_id: int, inviter_id: int) -> bool:
+        """Link ``user_id`` to ``inviter_id`` (see ``Database.register_referral``)."""
+        if not await db.register_referral(user_id, inviter_id):
+            return False
+        self.remember(user_id, inviter_id)
+        return True
+
+    async def award(self, user_id: int, loss_amount: float) -> None:
+        """Accrue ``COMMISSION`` of a player's loss to their referrer."""
+        if loss_amount <= 0:
+            return
+        try:
+            ref_id = await self.referrer(user_id)
+        except Exception:
+            # Failing referral bonus should not break the main flow
+            logger.exception("Referrer lookup for %s failed", user_id)
+            return
+        if not ref_id:
+            return
+        loss = Decimal(str(loss_amount))
+        entry = self._pending.get(ref_id)
+        if entry is None:
+            self._pending[ref_id] = [loss * COMMISSION, 1, loss]
+        else:
+            entry[0] += loss * COMMISSION
+            entry[1] += 1
+            entry[2] += loss
+        if self._task is None:
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Referral commission for %s failed", ref_id)
+
+    async def flush(self) -> int:
+        """Credit everything accrued so far. Returns the number of referrers credited."""
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            credits = [
+                (ref_id, float(bonus), {"losses": losses, "loss": float(lost)})
+                for ref_id, (bonus, losses, lost) in pending.items()
+            ]
+            try:
+                await db.credit_referral_commissions(credits)
+            except Exception:
+                # Merge back for the next flush.
+                for ref_id, (bonus, losses, lost) in pending.items():
+                    entry = self._pending.setdefault(ref_id, [Decimal(0), 0, Decimal(0)])
+                    entry[0] += bonus
+                    entry[1] += losses
+                    entry[2] += lost
+                raise
+            self.credited += len(credits)
+            self.flushes += 1
+            return len(credits)
+
+    # ------------------------
+    # lifecycle
+    # ------------------------
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="referral-accruals")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Also waits for a flush the loop had in flight.
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                # Shielded: close() cancels the loop, not a half-done transaction.
+                await asyncio.shield(self.flush())
+            except Exception:
+                logger.exception("Crediting referral commissions to %d referrers failed, retrying", len(self))
+
+
+referrals = ReferralAccruals()
+
 
 async def award_loss_commission(user_id: int, loss_amount: float) -> None:
     """Add 10% of player's loss to their referrer balance and stats."""
-    if loss_amount <= 0:
-        return
-
-    row = await db.fetchone(
-        "SELECT referred_by FROM users WHERE user_id=?",
-        (user_id,),
-    )
-    if not row or not row[0]:
-        return
-
-    ref_id = int(row[0])
-    bonus = Decimal(str(loss_amount)) * Decimal("0.10")
-
-    try:
-        await db.change_balance_atomic(
-            ref_id,
-            bonus,
-            tx_type="referral_loss_bonus",
-            method="system",
-            meta={"source_user": user_id, "loss": float(loss_amount)},
-        )
-        await db.execute(
-            "UPDATE users SET refs_earned = COALESCE(refs_earned,0) + ? WHERE user_id=?",
-            (float(bonus), ref_id),
-        )
-    except Exception:
-        # Failing referral bonus should not break the main flow
-        return
+    await referrals.award(user_id, loss_amount)
+
+
+async def register_referral(user_id: int, inviter_id: int) -> bool:
+    return await referrals.register(user_id, inviter_id)
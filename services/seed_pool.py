@@ -0,0 +1,192 @@
+"""Precomputed reverse SHA-256 hash chain for provably-fair rounds.
+
+A chain of ``N`` seeds is built backwards from a random 32-byte secret::
+
+    entry[N] = urandom(32)
+    entry[k - 1] = sha256(entry[k])
+
+``entry[0]`` is the terminal hash and is published up front. Seeds are served
+forwards (``entry[1]``, ``entry[2]``, ...), so each served seed is committed by
+the one before it (``sha256(seed_k) == seed_{k-1}``) and hashing any seed
+``index`` times must land on the terminal. Revealing a seed only exposes
+earlier, already served seeds, which is why the chain backs the global round
+stream (``services.fairness.generate_round``) and not per-user server seeds.
+
+The chain lives in one file mapped with mmap::
+
+    header (32 bytes): magic b"SEEDCHN1", uint64 entries, uint64 position, 8 reserved
+    body: entries * 32 bytes
+
+Serving a seed is a slice read plus a header write, no hashing on the event
+loop. Building (and rebuilding once the chain runs out) happens in a daemon
+thread; until a chain is ready callers get ``None`` and fall back to fresh
+random seeds.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+
+from config import SEED_POOL_PATH, SEED_POOL_SIZE
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SEEDCHN1"
+HEADER = struct.Struct("<8sQQ8x")
+DIGEST = 32
+FLUSH_EVERY = 256
+
+
+def build_chain(path: str, size: int) -> bytes:
+    """Write a fresh chain of ``size`` seeds to ``path``; returns the terminal hash.
+
+    Overwrites ``path`` directly, so callers write to a temporary name and move
+    it into place.
+    """
+    entries = size + 1
+    body = bytearray(entries * DIGEST)
+    link = os.urandom(DIGEST)
+    sha256 = hashlib.sha256
+    for k in range(size, -1, -1):
+        body[k * DIGEST:(k + 1) * DIGEST] = link
+        link = sha256(link).digest()
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, entries, 1))
+        f.write(body)
+        f.flush()
+        os.fsync(f.fileno())
+    return bytes(body[:DIGEST])
+
+
+def verify_seed(seed_hex: str, index: int, terminal_hex: str) -> bool:
+    """True if hashing ``seed`` ``index`` times gives the published terminal."""
+    link = bytes.fromhex(seed_hex)
+    for _ in range(index):
+        link = hashlib.sha256(link).digest()
+    return link.hex() == terminal_hex
+
+
+class SeedPool:
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = size
+        self._lock = threading.Lock()
+        self._file = None
+        self._map: mmap.mmap | None = None
+        self._entries = 0
+        self._position = 0
+        self._served = 0
+        self._building = False
+
+    # ------------------------
+    # lifecycle
+    # ------------------------
+    def start(self) -> None:
+        """Open the chain file, or build one in the background if missing/used up."""
+        with self._lock:
+            if self._map is None and os.path.exists(self.path):
+                self._open()
+            if self._map is None or self._position >= self._entries:
+                self._rebuild_async()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    def _open(self) -> None:
+        f = open(self.path, "r+b")
+        try:
+            mapped = mmap.mmap(f.fileno(), 0)
+        except ValueError:  # empty file
+            f.close()
+            return
+        magic, entries, position = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC or len(mapped) != HEADER.size + entries * DIGEST:
+            logger.warning("Seed chain %s is corrupt, rebuilding", self.path)
+            mapped.close()
+            f.close()
+            return
+        self._file, self._map = f, mapped
+        self._entries, self._position = entries, position
+        logger.info(
+            "Seed chain loaded: %d/%d seeds left, terminal %s",
+            entries - position, entries - 1, self.terminal,
+        )
+
+    def _close(self) -> None:
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+            self._file.close()
+        self._map = self._file = None
+        self._entries = self._position = 0
+
+    def _rebuild_async(self) -> None:
+        if self._building:
+            return
+        self._building = True
+        threading.Thread(target=self._rebuild, name="seed-pool-build", daemon=True).start()
+
+    def _rebuild(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            terminal = build_chain(tmp, self.size)
+            with self._lock:
+                # The old mapping must be closed before the file is replaced (Windows).
+                self._close()
+                os.replace(tmp, self.path)
+                self._open()
+            logger.info("Seed chain built: %d seeds, terminal %s", self.size, terminal.hex())
+        except Exception:
+            logger.exception("Seed chain build failed")
+        finally:
+            self._building = False
+
+    # ------------------------
+    # serving
+    # ------------------------
+    @property
+    def ready(self) -> bool:
+        return self._map is not None and self._position < self._entries
+
+    @property
+    def terminal(self) -> str | None:
+        if self._map is None:
+            return None
+        return self._map[HEADER.size:HEADER.size + DIGEST].hex()
+
+    @property
+    def remaining(self) -> int:
+        return max(self._entries - self._position, 0)
+
+    def next_seed(self) -> tuple[int, str, str] | None:
+        """``(index, seed_hex, commitment_hex)`` or None if no chain is ready.
+
+        ``commitment_hex`` is the previous chain entry, i.e. ``sha256(seed)``.
+        """
+        with self._lock:
+            if not self.ready:
+                self._rebuild_async()
+                return None
+            index = self._position
+            offset = HEADER.size + index * DIGEST
+            seed = self._map[offset:offset + DIGEST].hex()
+            commitment = self._map[offset - DIGEST:offset].hex()
+            self._position = index + 1
+            HEADER.pack_into(self._map, 0, MAGIC, self._entries, self._position)
+            self._served += 1
+            if self._served % FLUSH_EVERY == 0:
+                self._map.flush(0, mmap.PAGESIZE)
+            if self._position >= self._entries:
+                self._rebuild_async()
+            return index, seed, commitment
+
+
+pool = SeedPool(SEED_POOL_PATH, SEED_POOL_SIZE)
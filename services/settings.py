@@ -4,6 +4,7 @@ import json
 from typing import Iterable
 
 from database.db import db
+from services.tenants import tenants
 from config import (
     CHANNELS as DEFAULT_CHANNELS,
     ROCKET_BOT as DEFAULT_ROCKET_BOT,
@@ -14,8 +15,23 @@ from config import (
 )
 
 
+async def _get(key: str) -> str | None:
+    """The current tenant's own value of ``key``, else the shared one."""
+    tenant = tenants.current()
+    if tenant is not None and tenant.namespace:
+        raw = await db.get_setting(tenant.namespace + key)
+        if raw is not None:
+            return raw
+    return await db.get_setting(key)
+
+
+async def _set(key: str, value: str) -> None:
+    tenant = tenants.current()
+    await db.set_setting((tenant.namespace if tenant is not None else "") + key, value)
+
+
 async def get_channels() -> list[str]:
-    raw = await db.get_setting("channels")
+    raw = await _get("channels")
     if not raw:
         return DEFAULT_CHANNELS
     try:
@@ -26,7 +42,7 @@ async def get_channels() -> list[str]:
 
 async def set_channels(channels: Iterable[str]) -> None:
     cleaned = [c.strip() for c in channels if c and c.strip()]
-    await db.set_setting("channels", json.dumps(cleaned, ensure_ascii=False))
+    await _set("channels", json.dumps(cleaned, ensure_ascii=False))
 
 
 async def get_requisite(name: str, default: str | None = None) -> str | None:
@@ -34,7 +50,7 @@ async def get_requisite(name: str, default: str | None = None) -> str | None:
         "rocket_bot": DEFAULT_ROCKET_BOT,
         "crypto_bot": DEFAULT_CRYPTO_BOT,
     }
-    raw = await db.get_setting(name)
+    raw = await _get(name)
     if raw is not None:
         return raw
     if default is not None:
@@ -43,11 +59,11 @@ async def get_requisite(name: str, default: str | None = None) -> str | None:
 
 
 async def set_requisite(name: str, value: str) -> None:
-    await db.set_setting(name, value)
+    await _set(name, value)
 
 
 async def get_duel_log_channel() -> int | None:
-    raw = await db.get_setting("duel_log_channel")
+    raw = await _get("duel_log_channel")
     if raw:
         try:
             return int(raw)
@@ -57,20 +73,20 @@ async def get_duel_log_channel() -> int | None:
 
 
 async def set_duel_log_channel(chat_id: int | None) -> None:
-    await db.set_setting("duel_log_channel", str(chat_id) if chat_id is not None else "")
+    await _set("duel_log_channel", str(chat_id) if chat_id is not None else "")
 
 
 async def get_support_url() -> str | None:
-    raw = await db.get_setting("support_url")
+    raw = await _get("support_url")
     return raw if raw is not None else DEFAULT_SUPPORT_URL
 
 
 async def set_support_url(value: str | None) -> None:
-    await db.set_setting("support_url", value or "")
+    await _set("support_url", value or "")
 
 
 async def get_game_log_channel() -> int | None:
-    raw = await db.get_setting("game_log_channel")
+    raw = await _get("game_log_channel")
     if raw:
         try:
             return int(raw)
@@ -0,0 +1,103 @@
+"""Several bots (tenants) served by one process.
+
+``BOT_TOKENS`` lists the bots. Each is a ``Bot`` on one shared
+:class:`~services.bot_session.ScheduledSession`, so they share one aiohttp
+connection pool and one scheduler (which keeps Telegram's limits per bot),
+and all of them share the database, the background services and the event
+loop. One ``Dispatcher`` polls every bot (``dp.start_polling(*bots)``):
+routers are module-level singletons that can be attached to one parent
+only, and handlers already answer through the ``bot`` of their update.
+
+:meth:`Tenants.middleware` marks which tenant an update came to, for
+:func:`current`. Admin settings (``services.settings``) of every bot but the
+primary one (``BOT_TOKEN``) are stored under ``"<bot id>:<key>"`` and fall
+back to the shared value, so a tenant can have its own log channels and
+support link while the rest keeps the defaults.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+
+
+@dataclass(frozen=True, slots=True)
+class Tenant:
+    bot: Bot
+    id: int
+    username: str | None
+    primary: bool
+
+    @property
+    def namespace(self) -> str:
+        """Prefix of the tenant's own settings keys ("" for the primary bot)."""
+        return "" if self.primary else f"{self.id}:"
+
+
+_current: ContextVar[Tenant | None] = ContextVar("tenant", default=None)
+
+
+class Tenants:
+    def __init__(self) -> None:
+        self._by_id: dict[int, Tenant] = {}
+        self._primary: Tenant | None = None
+        # user id -> id of the non-primary bot they wrote to last
+        self._last_seen: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[Tenant]:
+        return iter(self._by_id.values())
+
+    @property
+    def primary(self) -> Tenant | None:
+        return self._primary
+
+    async def start(self, tokens: list[str], session: BaseSession, **bot_kwargs: Any) -> list[Bot]:
+        """Create a ``Bot`` per token on ``session`` and look them all up at once.
+
+        The first token is the primary bot.
+        """
+        bots = [Bot(token, session=session, **bot_kwargs) for token in tokens]
+        for i, (bot, me) in enumerate(zip(bots, await asyncio.gather(*(bot.get_me() for bot in bots)))):
+            tenant = Tenant(bot=bot, id=me.id, username=me.username, primary=i == 0)
+            self._by_id[me.id] = tenant
+            if tenant.primary:
+                self._primary = tenant
+        return bots
+
+    def get(self, bot_id: int) -> Tenant | None:
+        return self._by_id.get(bot_id)
+
+    def current(self) -> Tenant | None:
+        """Tenant of the update being handled; the primary one outside of updates."""
+        return _current.get() or self._primary
+
+    def bot_for(self, user_id: int, default: Bot | None = None) -> Bot | None:
+        """Bot the user wrote to last, for messages sent outside of an update."""
+        tenant = self._by_id.get(self._last_seen.get(user_id, 0))
+        return tenant.bot if tenant is not None else default
+
+    async def middleware(self, handler, event, data):
+        """Outer ``dp.update`` middleware: remember which bot got the update."""
+        tenant = self._by_id.get(data["bot"].id)
+        user = data.get("event_from_user")
+        if tenant is not None and user is not None:
+            if tenant.primary:
+                self._last_seen.pop(user.id, None)
+            else:
+                self._last_seen[user.id] = tenant.id
+        token = _current.set(tenant)
+        try:
+            return await handler(event, data)
+        finally:
+            _current.reset(token)
+
+
+tenants = Tenants()
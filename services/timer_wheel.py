@@ -0,0 +1,112 @@
+"""Hierarchical timer wheel.
+
+Deadlines are kept in levels of slots; level ``l`` slots are
+``slots[0] * ... * slots[l - 1]`` ticks wide, so with the default
+``(64, 64, 32)`` and a one second tick the wheel covers about 36 hours.
+Scheduling, refreshing and cancelling a key are O(1): the key is dropped into
+(or removed from) one slot set. :meth:`TimerWheel.advance` walks the elapsed
+ticks; whenever a lower level wraps around, the matching slot of the level
+above is cascaded down. Deadlines past the last level wait in its farthest
+slot and are re-placed when they cascade.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Hashable, Sequence
+
+
+class TimerWheel:
+    def __init__(self, tick: float = 1.0, slots: Sequence[int] = (64, 64, 32), now: float = 0.0):
+        if tick <= 0 or not slots or min(slots) < 2:
+            raise ValueError("tick must be positive and every level needs at least 2 slots")
+        self.tick = tick
+        self._sizes = tuple(slots)
+        self._spans = []  # ticks per slot on each level
+        span = 1
+        for size in self._sizes:
+            self._spans.append(span)
+            span *= size
+        self._horizon = span
+        self._levels: list[list[set]] = [[set() for _ in range(size)] for size in self._sizes]
+        self._deadlines: dict[Hashable, int] = {}
+        self._slot_of: dict[Hashable, set] = {}
+        self._current = math.floor(now / tick)
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._deadlines
+
+    def _ticks(self, when: float) -> int:
+        return math.ceil(when / self.tick)
+
+    def _place(self, key: Hashable, deadline: int) -> None:
+        delta = deadline - self._current
+        if delta >= self._horizon:
+            deadline, delta = self._current + self._horizon - 1, self._horizon - 1
+        for level, size in enumerate(self._sizes):
+            if delta < self._spans[level] * size:
+                break
+        bucket = self._levels[level][(deadline // self._spans[level]) % size]
+        bucket.add(key)
+        self._slot_of[key] = bucket
+
+    def schedule(self, key: Hashable, when: float) -> None:
+        """Fire ``key`` at ``when`` (same clock as ``advance``); moves it if already scheduled."""
+        self.cancel(key)
+        # The current tick's slot has already been swept; due keys go to the next one.
+        deadline = max(self._ticks(when), self._current + 1)
+        self._deadlines[key] = deadline
+        self._place(key, deadline)
+
+    refresh = schedule
+
+    def cancel(self, key: Hashable) -> bool:
+        bucket = self._slot_of.pop(key, None)
+        if bucket is None:
+            return False
+        bucket.discard(key)
+        del self._deadlines[key]
+        return True
+
+    def deadline(self, key: Hashable) -> float | None:
+        ticks = self._deadlines.get(key)
+        return None if ticks is None else ticks * self.tick
+
+    def advance(self, now: float) -> list[Hashable]:
+        """Move the wheel to ``now`` and return the keys whose deadline passed."""
+        # Deadlines round up and ``now`` rounds down, so nothing fires early.
+        target = math.floor(now / self.tick)
+        expired: list[Hashable] = []
+        while self._current < target:
+            if not self._deadlines:
+                self._current = target
+                break
+            self._current += 1
+            current = self._current
+            # Highest level first, so cascaded keys can fall all the way down.
+            for level in range(len(self._sizes) - 1, 0, -1):
+                span = self._spans[level]
+                if current % span == 0:
+                    bucket = self._levels[level][(current // span) % self._sizes[level]]
+                    if bucket:
+                        keys = list(bucket)
+                        bucket.clear()
+                        for key in keys:
+                            self._place(key, self._deadlines[key])
+
+            bucket = self._levels[0][current % self._sizes[0]]
+            if bucket:
+                for key in list(bucket):
+                    if self._deadlines[key] <= current:
+                        bucket.discard(key)
+                        del self._slot_of[key]
+                        del self._deadlines[key]
+                        expired.append(key)
+                    else:
+                        # Clamped past the horizon; not due yet.
+                        bucket.discard(key)
+                        self._place(key, self._deadlines[key])
+        return expired